@@ -0,0 +1 @@
+"""Benchmarks for the NodeNest server, driven from Python."""
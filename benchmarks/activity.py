@@ -0,0 +1,55 @@
+"""Activity log throughput at a month of audit trail.
+
+Appends ``--records`` activities spread over ``--days`` daily segments, then
+times newest-first page reads (unfiltered, deep offset, per user and per
+resource), a full streaming export and a retention cleanup that drops half
+of the segments.
+
+    python3 -m benchmarks.activity [--records 2000000] [--days 30]
+
+Exits 1 when the export grows the heap by more than ``--export-heap-mb``,
+i.e. when export is no longer streaming.
+"""
+
+import argparse
+import sys
+
+from benchmarks.node import fmt_ms, run_driver
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--records', type=int, default=2000000)
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--resources', type=int, default=50000)
+    parser.add_argument('--iterations', type=int, default=500)
+    parser.add_argument('--export-heap-mb', type=float, default=64.0,
+                        help='maximum heap growth across a full export')
+    args = parser.parse_args(argv)
+
+    result = run_driver('activity', {
+        'records': args.records, 'days': args.days, 'users': args.users,
+        'resources': args.resources, 'iterations': args.iterations,
+    })
+    print('appended %d records into %d segments in %.0f ms (%.0f/s)' % (
+        result['records'], result['segments'], result['append_ms'], result['appends_per_sec']))
+    print('%-22s %9s %9s %9s' % ('page', 'p50', 'p99', 'max'))
+    for label in ('first_page', 'deep_page', 'user_page', 'resource_page'):
+        stats = result[label]
+        print('%-22s %s %s %s' % (label, fmt_ms(stats['p50_ms']), fmt_ms(stats['p99_ms']), fmt_ms(stats['max_ms'])))
+    print('exported %d records in %.0f ms (%.0f rows/s), heap %+.1f MB, peak rss %.0f MB' % (
+        result['exported'], result['export_ms'], result['export_rows_per_sec'],
+        result['export_heap_mb'], result['rss_mb']))
+    cleanup = result['cleanup']
+    print('cleanup dropped %d segments (%d records) in %.1f ms, %d remain' % (
+        cleanup['segments'], cleanup['deleted'], result['cleanup_ms'], cleanup['remaining']))
+
+    if result['export_heap_mb'] > args.export_heap_mb:
+        print('export grew the heap by %.1f MB (budget %.1f MB)' % (result['export_heap_mb'], args.export_heap_mb))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
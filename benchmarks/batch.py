@@ -0,0 +1,127 @@
+"""1,000 single task status PATCHes against one batch or bulk request.
+
+Starts ``server/index.js`` on a generated dataset and, for ``--rounds``
+rounds, moves the same ``--count`` tasks to a new status three ways:
+
+* ``single``: one ``PATCH /api/tasks/:id/status`` each, over ``--connections``
+  keep-alive connections (6 is a browser's per-host limit; 1 is sequential);
+* ``batch``: one ``POST /api/batch`` carrying those PATCHes as sub-requests;
+* ``bulk``: one ``PATCH /api/tasks/bulk/status`` naming every id.
+
+    python3 -m benchmarks.batch [--tasks 100000] [--count 1000] [--connections 1,6] [--rounds 5]
+
+Prints the median wall time of each way and its speedup over sequential
+singles. Every round checks that all tasks took the new status. Exits 1 when
+a write fails or when the batch is less than ``--min-speedup`` times faster
+than the sequential singles.
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+
+from benchmarks.datagen import dataset
+from harness.loadgen import ConnectionPool
+from harness.server import NodeServer
+
+STATUSES = ('in_progress', 'review', 'completed', 'todo')
+
+
+async def singles(pool, ids, status, connections):
+    queue = list(reversed(ids))
+    failed = []
+
+    async def worker():
+        while queue:
+            task_id = queue.pop()
+            response = await pool.request('PATCH', '/api/tasks/%s/status' % task_id, {'status': status})
+            if response.status != 200:
+                failed.append('%s: %d' % (task_id, response.status))
+
+    await asyncio.gather(*(worker() for _ in range(connections)))
+    return failed
+
+
+async def batch(pool, ids, status, connections):
+    requests = [{'method': 'PATCH', 'path': '/api/tasks/%s/status' % task_id, 'body': {'status': status}}
+                for task_id in ids]
+    response = await pool.request('POST', '/api/batch', {'requests': requests})
+    if response.status != 200:
+        return ['batch: %d %s' % (response.status, response.body[:200])]
+    items = json.loads(response.body)['responses']
+    return ['%s: %d' % (task_id, item['status']) for task_id, item in zip(ids, items) if item['status'] != 200]
+
+
+async def bulk(pool, ids, status, connections):
+    response = await pool.request('PATCH', '/api/tasks/bulk/status', {'ids': ids, 'status': status})
+    if response.status != 200:
+        return ['bulk: %d %s' % (response.status, response.body[:200])]
+    return []
+
+
+async def check(pool, ids, status):
+    """Ids of tasks that don't have ``status``."""
+    wrong = []
+    for task_id in ids[:: max(1, len(ids) // 50)]:
+        response = await pool.request('GET', '/api/tasks/%s' % task_id)
+        if response.status != 200 or json.loads(response.body)['task']['status'] != status:
+            wrong.append(task_id)
+    return wrong
+
+
+async def measure(server, args):
+    ids = [str(task_id) for task_id in range(1, args.count + 1)]
+    ways = [('single x%d' % connections, singles, connections) for connections in args.connections]
+    ways += [('batch', batch, 1), ('bulk', bulk, 1)]
+    pool = ConnectionPool(server.host, server.port, size=max(args.connections))
+    timings = {name: [] for name, _, _ in ways}
+    problems = []
+    step = 0
+    try:
+        for _ in range(args.rounds + 1):
+            for name, run, connections in ways:
+                status = STATUSES[step % len(STATUSES)]
+                step += 1
+                started = time.perf_counter()
+                failed = await run(pool, ids, status, connections)
+                elapsed = time.perf_counter() - started
+                failed += ['%s not %s' % (task_id, status) for task_id in await check(pool, ids, status)]
+                if failed:
+                    problems.append('%s: %d failures, e.g. %s' % (name, len(failed), failed[0]))
+                timings[name].append(elapsed)
+    finally:
+        await pool.close()
+    # The first round warms the routes up
+    return {name: statistics.median(samples[1:]) for name, samples in timings.items()}, problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--tasks', type=int, default=100000)
+    parser.add_argument('--count', type=int, default=1000, help='tasks updated per round')
+    parser.add_argument('--connections', default='1,6', help='comma-separated connection counts for singles')
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--min-speedup', type=float, default=2.0)
+    args = parser.parse_args(argv)
+    args.connections = sorted({int(count) for count in args.connections.split(',')})
+
+    seed_file = dataset(tasks=args.tasks)
+    with NodeServer(env={'SEED_FILE': seed_file}, timeout=300) as server:
+        medians, problems = asyncio.run(measure(server, args))
+
+    baseline = medians['single x%d' % args.connections[0]]
+    print('%-12s %10s %8s' % ('way', 'median ms', 'speedup'))
+    for name, seconds in medians.items():
+        print('%-12s %10.1f %7.1fx' % (name, seconds * 1000.0, baseline / seconds))
+    if args.connections[0] == 1 and baseline / medians['batch'] < args.min_speedup:
+        problems.append('batch only %.1fx faster than sequential singles' % (baseline / medians['batch']))
+    for line in problems:
+        print('FAIL ' + line)
+    return 1 if problems else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,129 @@
+"""Throughput of cluster mode from 1 to N workers.
+
+Starts ``server/index.js`` on the same generated dataset with
+``CLUSTER_WORKERS`` set to each of ``--workers`` in turn, waits for all
+workers to listen, and saturates the read routes below with ``--clients``
+load-generator processes running closed loops. Prints requests/second per
+route and worker count and the scaling efficiency against one worker
+(``throughput(n) / (n * throughput(1))``).
+
+    python3 -m benchmarks.cluster [--tasks 100000] [--workers 1,2,4] [--clients 4] [--duration 5]
+
+The response cache is off by default (``--cache`` turns it on) so every
+request does the route's real work. Exits 1 when any request fails or, if
+the machine has a core for every worker and client, when the efficiency at
+the largest worker count is below ``--min-efficiency``.
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import sys
+import time
+
+from benchmarks.datagen import dataset
+from harness.loadgen import ConnectionPool, closed_loop
+from harness.server import NodeServer
+
+ROUTES = (
+    '/api/tasks?projectId=1',
+    '/api/tasks?status=in_progress&priority=high',
+    '/api/dashboard/stats',
+    '/api/dashboard/tasks/status',
+)
+
+
+def default_workers():
+    counts = [1]
+    while counts[-1] * 2 <= max(1, (os.cpu_count() or 1) // 2):
+        counts.append(counts[-1] * 2)
+    return ','.join(map(str, counts))
+
+
+def client(host, port, path, concurrency, duration, results):
+    async def drive():
+        pool = ConnectionPool(host, port, size=concurrency)
+        try:
+            request = lambda i: ('GET', path, None, None)
+            await closed_loop(pool, request, concurrency, min(1.0, duration))
+            recorder, elapsed = await closed_loop(pool, request, concurrency, duration)
+            return recorder.summary(elapsed)
+        finally:
+            await pool.close()
+
+    results.put(asyncio.run(drive()))
+
+
+def saturate(server, path, clients, concurrency, duration):
+    """Requests/second, p99 and failures summed over ``clients`` processes."""
+    results = multiprocessing.Queue()
+    procs = [multiprocessing.Process(target=client, args=(server.host, server.port, path, concurrency, duration, results))
+             for _ in range(clients)]
+    for proc in procs:
+        proc.start()
+    summaries = [results.get() for _ in procs]
+    for proc in procs:
+        proc.join()
+    failures = sum(sum(summary['errors'].values()) for summary in summaries)
+    failures += sum(count for summary in summaries for code, count in summary['statuses'].items() if code != '200')
+    return {
+        'throughput': sum(summary['throughput'] for summary in summaries),
+        'p99_ms': max(summary['p99_ms'] for summary in summaries),
+        'failures': failures,
+    }
+
+
+def wait_for_cluster(server, timeout):
+    deadline = time.monotonic() + timeout
+    while 'Cluster ready' not in server.log():
+        if time.monotonic() > deadline:
+            raise RuntimeError('cluster not ready after %.0fs:\n%s' % (timeout, server.log()))
+        time.sleep(0.05)
+
+
+def run(workers, seed_file, args):
+    env = {'SEED_FILE': seed_file, 'CLUSTER_WORKERS': str(workers), 'RESPONSE_CACHE': 'on' if args.cache else 'off'}
+    with NodeServer(env=env, timeout=180) as server:
+        wait_for_cluster(server, 180)
+        return {path: saturate(server, path, args.clients, args.concurrency, args.duration) for path in ROUTES}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--tasks', type=int, default=100000)
+    parser.add_argument('--workers', default=default_workers(), help='comma-separated worker counts')
+    parser.add_argument('--clients', type=int, default=4, help='load-generator processes')
+    parser.add_argument('--concurrency', type=int, default=16, help='requests outstanding per client')
+    parser.add_argument('--duration', type=float, default=5.0, help='measured seconds per route')
+    parser.add_argument('--cache', action='store_true', help='leave the response cache on')
+    parser.add_argument('--min-efficiency', type=float, default=0.7)
+    args = parser.parse_args(argv)
+
+    counts = sorted({int(count) for count in args.workers.split(',')})
+    seed_file = dataset(tasks=args.tasks)
+    results = {workers: run(workers, seed_file, args) for workers in counts}
+
+    print('%-44s %7s %11s %9s %10s' % ('route', 'workers', 'req/s', 'p99 ms', 'efficiency'))
+    problems = []
+    for path in ROUTES:
+        base = results[counts[0]][path]['throughput'] / counts[0]
+        for workers in counts:
+            result = results[workers][path]
+            efficiency = result['throughput'] / (workers * base) if base else 0.0
+            print('%-44s %7d %11.0f %9.2f %10.2f' % (path[:44], workers, result['throughput'], result['p99_ms'], efficiency))
+            if result['failures']:
+                problems.append('%s with %d workers: %d failed requests' % (path, workers, result['failures']))
+        if counts[-1] + args.clients <= (os.cpu_count() or 1) and efficiency < args.min_efficiency:
+            problems.append('%s: efficiency %.2f at %d workers' % (path, efficiency, counts[-1]))
+
+    if counts[-1] + args.clients > (os.cpu_count() or 1):
+        print('(%d cores for %d workers and %d clients: efficiency not checked)' % (
+            os.cpu_count() or 1, counts[-1], args.clients))
+    for line in problems:
+        print('FAIL ' + line)
+    return 1 if problems else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,249 @@
+"""Cold start: time from spawning the server to its first answers, tracked by commit.
+
+Each run spawns ``node server/index.js`` and measures, from the spawn:
+
+* ``health``: the first 200 from ``/api/health`` (polled every 2 ms);
+* for each route group, in a fixed order, the first request under its prefix
+  (``first_ms``: latency of that request, which pays for loading the group;
+  ``since_spawn_ms``: when it completed) and a second one (``warm_ms``).
+
+Every figure is the median of ``--runs`` fresh processes. Results are
+appended to a JSON-lines history keyed by commit (``dirty`` when the working
+tree has uncommitted changes), and each run is compared with the latest
+record of a different commit::
+
+    python3 -m benchmarks.cold_start run [--runs 5] [--tasks 0] [--ref REF ...] [--threshold 0.25]
+    python3 -m benchmarks.cold_start history [--last 10]
+
+``--ref`` measures committed trees in temporary git worktrees (dependencies
+resolve from this checkout's node_modules) instead of the working tree,
+e.g. ``--ref HEAD~1 --ref HEAD`` to record both sides of a change.
+
+``run`` exits 1 when time to first health check regresses by more than
+``--threshold`` and at least ``--min-delta-ms`` against that record.
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.datagen import dataset
+from benchmarks.latency import node_version
+from harness.routes import REPO_ROOT
+from harness.server import free_port, http_get
+
+DEFAULT_HISTORY = os.path.join(REPO_ROOT, '.harness', 'bench', 'cold_start.jsonl')
+POLL_INTERVAL = 0.002
+
+# One cheap GET per route group, in the order they are first requested
+GROUP_PROBES = (
+    ('users', '/api/users'),
+    ('projects', '/api/projects'),
+    ('tasks', '/api/tasks'),
+    ('dashboard', '/api/dashboard/stats'),
+    ('search', '/api/search/global?q=task'),
+    ('comments', '/api/comments?resourceId=1'),
+    ('tags', '/api/tags/popular'),
+    ('activities', '/api/activities'),
+    ('notifications', '/api/notifications/unread/count'),
+    ('files', '/api/files'),
+)
+
+
+def git(*args, cwd=REPO_ROOT):
+    return subprocess.run(('git',) + args, cwd=cwd, check=True,
+                          stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True).stdout.strip()
+
+
+def describe(ref=None):
+    """``(commit, subject, dirty)`` of ``ref``, or of the working tree."""
+    commit = git('rev-parse', '--verify', (ref or 'HEAD') + '^{commit}')
+    subject = git('log', '-1', '--format=%s', commit)
+    dirty = ref is None and bool(git('status', '--porcelain', '--untracked-files=no'))
+    return commit, subject, dirty
+
+
+def spawn_once(tree, seed_file, timeout):
+    """One fresh server process in ``tree``: health and per-group timings."""
+    port = free_port()
+    env = dict(os.environ, PORT=str(port), NODE_ENV='production')
+    env['NODE_PATH'] = os.pathsep.join(filter(None, [os.path.join(REPO_ROOT, 'node_modules'), env.get('NODE_PATH')]))
+    if seed_file:
+        env['SEED_FILE'] = seed_file
+    log = tempfile.TemporaryFile()
+    started = time.monotonic()
+    proc = subprocess.Popen(['node', os.path.join('server', 'index.js')], cwd=tree, env=env,
+                            stdout=log, stderr=subprocess.STDOUT)
+    try:
+        deadline = started + timeout
+        while True:
+            result = http_get('127.0.0.1', port, '/api/health', timeout=0.5)
+            if result and result[0] == 200:
+                break
+            if proc.poll() is not None or time.monotonic() > deadline:
+                log.seek(0)
+                raise RuntimeError('server never became healthy:\n%s' % log.read().decode('utf-8', 'replace'))
+            time.sleep(POLL_INTERVAL)
+        timings = {'health_ms': (time.monotonic() - started) * 1000.0, 'groups': {}}
+        for group, path in GROUP_PROBES:
+            sent = time.monotonic()
+            result = http_get('127.0.0.1', port, path, timeout=timeout)
+            done = time.monotonic()
+            http_get('127.0.0.1', port, path, timeout=timeout)
+            timings['groups'][group] = {
+                'first_ms': (done - sent) * 1000.0,
+                'warm_ms': (time.monotonic() - done) * 1000.0,
+                'since_spawn_ms': (done - started) * 1000.0,
+                'status': result[0] if result else None,
+            }
+        return timings
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+        log.close()
+
+
+def median_timings(runs):
+    median = lambda values: round(statistics.median(values), 3)
+    return {
+        'health_ms': median([run['health_ms'] for run in runs]),
+        'groups': {
+            group: dict(
+                {stat: median([run['groups'][group][stat] for run in runs])
+                 for stat in ('first_ms', 'warm_ms', 'since_spawn_ms')},
+                status=runs[-1]['groups'][group]['status'],
+            )
+            for group, _ in GROUP_PROBES
+        },
+    }
+
+
+def measure(ref, args, seed_file):
+    commit, subject, dirty = describe(ref)
+    scratch = None
+    tree = REPO_ROOT
+    if ref is not None:
+        scratch = tempfile.mkdtemp(prefix='nodenest-cold-start-')
+        tree = os.path.join(scratch, 'tree')
+        git('worktree', 'add', '--detach', tree, commit)
+    try:
+        spawn_once(tree, seed_file, args.timeout)  # warms the OS file cache
+        runs = [spawn_once(tree, seed_file, args.timeout) for _ in range(args.runs)]
+    finally:
+        if scratch:
+            subprocess.run(['git', 'worktree', 'remove', '--force', tree], cwd=REPO_ROOT,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            shutil.rmtree(scratch, ignore_errors=True)
+    record = {
+        'commit': commit,
+        'subject': subject,
+        'dirty': dirty,
+        'node': node_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'tasks': args.tasks,
+        'runs': args.runs,
+        'timestamp': time.time(),
+    }
+    record.update(median_timings(runs))
+    return record
+
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def label(record):
+    return '%s%s' % (record['commit'][:10], '+dirty' if record.get('dirty') else '')
+
+
+def print_record(record, previous):
+    print('%s %s' % (label(record), record['subject']))
+    before = previous and previous['health_ms']
+    print('  %-14s %9.1f ms%s' % ('health', record['health_ms'],
+                                  '   (was %.1f ms at %s)' % (before, label(previous)) if previous else ''))
+    print('  %-14s %9s %9s %9s %12s' % ('group', 'first', 'warm', 'at', 'first before'))
+    for group, stats in record['groups'].items():
+        was = previous and previous['groups'].get(group)
+        print('  %-14s %9.2f %9.2f %9.1f %12s%s' % (
+            group, stats['first_ms'], stats['warm_ms'], stats['since_spawn_ms'],
+            '%.2f' % was['first_ms'] if was else '-',
+            '' if stats['status'] == 200 else '  (status %s)' % stats['status']))
+
+
+def previous_record(history, record):
+    """The latest record of another commit (or the committed tree) with the same seed size."""
+    for old in reversed(history):
+        if old['tasks'] == record['tasks'] and (old['commit'], old.get('dirty')) != (record['commit'], record['dirty']):
+            return old
+    return None
+
+
+def run(args):
+    seed_file = dataset(tasks=args.tasks) if args.tasks else None
+    history = load_history(args.history)
+    os.makedirs(os.path.dirname(os.path.abspath(args.history)), exist_ok=True)
+    regressions = []
+    for ref in args.ref or [None]:
+        record = measure(ref, args, seed_file)
+        previous = previous_record(history, record)
+        print_record(record, previous)
+        with open(args.history, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, sort_keys=True) + '\n')
+        history.append(record)
+        if previous:
+            before, after = previous['health_ms'], record['health_ms']
+            if after > before * (1 + args.threshold) and after - before >= args.min_delta_ms:
+                regressions.append('%s: health %.1f ms -> %.1f ms (vs %s)' % (
+                    label(record), before, after, label(previous)))
+    for line in regressions:
+        print('REGRESSION ' + line)
+    return 1 if regressions else 0
+
+
+def show_history(args):
+    history = load_history(args.history)[-args.last:]
+    print('%-16s %6s %9s %9s  %s' % ('commit', 'tasks', 'health', 'slowest', 'subject'))
+    for record in history:
+        group, stats = max(record['groups'].items(), key=lambda item: item[1]['first_ms'])
+        print('%-16s %6d %9.1f %9s  %s' % (
+            label(record), record['tasks'], record['health_ms'],
+            '%s %.1f' % (group, stats['first_ms']), record['subject'][:60]))
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    sub = parser.add_subparsers(dest='command', required=True)
+    run_cmd = sub.add_parser('run', help='measure and append to the history')
+    run_cmd.add_argument('--runs', type=int, default=5, help='fresh processes per tree (median)')
+    run_cmd.add_argument('--tasks', type=int, default=0, help='seed this many generated tasks (0: no seed)')
+    run_cmd.add_argument('--ref', action='append', help='measure this commit instead of the working tree')
+    run_cmd.add_argument('--timeout', type=float, default=120.0)
+    run_cmd.add_argument('--threshold', type=float, default=0.25)
+    run_cmd.add_argument('--min-delta-ms', type=float, default=20.0,
+                         help='ignore health differences smaller than this (process spawn jitter)')
+    hist_cmd = sub.add_parser('history', help='list recorded runs')
+    hist_cmd.add_argument('--last', type=int, default=10)
+    for cmd in (run_cmd, hist_cmd):
+        cmd.add_argument('--history', default=DEFAULT_HISTORY)
+    args = parser.parse_args(argv)
+    return run(args) if args.command == 'run' else show_history(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""TaskDetail comment-load latency at 10 and at 10,000 comments per task.
+
+Writes a seed file holding the generated dataset plus comments: task 1
+gets ``--small`` of them, task 2 ``--large``, and ``--background`` more
+are spread over the other tasks. A ``--reply-share`` of each task's
+comments are replies to one of its earlier comments. Starts
+``server/index.js`` on it (response cache off, so every load is computed)
+and times the request the task detail page makes,
+``GET /api/comments/resource/:id?limit=20&replies=3``, plus a deep page of
+the large thread reached by cursor.
+
+    python3 -m benchmarks.comments [--tasks 20000] [--large 10000] [--samples 500]
+
+Exits 1 when the large thread's p50 is slower than the small one's by more
+than ``--threshold`` and at least ``--min-delta-ms``.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import random
+import sys
+
+from benchmarks.datagen import DATA_DIR, generate, write
+from benchmarks.pagination import Client
+from harness.loadgen import percentile
+from harness.server import NodeServer
+
+LOAD = '/api/comments/resource/%s?limit=20&replies=3'
+
+
+def thread(rng, resource_id, count, first_id, reply_share, users):
+    """``count`` comment records on ``resource_id`` with ids from ``first_id``."""
+    for n in range(count):
+        comment_id = first_id + n
+        reply = n > 0 and rng.random() < reply_share
+        yield {
+            'collection': 'comments', 'id': str(comment_id),
+            'content': 'Comment %d on task %s' % (n, resource_id),
+            'resourceId': str(resource_id), 'resourceType': 'task',
+            'parentId': str(rng.randint(first_id, comment_id - 1)) if reply else None,
+            'authorId': str(rng.randint(1, users)),
+        }
+
+
+def seed(args):
+    name = 'comments-t%d-s%d-l%d-b%d.ndjson' % (args.tasks, args.small, args.large, args.background)
+    path = os.path.join(DATA_DIR, name)
+    if os.path.exists(path):
+        return path
+    rng = random.Random(42)
+    users = 1000
+    threads = [thread(rng, 1, args.small, 1, args.reply_share, users),
+               thread(rng, 2, args.large, 1 + args.small, args.reply_share, users)]
+    next_id = 1 + args.small + args.large
+    per_task = 5
+    for offset in range(0, args.background, per_task):
+        count = min(per_task, args.background - offset)
+        task_id = 3 + (offset // per_task) % max(1, args.tasks - 2)
+        threads.append(thread(rng, task_id, count, next_id, args.reply_share, users))
+        next_id += count
+    write(path, itertools.chain(generate(users=users, tasks=args.tasks), *threads))
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--tasks', type=int, default=20000)
+    parser.add_argument('--small', type=int, default=10, help='comments on task 1')
+    parser.add_argument('--large', type=int, default=10000, help='comments on task 2')
+    parser.add_argument('--background', type=int, default=100000, help='comments on other tasks')
+    parser.add_argument('--reply-share', type=float, default=0.3)
+    parser.add_argument('--samples', type=int, default=500)
+    parser.add_argument('--threshold', type=float, default=0.5)
+    parser.add_argument('--min-delta-ms', type=float, default=0.5)
+    args = parser.parse_args(argv)
+
+    seed_file = seed(args)
+    ms = lambda seconds: seconds * 1000.0
+    with NodeServer(env={'SEED_FILE': seed_file, 'RESPONSE_CACHE': 'off'}, timeout=300) as server:
+        client = Client(server.host, server.port)
+        try:
+            # A page about half way down the large thread
+            deep = LOAD % 2
+            for _ in range(args.large // 2 // 20 // 2):
+                _, body, cursor = client.get(deep)
+                if not cursor:
+                    break
+                deep = (LOAD % 2) + '&cursor=' + cursor
+            paths = [('%d comments' % args.small, LOAD % 1), ('%d comments' % args.large, LOAD % 2),
+                     ('%d comments, deep page' % args.large, deep)]
+            totals = {label: client.get(path)[1]['totalComments'] for label, path in paths}
+            timings = {label: [] for label, _ in paths}
+            for _ in range(args.samples):
+                for label, path in paths:
+                    timings[label].append(client.get(path)[0])
+        finally:
+            client.close()
+
+    print('%-28s %8s %9s %9s' % ('thread', 'comments', 'p50 ms', 'p99 ms'))
+    for label, samples in timings.items():
+        samples.sort()
+        print('%-28s %8d %9.3f %9.3f' % (label, totals[label], ms(percentile(samples, 50)), ms(percentile(samples, 99))))
+    problems = []
+    small = percentile(timings[paths[0][0]], 50)
+    for label, _ in paths[1:]:
+        large = percentile(timings[label], 50)
+        if large > small * (1 + args.threshold) and ms(large - small) >= args.min_delta_ms:
+            problems.append('%s: p50 %.3f ms vs %.3f ms' % (label, ms(large), ms(small)))
+    for line in problems:
+        print('FAIL ' + line)
+    return 1 if problems else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,61 @@
+"""Dashboard read latency: maintained aggregates versus a full scan.
+
+For each ``--sizes`` task count, loads a generated dataset through
+``server/store`` (so the aggregates are built by the same change events the
+API uses) and times the four dashboard views two ways: reading the
+incrementally maintained counters, and recomputing them from every entity
+as the dashboard used to. Also reports the cost a status change adds to a
+write and the duration of one reconciliation pass.
+
+    python3 -m benchmarks.dashboard [--sizes 10000,100000,1000000] [--budget-ms 0.5]
+
+Exits 1 when any incremental view p99 exceeds ``--budget-ms``.
+"""
+
+import argparse
+import sys
+
+from benchmarks.datagen import dataset
+from benchmarks.node import fmt_ms, run_driver
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--sizes', default='10000,100000,1000000',
+                        help='comma-separated task counts')
+    parser.add_argument('--iterations', type=int, default=2000)
+    parser.add_argument('--scan-iterations', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, default=0.5,
+                        help='maximum p99 for an incremental dashboard read')
+    args = parser.parse_args(argv)
+
+    failures = []
+    for size in [int(value) for value in args.sizes.split(',')]:
+        result = run_driver('dashboard', {
+            'file': dataset(tasks=size), 'iterations': args.iterations,
+            'scanIterations': args.scan_iterations,
+        })
+        print('\n%d tasks loaded in %.0f ms, heap +%.0f MB' % (
+            result['tasks'], result['load_ms'], result['heap_mb']))
+        print('%-18s %13s %13s %13s %9s' % ('view', 'incr p50', 'incr p99', 'scan p50', 'speedup'))
+        for view in result['views']:
+            incremental, scan = view['incremental'], view['scan']
+            print('%-18s     %s     %s     %s %8.0fx' % (
+                view['view'], fmt_ms(incremental['p50_ms']), fmt_ms(incremental['p99_ms']),
+                fmt_ms(scan['p50_ms']), scan['p50_ms'] / max(incremental['p50_ms'], 1e-6)))
+            if incremental['p99_ms'] > args.budget_ms:
+                failures.append('%s at %d tasks: p99 %.4f ms' % (view['view'], size, incremental['p99_ms']))
+        print('%-18s     %s     %s' % ('status write', fmt_ms(result['write']['p50_ms']), fmt_ms(result['write']['p99_ms'])))
+        print('%-18s     %s     %s' % ('reconcile', fmt_ms(result['reconcile']['p50_ms']), fmt_ms(result['reconcile']['p99_ms'])))
+
+    if failures:
+        print('\nincremental reads over the %.2f ms budget:' % args.budget_ms)
+        for failure in failures:
+            print('  ' + failure)
+        return 1
+    print('\nincremental reads are within the %.2f ms budget' % args.budget_ms)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,175 @@
+"""Deterministic synthetic users, projects and tasks as NDJSON.
+
+Each line is ``{"collection": <name>, ...fields}``, the format read by
+``store.loadFile`` (and by ``SEED_FILE`` at server start-up).  Field values
+are skewed the way real boards are: a few busy assignees and projects, most
+tasks in todo/in_progress, a long tail of rarely used tags.
+
+    python3 -m benchmarks.datagen --tasks 100000 --out tasks.ndjson
+"""
+
+import argparse
+import bisect
+import datetime
+import json
+import os
+import random
+
+from harness.routes import REPO_ROOT
+
+DATA_DIR = os.path.join(REPO_ROOT, '.harness', 'bench', 'data')
+
+TASK_STATUSES = (('todo', 40), ('in_progress', 25), ('review', 10), ('completed', 20), ('cancelled', 5))
+PROJECT_STATUSES = (('planning', 15), ('active', 45), ('on_hold', 10), ('completed', 25), ('cancelled', 5))
+PRIORITIES = (('low', 30), ('medium', 40), ('high', 22), ('urgent', 8))
+ROLES = (('user', 85), ('project_manager', 12), ('admin', 3))
+
+WORDS = (
+    'api auth backend billing board build cache calendar chart client cluster comment config cron '
+    'dashboard database deploy design docs email export feature file filter form frontend gateway '
+    'graph health import index invoice kanban layout login logging metrics migration mobile modal '
+    'monitor notification onboarding order page payment performance permission pipeline profile '
+    'query queue release report request review role router sample schema search security server '
+    'session settings signup storage stream sync tag task team test theme timeline token upload '
+    'user validation webhook widget workflow'
+).split()
+FIRST_NAMES = 'Ada Alan Barbara Brian Carol Dennis Donald Edsger Frances Grace Guido Ken Linus Margaret Radia Tim'.split()
+LAST_NAMES = 'Allen Backus Hopper Kernighan Knuth Lamport Liskov Lovelace Perlman Ritchie Thompson Torvalds Turing'.split()
+
+
+def weighted(rng, table):
+    values, weights = zip(*table)
+    return rng.choices(values, weights)[0]
+
+
+class Zipf:
+    """Sample ids ``1..count`` with probability proportional to ``1 / rank**s``."""
+
+    def __init__(self, count, s=0.9):
+        total = 0.0
+        self.cumulative = []
+        for rank in range(1, count + 1):
+            total += 1.0 / rank ** s
+            self.cumulative.append(total)
+
+    def __call__(self, rng):
+        return str(bisect.bisect_left(self.cumulative, rng.random() * self.cumulative[-1]) + 1)
+
+
+SYLLABLES = [c + v for c in 'bcdfghklmnprstvz' for v in 'aeiou']
+
+
+def vocabulary(size):
+    """``WORDS`` followed by pronounceable made-up words, ``size`` in total."""
+    words = list(WORDS)
+    n = 0
+    while len(words) < size:
+        n += 1
+        word, rest = '', n
+        while rest:
+            rest, digit = divmod(rest, len(SYLLABLES))
+            word += SYLLABLES[digit]
+        words.append(word)
+    return words
+
+
+class Phrases:
+    """Random phrases from ``WORDS``, or Zipf-distributed over a larger vocabulary."""
+
+    def __init__(self, size=0):
+        self.words = vocabulary(size) if size else None
+        self.pick = Zipf(len(self.words), s=1.0) if size else None
+
+    def __call__(self, rng, low, high):
+        count = rng.randint(low, high)
+        if self.words is None:
+            return ' '.join(rng.choice(WORDS) for _ in range(count))
+        return ' '.join(self.words[int(self.pick(rng)) - 1] for _ in range(count))
+
+
+def timestamp(rng, now, days=365):
+    moment = now - datetime.timedelta(seconds=rng.randint(0, days * 86400))
+    return moment.strftime('%Y-%m-%dT%H:%M:%S.000Z')
+
+
+def generate(users=1000, projects=500, tasks=100000, tags=200, seed=42, words=0):
+    """Yield user, project and task records in insertion order.
+
+    ``words`` widens the text vocabulary beyond ``WORDS`` (for search
+    benchmarks); the default keeps the small fixed word list.
+    """
+    rng = random.Random(seed)
+    phrase = Phrases(words)
+    now = datetime.datetime(2026, 1, 1)
+    tag_names = ['%s-%d' % (rng.choice(WORDS), i) for i in range(1, tags + 1)]
+    pick_user, pick_project, pick_tag = Zipf(users), Zipf(projects), Zipf(tags)
+    for i in range(1, users + 1):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        yield {
+            'collection': 'users', 'id': str(i),
+            'username': '%s%s%d' % (first.lower(), last.lower(), i),
+            'email': '%s.%s%d@example.com' % (first.lower(), last.lower(), i),
+            'firstName': first, 'lastName': last, 'role': weighted(rng, ROLES),
+            'createdAt': timestamp(rng, now),
+        }
+    for i in range(1, projects + 1):
+        yield {
+            'collection': 'projects', 'id': str(i),
+            'name': phrase(rng, 2, 4).title(), 'description': phrase(rng, 8, 20),
+            'status': weighted(rng, PROJECT_STATUSES), 'priority': weighted(rng, PRIORITIES),
+            'owner': pick_user(rng), 'createdAt': timestamp(rng, now),
+        }
+    for i in range(1, tasks + 1):
+        yield {
+            'collection': 'tasks', 'id': str(i),
+            'title': phrase(rng, 3, 7).capitalize(), 'description': phrase(rng, 10, 30),
+            'projectId': pick_project(rng), 'assignee': pick_user(rng),
+            'status': weighted(rng, TASK_STATUSES), 'priority': weighted(rng, PRIORITIES),
+            'tags': sorted({tag_names[int(pick_tag(rng)) - 1] for _ in range(rng.randint(0, 3))}),
+            'createdAt': timestamp(rng, now),
+        }
+
+
+def write(path, records):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    count = 0
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record, separators=(',', ':')))
+            f.write('\n')
+            count += 1
+    os.replace(tmp, path)
+    return count
+
+
+def dataset(**sizes):
+    """Path of a generated dataset for ``sizes``, generating it on first use."""
+    params = dict(users=1000, projects=500, tasks=100000, tags=200, seed=42, words=0)
+    params.update(sizes)
+    name = 'dataset-u{users}-p{projects}-t{tasks}-g{tags}-s{seed}'.format(**params)
+    if params['words']:
+        name += '-w{words}'.format(**params)
+    name += '.ndjson'
+    path = os.path.join(DATA_DIR, name)
+    if not os.path.exists(path):
+        write(path, generate(**params))
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate a synthetic NDJSON dataset')
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--projects', type=int, default=500)
+    parser.add_argument('--tasks', type=int, default=100000)
+    parser.add_argument('--tags', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--words', type=int, default=0, help='text vocabulary size (default: the fixed word list)')
+    parser.add_argument('--out', required=True)
+    args = parser.parse_args(argv)
+    count = write(args.out, generate(args.users, args.projects, args.tasks, args.tags, args.seed, args.words))
+    print('wrote %d records to %s' % (count, args.out))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+// Activity log at audit-trail scale: append rate, indexed page reads,
+// export memory and segment-dropping cleanup.
+const fs = require('fs');
+const os = require('os');
+const path = require('path');
+const { Writable } = require('stream');
+const { pipeline } = require('stream/promises');
+const { Readable } = require('stream');
+const { ActivityLog } = require('../../server/activity');
+const { time, heapUsedMb, config, report } = require('./timing');
+
+const DAY = 24 * 60 * 60 * 1000;
+const ACTIONS = ['user_login', 'project_created', 'project_updated', 'task_created', 'task_updated', 'comment_added'];
+
+async function main() {
+  const { records, days, users, resources, iterations } = config();
+  const dir = fs.mkdtempSync(path.join(os.tmpdir(), 'activity-bench-'));
+  const start = Date.parse('2026-01-01T00:00:00Z');
+  let clock = start;
+  const log = new ActivityLog({ dir, now: () => clock });
+
+  try {
+    const step = (days * DAY) / records;
+    const appendStarted = process.hrtime.bigint();
+    for (let i = 0; i < records; i += 1) {
+      clock = start + Math.floor(i * step);
+      log.append({
+        action: ACTIONS[i % ACTIONS.length],
+        userId: String(1 + ((i * 7919) % users)),
+        resource: { type: 'task', id: String(1 + ((i * 104729) % resources)) },
+        description: `activity ${i}`,
+        ipAddress: '10.0.0.1',
+        userAgent: 'bench'
+      });
+    }
+    const appendMs = Number(process.hrtime.bigint() - appendStarted) / 1e6;
+
+    const firstPage = time(() => log.find({}, { limit: 20 }).records.length, { iterations });
+    const deepPage = time(() => log.find({}, { offset: Math.floor(records / 2), limit: 20 }).records.length, { iterations });
+    const userPage = time((i) => log.find({ userId: String(1 + (i % users)) }, { offset: 100, limit: 20 }).records.length, { iterations });
+    const resourcePage = time((i) => log.find({ resource: `task:${1 + (i % resources)}` }, { limit: 20 }).records.length, { iterations });
+
+    // Export everything into a sink, sampling the heap as it goes.
+    const heapBefore = heapUsedMb();
+    let peakRss = process.memoryUsage().rss;
+    let exported = 0;
+    const exportStarted = process.hrtime.bigint();
+    const lines = async function* lines() {
+      for await (const record of log.stream()) {
+        exported += 1;
+        if (exported % 50000 === 0) {
+          peakRss = Math.max(peakRss, process.memoryUsage().rss);
+        }
+        yield `${JSON.stringify(record)}\n`;
+      }
+    };
+    await pipeline(Readable.from(lines()), new Writable({ write: (chunk, encoding, done) => done() }));
+    const exportMs = Number(process.hrtime.bigint() - exportStarted) / 1e6;
+
+    const segments = log.segments.length;
+    const cleanupStarted = process.hrtime.bigint();
+    const cleanup = log.cleanup({ before: start + Math.floor(days / 2) * DAY });
+    const cleanupMs = Number(process.hrtime.bigint() - cleanupStarted) / 1e6;
+
+    report({
+      records,
+      segments,
+      append_ms: appendMs,
+      appends_per_sec: records / (appendMs / 1000),
+      first_page: firstPage,
+      deep_page: deepPage,
+      user_page: userPage,
+      resource_page: resourcePage,
+      exported,
+      export_ms: exportMs,
+      export_rows_per_sec: exported / (exportMs / 1000),
+      export_heap_mb: heapUsedMb() - heapBefore,
+      rss_mb: peakRss / 1048576,
+      cleanup_ms: cleanupMs,
+      cleanup
+    });
+  } finally {
+    log.close();
+    fs.rmSync(dir, { recursive: true, force: true });
+  }
+}
+
+main().catch((err) => {
+  console.error(err.stack);
+  process.exit(1);
+});
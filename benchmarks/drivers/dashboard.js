@@ -0,0 +1,60 @@
+// Dashboard read cost with incrementally maintained aggregates versus a full
+// scan of the stores, plus the per-write overhead and a reconciliation pass.
+const store = require('../../server/store');
+const { dashboard } = require('../../server/aggregates');
+const { time, heapUsedMb, config, report } = require('./timing');
+
+const { TASK_STATUSES, PROJECT_STATUSES, PRIORITIES } = store;
+const nameOf = (id) => {
+  const user = store.users.get(id);
+  return user ? `${user.firstName} ${user.lastName}` : 'Unknown User';
+};
+
+const VIEWS = {
+  stats: (aggregates) => aggregates.stats().totalTasks,
+  projects_summary: (aggregates) => aggregates.projectsSummary(PROJECT_STATUSES).totalProjects,
+  tasks_status: (aggregates) => aggregates.tasksStatus(TASK_STATUSES, PRIORITIES).totalTasks,
+  users_activity: (aggregates) => aggregates.usersActivity(nameOf).topPerformers.length
+};
+
+async function main() {
+  const { file, iterations, scanIterations } = config();
+  store.reset();
+  const heapBefore = heapUsedMb();
+  const started = process.hrtime.bigint();
+  const loaded = await store.loadFile(file);
+  const loadMs = Number(process.hrtime.bigint() - started) / 1e6;
+
+  const views = Object.entries(VIEWS).map(([view, read]) => ({
+    view,
+    incremental: time(() => read(dashboard), { iterations }),
+    scan: time(() => read(dashboard.compute()), { iterations: scanIterations, warmup: 1 })
+  }));
+
+  // Each iteration moves one task to the next status: a store update plus
+  // the counter adjustments it triggers.
+  const ids = store.tasks.findIds().slice(0, iterations);
+  const write = time((i) => {
+    const id = ids[i % ids.length];
+    const { status } = store.tasks.get(id);
+    const next = TASK_STATUSES[(TASK_STATUSES.indexOf(status) + 1) % TASK_STATUSES.length];
+    return store.tasks.update(id, { status: next }).id;
+  }, { iterations, warmup: 0 });
+
+  const reconcile = time(() => dashboard.reconcile().drift.length, { iterations: scanIterations, warmup: 0 });
+
+  report({
+    loaded,
+    tasks: store.tasks.size,
+    load_ms: loadMs,
+    heap_mb: heapUsedMb() - heapBefore,
+    views,
+    write,
+    reconcile
+  });
+}
+
+main().catch((err) => {
+  console.error(err.stack);
+  process.exit(1);
+});
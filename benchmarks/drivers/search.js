@@ -0,0 +1,63 @@
+// Search index cost at scale: bulk indexing through the store's change
+// events, autocomplete and BM25 query latency, and incremental updates.
+const store = require('../../server/store');
+const search = require('../../server/search');
+const { time, heapUsedMb, config, report } = require('./timing');
+
+async function main() {
+  const { file, prefixes, queries, iterations } = config();
+  store.reset();
+  const heapBefore = heapUsedMb();
+  const started = process.hrtime.bigint();
+  const loaded = await store.loadFile(file);
+  const loadMs = Number(process.hrtime.bigint() - started) / 1e6;
+  const documents = Object.values(search.indexes).reduce((sum, index) => sum + index.size, 0);
+
+  const byLength = new Map();
+  for (const prefix of prefixes) {
+    const group = byLength.get(prefix.length) || [];
+    group.push(prefix);
+    byLength.set(prefix.length, group);
+  }
+  const suggestions = Array.from(byLength, ([length, group]) => ({
+    prefix_length: length,
+    prefixes: group.length,
+    ...time((i) => search.suggest(group[i % group.length]).length, { iterations })
+  }));
+  const all = time((i) => search.suggest(prefixes[i % prefixes.length]).length, { iterations: iterations * 4 });
+
+  const queryResults = queries.map((query) => ({
+    query,
+    ...time(() => search.searchAll(query, { limit: 10 }).total, { iterations: Math.max(10, iterations / 20) })
+  }));
+
+  // Each iteration retitles an existing task: one remove and one add per term.
+  const ids = store.tasks.findIds().slice(0, iterations);
+  const update = time((i) => {
+    const id = ids[i % ids.length];
+    const task = store.tasks.get(id);
+    return store.tasks.update(id, { title: `${task.title} revised ${i}` }).id;
+  }, { iterations, warmup: 0 });
+  const insertRemove = time((i) => {
+    const task = store.tasks.insert({ title: `benchmark probe ${i}`, description: queries[i % queries.length] });
+    return store.tasks.remove(task.id).id;
+  }, { iterations });
+
+  report({
+    loaded,
+    documents,
+    terms: Object.values(search.indexes).reduce((sum, index) => sum + index.postings.size, 0),
+    load_ms: loadMs,
+    heap_mb: heapUsedMb() - heapBefore,
+    suggest: all,
+    suggest_by_length: suggestions,
+    search: queryResults,
+    update,
+    insert_remove: insertRemove
+  });
+}
+
+main().catch((err) => {
+  console.error(err.stack);
+  process.exit(1);
+});
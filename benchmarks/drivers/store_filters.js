@@ -0,0 +1,30 @@
+// Filter latency of the indexed task store against a linear array scan.
+const store = require('../../server/store');
+const { time, heapUsedMb, config, report } = require('./timing');
+
+async function main() {
+  const { file, queries, iterations } = config();
+  store.reset();
+  const heapBefore = heapUsedMb();
+  const started = process.hrtime.bigint();
+  const loaded = await store.loadFile(file);
+  const loadMs = Number(process.hrtime.bigint() - started) / 1e6;
+  const all = store.tasks.all();
+
+  const results = queries.map((filters) => {
+    const entries = Object.entries(filters);
+    const indexed = time(() => store.tasks.find(filters).length, { iterations });
+    const scan = time(() => all.filter((task) => entries.every(([field, value]) => String(task[field]) === value)).length, { iterations });
+    if (indexed.result !== scan.result) {
+      throw new Error(`index/scan mismatch for ${JSON.stringify(filters)}: ${indexed.result} != ${scan.result}`);
+    }
+    return { filters, matches: indexed.result, indexed, scan };
+  });
+
+  report({ loaded, tasks: store.tasks.size, load_ms: loadMs, heap_mb: heapUsedMb() - heapBefore, results });
+}
+
+main().catch((err) => {
+  console.error(err.stack);
+  process.exit(1);
+});
@@ -0,0 +1,78 @@
+// Popular-tag reads from the maintained usage counters versus counting and
+// sorting every task's and project's tags, plus the cost tag counting adds
+// to a write.
+const store = require('../../server/store');
+const { tagUsage } = require('../../server/aggregates');
+const { time, heapUsedMb, config, report } = require('./timing');
+
+const DAY_MS = 24 * 60 * 60 * 1000;
+
+// What /api/tags/popular would do without the counters
+function scanAndSort(k, windowDays) {
+  const since = windowDays ? Date.now() - windowDays * DAY_MS : -Infinity;
+  const counts = new Map();
+  for (const collection of [store.tasks, store.projects]) {
+    for (const doc of collection.items.values()) {
+      if (!doc.tags || (windowDays && Date.parse(doc.createdAt) < since)) {
+        continue;
+      }
+      for (const tag of doc.tags) {
+        counts.set(tag, (counts.get(tag) || 0) + 1);
+      }
+    }
+  }
+  return Array.from(counts, ([tag, count]) => ({ tag, count }))
+    .sort((a, b) => b.count - a.count)
+    .slice(0, k);
+}
+
+const VIEWS = { all: null, week: 7, month: 30 };
+
+async function main() {
+  const { file, k, iterations, scanIterations } = config();
+  store.reset();
+  const heapBefore = heapUsedMb();
+  const started = process.hrtime.bigint();
+  const loaded = await store.loadFile(file);
+  const loadMs = Number(process.hrtime.bigint() - started) / 1e6;
+
+  let assignments = 0;
+  for (const task of store.tasks.items.values()) {
+    assignments += task.tags ? task.tags.length : 0;
+  }
+
+  const views = Object.entries(VIEWS).map(([view, days]) => {
+    const window = days ? view : null;
+    const maintained = time(() => tagUsage.top(k, window).length, { iterations });
+    const scan = time(() => scanAndSort(k, days).length, { iterations: scanIterations, warmup: 1 });
+    const agrees = days === null &&
+      JSON.stringify(tagUsage.top(k).map(({ count }) => count)) === JSON.stringify(scanAndSort(k, null).map(({ count }) => count));
+    return { view, maintained, scan, agrees: days === null ? agrees : null };
+  });
+
+  // Each iteration moves one tag of a task to another tag: the store update
+  // plus the counter adjustments it triggers.
+  const ids = store.tasks.findIds().filter((id) => store.tasks.get(id).tags.length > 0).slice(0, iterations);
+  const names = tagUsage.top(100).map(({ tag }) => tag);
+  const write = time((i) => {
+    const task = store.tasks.get(ids[i % ids.length]);
+    const tags = [...task.tags.slice(1), names[i % names.length]];
+    return store.tasks.update(task.id, { tags }).id;
+  }, { iterations, warmup: 0 });
+
+  report({
+    loaded,
+    tasks: store.tasks.size,
+    assignments,
+    tags: tagUsage.total.size,
+    load_ms: loadMs,
+    heap_mb: heapUsedMb() - heapBefore,
+    views,
+    write
+  });
+}
+
+main().catch((err) => {
+  console.error(err.stack);
+  process.exit(1);
+});
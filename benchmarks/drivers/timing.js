@@ -0,0 +1,47 @@
+// Shared helpers for benchmark drivers: timing loops and percentile summaries.
+
+function summarize(samplesNs) {
+  const sorted = Float64Array.from(samplesNs).sort();
+  const at = (pct) => sorted[Math.max(0, Math.ceil((pct / 100) * sorted.length) - 1)] / 1e6;
+  const total = sorted.reduce((sum, value) => sum + value, 0);
+  return {
+    samples: sorted.length,
+    mean_ms: total / sorted.length / 1e6,
+    p50_ms: at(50),
+    p95_ms: at(95),
+    p99_ms: at(99),
+    max_ms: sorted[sorted.length - 1] / 1e6
+  };
+}
+
+// Run fn `iterations` times (after `warmup` untimed runs) and summarize.
+function time(fn, { iterations = 200, warmup = 20 } = {}) {
+  let result;
+  for (let i = 0; i < warmup; i += 1) {
+    result = fn(i);
+  }
+  const samples = new Array(iterations);
+  for (let i = 0; i < iterations; i += 1) {
+    const started = process.hrtime.bigint();
+    result = fn(i);
+    samples[i] = Number(process.hrtime.bigint() - started);
+  }
+  return { ...summarize(samples), result };
+}
+
+function heapUsedMb() {
+  if (global.gc) {
+    global.gc();
+  }
+  return process.memoryUsage().heapUsed / 1048576;
+}
+
+function config() {
+  return JSON.parse(process.argv[2] || '{}');
+}
+
+function report(result) {
+  process.stdout.write(`${JSON.stringify(result)}\n`);
+}
+
+module.exports = { summarize, time, heapUsedMb, config, report };
@@ -0,0 +1,123 @@
+"""The endpoints named in the tasks' "Critical tested requirements".
+
+Each task description lists the routes it must provide; the benchmarks drive
+exactly that set, with concrete parameters and valid request bodies so the
+handlers exercise their success path instead of a 400.
+
+Repeating a PUT, PATCH or DELETE on one id measures 404s once the first
+DELETE lands, so those endpoints are marked ``fresh``: every request should
+target a document of its own (see ``CREATE_ROUTES``).  ``{n}`` in a body is
+replaced by a number unique to the request, for fields that must not repeat.
+"""
+
+import collections
+import glob
+import os
+import re
+
+from harness.routes import REPO_ROOT
+
+Endpoint = collections.namedtuple('Endpoint', ['task', 'method', 'route', 'path', 'body', 'fresh'])
+
+_REQUIREMENT = re.compile(r'^\s*-\s+(GET|POST|PUT|PATCH|DELETE)\s+(/\S+)\s+endpoint\b')
+_DOCUMENT_ROUTE = re.compile(r'^/api/(\w+)/:id(?:/|$)')
+_PLACEHOLDER = '{n}'
+
+MUTATING_METHODS = ('PUT', 'PATCH', 'DELETE')
+
+PARAMS = {
+    'id': '1',
+    'userId': '1',
+    'resourceId': '1',
+    'resourceType': 'task',
+}
+
+QUERIES = {
+    '/api/search/global': 'q=sample',
+    '/api/search/projects': 'q=sample',
+    '/api/search/tasks': 'q=sample',
+    '/api/search/users': 'q=test',
+    '/api/search/files': 'q=design',
+    '/api/search/suggestions': 'q=sa',
+}
+
+_profile = {'firstName': 'Load', 'lastName': 'Test'}
+
+BODIES = {
+    ('PUT', '/api/users/profile'): _profile,
+    ('PUT', '/api/users/:id'): _profile,
+    ('POST', '/api/projects'): {'name': 'Load test project', 'description': 'Created by the benchmarks'},
+    ('PUT', '/api/projects/:id'): {'name': 'Load test project'},
+    ('POST', '/api/projects/:id/tasks'): {'title': 'Load test task'},
+    ('POST', '/api/tasks'): {'title': 'Load test task', 'projectId': '1'},
+    ('PUT', '/api/tasks/:id'): {'title': 'Load test task'},
+    ('PATCH', '/api/tasks/:id/status'): {'status': 'in_progress'},
+    ('POST', '/api/notifications'): {'title': 'Load test', 'message': 'Created by the benchmarks', 'userId': '1'},
+    ('POST', '/api/files/upload'): {'filename': 'load.txt', 'filetype': 'text/plain', 'filesize': 11, 'content': 'hello world'},
+    ('PUT', '/api/files/:id/rename'): {'newFilename': 'renamed.txt'},
+    ('POST', '/api/comments'): {'content': 'Load test comment', 'resourceId': '1', 'resourceType': 'task', 'authorId': '1'},
+    ('PUT', '/api/comments/:id'): {'content': 'Edited load test comment'},
+    ('POST', '/api/tags'): {'name': 'load-test-{n}'},
+    ('PUT', '/api/tags/:id'): {'name': 'load-test-{n}'},
+    ('POST', '/api/activities'): {'action': 'task.updated', 'userId': '1', 'resource': {'type': 'task', 'id': '1'}},
+}
+
+# How to create a document of a collection: the route and the key of the
+# created document in its response. Users have no create route; their fresh
+# ids come from a seeded dataset.
+CREATE_ROUTES = {
+    'projects': ('/api/projects', 'project'),
+    'tasks': ('/api/tasks', 'task'),
+    'notifications': ('/api/notifications', 'notification'),
+    'files': ('/api/files/upload', 'file'),
+    'comments': ('/api/comments', 'comment'),
+    'tags': ('/api/tags', 'tag'),
+}
+
+# Reads the sample data can't serve (its files have no content): one
+# document is created and every request reads it.
+CREATED_FOR_READS = {
+    ('GET', '/api/files/:id/download'): 'files',
+}
+
+
+def concrete_path(route, **params):
+    """Fill ``:param`` segments of ``route`` (``params`` over ``PARAMS``) and
+    append its sample query."""
+    values = dict(PARAMS, **params)
+    path = re.sub(r':(\w+)', lambda m: values.get(m.group(1), '1'), route)
+    query = QUERIES.get(route)
+    return '%s?%s' % (path, query) if query else path
+
+
+def fresh_collection(method, route):
+    """The collection whose documents a mutating ``/:id`` route consumes, or None."""
+    match = _DOCUMENT_ROUTE.match(route)
+    return match.group(1) if match and method in MUTATING_METHODS else None
+
+
+def fill(body, n):
+    """``body`` with ``{n}`` in its strings replaced by ``n``."""
+    if isinstance(body, dict):
+        return {key: fill(value, n) for key, value in body.items()}
+    if isinstance(body, list):
+        return [fill(value, n) for value in body]
+    if isinstance(body, str):
+        return body.replace(_PLACEHOLDER, str(n))
+    return body
+
+
+def critical_endpoints(tasks_dir=os.path.join(REPO_ROOT, 'tasks')):
+    """Parse every task description into a list of :class:`Endpoint`."""
+    endpoints = []
+    for path in sorted(glob.glob(os.path.join(tasks_dir, '*', 'task_description.txt'))):
+        task = os.path.basename(os.path.dirname(path))
+        with open(path, 'r', encoding='utf-8') as f:
+            section = f.read().partition('Critical tested requirements:')[2]
+        for line in section.splitlines():
+            match = _REQUIREMENT.match(line)
+            if match:
+                method, route = match.groups()
+                endpoints.append(Endpoint(task, method, route, concrete_path(route), BODIES.get((method, route)),
+                                          fresh_collection(method, route)))
+    return endpoints
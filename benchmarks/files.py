@@ -0,0 +1,171 @@
+"""Upload and download throughput of /api/files with multi-GB files.
+
+Starts ``server/index.js`` with a scratch ``DATA_DIR`` and streams a
+``--size-gb`` file through ``POST /api/files/upload`` (raw body), uploads it
+again to exercise deduplication, downloads it whole with ``--parallel``
+concurrent clients, and times small ``Range`` reads at random offsets. The
+server's resident set size is sampled throughout, so a handler that buffers
+whole files shows up as RSS growing with the file size.
+
+    python3 -m benchmarks.files [--size-gb 2] [--parallel 4] [--rss-budget-mb 256]
+
+Exits 1 when the server's RSS grows by more than ``--rss-budget-mb`` over
+its idle baseline.
+"""
+
+import argparse
+import http.client
+import json
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+from harness.server import NodeServer
+
+MB = 1024 * 1024
+CHUNK = MB
+
+
+class RssSampler(threading.Thread):
+    """Track the peak RSS of the server process in the background."""
+
+    def __init__(self, server, interval=0.05):
+        super().__init__(daemon=True)
+        self.server = server
+        self.interval = interval
+        self.peak = server.rss() or 0
+        self.done = threading.Event()
+
+    def run(self):
+        while not self.done.wait(self.interval):
+            self.peak = max(self.peak, self.server.rss() or 0)
+
+    def stop(self):
+        self.done.set()
+        self.join()
+        return self.peak
+
+
+def body_chunks(size, seed):
+    """``size`` bytes of incompressible data, generated one chunk at a time."""
+    block = random.Random(seed).randbytes(CHUNK)
+    sent = 0
+    while sent < size:
+        piece = block[:min(CHUNK, size - sent)]
+        sent += len(piece)
+        yield piece
+
+
+def upload(server, size, seed, name):
+    conn = http.client.HTTPConnection(server.host, server.port, timeout=600)
+    started = time.perf_counter()
+    conn.request('POST', '/api/files/upload?filename=%s' % name, body=body_chunks(size, seed),
+                 headers={'Content-Type': 'application/octet-stream', 'Content-Length': str(size)})
+    response = conn.getresponse()
+    payload = json.loads(response.read())
+    elapsed = time.perf_counter() - started
+    conn.close()
+    if response.status != 201:
+        raise RuntimeError('upload failed with %d: %s' % (response.status, payload))
+    return payload, elapsed
+
+
+def download(server, file_id, headers=None):
+    """Read a download to the end; returns (status, bytes read, seconds)."""
+    conn = http.client.HTTPConnection(server.host, server.port, timeout=600)
+    started = time.perf_counter()
+    conn.request('GET', '/api/files/%s/download' % file_id, headers=headers or {})
+    response = conn.getresponse()
+    received = 0
+    while True:
+        chunk = response.read(CHUNK)
+        if not chunk:
+            break
+        received += len(chunk)
+    elapsed = time.perf_counter() - started
+    conn.close()
+    return response.status, received, elapsed
+
+
+def parallel_downloads(server, file_id, clients):
+    results = [None] * clients
+
+    def worker(i):
+        results[i] = download(server, file_id)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, time.perf_counter() - started
+
+
+def range_reads(server, file_id, size, count, length, seed=3):
+    rng = random.Random(seed)
+    latencies = []
+    for _ in range(count):
+        start = rng.randrange(0, max(1, size - length))
+        status, received, elapsed = download(
+            server, file_id, {'Range': 'bytes=%d-%d' % (start, start + length - 1)})
+        if status != 206 or received != length:
+            raise RuntimeError('range read returned %d with %d bytes' % (status, received))
+        latencies.append(elapsed * 1000)
+    latencies.sort()
+    return latencies[len(latencies) // 2], latencies[max(0, int(len(latencies) * 0.99) - 1)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--size-gb', type=float, default=2.0)
+    parser.add_argument('--parallel', type=int, default=4, help='concurrent full downloads')
+    parser.add_argument('--ranges', type=int, default=200, help='number of range reads')
+    parser.add_argument('--range-kb', type=int, default=64)
+    parser.add_argument('--rss-budget-mb', type=float, default=256.0,
+                        help='maximum server RSS growth over its idle baseline')
+    args = parser.parse_args(argv)
+
+    size = int(args.size_gb * 1024 * MB)
+    data_dir = tempfile.mkdtemp(prefix='nodenest-files-bench-')
+    try:
+        with NodeServer(env={'DATA_DIR': data_dir}) as server:
+            baseline = server.rss() or 0
+            sampler = RssSampler(server)
+            sampler.start()
+
+            first, upload_s = upload(server, size, 1, 'bench.bin')
+            file_id = first['file']['id']
+            print('upload      %8.1f MB/s  (%.1f GB in %.1f s)' % (size / MB / upload_s, size / 1024 / MB, upload_s))
+            second, dedup_s = upload(server, size, 1, 'bench-copy.bin')
+            print('dedup upload%8.1f MB/s  (deduplicated: %s)' % (size / MB / dedup_s, second['deduplicated']))
+
+            results, wall = parallel_downloads(server, file_id, args.parallel)
+            for status, received, _ in results:
+                if status != 200 or received != size:
+                    raise RuntimeError('download returned %d with %d of %d bytes' % (status, received, size))
+            print('download    %8.1f MB/s  (%d clients, %.1f MB/s each)' % (
+                args.parallel * size / MB / wall, args.parallel,
+                sum(size / MB / elapsed for _, _, elapsed in results) / args.parallel))
+
+            p50, p99 = range_reads(server, file_id, size, args.ranges, args.range_kb * 1024)
+            print('range %dKB  p50 %7.2f ms  p99 %7.2f ms' % (args.range_kb, p50, p99))
+
+            peak = sampler.stop()
+            growth = (peak - baseline) / MB
+            print('server rss  idle %.0f MB, peak %.0f MB (+%.0f MB)' % (baseline / MB, peak / MB, growth))
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    if growth > args.rss_budget_mb:
+        print('server RSS grew by %.0f MB (budget %.0f MB)' % (growth, args.rss_budget_mb))
+        return 1
+    print('server RSS growth is within the %.0f MB budget' % args.rss_budget_mb)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
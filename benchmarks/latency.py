@@ -0,0 +1,217 @@
+"""Per-route latency percentiles for the task endpoints.
+
+Starts ``server/index.js`` on a free port, then drives every endpoint from the
+tasks' "Critical tested requirements" one route at a time with the open-loop
+load generator.  PUT, PATCH and DELETE on a document get a document of their
+own per request: created through the API just before the route is measured,
+or for users, seeded at start-up.  Results (throughput, p50/p95/p99/max,
+status counts and error rate per route) are written as JSON and can be
+compared against a stored baseline::
+
+    python3 -m benchmarks.latency run [--rate 200] [--duration 3] [--out FILE] [--baseline FILE]
+    python3 -m benchmarks.latency compare BASELINE CURRENT [--threshold 0.25]
+
+``compare`` (and ``run --baseline``) exits 1 when any route regresses, in
+latency, throughput or error rate.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import os
+import platform
+import re
+import subprocess
+import sys
+import time
+
+from benchmarks.datagen import dataset
+from benchmarks.endpoints import (BODIES, CREATED_FOR_READS, CREATE_ROUTES, concrete_path,
+                                  critical_endpoints, fill)
+from harness.loadgen import ConnectionPool, Recorder, error_rate, open_loop
+from harness.routes import REPO_ROOT
+from harness.server import NodeServer
+
+DEFAULT_OUT = os.path.join(REPO_ROOT, '.harness', 'bench', 'latency.json')
+COMPARED_STATS = ('p50_ms', 'p95_ms', 'p99_ms')
+# Seeded users from this id on are handed out as fresh ones; user 1 stays
+# for the routes that read it.
+FIRST_FRESH_USER = 2
+
+
+def git_commit():
+    proc = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=REPO_ROOT,
+                          stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    return proc.stdout.strip() or None
+
+
+def node_version():
+    return subprocess.run(['node', '--version'], stdout=subprocess.PIPE, text=True).stdout.strip()
+
+
+def arrivals(rate, duration):
+    """Most requests ``open_loop`` sends at ``rate`` over ``duration`` seconds
+    (one more than the exact count, which float rounding can reach)."""
+    return int(math.ceil(rate * duration)) + 1 if duration > 0 else 0
+
+
+async def create(pool, collection, count, unique):
+    """Create ``count`` documents in ``collection`` and return their ids."""
+    route, key = CREATE_ROUTES[collection]
+    ids = []
+    while len(ids) < count:
+        batch = min(pool.size, count - len(ids))
+        responses = await asyncio.gather(*(
+            pool.request('POST', route, fill(BODIES[('POST', route)], next(unique))) for _ in range(batch)))
+        for response in responses:
+            if response.status != 201:
+                raise RuntimeError('POST %s answered %d: %r' % (route, response.status, response.body[:200]))
+            ids.append(json.loads(response.body)[key]['id'])
+    return ids
+
+
+async def measure(server, endpoints, rate, duration, warmup, connections):
+    pool = ConnectionPool(server.host, server.port, size=connections)
+    unique = itertools.count(1)
+    seeded_users = (str(i) for i in itertools.count(FIRST_FRESH_USER))
+    results = {}
+
+    async def phase(endpoint, seconds, recorder=None):
+        ids = None
+        shared = CREATED_FOR_READS.get((endpoint.method, endpoint.route))
+        if endpoint.fresh == 'users':
+            ids = list(itertools.islice(seeded_users, arrivals(rate, seconds)))
+        elif endpoint.fresh:
+            ids = await create(pool, endpoint.fresh, arrivals(rate, seconds), unique)
+        elif shared:
+            ids = await create(pool, shared, 1, unique) * arrivals(rate, seconds)
+
+        def request(i):
+            path = endpoint.path if ids is None else concrete_path(endpoint.route, id=ids[i])
+            return endpoint.method, path, fill(endpoint.body, next(unique)), None
+        return await open_loop(pool, request, rate, seconds, recorder)
+
+    try:
+        for endpoint in endpoints:
+            if warmup > 0:
+                await phase(endpoint, warmup)
+            recorder, elapsed = await phase(endpoint, duration, Recorder())
+            stats = recorder.summary(elapsed)
+            stats['task'] = endpoint.task
+            key = '%s %s' % (endpoint.method, endpoint.route)
+            results[key] = stats
+            print('%-58s %8.1f req/s  p50 %7.2f  p95 %7.2f  p99 %7.2f  max %7.2f ms  errors %5.1f%%  %s' % (
+                key, stats['throughput'], stats['p50_ms'], stats['p95_ms'], stats['p99_ms'],
+                stats['max_ms'], stats['error_rate'] * 100, stats['statuses']), flush=True)
+    finally:
+        await pool.close()
+    return results
+
+
+def run(rate=200, duration=3.0, warmup=0.5, connections=32, pattern=None, env=None):
+    endpoints = critical_endpoints()
+    if pattern:
+        regex = re.compile(pattern)
+        endpoints = [e for e in endpoints if regex.search('%s %s' % (e.method, e.route))]
+    # Enough seeded users for every request that consumes one
+    users = sum(arrivals(rate, warmup) + arrivals(rate, duration) for e in endpoints if e.fresh == 'users')
+    if users:
+        env = dict(env or {}, SEED_FILE=dataset(users=FIRST_FRESH_USER - 1 + users, projects=1, tasks=0, tags=0))
+    with NodeServer(env=env) as server:
+        routes = asyncio.run(measure(server, endpoints, rate, duration, warmup, connections))
+    return {
+        'meta': {
+            'commit': git_commit(),
+            'node': node_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'rate': rate,
+            'duration': duration,
+            'connections': connections,
+            'timestamp': time.time(),
+        },
+        'routes': routes,
+    }
+
+
+def compare(baseline, current, threshold=0.25, min_delta_ms=1.0, max_error_delta=0.01):
+    """Return a list of regression messages for routes present in both runs.
+
+    A percentile regresses when it is more than ``threshold`` (a fraction)
+    above the baseline *and* at least ``min_delta_ms`` slower, so sub-ms
+    jitter on fast routes doesn't fail the comparison.  A route whose error
+    rate moved by more than ``max_error_delta`` either way fails too: its
+    latencies time different responses, e.g. fast 404s.
+    """
+    regressions = []
+    for route, base in sorted(baseline['routes'].items()):
+        cur = current['routes'].get(route)
+        if cur is None:
+            continue
+        for stat in COMPARED_STATS:
+            before, after = base[stat], cur[stat]
+            if after > before * (1 + threshold) and after - before >= min_delta_ms:
+                regressions.append('%s: %s %.2fms -> %.2fms (+%.0f%%)' % (
+                    route, stat, before, after, (after / before - 1) * 100 if before else float('inf')))
+        if cur['throughput'] < base['throughput'] * (1 - threshold):
+            regressions.append('%s: throughput %.1f -> %.1f req/s' % (
+                route, base['throughput'], cur['throughput']))
+        before, after = error_rate(base), error_rate(cur)
+        if abs(after - before) > max_error_delta:
+            regressions.append('%s: error rate %.1f%% -> %.1f%% (statuses %s -> %s)' % (
+                route, before * 100, after * 100, base['statuses'], cur['statuses']))
+    return regressions
+
+
+def load(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def report_regressions(regressions):
+    for line in regressions:
+        print('REGRESSION ' + line)
+    if not regressions:
+        print('no regressions')
+    return 1 if regressions else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Per-route latency benchmark')
+    sub = parser.add_subparsers(dest='command', required=True)
+    run_cmd = sub.add_parser('run', help='benchmark the task endpoints')
+    run_cmd.add_argument('--rate', type=float, default=200.0, help='offered requests/second per route')
+    run_cmd.add_argument('--duration', type=float, default=3.0, help='measured seconds per route')
+    run_cmd.add_argument('--warmup', type=float, default=0.5, help='unmeasured seconds per route')
+    run_cmd.add_argument('--connections', type=int, default=32, help='keep-alive pool size')
+    run_cmd.add_argument('--routes', help='only routes matching this regex, e.g. "^GET /api/tasks"')
+    run_cmd.add_argument('--out', default=DEFAULT_OUT)
+    run_cmd.add_argument('--baseline', help='compare against this result file afterwards')
+    cmp_cmd = sub.add_parser('compare', help='compare two result files')
+    cmp_cmd.add_argument('baseline')
+    cmp_cmd.add_argument('current')
+    for cmd in (run_cmd, cmp_cmd):
+        cmd.add_argument('--threshold', type=float, default=0.25)
+        cmd.add_argument('--max-error-delta', type=float, default=0.01,
+                         help='largest change in a route\'s error rate (a fraction) that passes')
+    args = parser.parse_args(argv)
+
+    if args.command == 'compare':
+        return report_regressions(compare(load(args.baseline), load(args.current), args.threshold,
+                                          max_error_delta=args.max_error_delta))
+
+    result = run(args.rate, args.duration, args.warmup, args.connections, args.routes)
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump(result, f, indent=2, sort_keys=True)
+    print('wrote %s' % args.out)
+    if args.baseline:
+        return report_regressions(compare(load(args.baseline), result, args.threshold,
+                                          max_error_delta=args.max_error_delta))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""Throughput cost of the request instrumentation, checked against a budget.
+
+Starts ``server/index.js`` twice on the same generated dataset, with
+``METRICS=off`` and with the instrumentation on, and drives both with the
+same closed-loop mix of cheap reads (health checks and response cache hits,
+where per-request overhead is the largest share). Rounds alternate between
+the two servers and each mode keeps its best round, so a noisy neighbour
+slows both rather than one. The instrumented server is then scraped through
+``harness.metrics``: the requests it counted must match the requests sent,
+and its p50 latency is reported next to the client-side one.
+
+    python3 -m benchmarks.metrics [--tasks 20000] [--duration 3] [--rounds 3] [--budget 0.05]
+
+Exits 1 when throughput with metrics on is lower than with them off by more
+than ``--budget`` (a fraction), or when the counts don't match.
+"""
+
+import argparse
+import asyncio
+import sys
+
+from benchmarks.datagen import dataset
+from harness.loadgen import ConnectionPool, closed_loop
+from harness.metrics import scrape
+from harness.server import NodeServer
+
+READ_MIX = (
+    '/api/health',
+    '/api/tasks/1',
+    '/api/projects/1',
+    '/api/tasks?projectId=1&limit=20',
+    '/api/dashboard/stats',
+)
+# Routes the harness itself calls (readiness checks, scrapes)
+UNCOUNTED_ROUTES = ('/api/health', '/api/metrics')
+
+
+async def measure(server, args):
+    pool = ConnectionPool(server.host, server.port, size=args.concurrency)
+    request = lambda i: ('GET', READ_MIX[i % len(READ_MIX)], None, None)
+    try:
+        warm, _ = await closed_loop(pool, request, args.concurrency, min(0.5, args.duration))
+        recorder, elapsed = await closed_loop(pool, request, args.concurrency, args.duration)
+    finally:
+        await pool.close()
+    summary = recorder.summary(elapsed)
+    sent = len(warm.latencies) + summary['requests']
+    counted = sum(1 for i in range(sent) if READ_MIX[i % len(READ_MIX)] not in UNCOUNTED_ROUTES)
+    return summary, sent, counted
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--tasks', type=int, default=20000)
+    parser.add_argument('--duration', type=float, default=3.0, help='measured seconds per round')
+    parser.add_argument('--rounds', type=int, default=3)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--budget', type=float, default=0.05,
+                        help='maximum throughput lost to instrumentation, as a fraction')
+    args = parser.parse_args(argv)
+
+    seed_file = dataset(tasks=args.tasks)
+    best = {}
+    expected = 0
+    with NodeServer(env={'SEED_FILE': seed_file, 'METRICS': 'off'}, timeout=120) as off, \
+            NodeServer(env={'SEED_FILE': seed_file}, timeout=120) as on:
+        for round_ in range(args.rounds):
+            for mode, server in (('off', off), ('on', on)) if round_ % 2 == 0 else (('on', on), ('off', off)):
+                summary, sent, counted = asyncio.run(measure(server, args))
+                if mode == 'on':
+                    expected += counted
+                print('round %d %-3s %9.0f req/s  p50 %6.3f ms  p99 %6.3f ms' % (
+                    round_ + 1, mode, summary['throughput'], summary['p50_ms'], summary['p99_ms']))
+                if mode not in best or summary['throughput'] > best[mode]['throughput']:
+                    best[mode] = summary
+        samples = scrape(on.host, on.port)
+
+    counted = sum(value for labels, value in samples.select('http_requests_total')
+                  if labels['route'] not in UNCOUNTED_ROUTES)
+    overhead = 1 - best['on']['throughput'] / best['off']['throughput']
+    print('best: off %.0f req/s, on %.0f req/s, overhead %.1f%% (budget %.1f%%)' % (
+        best['off']['throughput'], best['on']['throughput'], overhead * 100, args.budget * 100))
+    print('server-side p50 %.3f ms, p99 %.3f ms; %d requests counted of %d sent' % (
+        samples.quantile('http_request_duration_seconds', 0.5) * 1000,
+        samples.quantile('http_request_duration_seconds', 0.99) * 1000, counted, expected))
+
+    failures = []
+    if overhead > args.budget:
+        failures.append('instrumentation costs %.1f%% of throughput' % (overhead * 100))
+    if counted != expected:
+        failures.append('metrics counted %d requests, %d were sent' % (counted, expected))
+    for failure in failures:
+        print('FAIL ' + failure)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
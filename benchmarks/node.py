@@ -0,0 +1,31 @@
+"""Run a Node benchmark driver and collect the JSON it prints.
+
+Data-structure benchmarks time the server modules in-process (no HTTP in the
+way), so each one has a small driver under ``benchmarks/drivers`` that loads
+a dataset, times the operations with ``process.hrtime`` and prints a single
+JSON document on its last stdout line.
+"""
+
+import json
+import os
+import subprocess
+
+from harness.routes import REPO_ROOT
+
+DRIVERS_DIR = os.path.join(REPO_ROOT, 'benchmarks', 'drivers')
+
+
+def run_driver(name, config, heap_mb=4096, timeout=1800):
+    """Run ``drivers/<name>.js`` with ``config`` (JSON on argv) and return its result."""
+    proc = subprocess.run(
+        ['node', '--max-old-space-size=%d' % heap_mb, '--expose-gc',
+         os.path.join(DRIVERS_DIR, name + '.js'), json.dumps(config)],
+        cwd=REPO_ROOT, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, timeout=timeout,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError('%s driver failed (%d):\n%s' % (name, proc.returncode, proc.stderr))
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def fmt_ms(value):
+    return '%9.4f' % value
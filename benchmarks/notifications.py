@@ -0,0 +1,188 @@
+"""Fan-out latency and memory of the notification stream.
+
+Starts ``server/index.js``, opens ``--connections`` concurrent
+``GET /api/notifications/stream`` connections spread over ``--users`` users
+(several "tabs" per user), and measures the server's RSS per open stream.
+Then, for ``--rounds`` rounds, posts one notification to every user at once
+and records how long each connection takes to receive it, measured from
+the notification's ``createdAt`` (server and client share the clock).
+
+    python3 -m benchmarks.notifications [--connections 5000] [--users 1000] [--rounds 5]
+
+Exits 1 when the delivery p99 exceeds ``--budget-ms``, when memory per
+connection exceeds ``--kb-per-connection`` or when a notification is lost.
+"""
+
+import argparse
+import asyncio
+import datetime
+import json
+import resource
+import sys
+import time
+
+from harness.loadgen import ConnectionPool, percentile
+from harness.server import NodeServer
+
+
+def raise_fd_limit(needed):
+    """Raise the soft open-files limit (inherited by the server) if possible."""
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    wanted = needed if hard == resource.RLIM_INFINITY else min(needed, hard)
+    if soft != resource.RLIM_INFINITY and soft < wanted:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (wanted, hard))
+    return resource.getrlimit(resource.RLIMIT_NOFILE)[0]
+
+
+class Stream:
+    """One SSE connection; records when each notification title arrives."""
+
+    def __init__(self, host, port, user_id):
+        self.host = host
+        self.port = port
+        self.user_id = user_id
+        self.ready = asyncio.Event()
+        self.received = {}
+        self.task = None
+        self.writer = None
+
+    async def open(self):
+        reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        self.writer.write((
+            'GET /api/notifications/stream HTTP/1.1\r\nHost: %s:%d\r\n'
+            'Accept: text/event-stream\r\nX-User-Id: %s\r\n\r\n' % (self.host, self.port, self.user_id)
+        ).encode('latin-1'))
+        await self.writer.drain()
+        self.task = asyncio.ensure_future(self.read(reader))
+        await self.ready.wait()
+
+    async def read(self, reader):
+        buffered = b''
+        chunked = None
+        while True:
+            data = await reader.read(65536)
+            if not data:
+                return
+            buffered += data
+            if chunked is None:
+                head, sep, rest = buffered.partition(b'\r\n\r\n')
+                if not sep:
+                    continue
+                chunked = b'transfer-encoding: chunked' in head.lower()
+                buffered = rest
+            # Chunk-size lines never contain "event:", so frames can be found
+            # in the raw bytes without de-chunking.
+            *frames, buffered = buffered.split(b'\n\n')
+            for frame in frames:
+                self.on_frame(frame)
+
+    def on_frame(self, frame):
+        event = data = None
+        for line in frame.split(b'\n'):
+            if line.startswith(b'event: '):
+                event = line[7:].strip()
+            elif line.startswith(b'data: '):
+                data = line[6:]
+        if event == b'count':
+            self.ready.set()
+        elif event == b'notification':
+            notification = json.loads(data)
+            created = datetime.datetime.fromisoformat(notification['createdAt'].replace('Z', '+00:00'))
+            self.received[notification['title']] = (time.time() - created.timestamp()) * 1000
+
+    def close(self):
+        if self.task:
+            self.task.cancel()
+        if self.writer:
+            self.writer.close()
+
+
+async def measure(server, connections, users, rounds, open_batch):
+    idle_rss = server.rss() or 0
+    streams = [Stream(server.host, server.port, str(1000 + i % users)) for i in range(connections)]
+    started = time.perf_counter()
+    for i in range(0, connections, open_batch):
+        await asyncio.gather(*(stream.open() for stream in streams[i:i + open_batch]))
+    open_s = time.perf_counter() - started
+    await asyncio.sleep(0.5)
+    open_rss = server.rss() or 0
+    print('opened %d streams for %d users in %.1f s' % (connections, users, open_s))
+
+    pool = ConnectionPool(server.host, server.port, size=64)
+    latencies = []
+    lost = 0
+    try:
+        for round_number in range(rounds):
+            async def post(user_id):
+                title = 'round-%d-user-%s' % (round_number, user_id)
+                response = await pool.request('POST', '/api/notifications', {
+                    'title': title, 'message': 'fan-out benchmark', 'userId': user_id,
+                })
+                if response.status != 201:
+                    raise RuntimeError('POST /api/notifications returned %d' % response.status)
+
+            await asyncio.gather(*(post(str(1000 + u)) for u in range(users)))
+            deadline = time.perf_counter() + 10
+            while time.perf_counter() < deadline:
+                if all('round-%d-user-%s' % (round_number, s.user_id) in s.received for s in streams):
+                    break
+                await asyncio.sleep(0.01)
+            for stream in streams:
+                title = 'round-%d-user-%s' % (round_number, stream.user_id)
+                if title in stream.received:
+                    latencies.append(stream.received[title])
+                else:
+                    lost += 1
+    finally:
+        await pool.close()
+        for stream in streams:
+            stream.close()
+    return {
+        'idle_rss': idle_rss,
+        'open_rss': open_rss,
+        'latencies': sorted(latencies),
+        'lost': lost,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--connections', type=int, default=5000)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--open-batch', type=int, default=500, help='streams opened concurrently')
+    parser.add_argument('--budget-ms', type=float, default=500.0, help='maximum delivery p99')
+    parser.add_argument('--kb-per-connection', type=float, default=64.0,
+                        help='maximum server RSS growth per open stream')
+    args = parser.parse_args(argv)
+
+    limit = raise_fd_limit(args.connections + 1024)
+    if limit < args.connections + 256:
+        print('open files limit %d is too low for %d connections' % (limit, args.connections))
+        return 1
+
+    with NodeServer() as server:
+        result = asyncio.run(measure(server, args.connections, args.users, args.rounds, args.open_batch))
+
+    latencies = result['latencies']
+    per_connection_kb = (result['open_rss'] - result['idle_rss']) / 1024 / args.connections
+    print('server rss  idle %.0f MB, with streams %.0f MB (%.1f KB per connection)' % (
+        result['idle_rss'] / 1048576, result['open_rss'] / 1048576, per_connection_kb))
+    if latencies:
+        print('delivery    p50 %.2f ms  p99 %.2f ms  max %.2f ms  (%d deliveries, %d lost)' % (
+            percentile(latencies, 50), percentile(latencies, 99), latencies[-1], len(latencies), result['lost']))
+
+    failures = []
+    if result['lost']:
+        failures.append('%d notifications were not delivered' % result['lost'])
+    if latencies and percentile(latencies, 99) > args.budget_ms:
+        failures.append('delivery p99 %.2f ms is over the %.0f ms budget' % (percentile(latencies, 99), args.budget_ms))
+    if per_connection_kb > args.kb_per_connection:
+        failures.append('%.1f KB per connection is over the %.0f KB budget' % (per_connection_kb, args.kb_per_connection))
+    for failure in failures:
+        print(failure)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,130 @@
+"""Per-page latency of keyset pagination at page 1 and page 10,000.
+
+Starts ``server/index.js`` on a generated dataset (response cache off, so
+every page is computed), walks each list route below page by page by
+following ``X-Next-Cursor`` down to ``--pages`` pages, then times the first
+page and the last one alternately, ``--samples`` times each.
+
+    python3 -m benchmarks.pagination [--tasks 200000] [--limit 20] [--pages 10000]
+
+Filtered routes may end before ``--pages``; their deepest page is used.
+Exits 1 when the deep page's p50 is slower than the first page's by more
+than ``--threshold`` and at least ``--min-delta-ms``, or when a walk
+repeats an item.
+"""
+
+import argparse
+import http.client
+import json
+import sys
+import time
+import urllib.parse
+
+from benchmarks.datagen import dataset
+from harness.loadgen import percentile
+from harness.server import NodeServer
+
+ROUTES = (
+    '/api/tasks',
+    '/api/tasks?sort=createdAt',
+    '/api/tasks?sort=createdAt&order=desc',
+    '/api/tasks?status=todo&sort=createdAt',
+)
+
+
+def with_query(path, **params):
+    url = urllib.parse.urlsplit(path)
+    query = dict(urllib.parse.parse_qsl(url.query))
+    query.update({name: value for name, value in params.items() if value is not None})
+    return '%s?%s' % (url.path, urllib.parse.urlencode(query))
+
+
+class Client:
+    """Sequential GETs over one keep-alive connection."""
+
+    def __init__(self, host, port):
+        self.conn = http.client.HTTPConnection(host, port, timeout=30)
+
+    def get(self, path):
+        started = time.perf_counter()
+        self.conn.request('GET', path)
+        response = self.conn.getresponse()
+        body = response.read()
+        elapsed = time.perf_counter() - started
+        if response.status != 200:
+            raise RuntimeError('GET %s: %d %s' % (path, response.status, body[:200]))
+        return elapsed, json.loads(body), response.getheader('X-Next-Cursor')
+
+    def close(self):
+        self.conn.close()
+
+
+def walk(client, route, limit, pages):
+    """Latencies of pages 1..pages (fewer if the list ends first), the cursor
+    of the last page and any problem."""
+    latencies = []
+    seen = set()
+    cursor = None
+    for page in range(1, pages + 1):
+        path = with_query(route, limit=limit, cursor=cursor)
+        elapsed, items, next_cursor = client.get(path)
+        latencies.append(elapsed)
+        ids = [item['id'] for item in items]
+        if seen.intersection(ids):
+            return latencies, cursor, 'page %d repeats an item' % page
+        seen.update(ids)
+        if page == pages or not next_cursor:
+            return latencies, cursor, None
+        cursor = next_cursor
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--tasks', type=int, default=200000)
+    parser.add_argument('--limit', type=int, default=20, help='page size')
+    parser.add_argument('--pages', type=int, default=10000, help='depth of the last page')
+    parser.add_argument('--samples', type=int, default=500)
+    parser.add_argument('--threshold', type=float, default=0.5)
+    parser.add_argument('--min-delta-ms', type=float, default=0.5)
+    args = parser.parse_args(argv)
+
+    seed_file = dataset(tasks=args.tasks)
+    problems = []
+    ms = lambda seconds: seconds * 1000.0
+    print('%-40s %6s %9s %9s %9s %9s %11s %11s' % (
+        'route', 'depth', 'p1 p50', 'p1 p99', 'deep p50', 'deep p99', 'walk first', 'walk last'))
+    with NodeServer(env={'SEED_FILE': seed_file, 'RESPONSE_CACHE': 'off'}, timeout=300) as server:
+        client = Client(server.host, server.port)
+        try:
+            for route in ROUTES:
+                latencies, cursor, problem = walk(client, route, args.limit, args.pages)
+                if problem:
+                    problems.append('%s: %s' % (route, problem))
+                    continue
+                first_path = with_query(route, limit=args.limit)
+                deep_path = with_query(route, limit=args.limit, cursor=cursor)
+                first, deep = [], []
+                for _ in range(args.samples):
+                    first.append(client.get(first_path)[0])
+                    deep.append(client.get(deep_path)[0])
+                first.sort()
+                deep.sort()
+                window = max(1, min(100, len(latencies) // 10))
+                print('%-40s %6d %9.3f %9.3f %9.3f %9.3f %11.3f %11.3f' % (
+                    route[:40], len(latencies), ms(percentile(first, 50)), ms(percentile(first, 99)),
+                    ms(percentile(deep, 50)), ms(percentile(deep, 99)),
+                    ms(sum(latencies[:window]) / window), ms(sum(latencies[-window:]) / window)))
+                before, after = percentile(first, 50), percentile(deep, 50)
+                if after > before * (1 + args.threshold) and ms(after - before) >= args.min_delta_ms:
+                    problems.append('%s: page %d p50 %.3f ms vs page 1 %.3f ms' % (
+                        route, len(latencies), ms(after), ms(before)))
+        finally:
+            client.close()
+
+    for line in problems:
+        print('FAIL ' + line)
+    return 1 if problems else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
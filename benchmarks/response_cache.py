@@ -0,0 +1,97 @@
+"""Bytes on the wire and p99 latency of read endpoints, response cache on and off.
+
+Starts ``server/index.js`` twice on the same generated dataset, once with
+``RESPONSE_CACHE=off`` and once with the cache enabled, and drives each read
+route with two kinds of client at a fixed open-loop rate:
+
+* ``fresh``: accepts ``br, gzip`` but sends no validator (first visits);
+* ``revalidate``: also sends the ETag from a previous response in
+  ``If-None-Match`` (dashboards and lists re-fetching unchanged data).
+
+    python3 -m benchmarks.response_cache [--tasks 20000] [--rate 200] [--duration 3]
+
+Exits 1 when a route's p99 with the cache on is worse than with it off by
+more than ``--threshold`` and at least ``--min-delta-ms``.
+"""
+
+import argparse
+import asyncio
+import sys
+
+from benchmarks.datagen import dataset
+from harness.loadgen import ConnectionPool, open_loop
+from harness.server import NodeServer
+
+READ_ROUTES = (
+    '/api/projects?status=active',
+    '/api/tasks?projectId=1',
+    '/api/users?role=admin',
+    '/api/search/tasks?q=dashboard',
+    '/api/dashboard/stats',
+    '/api/dashboard/tasks/status',
+    '/api/dashboard/users/activity',
+)
+ACCEPT = {'Accept-Encoding': 'br, gzip'}
+
+
+async def measure(server, rate, duration, connections):
+    pool = ConnectionPool(server.host, server.port, size=connections)
+    results = {}
+    try:
+        for path in READ_ROUTES:
+            warm = await pool.request('GET', path, headers=ACCEPT)
+            profiles = {'fresh': ACCEPT}
+            if 'etag' in warm.headers:
+                profiles['revalidate'] = dict(ACCEPT, **{'If-None-Match': warm.headers['etag']})
+            for profile, headers in profiles.items():
+                request = lambda i, h=headers: ('GET', path, None, h)
+                await open_loop(pool, request, rate, min(0.5, duration))
+                recorder, elapsed = await open_loop(pool, request, rate, duration)
+                results[(path, profile)] = recorder.summary(elapsed)
+    finally:
+        await pool.close()
+    return results
+
+
+def run(mode, seed_file, args):
+    env = {'SEED_FILE': seed_file, 'RESPONSE_CACHE': mode}
+    with NodeServer(env=env, timeout=120) as server:
+        return asyncio.run(measure(server, args.rate, args.duration, args.connections))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--tasks', type=int, default=20000)
+    parser.add_argument('--rate', type=float, default=200.0, help='offered requests/second per route')
+    parser.add_argument('--duration', type=float, default=3.0, help='measured seconds per route and client')
+    parser.add_argument('--connections', type=int, default=32)
+    parser.add_argument('--threshold', type=float, default=0.25)
+    parser.add_argument('--min-delta-ms', type=float, default=2.0,
+                        help='ignore p99 differences smaller than this (scheduler jitter)')
+    args = parser.parse_args(argv)
+
+    seed_file = dataset(tasks=args.tasks)
+    off = run('off', seed_file, args)
+    on = run('on', seed_file, args)
+
+    print('%-32s %-10s %11s %11s %9s %9s' % ('route', 'client', 'bytes off', 'bytes on', 'p99 off', 'p99 on'))
+    regressions = []
+    for path in READ_ROUTES:
+        for profile in ('fresh', 'revalidate'):
+            after = on.get((path, profile))
+            before = off.get((path, profile)) or off.get((path, 'fresh'))
+            if not after:
+                continue
+            print('%-32s %-10s %11.0f %11.0f %9.2f %9.2f  %s' % (
+                path[:32], profile, before['bytes_per_request'], after['bytes_per_request'],
+                before['p99_ms'], after['p99_ms'], after['statuses']))
+            if after['p99_ms'] > before['p99_ms'] * (1 + args.threshold) and after['p99_ms'] - before['p99_ms'] >= args.min_delta_ms:
+                regressions.append('%s (%s): p99 %.2f ms -> %.2f ms' % (path, profile, before['p99_ms'], after['p99_ms']))
+
+    for line in regressions:
+        print('REGRESSION ' + line)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
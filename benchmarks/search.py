@@ -0,0 +1,80 @@
+"""Autocomplete and search latency of the inverted index at 1M documents.
+
+Generates a dataset whose task and project text is drawn from a Zipf-skewed
+vocabulary (``--words`` distinct words), loads it through ``server/store`` so
+every document reaches the index via the incremental change-event path, then
+times ``/api/search/suggestions`` lookups for 1-4 character prefixes,
+multi-term BM25 queries across all types, and single-document re-indexing.
+
+    python3 -m benchmarks.search [--tasks 1000000] [--words 50000] [--budget-ms 1]
+
+Exits 1 when the suggestion p99 exceeds ``--budget-ms``.
+"""
+
+import argparse
+import random
+import sys
+
+from benchmarks.datagen import dataset, vocabulary
+from benchmarks.node import fmt_ms, run_driver
+
+
+def sample_prefixes(words, count, seed=7):
+    """Prefixes of 1-4 characters of words picked across the frequency range."""
+    rng = random.Random(seed)
+    prefixes = []
+    for _ in range(count):
+        word = words[min(len(words) - 1, int(rng.paretovariate(0.6)) - 1)]
+        prefixes.append(word[:rng.randint(1, 4)])
+    return prefixes
+
+
+def sample_queries(words, count, seed=11):
+    rng = random.Random(seed)
+    return [' '.join(rng.choice(words[:2000]) for _ in range(rng.randint(1, 3))) for _ in range(count)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--tasks', type=int, default=1000000)
+    parser.add_argument('--words', type=int, default=50000, help='distinct words in the generated text')
+    parser.add_argument('--iterations', type=int, default=2000)
+    parser.add_argument('--budget-ms', type=float, default=1.0,
+                        help='maximum p99 for a suggestion lookup')
+    args = parser.parse_args(argv)
+
+    words = vocabulary(args.words)
+    path = dataset(tasks=args.tasks, words=args.words)
+    result = run_driver('search', {
+        'file': path,
+        'prefixes': sample_prefixes(words, 500),
+        'queries': sample_queries(words, 20),
+        'iterations': args.iterations,
+    })
+    print('indexed %d documents (%d terms) in %.0f ms, heap +%.0f MB' % (
+        result['documents'], result['terms'], result['load_ms'], result['heap_mb']))
+
+    print('%-24s %9s %9s %9s %9s' % ('operation', 'p50', 'p95', 'p99', 'max'))
+
+    def row(label, stats):
+        print('%-24s %s %s %s %s' % (label, fmt_ms(stats['p50_ms']), fmt_ms(stats['p95_ms']),
+                                      fmt_ms(stats['p99_ms']), fmt_ms(stats['max_ms'])))
+
+    row('suggest (all)', result['suggest'])
+    for group in sorted(result['suggest_by_length'], key=lambda g: g['prefix_length']):
+        row('suggest prefix len %d' % group['prefix_length'], group)
+    for query in result['search']:
+        row('search %r' % query['query'][:14], query)
+    row('update (retitle)', result['update'])
+    row('insert + remove', result['insert_remove'])
+
+    p99 = result['suggest']['p99_ms']
+    if p99 > args.budget_ms:
+        print('suggestion p99 %.4f ms is over the %.2f ms budget' % (p99, args.budget_ms))
+        return 1
+    print('suggestion p99 %.4f ms is within the %.2f ms budget' % (p99, args.budget_ms))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
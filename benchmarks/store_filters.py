@@ -0,0 +1,59 @@
+"""Filter latency of the indexed entity store at 100k+ tasks.
+
+Generates a skewed dataset with :mod:`benchmarks.datagen`, loads it into
+``server/store`` in a Node driver and times each filter combination through
+the secondary indexes and, for comparison, as a linear scan over all tasks.
+
+    python3 -m benchmarks.store_filters [--tasks 100000] [--budget-ms 5]
+
+Exits 1 when any indexed query's p99 exceeds ``--budget-ms``.
+"""
+
+import argparse
+import sys
+
+from benchmarks.datagen import dataset
+from benchmarks.node import fmt_ms, run_driver
+
+QUERIES = (
+    {'status': 'review'},
+    {'assignee': '1'},
+    {'assignee': '37'},
+    {'projectId': '12'},
+    {'status': 'in_progress', 'priority': 'urgent'},
+    {'projectId': '3', 'status': 'todo'},
+    {'assignee': '5', 'status': 'todo', 'priority': 'high'},
+    {'projectId': '1', 'assignee': '2', 'status': 'in_progress', 'priority': 'medium'},
+)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--tasks', type=int, default=100000)
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--budget-ms', type=float, default=5.0,
+                        help='maximum p99 for an indexed query')
+    args = parser.parse_args(argv)
+
+    path = dataset(tasks=args.tasks)
+    result = run_driver('store_filters', {'file': path, 'queries': QUERIES, 'iterations': args.iterations})
+    print('loaded %d records (%d tasks) in %.0f ms, heap +%.0f MB' % (
+        result['loaded'], result['tasks'], result['load_ms'], result['heap_mb']))
+    print('%-70s %8s %9s %9s %9s %9s' % ('filters', 'matches', 'idx p50', 'idx p99', 'scan p50', 'speedup'))
+    over_budget = []
+    for row in result['results']:
+        label = '&'.join('%s=%s' % item for item in sorted(row['filters'].items()))
+        indexed, scan = row['indexed'], row['scan']
+        print('%-70s %8d %s %s %s %8.1fx' % (
+            label, row['matches'], fmt_ms(indexed['p50_ms']), fmt_ms(indexed['p99_ms']),
+            fmt_ms(scan['p50_ms']), scan['p50_ms'] / max(indexed['p50_ms'], 1e-9)))
+        if indexed['p99_ms'] > args.budget_ms:
+            over_budget.append(label)
+    if over_budget:
+        print('over the %.1f ms p99 budget: %s' % (args.budget_ms, ', '.join(over_budget)))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
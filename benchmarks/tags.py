@@ -0,0 +1,89 @@
+"""Popular-tag latency at a million tag assignments: maintained top-k vs scan-and-sort.
+
+Writes a seed of ``--tasks`` tasks carrying ``--per-task`` tags on average
+(Zipf-distributed over ``--tags`` names, created over the last 90 days),
+loads it through ``server/store`` so the usage counters are built by the
+same change events the API uses, and times the ``/api/tags/popular`` read
+three ways (all time, last 7 days, last 30 days): from the maintained
+counters, and by counting every task's tags and sorting. Also reports what
+retagging a task costs with the counters attached.
+
+    python3 -m benchmarks.tags [--tasks 200000] [--per-task 5] [--tags 5000] [--budget-ms 0.5]
+
+Exits 1 when a maintained read's p99 exceeds ``--budget-ms`` or when the
+maintained all-time counts disagree with the scan.
+"""
+
+import argparse
+import datetime
+import os
+import random
+import sys
+
+from benchmarks.datagen import DATA_DIR, TASK_STATUSES, Zipf, timestamp, weighted, write
+from benchmarks.node import fmt_ms, run_driver
+
+
+def records(tasks, per_task, tags, seed=42):
+    rng = random.Random(seed)
+    pick = Zipf(tags)
+    now = datetime.datetime.utcnow()
+    for i in range(1, tasks + 1):
+        count = rng.randint(max(0, per_task - 2), per_task + 2)
+        names = set()
+        while len(names) < min(count, tags):
+            names.add('tag-%s' % pick(rng))
+        yield {
+            'collection': 'tasks', 'id': str(i), 'title': 'Task %d' % i,
+            'status': weighted(rng, TASK_STATUSES), 'tags': sorted(names),
+            'createdAt': timestamp(rng, now, days=90),
+        }
+
+
+def seed(args):
+    # Dated by day: the windows are relative to now
+    name = 'tags-t%d-p%d-g%d-%s.ndjson' % (args.tasks, args.per_task, args.tags, datetime.date.today().isoformat())
+    path = os.path.join(DATA_DIR, name)
+    if not os.path.exists(path):
+        write(path, records(args.tasks, args.per_task, args.tags))
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--tasks', type=int, default=200000)
+    parser.add_argument('--per-task', type=int, default=5, help='mean tags per task')
+    parser.add_argument('--tags', type=int, default=5000, help='distinct tag names')
+    parser.add_argument('--k', type=int, default=10, help='popular tags returned')
+    parser.add_argument('--iterations', type=int, default=2000)
+    parser.add_argument('--scan-iterations', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, default=0.5,
+                        help='maximum p99 for a maintained popular-tags read')
+    args = parser.parse_args(argv)
+
+    result = run_driver('tags', {
+        'file': seed(args), 'k': args.k, 'iterations': args.iterations,
+        'scanIterations': args.scan_iterations,
+    })
+    print('%d tasks, %d tag assignments over %d tags loaded in %.0f ms, heap +%.0f MB' % (
+        result['tasks'], result['assignments'], result['tags'], result['load_ms'], result['heap_mb']))
+    print('%-10s %13s %13s %13s %9s' % ('window', 'top-k p50', 'top-k p99', 'scan p50', 'speedup'))
+    failures = []
+    for view in result['views']:
+        maintained, scan = view['maintained'], view['scan']
+        print('%-10s     %s     %s     %s %8.0fx' % (
+            view['view'], fmt_ms(maintained['p50_ms']), fmt_ms(maintained['p99_ms']),
+            fmt_ms(scan['p50_ms']), scan['p50_ms'] / max(maintained['p50_ms'], 1e-6)))
+        if maintained['p99_ms'] > args.budget_ms:
+            failures.append('%s: p99 %.4f ms' % (view['view'], maintained['p99_ms']))
+        if view['agrees'] is False:
+            failures.append('%s: maintained counts differ from the scan' % view['view'])
+    print('%-10s     %s     %s' % ('retag', fmt_ms(result['write']['p50_ms']), fmt_ms(result['write']['p99_ms'])))
+
+    for failure in failures:
+        print('FAIL ' + failure)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
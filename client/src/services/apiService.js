@@ -74,15 +74,86 @@ export const taskService = {
   addComment: async (id, content) => {
     const response = await api.post(`/tasks/${id}/comments`, { content });
     return response.data.task;
+  },
+
+  updateStatuses: async (ids, status) => {
+    const response = await api.patch('/tasks/bulk/status', { ids, status });
+    return response.data.tasks;
+  },
+
+  assignTasks: async (ids, assignee) => {
+    const response = await api.patch('/tasks/bulk/assignee', { ids, assignee });
+    return response.data.tasks;
+  },
+
+  tagTasks: async (ids, { add = [], remove = [] }) => {
+    const response = await api.patch('/tasks/bulk/tags', { ids, add, remove });
+    return response.data.tasks;
   }
 };
 
-export const userService = {
-  getUsers: async (page = 1, limit = 10) => {
-    const response = await api.get(`/users?page=${page}&limit=${limit}`);
+export const commentService = {
+  // A page of top-level comments with their first replies; pass the
+  // returned nextCursor for the next page
+  getThread: async (resourceId, { cursor, limit = 20, replies = 3 } = {}) => {
+    const params = new URLSearchParams({ limit, replies });
+    if (cursor) {
+      params.set('cursor', cursor);
+    }
+    const response = await api.get(`/comments/resource/${resourceId}?${params}`);
     return response.data;
   },
 
+  // More replies, from a comment's repliesCursor or the X-Next-Cursor of
+  // the previous call
+  getReplies: async (parentId, cursor, limit = 20) => {
+    const params = new URLSearchParams({ parentId, limit });
+    if (cursor) {
+      params.set('cursor', cursor);
+    }
+    const response = await api.get(`/comments?${params}`);
+    return { replies: response.data, nextCursor: response.headers['x-next-cursor'] || null };
+  },
+
+  addComment: async (comment) => {
+    const response = await api.post('/comments', comment);
+    return response.data.comment;
+  },
+
+  updateComment: async (id, content) => {
+    const response = await api.put(`/comments/${id}`, { content });
+    return response.data.comment;
+  },
+
+  deleteComment: async (id) => {
+    const response = await api.delete(`/comments/${id}`);
+    return response.data;
+  }
+};
+
+// Several calls in one round trip: [{ method, path, body }] with paths
+// relative to the API base, answered with [{ status, body }] in order
+export const batchService = {
+  run: async (requests) => {
+    const response = await api.post('/batch', {
+      requests: requests.map((request) => ({ ...request, path: `/api${request.path}` }))
+    });
+    return response.data.responses;
+  }
+};
+
+export const userService = {
+  // A page of users; pass the returned nextCursor for the next page, which
+  // is null after the last one
+  getUsers: async (cursor, limit = 10) => {
+    const params = new URLSearchParams({ limit });
+    if (cursor) {
+      params.set('cursor', cursor);
+    }
+    const response = await api.get(`/users?${params}`);
+    return { users: response.data, nextCursor: response.headers['x-next-cursor'] || null };
+  },
+
   getUser: async (id) => {
     const response = await api.get(`/users/${id}`);
     return response.data.user;
@@ -0,0 +1 @@
+"""Python tooling for validating and benchmarking the NodeNest server."""
@@ -0,0 +1,403 @@
+"""Compose several task diffs into one tree without hunk conflicts.
+
+Every ``tasks/*/task_diff.txt`` inserts its routes at the same spot in
+server/app.js (right after ``/api/auth/login``), so applying them one after
+another fails: once the first diff lands, the second one's context no longer
+matches.  Since the hunks are purely additive, each one can instead be
+resolved to an insertion point in the *original* file and all insertions at
+the same point concatenated in a fixed order.
+
+Route registrations in the added lines are indexed with
+:mod:`harness.routes`; two diffs registering the same ``(method, path)`` are a
+collision, and a static path registered after a parameterised one that
+matches it (``/api/tags/:id`` before ``/api/tags/popular``) is reported as
+shadowed.  Composed trees are cached under ``.harness/compose/<key>`` where
+the key hashes the base files and every diff, so repeated builds are free.
+
+Usage::
+
+    python3 -m harness.compose [--out DIR] [--on-collision error|first] [TASK_ID ...]
+"""
+
+import argparse
+import collections
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+
+from harness.routes import REPO_ROOT, parse_routes
+from harness.runner import TASKS_DIR, discover_tasks
+
+ENGINE_VERSION = '2'
+DEFAULT_CACHE_DIR = os.path.join(REPO_ROOT, '.harness', 'compose')
+
+Hunk = collections.namedtuple('Hunk', ['old_start', 'old_len', 'new_start', 'new_len', 'lines'])
+
+_HUNK_HEADER = re.compile(r'^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@')
+_INDEX_LINE = re.compile(r'^index ([0-9a-f]+)\.\.([0-9a-f]+)')
+
+
+class ComposeError(Exception):
+    """The diffs cannot be composed (non-additive hunk, missing anchor, collision)."""
+
+
+class FilePatch:
+    """The hunks one diff applies to one file."""
+
+    def __init__(self, old_path, new_path, old_blob=None):
+        self.old_path = old_path
+        self.new_path = new_path
+        self.old_blob = old_blob
+        self.hunks = []
+
+    @property
+    def path(self):
+        return self.new_path if self.new_path != '/dev/null' else self.old_path
+
+
+def _strip_prefix(path):
+    if path.startswith(('a/', 'b/')):
+        return path[2:]
+    return path
+
+
+def parse_diff(text):
+    """Parse a unified (git) diff into a list of :class:`FilePatch`."""
+    patches = []
+    current = None
+    old_blob = None
+    old_path = None
+    lines = text.replace('\r\n', '\n').split('\n')
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        if line.startswith('diff --git '):
+            current, old_blob, old_path = None, None, None
+        elif _INDEX_LINE.match(line):
+            old_blob = _INDEX_LINE.match(line).group(1)
+        elif line.startswith('--- '):
+            old_path = _strip_prefix(line[4:].split('\t')[0])
+        elif line.startswith('+++ ') and old_path is not None:
+            current = FilePatch(old_path, _strip_prefix(line[4:].split('\t')[0]), old_blob)
+            patches.append(current)
+        elif line.startswith('@@'):
+            match = _HUNK_HEADER.match(line)
+            if not match or current is None:
+                raise ComposeError('malformed hunk header: %r' % line)
+            old_start, old_len, new_start, new_len = (
+                int(g) if g is not None else 1 for g in match.groups())
+            body = []
+            remaining_old, remaining_new = old_len, new_len
+            while remaining_old > 0 or remaining_new > 0:
+                i += 1
+                if i >= len(lines):
+                    raise ComposeError('truncated hunk at line %d' % old_start)
+                raw = lines[i]
+                if raw.startswith('\\'):
+                    continue
+                # Editors strip the single space off empty context lines.
+                tag, content = (raw[0], raw[1:]) if raw else (' ', '')
+                if tag not in ' +-':
+                    raise ComposeError('unexpected hunk line %r' % raw)
+                body.append((tag, content))
+                if tag in ' -':
+                    remaining_old -= 1
+                if tag in ' +':
+                    remaining_new -= 1
+            current.hunks.append(Hunk(old_start, old_len, new_start, new_len, body))
+        i += 1
+    return patches
+
+
+def _same(a, b):
+    return a.rstrip() == b.rstrip()
+
+
+def locate(base_lines, hunk):
+    """Return the base line index where ``hunk``'s old lines start.
+
+    Tries the position in the hunk header first, then searches outwards like
+    ``git apply`` does for offset hunks.
+    """
+    old = [content for tag, content in hunk.lines if tag != '+']
+    expected = max(0, hunk.old_start - 1)
+    limit = len(base_lines) - len(old)
+    for delta in range(0, max(expected, limit - expected) + 1):
+        for start in ((expected,) if delta == 0 else (expected - delta, expected + delta)):
+            if 0 <= start <= limit and all(_same(base_lines[start + k], old[k]) for k in range(len(old))):
+                return start
+    raise ComposeError('context of hunk @@ -%d,%d @@ not found in base' % (hunk.old_start, hunk.old_len))
+
+
+def insertions(base_lines, hunk):
+    """Resolve an additive hunk to ``[(base_index, [added lines]), ...]``."""
+    if any(tag == '-' for tag, _ in hunk.lines):
+        raise ComposeError('hunk @@ -%d,%d @@ removes lines; only additive hunks compose'
+                           % (hunk.old_start, hunk.old_len))
+    pointer = locate(base_lines, hunk)
+    groups = []
+    for tag, content in hunk.lines:
+        if tag == ' ':
+            pointer += 1
+        elif groups and groups[-1][0] == pointer:
+            groups[-1][1].append(content)
+        else:
+            groups.append((pointer, [content]))
+    return groups
+
+
+def route_key(method, path):
+    """Collision key: parameter names don't matter, only their positions."""
+    return method, re.sub(r':\w+', ':', path)
+
+
+def route_blocks(lines):
+    """Split added lines into ``(route, first, last)`` registration blocks.
+
+    A block runs from an ``app.<method>(`` line to the top-level ``});`` that
+    closes it, which is how every handler in server/app.js is laid out.
+    """
+    blocks = []
+    for route in parse_routes('\n'.join(lines)):
+        first = route.line - 1
+        last = first
+        while last < len(lines) - 1 and lines[last].rstrip() != '});':
+            last += 1
+        if last + 1 < len(lines) and not lines[last + 1].strip():
+            last += 1
+        blocks.append((route, first, last))
+    return blocks
+
+
+def shadowed_routes(routes):
+    """Static routes that an earlier ``:param`` route with the same method catches."""
+    warnings = []
+    seen = []
+    for route in routes:
+        for earlier in seen:
+            if earlier.method != route.method or ':' not in earlier.path or ':' in route.path:
+                continue
+            pattern = '^' + re.sub(r':\w+', '[^/]+', re.escape(earlier.path).replace('\\:', ':')) + '$'
+            if re.match(pattern, route.path):
+                warnings.append('%s %s (line %d) is shadowed by %s (line %d)' % (
+                    route.method, route.path, route.line, earlier.path, earlier.line))
+                break
+        seen.append(route)
+    return warnings
+
+
+def git_blob(abbrev):
+    proc = subprocess.run(['git', 'cat-file', 'blob', abbrev], cwd=REPO_ROOT,
+                          stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    return proc.stdout.decode('utf-8') if proc.returncode == 0 else None
+
+
+def resolve_base(path, named_patches, base):
+    """Text of ``path`` the diffs were made against, and warnings about it.
+
+    ``base='auto'`` reads the pre-image blob named in each diff's ``index``
+    line.  A diff whose blob isn't in this repository is resolved against the
+    pre-image the other diffs name (its hunks' context still has to match
+    there) and reported; when none of the blobs are here, or they name
+    different pre-images, :class:`ComposeError` asks for an explicit base.
+    ``base='worktree'`` uses the working-tree file; any other value is
+    treated as a git revision.
+    """
+    if base == 'auto':
+        blobs = collections.OrderedDict()
+        missing = []
+        for name, patch in named_patches:
+            text = git_blob(patch.old_blob) if patch.old_blob else None
+            if text is None:
+                missing.append((name, patch.old_blob))
+            else:
+                blobs.setdefault(text, patch.old_blob)
+        if len(blobs) > 1:
+            raise ComposeError('%s: the diffs were made against different versions (%s); pass --base'
+                               % (path, ', '.join(blobs.values())))
+        if not blobs:
+            raise ComposeError('%s: pre-image blob(s) %s are not in this repository; pass --base '
+                               'with a revision or "worktree"'
+                               % (path, ', '.join('%s (%s)' % (blob or 'none', name) for name, blob in missing)))
+        (text, found), = blobs.items()
+        return text, ['%s: %s names pre-image %s, which is not in this repository; resolved against %s'
+                      % (path, name, blob or 'none', found) for name, blob in missing]
+    if base == 'worktree':
+        with open(os.path.join(REPO_ROOT, path), 'r', encoding='utf-8') as f:
+            return f.read(), []
+    proc = subprocess.run(['git', 'show', '%s:%s' % (base, path)], cwd=REPO_ROOT,
+                          stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    if proc.returncode != 0:
+        raise ComposeError(proc.stderr.decode().strip())
+    return proc.stdout.decode('utf-8'), []
+
+
+class Composition:
+    """Result of composing a set of diffs: file contents plus a report."""
+
+    def __init__(self, files, routes, collisions, warnings, key, cached=False):
+        self.files = files
+        self.routes = routes
+        self.collisions = collisions
+        self.warnings = warnings
+        self.key = key
+        self.cached = cached
+
+    def write(self, root):
+        for path, text in self.files.items():
+            target = os.path.join(root, path)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with open(target, 'w', encoding='utf-8') as f:
+                f.write(text)
+
+    def manifest(self):
+        return {
+            'key': self.key,
+            'files': sorted(self.files),
+            'routes': self.routes,
+            'collisions': self.collisions,
+            'warnings': self.warnings,
+        }
+
+
+def compose_file(path, base_text, named_patches, on_collision='error'):
+    """Compose the patches for one file onto ``base_text``.
+
+    ``named_patches`` is an ordered list of ``(name, FilePatch)``.  Returns
+    ``(text, collisions)``.
+    """
+    base_lines = base_text.split('\n')
+    owners = {route_key(r.method, r.path): 'base' for r in parse_routes(base_text)}
+    collisions = []
+    pending = collections.defaultdict(list)
+    for name, patch in named_patches:
+        for hunk in patch.hunks:
+            for index, added in insertions(base_lines, hunk):
+                dropped = set()
+                for route, first, last in route_blocks(added):
+                    key = route_key(route.method, route.path)
+                    owner = owners.get(key)
+                    if owner is None:
+                        owners[key] = name
+                        continue
+                    if on_collision == 'error':
+                        raise ComposeError('%s %s is registered by both %s and %s'
+                                           % (route.method, route.path, owner, name))
+                    collisions.append({'route': '%s %s' % (route.method, route.path),
+                                       'kept': owner, 'dropped': name})
+                    dropped.update(range(first, last + 1))
+                pending[index].append([line for k, line in enumerate(added) if k not in dropped])
+    out = []
+    for index in range(len(base_lines) + 1):
+        for block in pending.get(index, ()):
+            out.extend(block)
+        if index < len(base_lines):
+            out.append(base_lines[index])
+    return '\n'.join(out), collisions
+
+
+def cache_key(named_diffs, bases, on_collision):
+    digest = hashlib.sha256(('%s\0%s\0' % (ENGINE_VERSION, on_collision)).encode())
+    for path in sorted(bases):
+        digest.update(path.encode() + b'\0' + bases[path].encode() + b'\0')
+    for name, text in named_diffs:
+        digest.update(name.encode() + b'\0' + hashlib.sha256(text.encode()).digest())
+    return digest.hexdigest()
+
+
+def compose(named_diffs, base='auto', on_collision='error', cache_dir=DEFAULT_CACHE_DIR):
+    """Compose ``[(name, diff_text), ...]`` in the given order.
+
+    Returns a :class:`Composition`; raises :class:`ComposeError` when a hunk
+    isn't additive, its context can't be found, or (with
+    ``on_collision='error'``) two diffs register the same route.
+    """
+    by_file = collections.OrderedDict()
+    for name, text in named_diffs:
+        for patch in parse_diff(text):
+            by_file.setdefault(patch.path, []).append((name, patch))
+    bases, warnings = {}, []
+    for path, items in by_file.items():
+        bases[path], base_warnings = resolve_base(path, items, base)
+        warnings.extend(base_warnings)
+    key = cache_key(named_diffs, bases, on_collision)
+
+    entry = os.path.join(cache_dir, key) if cache_dir else None
+    if entry and os.path.exists(os.path.join(entry, 'manifest.json')):
+        with open(os.path.join(entry, 'manifest.json'), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        files = {}
+        for path in manifest['files']:
+            with open(os.path.join(entry, 'tree', path), 'r', encoding='utf-8') as f:
+                files[path] = f.read()
+        return Composition(files, manifest['routes'], manifest['collisions'],
+                           manifest['warnings'], key, cached=True)
+
+    files, routes, collisions = {}, {}, []
+    for path, items in by_file.items():
+        text, file_collisions = compose_file(path, bases[path], items, on_collision)
+        files[path] = text
+        collisions.extend(file_collisions)
+        parsed = parse_routes(text)
+        if parsed:
+            routes[path] = ['%s %s' % (r.method, r.path) for r in parsed]
+            warnings.extend('%s: %s' % (path, w) for w in shadowed_routes(parsed))
+    composition = Composition(files, routes, collisions, warnings, key)
+
+    if entry:
+        tmp = '%s.tmp-%d' % (entry, os.getpid())
+        shutil.rmtree(tmp, ignore_errors=True)
+        composition.write(os.path.join(tmp, 'tree'))
+        with open(os.path.join(tmp, 'manifest.json'), 'w', encoding='utf-8') as f:
+            json.dump(composition.manifest(), f, indent=2)
+        try:
+            os.rename(tmp, entry)
+        except OSError:
+            shutil.rmtree(tmp, ignore_errors=True)
+    return composition
+
+
+def load_task_diffs(task_ids):
+    diffs = []
+    for task_id in task_ids:
+        with open(os.path.join(TASKS_DIR, task_id, 'task_diff.txt'), 'r', encoding='utf-8') as f:
+            diffs.append((task_id, f.read()))
+    return diffs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compose task diffs into one tree')
+    parser.add_argument('tasks', nargs='*', help='task ids to compose (default: all, in id order)')
+    parser.add_argument('--out', help='write the composed files under this directory')
+    parser.add_argument('--base', default='auto',
+                        help="'auto' (each diff's pre-image), 'worktree', or a git revision")
+    parser.add_argument('--on-collision', choices=('error', 'first'), default='error',
+                        help="fail, or keep the first registration and drop later ones")
+    parser.add_argument('--no-cache', action='store_true')
+    args = parser.parse_args(argv)
+
+    try:
+        composition = compose(load_task_diffs(discover_tasks(args.tasks)), args.base,
+                              args.on_collision, None if args.no_cache else DEFAULT_CACHE_DIR)
+    except ComposeError as exc:
+        print('compose failed: %s' % exc, file=sys.stderr)
+        return 1
+    for collision in composition.collisions:
+        print('collision: %s' % json.dumps(collision), file=sys.stderr)
+    for warning in composition.warnings:
+        print('warning: %s' % warning, file=sys.stderr)
+    total = sum(len(r) for r in composition.routes.values())
+    print('composed %d file(s), %d routes%s' % (
+        len(composition.files), total, ' (cached)' if composition.cached else ''))
+    if args.out:
+        composition.write(args.out)
+        print('wrote %s' % ', '.join(os.path.join(args.out, p) for p in sorted(composition.files)))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
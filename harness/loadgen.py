@@ -0,0 +1,292 @@
+"""Asyncio HTTP/1.1 load generator with a keep-alive connection pool.
+
+Requests are issued open-loop: arrivals follow a fixed schedule regardless of
+how fast the server answers, and latency is measured from the *scheduled*
+send time.  A slow server therefore shows up as queueing latency instead of
+silently lowering the offered load (coordinated omission).
+"""
+
+import asyncio
+import collections
+import json
+import math
+
+Response = collections.namedtuple('Response', ['status', 'headers', 'body', 'wire_bytes'])
+
+
+class HTTPError(Exception):
+    """The server closed the connection or sent an unparseable response."""
+
+
+class Connection:
+    """One keep-alive HTTP/1.1 connection."""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+        self.reusable = True
+        self.responses = 0
+
+    async def open(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        return self
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+    async def request(self, method, path, body=None, headers=None):
+        payload = b''
+        head = ['%s %s HTTP/1.1' % (method, path), 'Host: %s:%d' % (self.host, self.port)]
+        if body is not None:
+            payload = body if isinstance(body, bytes) else json.dumps(body).encode()
+            head.append('Content-Type: application/json')
+        if body is not None or method in ('POST', 'PUT', 'PATCH'):
+            head.append('Content-Length: %d' % len(payload))
+        for name, value in (headers or {}).items():
+            head.append('%s: %s' % (name, value))
+        self.writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + payload)
+        await self.writer.drain()
+        return await self._read_response(method)
+
+    async def _read_response(self, method):
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise HTTPError('connection closed by server')
+        wire = len(status_line)
+        try:
+            status = int(status_line.split(None, 2)[1])
+        except (IndexError, ValueError):
+            raise HTTPError('bad status line %r' % status_line)
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            wire += len(line)
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        if method == 'HEAD' or status in (204, 304) or 100 <= status < 200:
+            body = b''
+        elif 'chunked' in headers.get('transfer-encoding', '').lower():
+            chunks = []
+            while True:
+                size_line = await self.reader.readline()
+                wire += len(size_line)
+                size = int(size_line.split(b';', 1)[0].strip() or b'0', 16)
+                if size == 0:
+                    while True:
+                        trailer = await self.reader.readline()
+                        wire += len(trailer)
+                        if trailer in (b'\r\n', b'\n', b''):
+                            break
+                    break
+                chunks.append(await self.reader.readexactly(size))
+                await self.reader.readexactly(2)
+                wire += size + 2
+            body = b''.join(chunks)
+        elif 'content-length' in headers:
+            body = await self.reader.readexactly(int(headers['content-length']))
+            wire += len(body)
+        else:
+            body = await self.reader.read()
+            wire += len(body)
+            self.reusable = False
+
+        if headers.get('connection', '').lower() == 'close':
+            self.reusable = False
+        self.responses += 1
+        return Response(status, headers, body, wire)
+
+
+class ConnectionPool:
+    """At most ``size`` keep-alive connections shared by concurrent requests."""
+
+    def __init__(self, host, port, size=32):
+        self.host = host
+        self.port = port
+        self.size = size
+        self._idle = []
+        self._open = 0
+        self._available = asyncio.Condition()
+
+    async def _acquire(self):
+        async with self._available:
+            while not self._idle and self._open >= self.size:
+                await self._available.wait()
+            if self._idle:
+                return self._idle.pop()
+            self._open += 1
+        try:
+            return await Connection(self.host, self.port).open()
+        except BaseException:
+            await self._discard()
+            raise
+
+    async def _discard(self):
+        async with self._available:
+            self._open -= 1
+            self._available.notify()
+
+    async def _release(self, conn):
+        async with self._available:
+            self._idle.append(conn)
+            self._available.notify()
+
+    async def request(self, method, path, body=None, headers=None):
+        conn = await self._acquire()
+        try:
+            response = await conn.request(method, path, body, headers)
+        except (OSError, HTTPError, asyncio.IncompleteReadError):
+            conn.close()
+            await self._discard()
+            if not conn.responses:
+                raise
+            # The server closed the idle keep-alive connection (after its
+            # keepAliveTimeout) before reading the request: send it again
+            # on a new one.
+            return await self.request(method, path, body, headers)
+        except BaseException:
+            conn.close()
+            await self._discard()
+            raise
+        if conn.reusable:
+            await self._release(conn)
+        else:
+            conn.close()
+            await self._discard()
+        return response
+
+    async def close(self):
+        async with self._available:
+            for conn in self._idle:
+                conn.close()
+            self._open -= len(self._idle)
+            self._idle = []
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(math.ceil(pct / 100.0 * len(sorted_values))))
+    return sorted_values[rank - 1]
+
+
+def error_rate(summary):
+    """Share of a summary's requests answered 4xx/5xx or lost to a transport error."""
+    failed = sum(count for code, count in summary['statuses'].items() if int(code) >= 400)
+    failed += sum(summary['errors'].values())
+    attempted = summary['requests'] + sum(summary['errors'].values())
+    return round(failed / attempted, 4) if attempted else 0.0
+
+
+class Recorder:
+    """Latency samples, status codes and byte counts for one load phase."""
+
+    def __init__(self):
+        self.latencies = []
+        self.statuses = collections.Counter()
+        self.errors = collections.Counter()
+        self.wire_bytes = 0
+        self.dropped = 0
+
+    def record(self, latency, response):
+        self.latencies.append(latency)
+        self.statuses[response.status] += 1
+        self.wire_bytes += response.wire_bytes
+
+    def record_error(self, exc):
+        self.errors[type(exc).__name__] += 1
+
+    def summary(self, elapsed):
+        values = sorted(self.latencies)
+        ms = lambda seconds: round(seconds * 1000.0, 3)
+        summary = {
+            'requests': len(values),
+            'throughput': round(len(values) / elapsed, 2) if elapsed > 0 else 0.0,
+            'p50_ms': ms(percentile(values, 50)),
+            'p95_ms': ms(percentile(values, 95)),
+            'p99_ms': ms(percentile(values, 99)),
+            'max_ms': ms(values[-1] if values else 0.0),
+            'mean_ms': ms(sum(values) / len(values) if values else 0.0),
+            'bytes_per_request': round(self.wire_bytes / len(values), 1) if values else 0.0,
+            'statuses': {str(code): count for code, count in sorted(self.statuses.items())},
+            'errors': dict(self.errors),
+            'dropped': self.dropped,
+        }
+        summary['error_rate'] = error_rate(summary)
+        return summary
+
+
+async def open_loop(pool, make_request, rate, duration, recorder=None, max_in_flight=1024):
+    """Offer ``rate`` requests/second for ``duration`` seconds.
+
+    ``make_request(i)`` returns ``(method, path, body, headers)`` for the i-th
+    arrival.  Arrivals that would exceed ``max_in_flight`` are counted as
+    dropped rather than queued without bound.
+    """
+    recorder = recorder or Recorder()
+    loop = asyncio.get_running_loop()
+    interval = 1.0 / rate
+    in_flight = set()
+
+    async def fire(i, scheduled):
+        method, path, body, headers = make_request(i)
+        try:
+            response = await pool.request(method, path, body, headers)
+        except (OSError, HTTPError, asyncio.IncompleteReadError) as exc:
+            recorder.record_error(exc)
+            return
+        recorder.record(loop.time() - scheduled, response)
+
+    started = loop.time()
+    i = 0
+    while True:
+        scheduled = started + i * interval
+        if scheduled - started >= duration:
+            break
+        delay = scheduled - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if len(in_flight) >= max_in_flight:
+            recorder.dropped += 1
+        else:
+            task = loop.create_task(fire(i, scheduled))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+        i += 1
+    if in_flight:
+        await asyncio.gather(*in_flight)
+    return recorder, loop.time() - started
+
+
+async def closed_loop(pool, make_request, concurrency, duration, recorder=None):
+    """Keep ``concurrency`` requests outstanding for ``duration`` seconds.
+
+    Measures the maximum sustainable throughput rather than latency under a
+    fixed offered load.
+    """
+    recorder = recorder or Recorder()
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    deadline = started + duration
+    counter = iter(range(1 << 62))
+
+    async def worker():
+        while loop.time() < deadline:
+            method, path, body, headers = make_request(next(counter))
+            sent = loop.time()
+            try:
+                response = await pool.request(method, path, body, headers)
+            except (OSError, HTTPError, asyncio.IncompleteReadError) as exc:
+                recorder.record_error(exc)
+                continue
+            recorder.record(loop.time() - sent, response)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return recorder, loop.time() - started
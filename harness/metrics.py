@@ -0,0 +1,87 @@
+"""Scrape and query the server's Prometheus metrics (``GET /api/metrics``)."""
+
+import re
+
+from harness.server import http_get
+
+METRICS_PATH = '/api/metrics'
+
+_SAMPLE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{(.*)\})?\s+(\S+)$')
+_LABEL = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)="((?:[^"\\]|\\.)*)"')
+_UNESCAPE = {'\\\\': '\\', '\\"': '"', '\\n': '\n'}
+
+
+def _unescape(value):
+    return re.sub(r'\\[\\"n]', lambda m: _UNESCAPE[m.group(0)], value)
+
+
+def _number(text):
+    if text == '+Inf':
+        return float('inf')
+    if text == '-Inf':
+        return float('-inf')
+    return float(text)
+
+
+class Samples:
+    """Parsed samples of one scrape: ``(name, labels, value)`` triples."""
+
+    def __init__(self, samples):
+        self.samples = samples
+
+    def select(self, name, **labels):
+        """Samples of ``name`` whose labels include ``labels``."""
+        return [(sample_labels, value) for sample_name, sample_labels, value in self.samples
+                if sample_name == name and all(sample_labels.get(k) == v for k, v in labels.items())]
+
+    def total(self, name, **labels):
+        """Sum of the matching samples, e.g. all requests of a route."""
+        return sum(value for _, value in self.select(name, **labels))
+
+    def quantile(self, name, q, **labels):
+        """Quantile ``q`` of histogram ``name`` across the matching series,
+        interpolated within buckets as Prometheus' histogram_quantile does."""
+        buckets = {}
+        for sample_labels, value in self.select(name + '_bucket', **labels):
+            bound = _number(sample_labels['le'])
+            buckets[bound] = buckets.get(bound, 0) + value
+        bounds = sorted(buckets)
+        if not bounds or buckets[bounds[-1]] == 0:
+            return 0.0
+        rank = q * buckets[bounds[-1]]
+        lower, below = 0.0, 0.0
+        for bound in bounds:
+            count = buckets[bound]
+            if count >= rank:
+                if bound == float('inf'):
+                    return lower
+                return lower + (bound - lower) * (rank - below) / max(count - below, 1e-12)
+            lower, below = bound, count
+        return lower
+
+
+def parse(text):
+    """Parse the Prometheus text exposition format into ``Samples``."""
+    samples = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        match = _SAMPLE.match(line)
+        if not match:
+            raise ValueError('unparseable metrics line: %r' % line)
+        name, labels, value = match.groups()
+        samples.append((
+            name,
+            {k: _unescape(v) for k, v in _LABEL.findall(labels or '')},
+            _number(value),
+        ))
+    return Samples(samples)
+
+
+def scrape(host, port, path=METRICS_PATH, timeout=5.0):
+    """GET ``path`` and parse it; raises ``RuntimeError`` unless it answers 200."""
+    result = http_get(host, port, path, timeout=timeout)
+    if not result or result[0] != 200:
+        raise RuntimeError('scraping %s failed: %r' % (path, result and result[0]))
+    return parse(result[1].decode('utf-8'))
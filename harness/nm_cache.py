@@ -0,0 +1,269 @@
+"""Content-addressed node_modules cache keyed on the npm lockfile.
+
+``npm ci`` wipes and reinstalls node_modules on every run even when the
+lockfile has not changed.  This cache keeps one installed tree per
+``sha256(package.json, package-lock.json, node version, platform)`` and
+restores it with reflinks where the filesystem supports them and a plain
+copy otherwise, so repeat installs of the same lockfile cost a copy instead of
+a full install.  Restored trees never share inodes with the cache: npm and
+postinstall scripts write into node_modules in place.
+
+Entries live in ``$NODENEST_NM_CACHE_DIR`` (default
+``~/.cache/nodenest/node_modules``).  Each hit refreshes the entry's mtime and
+the least recently used entries are evicted once the cache grows past
+``$NODENEST_NM_CACHE_MAX_MB`` (default 4096).
+
+Usage::
+
+    python3 -m harness.nm_cache install [--dir PROJECT]
+    python3 -m harness.nm_cache stats
+    python3 -m harness.nm_cache prune [--max-mb N]
+"""
+
+import argparse
+import contextlib
+import fcntl
+import hashlib
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import time
+
+from harness.routes import REPO_ROOT
+
+DEFAULT_CACHE_DIR = os.path.join(
+    os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'),
+    'nodenest', 'node_modules',
+)
+DEFAULT_MAX_MB = 4096
+KEY_MARKER = '.nodenest-cache-key'
+INSTALL_CMD = 'npm ci --no-audit --no-fund --prefer-offline || npm i --no-audit --no-fund --prefer-offline'
+
+
+def node_version():
+    try:
+        return subprocess.run(['node', '--version'], stdout=subprocess.PIPE, text=True).stdout.strip()
+    except OSError:
+        return ''
+
+
+def cache_key(project_dir):
+    """Hash everything that decides the contents of ``npm ci``'s output."""
+    digest = hashlib.sha256()
+    for name in ('package.json', 'package-lock.json'):
+        digest.update(name.encode())
+        with open(os.path.join(project_dir, name), 'rb') as f:
+            digest.update(f.read())
+    # Native addons are built per Node ABI and platform.
+    digest.update(node_version().encode())
+    digest.update(('%s-%s' % (sys.platform, platform.machine())).encode())
+    return digest.hexdigest()
+
+
+def tree_size(path):
+    total = 0
+    for root, dirs, files in os.walk(path):
+        for name in files:
+            with contextlib.suppress(OSError):
+                total += os.lstat(os.path.join(root, name)).st_size
+    return total
+
+
+def reflink_copy(src, dest):
+    """Copy ``src`` to ``dest`` sharing extents; False if unsupported here."""
+    proc = subprocess.run(
+        ['cp', '-a', '--reflink=always', src, dest],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    if proc.returncode != 0:
+        shutil.rmtree(dest, ignore_errors=True)
+        return False
+    return True
+
+
+class NodeModulesCache:
+    """A directory of installed node_modules trees, one per cache key."""
+
+    def __init__(self, root=None, max_bytes=None):
+        self.root = root or os.environ.get('NODENEST_NM_CACHE_DIR') or DEFAULT_CACHE_DIR
+        if max_bytes is None:
+            max_bytes = int(os.environ.get('NODENEST_NM_CACHE_MAX_MB', DEFAULT_MAX_MB)) * 1024 * 1024
+        self.max_bytes = max_bytes
+        os.makedirs(self.root, exist_ok=True)
+
+    def entry_dir(self, key):
+        return os.path.join(self.root, key)
+
+    def _meta_path(self, key):
+        return os.path.join(self.entry_dir(key), 'meta.json')
+
+    @contextlib.contextmanager
+    def lock(self, key, wait=True):
+        """Serialize installs of one key across processes (parallel runners).
+
+        Yields True once the lock is held; with ``wait=False`` yields False
+        instead of blocking when another process holds it.  Lock files are
+        never removed: a process may already be waiting on one, and the next
+        would then lock a new file alongside it.
+        """
+        with open(os.path.join(self.root, '%s.lock' % key), 'w') as handle:
+            try:
+                fcntl.flock(handle, fcntl.LOCK_EX | (0 if wait else fcntl.LOCK_NB))
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def lookup(self, key):
+        """Return the cached node_modules path for ``key`` or None."""
+        meta = self._meta_path(key)
+        if not os.path.exists(meta):
+            return None
+        os.utime(meta)
+        return os.path.join(self.entry_dir(key), 'node_modules')
+
+    def restore(self, key, dest):
+        """Materialize the cached tree for ``key`` at ``dest``."""
+        src = self.lookup(key)
+        if src is None:
+            return False
+        remove_tree(dest)
+        if not reflink_copy(src, dest):
+            shutil.copytree(src, dest, symlinks=True)
+        with open(os.path.join(dest, KEY_MARKER), 'w') as f:
+            f.write(key)
+        return True
+
+    def store(self, key, src):
+        """Copy an installed tree into the cache under ``key``."""
+        if self.lookup(key) is not None:
+            return
+        tmp = os.path.join(self.root, '.tmp-%s-%d' % (key, os.getpid()))
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        modules = os.path.join(tmp, 'node_modules')
+        # A real copy (not hardlinks) so later edits in the project can't
+        # leak back into the cache.
+        if not reflink_copy(src, modules):
+            shutil.copytree(src, modules, symlinks=True)
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(os.path.join(modules, KEY_MARKER))
+        with open(os.path.join(tmp, 'meta.json'), 'w') as f:
+            json.dump({'key': key, 'size': tree_size(modules), 'created': time.time()}, f)
+        try:
+            os.rename(tmp, self.entry_dir(key))
+        except OSError:
+            shutil.rmtree(tmp, ignore_errors=True)
+        self.evict(keep=key)
+
+    def entries(self):
+        """Cached entries as dicts, least recently used first."""
+        found = []
+        for name in os.listdir(self.root):
+            meta = os.path.join(self.root, name, 'meta.json')
+            try:
+                with open(meta) as f:
+                    info = json.load(f)
+                info['last_used'] = os.stat(meta).st_mtime
+            except (OSError, ValueError):
+                continue
+            found.append(info)
+        found.sort(key=lambda info: info['last_used'])
+        return found
+
+    def evict(self, keep=None, max_bytes=None):
+        """Drop least recently used entries until the cache fits the size cap.
+
+        Entries another process is installing or restoring are skipped.
+        """
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        entries = self.entries()
+        total = sum(info['size'] for info in entries)
+        removed = []
+        for info in entries:
+            if total <= limit:
+                break
+            if info['key'] == keep:
+                continue
+            with self.lock(info['key'], wait=False) as locked:
+                if not locked:
+                    continue
+                shutil.rmtree(self.entry_dir(info['key']), ignore_errors=True)
+            total -= info['size']
+            removed.append(info['key'])
+        return removed
+
+
+def remove_tree(path):
+    if os.path.islink(path):
+        os.remove(path)
+    elif os.path.isdir(path):
+        shutil.rmtree(path)
+
+
+def installed_key(project_dir):
+    with contextlib.suppress(OSError):
+        with open(os.path.join(project_dir, 'node_modules', KEY_MARKER)) as f:
+            return f.read().strip()
+    return None
+
+
+def ensure(project_dir=REPO_ROOT, cache=None):
+    """Make ``project_dir/node_modules`` match its lockfile.
+
+    Returns ``'current'`` if the tree was already up to date, ``'hit'`` if it
+    was restored from the cache and ``'miss'`` if npm had to install it.
+    """
+    cache = cache or NodeModulesCache()
+    key = cache_key(project_dir)
+    dest = os.path.join(project_dir, 'node_modules')
+    if installed_key(project_dir) == key:
+        return 'current'
+    with cache.lock(key):
+        if cache.restore(key, dest):
+            return 'hit'
+        remove_tree(dest)
+        subprocess.run(INSTALL_CMD, shell=True, cwd=project_dir, check=True)
+        cache.store(key, dest)
+        with open(os.path.join(dest, KEY_MARKER), 'w') as f:
+            f.write(key)
+    return 'miss'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Content-addressed node_modules cache')
+    sub = parser.add_subparsers(dest='command', required=True)
+    install = sub.add_parser('install', help='restore or install node_modules for a project')
+    install.add_argument('--dir', default=os.getcwd(), help='project directory (default: cwd)')
+    sub.add_parser('stats', help='list cached entries')
+    prune = sub.add_parser('prune', help='evict entries down to the size cap')
+    prune.add_argument('--max-mb', type=int)
+    args = parser.parse_args(argv)
+
+    cache = NodeModulesCache()
+    if args.command == 'install':
+        started = time.monotonic()
+        try:
+            result = ensure(os.path.abspath(args.dir), cache)
+        except subprocess.CalledProcessError as exc:
+            return exc.returncode or 1
+        print('node_modules %s (%.1fs)' % (result, time.monotonic() - started))
+    elif args.command == 'stats':
+        for info in cache.entries():
+            print('%s  %8.1f MB  last used %s' % (
+                info['key'][:12], info['size'] / 1048576.0, time.ctime(info['last_used'])))
+    else:
+        max_bytes = None if args.max_mb is None else args.max_mb * 1024 * 1024
+        for key in cache.evict(max_bytes=max_bytes):
+            print('evicted %s' % key[:12])
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
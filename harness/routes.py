@@ -0,0 +1,183 @@
+"""Route-table extraction for server/app.js and its route groups.
+
+The task tests only need to know which ``(method, path)`` pairs the Express
+app registers: on ``app`` in server/app.js, or on the routers in
+server/routes/*.js, which register full paths.  Instead of grepping the raw
+sources in every test, they are parsed once into a :class:`RouteTable` and
+the parsed table is reused until one of the files changes.
+"""
+
+import glob
+import os
+import re
+import threading
+from collections import namedtuple
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+APP_FILE = os.path.join(REPO_ROOT, 'server', 'app.js')
+
+HTTP_METHODS = ('get', 'post', 'put', 'patch', 'delete', 'options', 'head', 'all')
+
+Route = namedtuple('Route', ['method', 'path', 'line', 'file'], defaults=(None,))
+
+_REGISTRATION = re.compile(
+    r"\b(?:app|router)\s*\.\s*(%s)\s*\(\s*(['\"`])([^'\"`\n]+)\2" % '|'.join(HTTP_METHODS)
+)
+
+
+def strip_comments(source):
+    """Blank out JS comments while keeping strings and line numbers intact.
+
+    Comment characters are replaced by spaces (newlines are preserved) so a
+    match offset in the result maps to the same line in the original source.
+    """
+    out = []
+    i = 0
+    n = len(source)
+    quote = None
+    while i < n:
+        ch = source[i]
+        if quote:
+            out.append(ch)
+            if ch == '\\' and i + 1 < n:
+                out.append(source[i + 1])
+                i += 2
+                continue
+            if ch == quote:
+                quote = None
+            i += 1
+            continue
+        if ch in '\'"`':
+            quote = ch
+            out.append(ch)
+            i += 1
+            continue
+        if source.startswith('//', i):
+            end = source.find('\n', i)
+            end = n if end == -1 else end
+            out.append(' ' * (end - i))
+            i = end
+            continue
+        if source.startswith('/*', i):
+            end = source.find('*/', i + 2)
+            end = n if end == -1 else end + 2
+            out.append(re.sub(r'[^\n]', ' ', source[i:end]))
+            i = end
+            continue
+        out.append(ch)
+        i += 1
+    return ''.join(out)
+
+
+def parse_routes(source, file=None):
+    """Return every ``app.<method>('<path>', ...)`` or
+    ``router.<method>('<path>', ...)`` registration in ``source``."""
+    code = strip_comments(source)
+    routes = []
+    for match in _REGISTRATION.finditer(code):
+        line = code.count('\n', 0, match.start()) + 1
+        routes.append(Route(match.group(1).upper(), match.group(3), line, file))
+    return routes
+
+
+def route_sources(path=APP_FILE):
+    """The app file followed by the route group modules next to it."""
+    groups = glob.glob(os.path.join(os.path.dirname(path), 'routes', '*.js'))
+    return [path] + sorted(groups)
+
+
+class RouteTable:
+    """Registered routes indexed by ``(METHOD, path)`` for O(1) lookups."""
+
+    def __init__(self, routes):
+        self.routes = list(routes)
+        self._index = {}
+        for route in self.routes:
+            self._index.setdefault((route.method, route.path), route)
+
+    @classmethod
+    def from_source(cls, source):
+        return cls(parse_routes(source))
+
+    @classmethod
+    def from_file(cls, path=APP_FILE):
+        """Routes of the app file at ``path`` and of its route groups."""
+        routes = []
+        for source in route_sources(path):
+            with open(source, 'r', encoding='utf-8') as f:
+                routes.extend(parse_routes(f.read(), source))
+        return cls(routes)
+
+    def get(self, method, path):
+        """Return the first :class:`Route` registered for ``method path`` or None."""
+        return self._index.get((method.upper(), path))
+
+    def has(self, method, path):
+        return (method.upper(), path) in self._index
+
+    def __contains__(self, key):
+        method, path = key
+        return self.has(method, path)
+
+    def __len__(self):
+        return len(self._index)
+
+    def __iter__(self):
+        return iter(self.routes)
+
+
+class CachedRouteTable:
+    """A :class:`RouteTable` for one app, re-parsed only when its files change.
+
+    Every lookup stats the app file and its route groups; the sources are read
+    and parsed again only if their paths or ``(mtime_ns, size)`` differ from
+    the parsed snapshot.
+    """
+
+    def __init__(self, path=APP_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._stamp = None
+        self._table = None
+
+    @property
+    def table(self):
+        stamp = []
+        for source in route_sources(self.path):
+            st = os.stat(source)
+            stamp.append((source, st.st_mtime_ns, st.st_size))
+        stamp = tuple(stamp)
+        with self._lock:
+            if stamp != self._stamp:
+                self._table = RouteTable.from_file(self.path)
+                self._stamp = stamp
+            return self._table
+
+    def get(self, method, path):
+        return self.table.get(method, path)
+
+    def has(self, method, path):
+        return self.table.has(method, path)
+
+    def __contains__(self, key):
+        return key in self.table
+
+    def __len__(self):
+        return len(self.table)
+
+    def __iter__(self):
+        return iter(self.table)
+
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def load_route_table(path=APP_FILE):
+    """Return the process-wide :class:`CachedRouteTable` for ``path``."""
+    path = os.path.abspath(path)
+    with _cache_lock:
+        cached = _cache.get(path)
+        if cached is None:
+            cached = _cache[path] = CachedRouteTable(path)
+        return cached
@@ -0,0 +1,291 @@
+"""Validate every task in parallel, each in its own git worktree.
+
+``run_tests.sh <TASK_ID>`` applies one task diff to the shared checkout, so
+tasks have to be validated one after another.  This runner gives each task a
+detached worktree of ``--ref``, applies its ``task_diff.txt`` there and runs
+the jest base suite plus the task's ``task_tests.py`` in a process pool.  The
+per-task results are merged into one JUnit XML file and one JSON summary.
+
+Like the single-task path of ``run_tests.sh``, a diff is only applied when
+the checked-out tree doesn't already register the routes it adds, so the
+runner validates both the baseline and a tree where the tasks are merged.
+
+Usage::
+
+    python3 -m harness.runner [--workers N] [--ref HEAD] [--report-dir DIR] [TASK_ID ...]
+"""
+
+import argparse
+import concurrent.futures
+import glob
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+
+from harness.routes import REPO_ROOT, RouteTable, parse_routes
+
+TASKS_DIR = os.path.join(REPO_ROOT, 'tasks')
+DEFAULT_REPORT_DIR = os.path.join(REPO_ROOT, '.harness', 'reports')
+JEST_SUITE = 'tests/simple.test.js'
+OUTPUT_TAIL = 4000
+
+
+def discover_tasks(selected=None):
+    """Return task ids that ship a task_diff.txt, in sorted order."""
+    found = sorted(
+        os.path.basename(os.path.dirname(path))
+        for path in glob.glob(os.path.join(TASKS_DIR, '*', 'task_diff.txt'))
+    )
+    if not selected:
+        return found
+    missing = [task for task in selected if task not in found]
+    if missing:
+        raise SystemExit('Unknown task(s): %s' % ', '.join(missing))
+    return [task for task in found if task in selected]
+
+
+def git(*args, cwd=REPO_ROOT, check=True):
+    return subprocess.run(
+        ('git',) + args, cwd=cwd, check=check,
+        stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+    )
+
+
+class Step:
+    """Outcome of one command run inside a task worktree."""
+
+    def __init__(self, name, returncode, duration, output):
+        self.name = name
+        self.returncode = returncode
+        self.duration = duration
+        self.output = output[-OUTPUT_TAIL:]
+
+    @property
+    def ok(self):
+        return self.returncode == 0
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'returncode': self.returncode,
+            'duration': round(self.duration, 3),
+            'output': self.output,
+        }
+
+
+def run_step(name, cmd, cwd, env=None):
+    started = time.monotonic()
+    proc = subprocess.run(
+        cmd, cwd=cwd, env=env,
+        stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+    )
+    return Step(name, proc.returncode, time.monotonic() - started, proc.stdout)
+
+
+def diff_routes(diff_file):
+    """``(METHOD, path)`` of every route registration the diff adds."""
+    with open(diff_file, 'r', encoding='utf-8') as f:
+        added = [line[1:] for line in f.read().splitlines()
+                 if line.startswith('+') and not line.startswith('+++')]
+    return {(route.method, route.path) for route in parse_routes('\n'.join(added))}
+
+
+def apply_diff(diff_file, worktree):
+    """Apply ``diff_file`` unless ``worktree`` already registers its routes."""
+    routes = diff_routes(diff_file)
+    table = RouteTable.from_file(os.path.join(worktree, 'server', 'app.js'))
+    if routes and all(table.has(method, path) for method, path in routes):
+        return Step('apply', 0, 0.0, 'skipped: %d route(s) of %s already registered'
+                    % (len(routes), os.path.relpath(diff_file, REPO_ROOT)))
+    return run_step('apply', ['git', 'apply', '--whitespace=fix', diff_file], worktree)
+
+
+def install_dependencies(worktree):
+    """Give the worktree a node_modules tree matching its lockfile."""
+    return run_step('install', [sys.executable, '-m', 'harness.nm_cache', 'install', '--dir', worktree], REPO_ROOT)
+
+
+def validate_task(task_id, worktree, report_dir, run_jest=True):
+    """Apply one task diff in ``worktree`` (if needed) and run its test suites.
+
+    Runs inside a pool worker, so it only takes and returns plain data.
+    """
+    started = time.monotonic()
+    steps = []
+    diff_file = os.path.join(TASKS_DIR, task_id, 'task_diff.txt')
+    env = dict(os.environ, CI='true')
+
+    def finish(status):
+        return {
+            'task': task_id,
+            'status': status,
+            'duration': round(time.monotonic() - started, 3),
+            'steps': [step.to_dict() for step in steps],
+        }
+
+    steps.append(apply_diff(diff_file, worktree))
+    if not steps[-1].ok:
+        return finish('error')
+
+    if run_jest:
+        steps.append(install_dependencies(worktree))
+        if not steps[-1].ok:
+            return finish('error')
+        jest_report = os.path.join(report_dir, '%s.jest.json' % task_id)
+        steps.append(run_step(
+            'jest',
+            ['npx', 'jest', JEST_SUITE, '--runInBand', '--json', '--outputFile', jest_report],
+            worktree, env,
+        ))
+
+    pytest_report = os.path.join(report_dir, '%s.pytest.xml' % task_id)
+    steps.append(run_step(
+        'pytest',
+        [sys.executable, '-m', 'pytest', '-q', '-p', 'no:cacheprovider',
+         '--junitxml', pytest_report, 'tasks/%s/task_tests.py' % task_id],
+        worktree, env,
+    ))
+    return finish('passed' if all(step.ok for step in steps) else 'failed')
+
+
+def jest_to_junit(task_id, path):
+    """Convert a ``jest --json`` report into a JUnit <testsuite> element."""
+    with open(path, 'r', encoding='utf-8') as f:
+        report = json.load(f)
+    suite = ET.Element('testsuite', name='%s.jest' % task_id)
+    counts = {'tests': 0, 'failures': 0, 'skipped': 0}
+    for result in report.get('testResults', []):
+        for case in result.get('assertionResults', []):
+            counts['tests'] += 1
+            el = ET.SubElement(
+                suite, 'testcase',
+                classname='%s.%s' % (task_id, os.path.basename(result['name'])),
+                name=case.get('fullName') or case.get('title', ''),
+                time=str((case.get('duration') or 0) / 1000.0),
+            )
+            if case.get('status') == 'failed':
+                counts['failures'] += 1
+                ET.SubElement(el, 'failure', message='failed').text = '\n'.join(case.get('failureMessages', []))
+            elif case.get('status') in ('pending', 'skipped', 'todo'):
+                counts['skipped'] += 1
+                ET.SubElement(el, 'skipped')
+    for key, value in counts.items():
+        suite.set(key, str(value))
+    return suite
+
+
+def pytest_to_junit(task_id, path):
+    """Load pytest's JUnit report and rename its suite after the task."""
+    root = ET.parse(path).getroot()
+    suite = root if root.tag == 'testsuite' else root.find('testsuite')
+    suite.set('name', '%s.pytest' % task_id)
+    return suite
+
+
+def error_suite(task_id, result):
+    """A one-case suite for tasks that failed before any tests ran."""
+    suite = ET.Element('testsuite', name=task_id, tests='1', failures='0', errors='1', skipped='0')
+    case = ET.SubElement(suite, 'testcase', classname=task_id, name='setup')
+    failed = next(step for step in result['steps'] if step['returncode'] != 0)
+    ET.SubElement(case, 'error', message='%s failed' % failed['name']).text = failed['output']
+    return suite
+
+
+def write_reports(results, report_dir, wall_time, commit):
+    suites = ET.Element('testsuites', name='nodenest-tasks')
+    for result in results:
+        task_id = result['task']
+        jest_report = os.path.join(report_dir, '%s.jest.json' % task_id)
+        pytest_report = os.path.join(report_dir, '%s.pytest.xml' % task_id)
+        added = False
+        if os.path.exists(jest_report):
+            suites.append(jest_to_junit(task_id, jest_report))
+            added = True
+        if os.path.exists(pytest_report):
+            suites.append(pytest_to_junit(task_id, pytest_report))
+            added = True
+        if not added:
+            suites.append(error_suite(task_id, result))
+    junit_path = os.path.join(report_dir, 'junit.xml')
+    ET.ElementTree(suites).write(junit_path, encoding='utf-8', xml_declaration=True)
+
+    summary = {
+        'commit': commit,
+        'wall_time': round(wall_time, 3),
+        'total': len(results),
+        'passed': sum(1 for r in results if r['status'] == 'passed'),
+        'failed': sum(1 for r in results if r['status'] == 'failed'),
+        'errors': sum(1 for r in results if r['status'] == 'error'),
+        'tasks': results,
+    }
+    json_path = os.path.join(report_dir, 'summary.json')
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2)
+    return junit_path, json_path, summary
+
+
+def run(task_ids, ref='HEAD', workers=None, report_dir=DEFAULT_REPORT_DIR, run_jest=True, keep=False):
+    """Validate ``task_ids`` concurrently and return the summary dict."""
+    if os.path.isdir(report_dir):
+        shutil.rmtree(report_dir)
+    os.makedirs(report_dir)
+    commit = git('rev-parse', '--verify', ref + '^{commit}').stdout.strip()
+    scratch = tempfile.mkdtemp(prefix='nodenest-worktrees-')
+    worktrees = {}
+    started = time.monotonic()
+    try:
+        # git serializes worktree bookkeeping itself; creating them up front
+        # keeps the pool workers free of concurrent writes to .git/worktrees.
+        for task_id in task_ids:
+            path = os.path.join(scratch, task_id)
+            git('worktree', 'add', '--detach', path, commit)
+            worktrees[task_id] = path
+
+        results = {}
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(validate_task, task_id, worktrees[task_id], report_dir, run_jest): task_id
+                for task_id in task_ids
+            }
+            for future in concurrent.futures.as_completed(futures):
+                result = future.result()
+                results[result['task']] = result
+                print('%-10s %-7s %6.1fs' % (result['task'], result['status'], result['duration']), flush=True)
+    finally:
+        if not keep:
+            for path in worktrees.values():
+                git('worktree', 'remove', '--force', path, check=False)
+            git('worktree', 'prune', check=False)
+            shutil.rmtree(scratch, ignore_errors=True)
+
+    ordered = [results[task_id] for task_id in task_ids]
+    junit_path, json_path, summary = write_reports(ordered, report_dir, time.monotonic() - started, commit)
+    print('%d/%d tasks passed in %.1fs (%s, %s)' % (
+        summary['passed'], summary['total'], summary['wall_time'], junit_path, json_path))
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('tasks', nargs='*', help='task ids to validate (default: all)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help='parallel task workers (default: CPU count)')
+    parser.add_argument('--ref', default='HEAD', help='commit to check out in each worktree')
+    parser.add_argument('--report-dir', default=DEFAULT_REPORT_DIR)
+    parser.add_argument('--no-jest', dest='run_jest', action='store_false',
+                        help='only run the pytest task suites')
+    parser.add_argument('--keep', action='store_true', help='keep worktrees for inspection')
+    args = parser.parse_args(argv)
+
+    summary = run(discover_tasks(args.tasks), ref=args.ref, workers=args.workers,
+                  report_dir=args.report_dir, run_jest=args.run_jest, keep=args.keep)
+    return 0 if summary['passed'] == summary['total'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,112 @@
+"""Start server/index.js on a free local port for benchmarks."""
+
+import http.client
+import os
+import socket
+import subprocess
+import tempfile
+import time
+
+from harness.routes import REPO_ROOT
+
+SERVER_SCRIPT = os.path.join(REPO_ROOT, 'server', 'index.js')
+
+
+def free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def http_get(host, port, path, timeout=2.0):
+    """Return ``(status, body)`` for a one-off GET, or None if unreachable."""
+    conn = http.client.HTTPConnection(host, port, timeout=timeout)
+    try:
+        conn.request('GET', path)
+        response = conn.getresponse()
+        return response.status, response.read()
+    except OSError:
+        return None
+    finally:
+        conn.close()
+
+
+def rss_bytes(pid):
+    """Resident set size of ``pid`` from /proc, or None where unavailable."""
+    try:
+        with open('/proc/%d/status' % pid) as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+class NodeServer:
+    """``node server/index.js`` bound to ``127.0.0.1:<port>``.
+
+    Use as a context manager; ``start()`` returns once ``ready_path`` answers
+    200 and raises ``RuntimeError`` with the server log if it never does.
+    """
+
+    def __init__(self, script=SERVER_SCRIPT, port=None, env=None, ready_path='/api/health', timeout=20.0):
+        self.script = script
+        self.host = '127.0.0.1'
+        self.port = port or free_port()
+        self.env = dict(os.environ, PORT=str(self.port), NODE_ENV='production')
+        self.env.update(env or {})
+        self.ready_path = ready_path
+        self.timeout = timeout
+        self.proc = None
+        self._log = None
+
+    @property
+    def base_url(self):
+        return 'http://%s:%d' % (self.host, self.port)
+
+    @property
+    def pid(self):
+        return self.proc.pid
+
+    def rss(self):
+        return rss_bytes(self.proc.pid)
+
+    def log(self):
+        self._log.flush()
+        self._log.seek(0)
+        return self._log.read().decode('utf-8', 'replace')
+
+    def start(self):
+        self._log = tempfile.TemporaryFile()
+        self.proc = subprocess.Popen(
+            ['node', self.script], cwd=REPO_ROOT, env=self.env,
+            stdout=self._log, stderr=subprocess.STDOUT,
+        )
+        deadline = time.monotonic() + self.timeout
+        while time.monotonic() < deadline:
+            if self.proc.poll() is not None:
+                raise RuntimeError('server exited with %s:\n%s' % (self.proc.returncode, self.log()))
+            result = http_get(self.host, self.port, self.ready_path, timeout=0.5)
+            if result and result[0] == 200:
+                return self
+            time.sleep(0.02)
+        self.stop()
+        raise RuntimeError('server not ready after %.0fs:\n%s' % (self.timeout, self.log()))
+
+    def stop(self):
+        if self.proc and self.proc.poll() is None:
+            self.proc.terminate()
+            try:
+                self.proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+                self.proc.wait()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        if self._log:
+            self._log.close()
@@ -8,9 +8,25 @@ case "${1-}" in
 esac
 TASK_ID="${1:-BASE}"
 
+# Install node_modules through the lockfile-keyed cache when the harness is
+# available; fall back to a plain npm install otherwise.
+install_deps() {
+  if command -v python3 >/dev/null 2>&1 && [ -f harness/nm_cache.py ]; then
+    python3 -m harness.nm_cache install
+  else
+    npm ci --no-audit --no-fund --prefer-offline || npm i --no-audit --no-fund --prefer-offline
+  fi
+}
+
+if [ "$TASK_ID" = "ALL" ]; then
+  # Validate every task in parallel, one git worktree per task
+  shift
+  exec python3 -m harness.runner "$@"
+fi
+
 if [ "$TASK_ID" = "BASE" ]; then
   echo "== Running base tests (Jest) =="
-  npm ci --no-audit --no-fund --prefer-offline || npm i --no-audit --no-fund --prefer-offline
+  install_deps
   npx jest tests/simple.test.js
 else
   echo "== Running task tests for ${TASK_ID} (Jest base + pytest task) =="
@@ -131,7 +147,7 @@ else
   fi
 
   # Now install deps
-  npm ci --no-audit --no-fund --prefer-offline || npm i --no-audit --no-fund --prefer-offline
+  install_deps
 
   # Run base tests to ensure starter remains intact
   npx jest tests/simple.test.js
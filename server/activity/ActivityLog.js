@@ -0,0 +1,341 @@
+const { EventEmitter } = require('events');
+const fs = require('fs');
+const path = require('path');
+const readline = require('readline');
+const { Segment, INDEXED_FIELDS } = require('./Segment');
+
+const DAY_MS = 24 * 60 * 60 * 1000;
+const SEGMENT_FILE = /^activity-(\d+)\.ndjson$/;
+
+// Activity log stored as one append-only Segment per time bucket.
+//
+// The log assigns ids and timestamps, so records arrive in time order and
+// only the newest segment is ever written. Queries walk segments newest
+// first and skip whole segments by their per-filter counts; exports stream
+// segment files oldest first; retention unlinks whole expired segments.
+// Each append emits an 'append' event with the stored record, and a cleanup
+// that drops segments emits 'cleanup'.
+class ActivityLog extends EventEmitter {
+  constructor({ dir, bucketMs = DAY_MS, now = Date.now }) {
+    super();
+    this.setMaxListeners(0);
+    this.dir = dir;
+    this.bucketMs = bucketMs;
+    this.now = now;
+    this.segments = null;
+    this.lastId = 0;
+    this.lastTime = 0;
+    this.idStride = 1;
+    this.idOffset = 0;
+    this.leader = null;
+  }
+
+  // Hand out only every `stride`-th id, starting at `offset` + 1, so
+  // processes appending to the same log never collide.
+  partitionIds(stride, offset) {
+    this.idStride = stride;
+    this.idOffset = offset;
+  }
+
+  // Follow a log written by another process: appends are stamped here and
+  // handed to `leader.append(record)`, retention goes to `leader.cleanup()`
+  // and `leader.clear()`, and the leader's writes come back through
+  // ingest(), forget() and forgetAll(). Segment files are only read.
+  follow(leader) {
+    this.leader = leader;
+  }
+
+  // Load existing segments on first use.
+  open() {
+    if (this.segments) {
+      return this;
+    }
+    fs.mkdirSync(this.dir, { recursive: true });
+    this.segments = fs.readdirSync(this.dir)
+      .map((name) => SEGMENT_FILE.exec(name))
+      .filter(Boolean)
+      .map((match) => Number(match[1]))
+      .sort((a, b) => a - b)
+      .map((start) => this.openSegment(start));
+    for (const segment of this.segments) {
+      this.lastId = Math.max(this.lastId, segment.lastId);
+      this.lastTime = Math.max(this.lastTime, segment.lastTime);
+    }
+    return this;
+  }
+
+  get count() {
+    return this.open().segments.reduce((sum, segment) => sum + segment.count, 0);
+  }
+
+  segmentFile(start) {
+    return path.join(this.dir, `activity-${String(start).padStart(15, '0')}.ndjson`);
+  }
+
+  openSegment(start) {
+    return Segment.open(this.segmentFile(start), start, start + this.bucketMs, { readOnly: Boolean(this.leader) });
+  }
+
+  nextId() {
+    let id = this.lastId + 1;
+    const skew = (((id - 1 - this.idOffset) % this.idStride) + this.idStride) % this.idStride;
+    if (skew > 0) {
+      id += this.idStride - skew;
+    }
+    this.lastId = id;
+    return String(id);
+  }
+
+  append(data) {
+    this.open();
+    const time = Math.max(this.now(), this.lastTime);
+    const record = { id: this.nextId(), ...data, timestamp: new Date(time).toISOString() };
+    this.lastTime = time;
+    if (this.leader) {
+      this.leader.append(record);
+    } else {
+      this.write(record);
+    }
+    return record;
+  }
+
+  // Store a stamped record and return where it went. Timestamps never go
+  // backwards: a record stamped slightly earlier by a follower is moved up
+  // to the newest one, which keeps segments in time order.
+  write(record) {
+    this.open();
+    const time = Math.max(Date.parse(record.timestamp), this.lastTime);
+    record.timestamp = new Date(time).toISOString();
+    const segment = this.segmentFor(time);
+    const offset = segment.size;
+    segment.append(record);
+    this.lastId = Math.max(this.lastId, Number(record.id));
+    this.lastTime = time;
+    this.emit('append', record);
+    return { start: segment.start, offset, bytes: segment.size - offset };
+  }
+
+  // Index a record the leader wrote (the result of its write()).
+  ingest({ record, start, offset, bytes }) {
+    this.open();
+    let segment = this.segments[this.segments.length - 1];
+    if (!segment || segment.start !== start) {
+      segment = this.openSegment(start);
+      this.segments.push(segment);
+    }
+    this.lastId = Math.max(this.lastId, Number(record.id));
+    this.lastTime = Math.max(this.lastTime, Date.parse(record.timestamp));
+    // Records already in the file when the segment was opened are indexed
+    if (offset < segment.size) {
+      return;
+    }
+    segment.track(record, offset);
+    segment.size = offset + bytes;
+    this.emit('append', record);
+  }
+
+  // The segment for `time`, sealing the previous one when a new bucket starts.
+  segmentFor(time) {
+    const start = time - (time % this.bucketMs);
+    const latest = this.segments[this.segments.length - 1];
+    if (latest && latest.start === start) {
+      if (!latest.writable) {
+        latest.resume();
+      }
+      return latest;
+    }
+    if (latest) {
+      latest.seal();
+    }
+    const segment = Segment.create(this.segmentFile(start), start, start + this.bucketMs);
+    this.segments.push(segment);
+    return segment;
+  }
+
+  // A page of records matching `filters` (userId, action, resourceType,
+  // resource), newest first, and the total number of matches. Pages are
+  // either `offset` records in, or the records older than the position
+  // `before` ({ start, offset }: segment and byte offset of the last record
+  // already seen). `next` is the position of the page's oldest record when
+  // older matches remain, else null. Positions are unaffected by appends
+  // and retention, so following `next` never skips or repeats a record.
+  find(filters = {}, { offset = 0, limit = 10, before = null } = {}) {
+    this.open();
+    const records = [];
+    let total = 0;
+    let skip = offset;
+    let next = null;
+    let more = false;
+    for (let i = this.segments.length - 1; i >= 0; i -= 1) {
+      const segment = this.segments[i];
+      const offsets = segment.match(filters);
+      const matches = offsets ? offsets.length : segment.count;
+      total += matches;
+      // Matches older than `before` in this segment
+      let older = matches;
+      if (before && segment.start > before.start) {
+        older = 0;
+      } else if (before && segment.start === before.start) {
+        older = offsets ? lowerBound(offsets, before.offset) : segment.ordinalAt(before.offset);
+      }
+      if (records.length >= limit || skip >= older) {
+        more = more || (records.length >= limit && older > 0);
+        skip -= Math.min(skip, older);
+        continue;
+      }
+      // Newest-first positions [skip, skip + take) in ascending order
+      const take = Math.min(limit - records.length, older - skip);
+      const from = older - skip - take;
+      const to = older - skip;
+      const positions = offsets ? offsets.slice(from, to) : [];
+      const page = offsets
+        ? positions.map((position) => segment.read(position))
+        : segment.readOrdinals(from, to, positions);
+      records.push(...page.reverse());
+      next = { start: segment.start, offset: positions[0] };
+      more = from > 0;
+      skip = 0;
+    }
+    return { records, total, next: more ? next : null };
+  }
+
+  // Where the log ends now, for stream({ upTo }): each segment's size.
+  position() {
+    this.open();
+    return new Map(this.segments.map((segment) => [segment.start, segment.size]));
+  }
+
+  // Records with since <= timestamp <= until (epoch ms, both optional) that
+  // match `filters`, oldest first, and only those already written at
+  // position `upTo` if given. Reads each segment file as a stream, so
+  // memory stays flat however much is exported.
+  async* stream({ since, until, filters = {}, upTo } = {}) {
+    this.open();
+    const segments = this.segments.filter((segment) => segment.size > 0 &&
+      (upTo === undefined || upTo.has(segment.start)) &&
+      (since === undefined || segment.end > since) && (until === undefined || segment.start <= until));
+    for (const segment of segments) {
+      const start = since === undefined ? 0 : segment.offsetAt(since);
+      const end = upTo === undefined ? segment.size : Math.min(upTo.get(segment.start), segment.size);
+      if (start >= end) {
+        continue;
+      }
+      const input = fs.createReadStream(segment.file, { start, end: end - 1 });
+      const lines = readline.createInterface({ input, crlfDelay: Infinity });
+      try {
+        for await (const line of lines) {
+          const record = JSON.parse(line);
+          const time = Date.parse(record.timestamp);
+          if (until !== undefined && time > until) {
+            return;
+          }
+          if ((since === undefined || time >= since) && matches(record, filters)) {
+            yield record;
+          }
+        }
+      } finally {
+        lines.close();
+        input.destroy();
+      }
+    }
+  }
+
+  // Drop every segment that ended before `before` (epoch ms), keeping enough
+  // of the newest segments to hold at least `keepCount` records. Segments
+  // are removed whole, so a bucket straddling the cutoff stays.
+  cleanup({ before, keepCount = 0 }) {
+    if (this.leader) {
+      return this.leader.cleanup({ before, keepCount });
+    }
+    this.open();
+    const kept = [];
+    let keptRecords = 0;
+    let deleted = 0;
+    let dropped = 0;
+    for (let i = this.segments.length - 1; i >= 0; i -= 1) {
+      const segment = this.segments[i];
+      if (segment.end <= before && keptRecords >= keepCount) {
+        deleted += segment.count;
+        dropped += 1;
+        segment.drop();
+      } else {
+        kept.push(segment);
+        keptRecords += segment.count;
+      }
+    }
+    this.segments = kept.reverse();
+    const result = { deleted, remaining: keptRecords, segments: dropped };
+    if (dropped > 0) {
+      this.emit('cleanup', result);
+    }
+    return result;
+  }
+
+  // Close the segments starting at `starts` after the leader removed them.
+  forget(starts) {
+    const gone = new Set(starts);
+    for (const segment of this.open().segments) {
+      if (gone.has(segment.start)) {
+        segment.close();
+      }
+    }
+    this.segments = this.segments.filter((segment) => !gone.has(segment.start));
+    this.emit('cleanup', { segments: gone.size });
+  }
+
+  forgetAll() {
+    this.close();
+    this.segments = [];
+    this.lastId = 0;
+    this.lastTime = 0;
+    this.emit('clear');
+  }
+
+  // Remove every segment (used by tests and benchmarks).
+  clear() {
+    if (this.leader) {
+      this.leader.clear();
+      return;
+    }
+    for (const segment of this.open().segments) {
+      segment.drop();
+    }
+    this.segments = [];
+    this.lastId = 0;
+    this.lastTime = 0;
+    this.emit('clear');
+  }
+
+  close() {
+    for (const segment of this.segments || []) {
+      segment.close();
+    }
+    this.segments = null;
+  }
+}
+
+// Number of entries of the ascending array `values` below `value`
+function lowerBound(values, value) {
+  let lo = 0;
+  let hi = values.length;
+  while (lo < hi) {
+    const mid = (lo + hi) >> 1;
+    if (values[mid] < value) {
+      lo = mid + 1;
+    } else {
+      hi = mid;
+    }
+  }
+  return lo;
+}
+
+function matches(record, filters) {
+  for (const [field, value] of Object.entries(filters)) {
+    if (value !== undefined && String(INDEXED_FIELDS[field](record)) !== String(value)) {
+      return false;
+    }
+  }
+  return true;
+}
+
+module.exports = ActivityLog;
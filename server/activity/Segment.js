@@ -0,0 +1,335 @@
+const fs = require('fs');
+
+// Every INDEX_EVERY-th record gets a sparse index entry
+const INDEX_EVERY = 128;
+// Reads are synchronous, so one scratch buffer per read size is enough
+const READ_BUFFER = Buffer.alloc(64 * 1024);
+const RECORD_BUFFER = Buffer.alloc(4 * 1024);
+
+// Secondary indexes kept per segment: field -> key of a record
+const INDEXED_FIELDS = {
+  userId: (record) => record.userId,
+  action: (record) => record.action,
+  resourceType: (record) => (record.resource ? record.resource.type : undefined),
+  resource: (record) => (record.resource ? resourceKey(record.resource.type, record.resource.id) : undefined)
+};
+
+function resourceKey(type, id) {
+  return `${type}:${id}`;
+}
+
+// One time bucket of the activity log: an append-only NDJSON file.
+//
+// Records are appended in timestamp order. The segment keeps a sparse index
+// (ordinal, byte offset, timestamp) of every INDEX_EVERY-th record, so a page
+// or a time range is found by a short forward read from the nearest entry,
+// and per-field postings (sorted byte offsets) for the user, action and
+// resource filters. Sealed segments persist these indexes to a sidecar
+// `.idx` file; the open segment rebuilds them by scanning on start-up.
+class Segment {
+  constructor(file, start, end) {
+    this.file = file;
+    this.start = start;
+    this.end = end;
+    this.fd = null;
+    this.writable = false;
+    this.size = 0;
+    this.count = 0;
+    this.firstId = null;
+    this.lastId = 0;
+    this.lastTime = 0;
+    this.sparse = [];
+    this.postings = new Map(Object.keys(INDEXED_FIELDS).map((field) => [field, new Map()]));
+  }
+
+  get indexFile() {
+    return `${this.file}.idx`;
+  }
+
+  static create(file, start, end) {
+    const segment = new Segment(file, start, end);
+    segment.fd = fs.openSync(file, 'a+');
+    segment.writable = true;
+    return segment;
+  }
+
+  // Load a segment from disk, trusting its sidecar index only when it
+  // describes exactly the bytes in the file. `readOnly` segments belong to
+  // another process's log and are never repaired.
+  static open(file, start, end, { readOnly = false } = {}) {
+    const segment = new Segment(file, start, end);
+    const { size } = fs.statSync(file);
+    try {
+      const saved = JSON.parse(fs.readFileSync(segment.indexFile, 'utf8'));
+      if (saved.size === size) {
+        segment.restore(saved);
+        return segment;
+      }
+    } catch (err) {
+      if (err.code !== 'ENOENT' && !(err instanceof SyntaxError)) {
+        throw err;
+      }
+    }
+    segment.rebuild(size, readOnly);
+    return segment;
+  }
+
+  rebuild(size, readOnly = false) {
+    const fd = fs.openSync(this.file, readOnly ? 'r' : 'r+');
+    let end = 0;
+    try {
+      readLines(fd, 0, size, (line, offset) => {
+        this.track(JSON.parse(line), offset);
+        end = offset + Buffer.byteLength(line) + 1;
+      });
+      // A crash mid-append can leave a partial last line; cut it off.
+      if (end < size && !readOnly) {
+        fs.ftruncateSync(fd, end);
+      }
+    } finally {
+      fs.closeSync(fd);
+    }
+    this.size = end;
+  }
+
+  append(record) {
+    const buffer = Buffer.from(`${JSON.stringify(record)}\n`);
+    fs.writeSync(this.fd, buffer, 0, buffer.length);
+    this.track(record, this.size);
+    this.size += buffer.length;
+  }
+
+  track(record, offset) {
+    const time = Date.parse(record.timestamp);
+    if (this.count % INDEX_EVERY === 0) {
+      this.sparse.push([this.count, offset, time]);
+    }
+    for (const [field, keyOf] of Object.entries(INDEXED_FIELDS)) {
+      const key = keyOf(record);
+      if (key === undefined || key === null) {
+        continue;
+      }
+      const postings = this.postings.get(field);
+      const offsets = postings.get(String(key));
+      if (offsets) {
+        offsets.push(offset);
+      } else {
+        postings.set(String(key), [offset]);
+      }
+    }
+    this.count += 1;
+    if (this.firstId === null) {
+      this.firstId = Number(record.id);
+    }
+    this.lastId = Math.max(this.lastId, Number(record.id));
+    this.lastTime = Math.max(this.lastTime, time);
+  }
+
+  // Offsets of records matching every filter, ascending; null means all.
+  match(filters) {
+    const lists = [];
+    for (const [field, value] of Object.entries(filters)) {
+      if (value === undefined) {
+        continue;
+      }
+      const offsets = this.postings.get(field).get(String(value));
+      if (!offsets) {
+        return [];
+      }
+      lists.push(offsets);
+    }
+    if (lists.length === 0) {
+      return null;
+    }
+    lists.sort((a, b) => a.length - b.length);
+    return lists.reduce(intersectSorted);
+  }
+
+  read(offset) {
+    let record = null;
+    readLines(this.readFd(), offset, this.size, (line) => {
+      record = JSON.parse(line);
+      return false;
+    }, RECORD_BUFFER);
+    return record;
+  }
+
+  // Records with ordinals in [from, to), read forward from the nearest
+  // sparse index entry. Their byte offsets go to `offsets` if given.
+  readOrdinals(from, to, offsets = null) {
+    const [ordinal, offset] = this.sparse[Math.floor(from / INDEX_EVERY)];
+    const records = [];
+    let current = ordinal;
+    readLines(this.readFd(), offset, this.size, (line, position) => {
+      if (current >= from) {
+        records.push(JSON.parse(line));
+        if (offsets) {
+          offsets.push(position);
+        }
+      }
+      current += 1;
+      return current < to;
+    });
+    return records;
+  }
+
+  // Number of records stored before byte `offset` (a record boundary),
+  // counted forward from the nearest sparse index entry.
+  ordinalAt(offset) {
+    if (offset >= this.size) {
+      return this.count;
+    }
+    let lo = 0;
+    let hi = this.sparse.length;
+    while (lo < hi) {
+      const mid = (lo + hi) >> 1;
+      if (this.sparse[mid][1] <= offset) {
+        lo = mid + 1;
+      } else {
+        hi = mid;
+      }
+    }
+    if (lo === 0) {
+      return 0;
+    }
+    let [ordinal] = this.sparse[lo - 1];
+    readLines(this.readFd(), this.sparse[lo - 1][1], offset, () => {
+      ordinal += 1;
+    });
+    return ordinal;
+  }
+
+  // Byte offset from which every record at or after `time` follows.
+  offsetAt(time) {
+    let lo = 0;
+    let hi = this.sparse.length;
+    while (lo < hi) {
+      const mid = (lo + hi) >> 1;
+      if (this.sparse[mid][2] < time) {
+        lo = mid + 1;
+      } else {
+        hi = mid;
+      }
+    }
+    return lo === 0 ? 0 : this.sparse[lo - 1][1];
+  }
+
+  readFd() {
+    if (this.fd === null) {
+      this.fd = fs.openSync(this.file, 'r');
+    }
+    return this.fd;
+  }
+
+  snapshot() {
+    return {
+      size: this.size,
+      count: this.count,
+      firstId: this.firstId,
+      lastId: this.lastId,
+      lastTime: this.lastTime,
+      sparse: this.sparse,
+      postings: Object.fromEntries(
+        Array.from(this.postings, ([field, postings]) => [field, Object.fromEntries(postings)])
+      )
+    };
+  }
+
+  restore(saved) {
+    this.size = saved.size;
+    this.count = saved.count;
+    this.firstId = saved.firstId;
+    this.lastId = saved.lastId;
+    this.lastTime = saved.lastTime;
+    this.sparse = saved.sparse;
+    for (const [field, postings] of Object.entries(saved.postings)) {
+      this.postings.set(field, new Map(Object.entries(postings)));
+    }
+  }
+
+  // Reopen an existing segment for appends (the newest one after a restart).
+  resume() {
+    this.close();
+    this.fd = fs.openSync(this.file, 'a+');
+    this.writable = true;
+    fs.rmSync(this.indexFile, { force: true });
+  }
+
+  // Stop appending: persist the indexes next to the data and reopen read-only.
+  seal() {
+    if (!this.writable) {
+      return;
+    }
+    const tmp = `${this.indexFile}.tmp`;
+    fs.writeFileSync(tmp, JSON.stringify(this.snapshot()));
+    fs.renameSync(tmp, this.indexFile);
+    this.close();
+    this.writable = false;
+  }
+
+  close() {
+    if (this.fd !== null) {
+      fs.closeSync(this.fd);
+      this.fd = null;
+    }
+  }
+
+  drop() {
+    this.close();
+    fs.rmSync(this.file, { force: true });
+    fs.rmSync(this.indexFile, { force: true });
+  }
+}
+
+// Call fn(line, offset) for each complete line in [offset, end) of fd until
+// it returns false.
+function readLines(fd, offset, end, fn, buffer = READ_BUFFER) {
+  let carry = null;
+  let carryOffset = offset;
+  let position = offset;
+  while (position < end) {
+    const bytes = fs.readSync(fd, buffer, 0, Math.min(buffer.length, end - position), position);
+    if (bytes === 0) {
+      break;
+    }
+    position += bytes;
+    let chunk = buffer.subarray(0, bytes);
+    if (carry) {
+      chunk = Buffer.concat([carry, chunk]);
+      carry = null;
+    }
+    let start = 0;
+    let newline = chunk.indexOf(10);
+    while (newline !== -1) {
+      if (fn(chunk.toString('utf8', start, newline), carryOffset + start) === false) {
+        return;
+      }
+      start = newline + 1;
+      newline = chunk.indexOf(10, start);
+    }
+    if (start < chunk.length) {
+      carry = Buffer.from(chunk.subarray(start));
+    }
+    carryOffset += start;
+  }
+}
+
+function intersectSorted(a, b) {
+  const result = [];
+  let i = 0;
+  let j = 0;
+  while (i < a.length && j < b.length) {
+    if (a[i] === b[j]) {
+      result.push(a[i]);
+      i += 1;
+      j += 1;
+    } else if (a[i] < b[j]) {
+      i += 1;
+    } else {
+      j += 1;
+    }
+  }
+  return result;
+}
+
+module.exports = { Segment, INDEXED_FIELDS, INDEX_EVERY, resourceKey, readLines };
@@ -0,0 +1,10 @@
+const path = require('path');
+const ActivityLog = require('./ActivityLog');
+const { Segment, resourceKey } = require('./Segment');
+
+const DATA_DIR = process.env.DATA_DIR || path.join(__dirname, '..', '..', 'data');
+
+// Shared log behind the /api/activities routes; opened on first use
+const activities = new ActivityLog({ dir: path.join(DATA_DIR, 'activities') });
+
+module.exports = { ActivityLog, Segment, activities, resourceKey, DATA_DIR };
@@ -0,0 +1,383 @@
+const RankedCounter = require('./RankedCounter');
+const RollingCounter = require('./RollingCounter');
+
+const HOUR_MS = 60 * 60 * 1000;
+const DAY_MS = 24 * HOUR_MS;
+const CLOSED_TASK_STATUSES = ['completed', 'cancelled'];
+
+// Open tasks per due day. Days before today collapse into one overdue count
+// as the clock passes them, so reading it is O(1) amortized.
+class DueCounter {
+  constructor(now) {
+    this.now = now;
+    this.days = new Map();
+    this.today = Math.floor(now() / DAY_MS);
+    this.overdue = 0;
+  }
+
+  add(dueDate, delta) {
+    const day = Math.floor(Date.parse(dueDate) / DAY_MS);
+    if (Number.isNaN(day)) {
+      return;
+    }
+    this.advance();
+    if (day < this.today) {
+      this.overdue += delta;
+      return;
+    }
+    const count = (this.days.get(day) || 0) + delta;
+    if (count === 0) {
+      this.days.delete(day);
+    } else {
+      this.days.set(day, count);
+    }
+  }
+
+  count() {
+    this.advance();
+    return this.overdue;
+  }
+
+  advance() {
+    const today = Math.floor(this.now() / DAY_MS);
+    for (; this.today < today; this.today += 1) {
+      this.overdue += this.days.get(this.today) || 0;
+      this.days.delete(this.today);
+    }
+  }
+}
+
+// Dashboard counters maintained from store change events and activity log
+// appends, so every dashboard read is a handful of lookups.
+//
+// compute() rebuilds the store-derived counters with a full scan; reconcile()
+// uses it to detect (and repair) drift between the two.
+class DashboardAggregates {
+  constructor({ now = Date.now } = {}) {
+    this.now = now;
+    this.stores = null;
+    this.lastReconciliation = null;
+    this.resetEntities();
+    this.resetActivity();
+  }
+
+  resetEntities() {
+    const { now } = this;
+    this.tasks = {
+      byStatus: new RankedCounter(),
+      byPriority: new RankedCounter(),
+      openByAssignee: new RankedCounter(),
+      completedByAssignee: new RankedCounter(),
+      created: new RollingCounter({ bucketMs: DAY_MS, windows: { month: 30, twoMonths: 60 }, now }),
+      completed: new RollingCounter({ bucketMs: DAY_MS, windows: { week: 7 }, now }),
+      due: new DueCounter(now),
+      completedAt: new Map()
+    };
+    this.projects = {
+      byStatus: new RankedCounter(),
+      byPriority: new RankedCounter(),
+      created: new RollingCounter({ bucketMs: DAY_MS, windows: { month: 30 }, now }),
+      completionMs: new Map(),
+      completionTotal: 0
+    };
+    this.users = {
+      total: 0,
+      created: new RollingCounter({ bucketMs: DAY_MS, windows: { month: 30 }, now })
+    };
+  }
+
+  resetActivity() {
+    const windows = { day: 24, week: 7 * 24, month: 30 * 24 };
+    this.activity = {
+      lastSeen: new Map(),
+      activeUsers: new RollingCounter({ bucketMs: HOUR_MS, windows, now: this.now }),
+      volume: new RollingCounter({ bucketMs: HOUR_MS, windows, now: this.now })
+    };
+  }
+
+  // Count the stores' current contents, then follow their change events.
+  attach(stores) {
+    this.stores = stores;
+    this.load(stores);
+    stores.tasks.on('change', (change) => this.onTask(change));
+    stores.projects.on('change', (change) => this.onProject(change));
+    stores.users.on('change', (change) => this.onUser(change));
+    for (const store of Object.values(stores)) {
+      store.on('clear', () => {
+        this.resetEntities();
+        this.load(stores);
+      });
+    }
+    return this;
+  }
+
+  // Count every entity. Completion times already known to `previous` are
+  // kept, since a completed entity's updatedAt moves on later edits.
+  load({ users, projects, tasks }, previous = null) {
+    for (const task of tasks.items.values()) {
+      if (previous && previous.tasks.completedAt.has(task.id)) {
+        this.tasks.completedAt.set(task.id, previous.tasks.completedAt.get(task.id));
+      }
+      this.countTask(task, 1);
+    }
+    for (const project of projects.items.values()) {
+      if (previous && previous.projects.completionMs.has(project.id)) {
+        this.projects.completionMs.set(project.id, previous.projects.completionMs.get(project.id));
+      }
+      this.countProject(project, 1);
+    }
+    for (const user of users.items.values()) {
+      this.countUser(user, 1);
+    }
+  }
+
+  onTask({ doc, previous }) {
+    if (previous) {
+      this.countTask(previous, -1);
+    }
+    if (doc) {
+      this.countTask(doc, 1);
+    }
+    if (!doc || doc.status !== 'completed') {
+      this.tasks.completedAt.delete((doc || previous).id);
+    }
+  }
+
+  onProject({ doc, previous }) {
+    if (previous) {
+      this.countProject(previous, -1);
+    }
+    if (doc) {
+      this.countProject(doc, 1);
+    }
+    if (!doc || doc.status !== 'completed') {
+      this.projects.completionMs.delete((doc || previous).id);
+    }
+  }
+
+  onUser({ doc, previous }) {
+    if (previous) {
+      this.countUser(previous, -1);
+    }
+    if (doc) {
+      this.countUser(doc, 1);
+    }
+  }
+
+  countTask(task, sign) {
+    const counters = this.tasks;
+    counters.byStatus.add(task.status, sign);
+    counters.byPriority.add(task.priority, sign);
+    counters.created.add(Date.parse(task.createdAt), sign);
+    if (!CLOSED_TASK_STATUSES.includes(task.status)) {
+      if (task.assignee) {
+        counters.openByAssignee.add(task.assignee, sign);
+      }
+      if (task.dueDate) {
+        counters.due.add(task.dueDate, sign);
+      }
+    }
+    if (task.status === 'completed') {
+      if (task.assignee) {
+        counters.completedByAssignee.add(task.assignee, sign);
+      }
+      // A task keeps the time it first became completed across later edits.
+      let completedAt = counters.completedAt.get(task.id);
+      if (completedAt === undefined) {
+        completedAt = Date.parse(task.updatedAt);
+        counters.completedAt.set(task.id, completedAt);
+      }
+      counters.completed.add(completedAt, sign);
+    }
+  }
+
+  countProject(project, sign) {
+    const counters = this.projects;
+    counters.byStatus.add(project.status, sign);
+    counters.byPriority.add(project.priority, sign);
+    counters.created.add(Date.parse(project.createdAt), sign);
+    if (project.status === 'completed') {
+      let duration = counters.completionMs.get(project.id);
+      if (duration === undefined) {
+        duration = Math.max(0, Date.parse(project.updatedAt) - Date.parse(project.createdAt));
+        counters.completionMs.set(project.id, duration);
+      }
+      counters.completionTotal += sign * duration;
+    }
+  }
+
+  countUser(user, sign) {
+    this.users.total += sign;
+    this.users.created.add(Date.parse(user.createdAt), sign);
+  }
+
+  onActivity(record) {
+    const time = Date.parse(record.timestamp);
+    const { lastSeen, activeUsers, volume } = this.activity;
+    volume.add(time, 1);
+    const previous = lastSeen.get(record.userId);
+    if (previous !== undefined && previous >= time) {
+      return;
+    }
+    // Each user is counted once, in the bucket of their latest activity.
+    if (previous !== undefined) {
+      activeUsers.add(previous, -1);
+    }
+    activeUsers.add(time, 1);
+    lastSeen.set(record.userId, time);
+  }
+
+  // Replay the last 30 days of the activity log into the activity windows,
+  // up to where the log ended when the replay started: records appended
+  // meanwhile reach onActivity() live.
+  async loadActivity(log) {
+    this.resetActivity();
+    const now = this.now();
+    const upTo = log.position();
+    for await (const record of log.stream({ since: now - 30 * DAY_MS, until: now, upTo })) {
+      this.onActivity(record);
+    }
+  }
+
+  // Fresh aggregates for the same stores, built by scanning every entity.
+  compute() {
+    const fresh = new DashboardAggregates({ now: this.now });
+    fresh.load(this.stores, this);
+    return fresh;
+  }
+
+  // Compare the maintained counters with a full recount; replace them when
+  // they have drifted. Returns the differences found.
+  reconcile() {
+    const fresh = this.compute();
+    const drift = [];
+    const expect = (metric, actual, expected) => {
+      if (JSON.stringify(actual) !== JSON.stringify(expected)) {
+        drift.push({ metric, actual, expected });
+      }
+    };
+    for (const group of ['tasks', 'projects']) {
+      for (const name of Object.keys(this[group])) {
+        const counter = this[group][name];
+        if (counter instanceof RankedCounter) {
+          expect(`${group}.${name}`, sortedObject(counter), sortedObject(fresh[group][name]));
+        } else if (counter instanceof RollingCounter) {
+          expect(`${group}.${name}`, counter.snapshot(), fresh[group][name].snapshot());
+        }
+      }
+    }
+    expect('tasks.overdue', this.tasks.due.count(), fresh.tasks.due.count());
+    expect('projects.completionTotal', this.projects.completionTotal, fresh.projects.completionTotal);
+    expect('users.total', this.users.total, fresh.users.total);
+    expect('users.created', this.users.created.snapshot(), fresh.users.created.snapshot());
+
+    if (drift.length > 0) {
+      this.tasks = fresh.tasks;
+      this.projects = fresh.projects;
+      this.users = fresh.users;
+    }
+    this.lastReconciliation = { checkedAt: new Date(this.now()).toISOString(), drift };
+    return this.lastReconciliation;
+  }
+
+  // Reconcile every `intervalMs` without keeping the process alive.
+  startReconciliation(intervalMs, onDrift = () => {}) {
+    const timer = setInterval(() => {
+      const { drift } = this.reconcile();
+      if (drift.length > 0) {
+        onDrift(drift);
+      }
+    }, intervalMs);
+    timer.unref();
+    return timer;
+  }
+
+  stats() {
+    const { byStatus } = this.tasks;
+    const created = this.tasks.created.snapshot();
+    const previousMonth = created.twoMonths - created.month;
+    return {
+      totalUsers: this.users.total,
+      totalProjects: this.projects.byStatus.total,
+      totalTasks: byStatus.total,
+      activeUsers: this.activity.activeUsers.sum('week'),
+      completedTasks: byStatus.get('completed'),
+      pendingTasks: byStatus.total - byStatus.get('completed') - byStatus.get('cancelled'),
+      // No billing data is tracked yet
+      totalRevenue: 0,
+      // Growth in tasks created over the last 30 days vs the 30 before
+      monthlyGrowth: previousMonth > 0
+        ? Math.round(((created.month - previousMonth) / previousMonth) * 1000) / 10
+        : 0
+    };
+  }
+
+  projectsSummary(statuses) {
+    const { byStatus, byPriority, completionTotal } = this.projects;
+    const completed = byStatus.get('completed');
+    const averageDays = completed > 0 ? Math.round(completionTotal / completed / DAY_MS) : null;
+    return {
+      totalProjects: byStatus.total,
+      activeProjects: byStatus.get('active'),
+      completedProjects: byStatus.get('completed'),
+      onHoldProjects: byStatus.get('on_hold'),
+      projectsByStatus: countsByKey(byStatus, statuses),
+      projectsByPriority: byPriority.toObject(),
+      averageCompletionTime: averageDays === null ? null : `${averageDays} days`,
+      projectsThisMonth: this.projects.created.sum('month')
+    };
+  }
+
+  tasksStatus(statuses, priorities) {
+    const { byStatus, byPriority } = this.tasks;
+    return {
+      totalTasks: byStatus.total,
+      tasksByStatus: countsByKey(byStatus, statuses),
+      tasksByPriority: countsByKey(byPriority, priorities),
+      overdueTasks: this.tasks.due.count(),
+      completedThisWeek: this.tasks.completed.sum('week')
+    };
+  }
+
+  // `nameOf(userId)` resolves display names for the top lists.
+  usersActivity(nameOf, topCount = 5) {
+    const { activeUsers, volume } = this.activity;
+    const ranked = (counter, field) => counter.top(topCount)
+      .map(({ key, count }) => ({ userId: key, name: nameOf(key), [field]: count }));
+    return {
+      totalUsers: this.users.total,
+      activeUsers: activeUsers.sum('week'),
+      newUsersThisMonth: this.users.created.sum('month'),
+      userEngagement: {
+        dailyActive: activeUsers.sum('day'),
+        weeklyActive: activeUsers.sum('week'),
+        monthlyActive: activeUsers.sum('month')
+      },
+      activityVolume: volume.snapshot(),
+      topPerformers: ranked(this.tasks.completedByAssignee, 'tasksCompleted'),
+      busiestUsers: ranked(this.tasks.openByAssignee, 'openTasks'),
+      averageTasksPerUser: this.users.total > 0
+        ? Math.round((this.tasks.byStatus.total / this.users.total) * 10) / 10
+        : 0
+    };
+  }
+
+  openTasksFor(userId) {
+    return this.tasks.openByAssignee.get(String(userId));
+  }
+}
+
+// { in_progress: 3, ... } -> { inProgress: 3, ... } with zeros for `keys`
+function countsByKey(counter, keys) {
+  const counts = {};
+  for (const key of keys) {
+    counts[key.replace(/_(\w)/g, (match, ch) => ch.toUpperCase())] = counter.get(key);
+  }
+  return counts;
+}
+
+function sortedObject(counter) {
+  return Object.fromEntries(Array.from(counter.entries()).sort(([a], [b]) => (a < b ? -1 : a > b ? 1 : 0)));
+}
+
+module.exports = { DashboardAggregates, DueCounter, CLOSED_TASK_STATUSES };
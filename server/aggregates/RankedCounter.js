@@ -0,0 +1,108 @@
+// Counts per key with O(1) unit updates and O(k) top-k reads.
+//
+// Keys with equal counts share a bucket, and buckets form a doubly linked
+// list in ascending count order, so moving a key up or down by one only
+// touches its neighbouring bucket (the "all O(1)" LFU layout). Keys whose
+// count drops to zero are forgotten.
+class RankedCounter {
+  constructor() {
+    this.counts = new Map();
+    this.buckets = new Map();
+    this.head = { count: 0, keys: null, prev: null, next: null };
+    this.tail = { count: Infinity, keys: null, prev: this.head, next: null };
+    this.head.next = this.tail;
+    this.total = 0;
+  }
+
+  get size() {
+    return this.counts.size;
+  }
+
+  get(key) {
+    return this.counts.get(key) || 0;
+  }
+
+  // Adjust `key` by `delta`; unit steps are O(1), larger ones walk the
+  // buckets in between. Counts never go below zero.
+  add(key, delta = 1) {
+    const before = this.counts.get(key) || 0;
+    const after = Math.max(0, before + delta);
+    if (after === before) {
+      return after;
+    }
+    let anchor = before > 0 ? this.buckets.get(before) : this.head;
+    if (before > 0) {
+      anchor = this.detach(key, anchor);
+    }
+    if (after > 0) {
+      this.attach(key, after, anchor);
+      this.counts.set(key, after);
+    } else {
+      this.counts.delete(key);
+    }
+    this.total += after - before;
+    return after;
+  }
+
+  // Remove `key` from its bucket; returns a node next to where it was.
+  detach(key, bucket) {
+    bucket.keys.delete(key);
+    if (bucket.keys.size > 0) {
+      return bucket;
+    }
+    bucket.prev.next = bucket.next;
+    bucket.next.prev = bucket.prev;
+    this.buckets.delete(bucket.count);
+    return bucket.prev;
+  }
+
+  attach(key, count, near) {
+    let bucket = this.buckets.get(count);
+    if (!bucket) {
+      let prev = near;
+      while (prev.count > count) {
+        prev = prev.prev;
+      }
+      while (prev.next.count < count) {
+        prev = prev.next;
+      }
+      bucket = { count, keys: new Set(), prev, next: prev.next };
+      prev.next.prev = bucket;
+      prev.next = bucket;
+      this.buckets.set(count, bucket);
+    }
+    bucket.keys.add(key);
+  }
+
+  // The k highest counts as [{ key, count }], ties in insertion order.
+  top(k) {
+    const result = [];
+    for (let bucket = this.tail.prev; bucket !== this.head && result.length < k; bucket = bucket.prev) {
+      for (const key of bucket.keys) {
+        result.push({ key, count: bucket.count });
+        if (result.length === k) {
+          break;
+        }
+      }
+    }
+    return result;
+  }
+
+  entries() {
+    return this.counts.entries();
+  }
+
+  toObject() {
+    return Object.fromEntries(this.counts);
+  }
+
+  clear() {
+    this.counts.clear();
+    this.buckets.clear();
+    this.head.next = this.tail;
+    this.tail.prev = this.head;
+    this.total = 0;
+  }
+}
+
+module.exports = RankedCounter;
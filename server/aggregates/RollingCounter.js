@@ -0,0 +1,72 @@
+// Event counts over sliding time windows, e.g. { day: 1, week: 7, month: 30 }
+// buckets of `bucketMs`.
+//
+// Counts live in a ring of time buckets as long as the widest window, and
+// every window keeps a running sum. Moving to a new bucket subtracts only the
+// buckets that slide out, so adds and reads are O(1) amortized however many
+// events the windows hold. Events older than the widest window are ignored.
+class RollingCounter {
+  constructor({ bucketMs, windows, now = Date.now }) {
+    this.bucketMs = bucketMs;
+    this.windows = windows;
+    this.now = now;
+    this.length = Math.max(...Object.values(windows));
+    this.counts = new Array(this.length).fill(0);
+    this.sums = Object.fromEntries(Object.keys(windows).map((name) => [name, 0]));
+    this.head = Math.floor(now() / bucketMs);
+  }
+
+  // Future timestamps count as now.
+  add(time, delta = 1) {
+    const current = Math.floor(this.now() / this.bucketMs);
+    const bucket = Math.min(Math.floor(time / this.bucketMs), current);
+    this.advance(current);
+    if (bucket <= this.head - this.length) {
+      return;
+    }
+    this.counts[mod(bucket, this.length)] += delta;
+    for (const [name, size] of Object.entries(this.windows)) {
+      if (bucket > this.head - size) {
+        this.sums[name] += delta;
+      }
+    }
+  }
+
+  // Events in the named window ending now.
+  sum(name) {
+    this.advance(Math.floor(this.now() / this.bucketMs));
+    return this.sums[name];
+  }
+
+  advance(bucket) {
+    if (bucket <= this.head) {
+      return;
+    }
+    if (bucket - this.head >= this.length) {
+      this.counts.fill(0);
+      for (const name of Object.keys(this.sums)) {
+        this.sums[name] = 0;
+      }
+      this.head = bucket;
+      return;
+    }
+    while (this.head < bucket) {
+      this.head += 1;
+      for (const [name, size] of Object.entries(this.windows)) {
+        this.sums[name] -= this.counts[mod(this.head - size, this.length)];
+      }
+      this.counts[mod(this.head, this.length)] = 0;
+    }
+  }
+
+  snapshot() {
+    this.advance(Math.floor(this.now() / this.bucketMs));
+    return { ...this.sums };
+  }
+}
+
+function mod(value, size) {
+  return ((value % size) + size) % size;
+}
+
+module.exports = RollingCounter;
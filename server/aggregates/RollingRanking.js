@@ -0,0 +1,89 @@
+const RankedCounter = require('./RankedCounter');
+
+// Per-key event counts over sliding time windows, each window ranked, e.g.
+// the most used tags of the last { week: 7, month: 30 } buckets of a day.
+//
+// The RollingCounter layout with a Map of key counts per bucket: a ring of
+// buckets as long as the widest window, and a RankedCounter per window
+// holding the sums. When a bucket slides out of a window its counts are
+// taken off that window's ranking, so reads never scan and each event is
+// added and expired once per window. Events older than the widest window
+// are ignored.
+class RollingRanking {
+  constructor({ bucketMs, windows, now = Date.now }) {
+    this.bucketMs = bucketMs;
+    this.windows = windows;
+    this.now = now;
+    this.length = Math.max(...Object.values(windows));
+    this.buckets = new Array(this.length).fill(null);
+    this.rankings = Object.fromEntries(Object.keys(windows).map((name) => [name, new RankedCounter()]));
+    this.head = Math.floor(now() / bucketMs);
+  }
+
+  // Future timestamps count as now.
+  add(key, time, delta = 1) {
+    const current = Math.floor(this.now() / this.bucketMs);
+    const bucket = Math.min(Math.floor(time / this.bucketMs), current);
+    this.advance(current);
+    if (bucket <= this.head - this.length) {
+      return;
+    }
+    const slot = mod(bucket, this.length);
+    const counts = this.buckets[slot] || (this.buckets[slot] = new Map());
+    const count = (counts.get(key) || 0) + delta;
+    if (count === 0) {
+      counts.delete(key);
+    } else {
+      counts.set(key, count);
+    }
+    for (const [name, size] of Object.entries(this.windows)) {
+      if (bucket > this.head - size) {
+        this.rankings[name].add(key, delta);
+      }
+    }
+  }
+
+  // Events for `key` in the named window ending now.
+  get(name, key) {
+    this.advance(Math.floor(this.now() / this.bucketMs));
+    return this.rankings[name].get(key);
+  }
+
+  // The k keys with the most events in the named window, as [{ key, count }].
+  top(name, k) {
+    this.advance(Math.floor(this.now() / this.bucketMs));
+    return this.rankings[name].top(k);
+  }
+
+  advance(bucket) {
+    if (bucket <= this.head) {
+      return;
+    }
+    if (bucket - this.head >= this.length) {
+      this.buckets.fill(null);
+      for (const ranking of Object.values(this.rankings)) {
+        ranking.clear();
+      }
+      this.head = bucket;
+      return;
+    }
+    while (this.head < bucket) {
+      this.head += 1;
+      for (const [name, size] of Object.entries(this.windows)) {
+        const expired = this.buckets[mod(this.head - size, this.length)];
+        if (expired) {
+          for (const [key, count] of expired) {
+            this.rankings[name].add(key, -count);
+          }
+        }
+      }
+      this.buckets[mod(this.head, this.length)] = null;
+    }
+  }
+}
+
+function mod(value, size) {
+  return ((value % size) + size) % size;
+}
+
+module.exports = RollingRanking;
@@ -0,0 +1,98 @@
+const RankedCounter = require('./RankedCounter');
+const RollingRanking = require('./RollingRanking');
+
+const DAY_MS = 24 * 60 * 60 * 1000;
+const WINDOWS = { week: 7, month: 30 };
+
+// Tag usage across tasks and projects, maintained from store change
+// events: how many resources carry each tag now, and how many times each
+// was attached within the last week and month (attached at creation counts
+// at createdAt, later at updatedAt; detaching doesn't undo an attachment).
+// Both are ranked, so the most popular tags are an O(k) read instead of a
+// count and sort over every resource.
+class TagUsage {
+  constructor({ now = Date.now } = {}) {
+    this.now = now;
+    this.reset();
+  }
+
+  reset() {
+    this.total = new RankedCounter();
+    this.attached = new RollingRanking({ bucketMs: DAY_MS, windows: WINDOWS, now: this.now });
+  }
+
+  // Count the stores' current tags, then follow their change events.
+  attach(stores) {
+    this.load(stores);
+    for (const store of Object.values(stores)) {
+      store.on('change', (change) => this.onChange(change));
+      store.on('clear', () => {
+        this.reset();
+        this.load(stores);
+      });
+    }
+    return this;
+  }
+
+  load(stores) {
+    for (const store of Object.values(stores)) {
+      for (const doc of store.items.values()) {
+        this.onChange({ doc, previous: null });
+      }
+    }
+  }
+
+  onChange({ doc, previous }) {
+    // Updates that don't touch tags keep the same array
+    if (doc && previous && doc.tags === previous.tags) {
+      return;
+    }
+    const before = tagsOf(previous);
+    const after = tagsOf(doc);
+    for (const tag of before) {
+      if (!after.has(tag)) {
+        this.total.add(tag, -1);
+      }
+    }
+    if (after.size === 0) {
+      return;
+    }
+    const time = Date.parse(previous ? doc.updatedAt : doc.createdAt);
+    for (const tag of after) {
+      if (!before.has(tag)) {
+        this.total.add(tag, 1);
+        if (!Number.isNaN(time)) {
+          this.attached.add(tag, time);
+        }
+      }
+    }
+  }
+
+  // Usage of `tag` in total, or within the named window
+  count(tag, window = null) {
+    return window ? this.attached.get(window, tag) : this.total.get(tag);
+  }
+
+  // The k most used tags as [{ tag, count }], in total or within a window
+  top(k, window = null) {
+    const ranked = window ? this.attached.top(window, k) : this.total.top(k);
+    return ranked.map(({ key, count }) => ({ tag: key, count }));
+  }
+
+  // Whether `tag` was attached more often in the last week than a month's
+  // weekly average: 'up', 'down' or 'stable'
+  trend(tag) {
+    const week = this.attached.get('week', tag);
+    const weeklyAverage = (this.attached.get('month', tag) * WINDOWS.week) / WINDOWS.month;
+    if (week > weeklyAverage * 1.2) {
+      return 'up';
+    }
+    return week < weeklyAverage * 0.8 ? 'down' : 'stable';
+  }
+}
+
+function tagsOf(doc) {
+  return new Set(doc && Array.isArray(doc.tags) ? doc.tags.map(String) : []);
+}
+
+module.exports = { TagUsage, TAG_WINDOWS: Object.keys(WINDOWS) };
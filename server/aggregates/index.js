@@ -0,0 +1,28 @@
+const { users, projects, tasks } = require('../store');
+const { activities } = require('../activity');
+const { DashboardAggregates, DueCounter, CLOSED_TASK_STATUSES } = require('./DashboardAggregates');
+const { TagUsage, TAG_WINDOWS } = require('./TagUsage');
+const RankedCounter = require('./RankedCounter');
+const RollingCounter = require('./RollingCounter');
+const RollingRanking = require('./RollingRanking');
+
+// Shared counters behind the /api/dashboard routes
+const dashboard = new DashboardAggregates().attach({ users, projects, tasks });
+activities.on('append', (record) => dashboard.onActivity(record));
+activities.on('clear', () => dashboard.resetActivity());
+
+// Tag popularity behind /api/tags
+const tagUsage = new TagUsage().attach({ tasks, projects });
+
+module.exports = {
+  dashboard,
+  tagUsage,
+  DashboardAggregates,
+  DueCounter,
+  TagUsage,
+  RankedCounter,
+  RollingCounter,
+  RollingRanking,
+  CLOSED_TASK_STATUSES,
+  TAG_WINDOWS
+};
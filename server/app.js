@@ -1,11 +1,22 @@
 const express = require('express');
 const cors = require('cors');
+const { responses, responseCache } = require('./cache');
+const { dispatch } = require('./batch');
+const { routeMetrics, profiler, metricsText, instrument, routeOf, CONTENT_TYPE } = require('./metrics');
+const { lazyRoutes } = require('./routes');
+const { currentUserId } = require('./routes/common');
 
 const app = express();
 
+// Per-route request metrics (server/metrics), ahead of everything else so
+// they time the whole request
+if (process.env.METRICS !== 'off') {
+  app.use(instrument(routeMetrics));
+}
+
 // Basic middleware
-app.use(cors());
-app.use(express.json());
+app.use(cors({ exposedHeaders: ['Link', 'X-Next-Cursor'] }));
+app.use(express.json({ limit: '1mb' }));
 
 // Health check endpoint
 app.get('/api/health', (req, res) => {
@@ -54,9 +65,151 @@ app.post('/api/auth/login', (req, res) => {
   });
 });
 
+// Read endpoints answered from the response cache (server/cache), with the
+// resource types whose writes invalidate them. Dashboard counters also move
+// with the clock, so their entries expire; streams and live metrics opt out.
+const CACHE_RULES = [
+  { prefix: '/api/dashboard/performance', types: null },
+  { prefix: '/api/metrics', types: null },
+  { prefix: '/api/dashboard', types: ['users', 'projects', 'tasks', 'activities'], ttlMs: 10 * 1000 },
+  { prefix: '/api/users', types: ['users'] },
+  { prefix: '/api/projects', types: ['projects'] },
+  { prefix: '/api/tasks', types: ['tasks'] },
+  { prefix: '/api/search', types: ['users', 'projects', 'tasks', 'files'] },
+  { prefix: '/api/activities/export', types: null },
+  { prefix: '/api/activities', types: ['activities', 'users'] },
+  { prefix: '/api/notifications/stream', types: null },
+  { prefix: '/api/notifications', types: ['notifications'] },
+  { prefix: '/api/files', types: ['files'] },
+  { prefix: '/api/comments', types: ['comments', 'users'] },
+  { prefix: '/api/tags', types: ['tags', 'tasks', 'projects'], ttlMs: 60 * 1000 }
+];
+
+if (process.env.RESPONSE_CACHE !== 'off') {
+  app.use(responseCache(responses, { rules: CACHE_RULES, scope: currentUserId }));
+}
+
+// Metrics endpoints
+
+// Prometheus scrape target
+app.get('/api/metrics', (req, res) => {
+  res.setHeader('Content-Type', CONTENT_TYPE);
+  res.send(metricsText());
+});
+
+app.get('/api/metrics/profiler', (req, res) => {
+  res.json(profiler.status());
+});
+
+// { enabled: true, intervalUs?, durationMs? } starts a profiling run,
+// { enabled: false } stops it and answers with its summary
+app.put('/api/metrics/profiler', async (req, res, next) => {
+  const { enabled, intervalUs = 1000, durationMs } = req.body;
+
+  // Simple validation
+  if (typeof enabled !== 'boolean') {
+    return res.status(400).json({ message: 'enabled must be true or false' });
+  }
+  if (!Number.isInteger(intervalUs) || intervalUs < 100 || intervalUs > 1000000) {
+    return res.status(400).json({ message: 'intervalUs must be an integer between 100 and 1000000' });
+  }
+  if (durationMs !== undefined && (!Number.isInteger(durationMs) || durationMs < 1)) {
+    return res.status(400).json({ message: 'durationMs must be a positive integer' });
+  }
+
+  try {
+    if (!enabled) {
+      const summary = await profiler.stop();
+      if (!summary) {
+        return res.status(409).json({ message: 'Profiler is not running' });
+      }
+      return res.json({ ...profiler.status(), last: summary });
+    }
+    if (!(await profiler.start({ intervalUs, durationMs }))) {
+      return res.status(409).json({ message: 'Profiler is already running' });
+    }
+    res.status(201).json(profiler.status());
+  } catch (err) {
+    next(err);
+  }
+});
+
+// The last run's raw profile, for Chrome DevTools or speedscope
+app.get('/api/metrics/profiler/profile', (req, res) => {
+  if (!profiler.last) {
+    return res.status(404).json({ message: 'No profile recorded' });
+  }
+  const stamp = profiler.last.summary.startedAt.replace(/[:.]/g, '-');
+  res.setHeader('Content-Disposition', `attachment; filename=nodenest-${stamp}.cpuprofile`);
+  res.json(profiler.last.profile);
+});
+
+// Everything else under /api/<group> is in server/routes, one router per
+// group, each loaded on the group's first request
+app.use(lazyRoutes());
+
+// Batch endpoint: many API calls in one round trip. Sub-requests run in
+// order through the same routes (server/batch), so later ones see earlier
+// ones' writes, and each gets its own status; a failing one doesn't stop
+// the rest. Streaming routes can't be batched.
+const MAX_BATCH_REQUESTS = 1000;
+const BATCH_METHODS = ['GET', 'POST', 'PUT', 'PATCH', 'DELETE'];
+const UNBATCHABLE = [
+  /^\/api\/batch(\/|$)/,
+  /^\/api\/notifications\/stream(\/|$)/,
+  /^\/api\/activities\/export(\/|$)/,
+  /^\/api\/files\/upload(\/|$)/,
+  /^\/api\/files\/[^/]+\/download(\/|$)/
+];
+
+// Why a batch item can't be dispatched, if it can't
+const batchItemError = (item) => {
+  if (!item || typeof item !== 'object' || typeof item.path !== 'string') {
+    return 'Each request needs a method and a path';
+  }
+  if (!BATCH_METHODS.includes(String(item.method).toUpperCase())) {
+    return `method must be one of ${BATCH_METHODS.join(', ')}`;
+  }
+  const pathname = item.path.split('?')[0];
+  if (!pathname.startsWith('/api/') || UNBATCHABLE.some((pattern) => pattern.test(pathname))) {
+    return `${pathname} cannot be batched`;
+  }
+  if (item.headers !== undefined && (typeof item.headers !== 'object' || item.headers === null)) {
+    return 'headers must be an object';
+  }
+  return null;
+};
+
+app.post('/api/batch', async (req, res, next) => {
+  const { requests } = req.body;
+
+  // Simple validation
+  if (!Array.isArray(requests) || requests.length === 0) {
+    return res.status(400).json({ message: 'requests must be a non-empty array' });
+  }
+  if (requests.length > MAX_BATCH_REQUESTS) {
+    return res.status(400).json({ message: `At most ${MAX_BATCH_REQUESTS} requests per batch` });
+  }
+
+  try {
+    const responses = [];
+    for (const item of requests) {
+      const error = batchItemError(item);
+      const response = error
+        ? { status: 400, body: { message: error } }
+        : await dispatch(app, req, { ...item, method: item.method.toUpperCase() });
+      responses.push(item && item.id !== undefined ? { id: item.id, ...response } : response);
+    }
+    res.json({ responses });
+  } catch (err) {
+    next(err);
+  }
+});
+
 // Basic error handling
 app.use((err, req, res, next) => {
   console.error(err.stack);
+  routeMetrics.error(req.method, routeOf(req) || 'unmatched');
   res.status(500).json({ message: 'Something went wrong!' });
 });
 
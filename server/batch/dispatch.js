@@ -0,0 +1,104 @@
+const http = require('http');
+
+// Request headers a sub-request inherits from the batch request: who is
+// asking, not how the batch itself was encoded
+const FORWARDED_HEADERS = ['authorization', 'cookie', 'x-user-id'];
+// Request headers an item may not set: its response is embedded in the
+// batch's JSON, so it has to be the whole entity, uncompressed
+const REFUSED_HEADERS = ['accept-encoding', 'if-none-match', 'range'];
+// Response headers passed back with a sub-response
+const KEPT_HEADERS = ['link', 'location', 'x-next-cursor'];
+
+// Run one sub-request through `app` in-process and resolve with its status,
+// kept headers and body (parsed when JSON). The request looks to the
+// routes like one that arrived on `parent`'s connection with its JSON body
+// already parsed; the response is collected in memory instead of being
+// written to the socket. Routes that read or write streams of their own
+// (uploads, downloads, SSE) are not meant to be dispatched this way.
+function dispatch(app, parent, { method, path, body, headers = {} }) {
+  return new Promise((resolve) => {
+    const req = new http.IncomingMessage(parent.socket);
+    req.method = method;
+    req.url = path;
+    req.headers = { 'content-type': 'application/json' };
+    for (const name of FORWARDED_HEADERS) {
+      if (parent.headers[name] !== undefined) {
+        req.headers[name] = parent.headers[name];
+      }
+    }
+    for (const [name, value] of Object.entries(headers)) {
+      if (!REFUSED_HEADERS.includes(name.toLowerCase())) {
+        req.headers[name.toLowerCase()] = String(value);
+      }
+    }
+    // Marks the body as parsed, so express.json() leaves it alone
+    req._body = true;
+    req.body = body === undefined ? {} : body;
+
+    const res = new http.ServerResponse(req);
+    const chunks = [];
+    let finished = false;
+    const collect = (chunk, encoding) => {
+      if (chunk !== undefined && chunk !== null && typeof chunk !== 'function') {
+        chunks.push(Buffer.isBuffer(chunk) ? chunk : Buffer.from(chunk, typeof encoding === 'string' ? encoding : 'utf8'));
+      }
+    };
+    res.write = (chunk, encoding, callback) => {
+      collect(chunk, encoding);
+      const done = [encoding, callback].find((arg) => typeof arg === 'function');
+      if (done) {
+        process.nextTick(done);
+      }
+      return true;
+    };
+    res.end = (chunk, encoding, callback) => {
+      if (finished) {
+        return res;
+      }
+      finished = true;
+      collect(chunk, encoding);
+      res.finished = true;
+      resolve(subResponse(res, Buffer.concat(chunks)));
+      res.emit('finish');
+      const done = [chunk, encoding, callback].find((arg) => typeof arg === 'function');
+      if (done) {
+        process.nextTick(done);
+      }
+      return res;
+    };
+
+    app.handle(req, res, (err) => {
+      res.statusCode = err ? 500 : 404;
+      res.setHeader('Content-Type', 'application/json; charset=utf-8');
+      res.end(JSON.stringify({ message: err ? 'Something went wrong!' : `Cannot ${method} ${path}` }));
+    });
+  });
+}
+
+function subResponse(res, raw) {
+  const response = { status: res.statusCode };
+  const headers = {};
+  for (const name of KEPT_HEADERS) {
+    if (res.hasHeader(name)) {
+      headers[name] = String(res.getHeader(name));
+    }
+  }
+  if (Object.keys(headers).length > 0) {
+    response.headers = headers;
+  }
+  const contentType = String(res.getHeader('Content-Type') || '');
+  if (raw.length === 0) {
+    response.body = null;
+  } else if (contentType.includes('json')) {
+    try {
+      response.body = JSON.parse(raw.toString('utf8'));
+    } catch (err) {
+      return { status: 500, body: { message: 'Sub-response is not valid JSON' } };
+    }
+  } else {
+    response.body = raw.toString('utf8');
+  }
+  return response;
+}
+
+module.exports = { dispatch };
@@ -0,0 +1,3 @@
+const { dispatch } = require('./dispatch');
+
+module.exports = { dispatch };
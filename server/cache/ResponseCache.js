@@ -0,0 +1,132 @@
+// LRU of serialized GET responses, tagged by the resource types they read.
+//
+// Entries are kept in a Map in recency order and evicted oldest first once
+// their bytes (body plus any compressed variants) exceed `maxBytes`. Each
+// resource type keeps the keys of the entries that depend on it, so a write
+// drops exactly those. Every invalidation also bumps the type's generation:
+// a response computed while a write happened is not stored.
+class ResponseCache {
+  constructor({ maxBytes = 32 * 1024 * 1024, now = Date.now } = {}) {
+    this.maxBytes = maxBytes;
+    this.now = now;
+    this.entries = new Map();
+    this.byType = new Map();
+    this.generations = new Map();
+    this.bytes = 0;
+    this.hits = 0;
+    this.misses = 0;
+  }
+
+  get size() {
+    return this.entries.size;
+  }
+
+  generation(types) {
+    let sum = 0;
+    for (const type of types) {
+      sum += this.generations.get(type) || 0;
+    }
+    return sum;
+  }
+
+  // The live entry for `key`, marked most recently used.
+  get(key) {
+    const entry = this.entries.get(key);
+    if (!entry || (entry.expiresAt && entry.expiresAt <= this.now())) {
+      if (entry) {
+        this.delete(key);
+      }
+      this.misses += 1;
+      return null;
+    }
+    this.entries.delete(key);
+    this.entries.set(key, entry);
+    this.hits += 1;
+    return entry;
+  }
+
+  // Store `body` (a Buffer) and the `headers` sent with it unless one of
+  // `types` changed since `generation` was read. Returns the entry, or null
+  // when not stored.
+  set(key, { body, hash, contentType, headers = {}, types, generation, ttlMs }) {
+    if (generation !== this.generation(types) || body.length > this.maxBytes) {
+      return null;
+    }
+    this.delete(key);
+    const entry = {
+      key,
+      body,
+      hash,
+      contentType,
+      headers,
+      types,
+      variants: new Map(),
+      bytes: body.length,
+      expiresAt: ttlMs ? this.now() + ttlMs : 0
+    };
+    this.entries.set(key, entry);
+    for (const type of types) {
+      let keys = this.byType.get(type);
+      if (!keys) {
+        keys = new Set();
+        this.byType.set(type, keys);
+      }
+      keys.add(key);
+    }
+    this.bytes += entry.bytes;
+    this.evict();
+    return entry;
+  }
+
+  // Cache a compressed form of a stored entry's body.
+  addVariant(entry, encoding, body) {
+    if (this.entries.get(entry.key) !== entry) {
+      return;
+    }
+    entry.variants.set(encoding, body);
+    entry.bytes += body.length;
+    this.bytes += body.length;
+    this.evict();
+  }
+
+  delete(key) {
+    const entry = this.entries.get(key);
+    if (!entry) {
+      return;
+    }
+    this.entries.delete(key);
+    for (const type of entry.types) {
+      const keys = this.byType.get(type);
+      keys.delete(key);
+      if (keys.size === 0) {
+        this.byType.delete(type);
+      }
+    }
+    this.bytes -= entry.bytes;
+  }
+
+  invalidate(type) {
+    this.generations.set(type, (this.generations.get(type) || 0) + 1);
+    for (const key of this.byType.get(type) || []) {
+      this.delete(key);
+    }
+  }
+
+  evict() {
+    while (this.bytes > this.maxBytes) {
+      this.delete(this.entries.keys().next().value);
+    }
+  }
+
+  clear() {
+    for (const key of Array.from(this.entries.keys())) {
+      this.delete(key);
+    }
+  }
+
+  stats() {
+    return { entries: this.entries.size, bytes: this.bytes, maxBytes: this.maxBytes, hits: this.hits, misses: this.misses };
+  }
+}
+
+module.exports = ResponseCache;
@@ -0,0 +1,20 @@
+const ResponseCache = require('./ResponseCache');
+const { responseCache, negotiateEncoding, etagMatches } = require('./middleware');
+const { collections } = require('../store');
+const { activities } = require('../activity');
+
+const MAX_BYTES = Number(process.env.RESPONSE_CACHE_MAX_BYTES) || 32 * 1024 * 1024;
+
+// Shared cache behind the read endpoints. Resource types are the store
+// collection names plus 'activities'; any write to one drops the cached
+// responses that read it.
+const responses = new ResponseCache({ maxBytes: MAX_BYTES });
+for (const [type, store] of Object.entries(collections)) {
+  store.on('change', () => responses.invalidate(type));
+  store.on('clear', () => responses.invalidate(type));
+}
+for (const event of ['append', 'cleanup', 'clear']) {
+  activities.on(event, () => responses.invalidate('activities'));
+}
+
+module.exports = { ResponseCache, responses, responseCache, negotiateEncoding, etagMatches };
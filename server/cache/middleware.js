@@ -0,0 +1,193 @@
+const crypto = require('crypto');
+const util = require('util');
+const zlib = require('zlib');
+
+const ENCODINGS = ['br', 'gzip'];
+// Response headers that belong to the cached representation
+const KEPT_HEADERS = ['Link', 'X-Next-Cursor'];
+const brotliCompress = util.promisify(zlib.brotliCompress);
+const gzip = util.promisify(zlib.gzip);
+// Compression runs on the libuv threadpool, off the event loop
+const COMPRESS = {
+  br: (body) => brotliCompress(body, {
+    params: {
+      [zlib.constants.BROTLI_PARAM_MODE]: zlib.constants.BROTLI_MODE_TEXT,
+      [zlib.constants.BROTLI_PARAM_QUALITY]: 5,
+      [zlib.constants.BROTLI_PARAM_SIZE_HINT]: body.length
+    }
+  }),
+  gzip: (body) => gzip(body, { level: 6 })
+};
+// Compressions in flight, by entry and encoding, so concurrent misses for
+// the same variant share one
+const compressing = new WeakMap();
+
+// The preferred supported content-coding in an Accept-Encoding header, or
+// null for identity. Brotli wins ties.
+function negotiateEncoding(header) {
+  if (!header) {
+    return null;
+  }
+  const weights = new Map();
+  for (const part of header.split(',')) {
+    const [name, ...params] = part.trim().toLowerCase().split(';');
+    const q = params.map((param) => /^\s*q=([\d.]+)\s*$/.exec(param)).find(Boolean);
+    weights.set(name, q ? Number(q[1]) : 1);
+  }
+  let best = null;
+  let bestWeight = 0;
+  for (const encoding of ENCODINGS) {
+    const weight = weights.has(encoding) ? weights.get(encoding) : (weights.get('*') || 0);
+    if (weight > bestWeight) {
+      best = encoding;
+      bestWeight = weight;
+    }
+  }
+  return best;
+}
+
+// If-None-Match uses the weak comparison: W/ prefixes are ignored.
+function etagMatches(header, etag) {
+  if (!header) {
+    return false;
+  }
+  const tag = etag.replace(/^W\//, '');
+  return header.split(',').some((candidate) => {
+    const value = candidate.trim();
+    return value === '*' || value.replace(/^W\//, '') === tag;
+  });
+}
+
+function addVary(res, field) {
+  const vary = res.getHeader('Vary');
+  res.setHeader('Vary', vary ? `${vary}, ${field}` : field);
+}
+
+// The `encoding` variant of an entry's body, compressed on first use and
+// kept with the entry.
+function compressVariant(cache, entry, encoding) {
+  let pending = compressing.get(entry);
+  if (!pending) {
+    pending = new Map();
+    compressing.set(entry, pending);
+  }
+  if (!pending.has(encoding)) {
+    const done = () => pending.delete(encoding);
+    pending.set(encoding, COMPRESS[encoding](entry.body).then((body) => {
+      done();
+      if (cache) {
+        cache.addVariant(entry, encoding, body);
+      } else {
+        entry.variants.set(encoding, body);
+      }
+      return body;
+    }, (err) => {
+      done();
+      throw err;
+    }));
+  }
+  return pending.get(encoding);
+}
+
+function sendBody(req, res, body, encoding) {
+  if (encoding) {
+    res.setHeader('Content-Encoding', encoding);
+  }
+  res.setHeader('Content-Length', body.length);
+  return res.end(req.method === 'HEAD' ? undefined : body);
+}
+
+// Each coding is its own representation with a strong ETag, compressed
+// variants getting a suffixed tag. The tag is known without compressing,
+// so a 304 never waits on zlib; a variant not compressed yet is sent once
+// the threadpool is done, or uncompressed if compression fails.
+function sendEntry(req, res, entry, { cache, minCompressBytes }) {
+  let encoding = negotiateEncoding(req.get('accept-encoding'));
+  if (entry.body.length < minCompressBytes) {
+    encoding = null;
+  }
+  const etag = encoding ? `"${entry.hash}-${encoding}"` : `"${entry.hash}"`;
+  for (const [name, value] of Object.entries(entry.headers || {})) {
+    res.setHeader(name, value);
+  }
+  res.setHeader('ETag', etag);
+  res.setHeader('Cache-Control', 'no-cache');
+  addVary(res, 'Accept-Encoding');
+  if (etagMatches(req.get('if-none-match'), etag)) {
+    res.statusCode = 304;
+    return res.end();
+  }
+  res.statusCode = 200;
+  res.setHeader('Content-Type', entry.contentType);
+  if (!encoding) {
+    return sendBody(req, res, entry.body, null);
+  }
+  const variant = entry.variants.get(encoding);
+  if (variant) {
+    return sendBody(req, res, variant, encoding);
+  }
+  compressVariant(cache, entry, encoding).then(
+    (body) => sendBody(req, res, body, encoding),
+    () => {
+      res.setHeader('ETag', `"${entry.hash}"`);
+      sendBody(req, res, entry.body, null);
+    }
+  );
+  return res;
+}
+
+// Conditional GET, compression and caching for JSON read endpoints.
+//
+// Every 200 JSON GET gets a strong ETag (answering If-None-Match with 304)
+// and a gzip or brotli body when the client accepts one. Responses of
+// routes matched by `rules` ({ prefix, types, ttlMs }) are kept in `cache`
+// under the `scope(req)` and URL, with their compressed variants, until a
+// write to one of `types` invalidates them; hits skip the route handler.
+// Rules with no types opt a prefix out of caching.
+function responseCache(cache, { rules = [], scope = () => '', minCompressBytes = 1024 } = {}) {
+  const options = { cache, minCompressBytes };
+  return (req, res, next) => {
+    if (req.method !== 'GET' && req.method !== 'HEAD') {
+      return next();
+    }
+    const rule = rules.find(({ prefix }) => req.path === prefix || req.path.startsWith(`${prefix}/`));
+    const types = rule && rule.types && rule.types.length > 0 ? rule.types : null;
+    const key = types ? `${scope(req)} ${req.originalUrl}` : null;
+    if (key) {
+      const entry = cache.get(key);
+      if (entry) {
+        return sendEntry(req, res, entry, options);
+      }
+    }
+
+    const generation = types ? cache.generation(types) : 0;
+    const send = res.send;
+    res.send = function sendCached(body) {
+      res.send = send;
+      const contentType = res.getHeader('Content-Type');
+      if (res.statusCode !== 200 || !(typeof body === 'string' || Buffer.isBuffer(body)) ||
+          !contentType || !String(contentType).includes('json')) {
+        return send.call(this, body);
+      }
+      const buffer = Buffer.from(body);
+      const headers = {};
+      for (const name of KEPT_HEADERS) {
+        if (res.hasHeader(name)) {
+          headers[name] = res.getHeader(name);
+        }
+      }
+      const fields = {
+        body: buffer,
+        hash: crypto.createHash('sha1').update(buffer).digest('base64url'),
+        contentType: String(contentType),
+        headers
+      };
+      const entry = (key && cache.set(key, { ...fields, types, generation, ttlMs: rule.ttlMs })) ||
+        { ...fields, variants: new Map() };
+      return sendEntry(req, res, entry, { cache: entry.key ? cache : null, minCompressBytes });
+    };
+    next();
+  };
+}
+
+module.exports = { responseCache, negotiateEncoding, etagMatches };
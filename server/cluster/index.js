@@ -0,0 +1,21 @@
+const os = require('os');
+const Primary = require('./primary');
+const { joinCluster, drainOnShutdown } = require('./worker');
+
+// Number of worker processes for a CLUSTER_WORKERS setting: "auto" for one
+// per core, a count, or 0 (unset) to serve from a single process.
+function workerCount(setting) {
+  if (!setting) {
+    return 0;
+  }
+  if (setting === 'auto') {
+    return os.availableParallelism ? os.availableParallelism() : os.cpus().length;
+  }
+  const count = parseInt(setting, 10);
+  if (!(count >= 0)) {
+    throw new Error(`CLUSTER_WORKERS must be "auto" or a number, got ${setting}`);
+  }
+  return count;
+}
+
+module.exports = { Primary, joinCluster, drainOnShutdown, workerCount };
@@ -0,0 +1,223 @@
+const cluster = require('cluster');
+const { collections } = require('../store');
+const { activities } = require('../activity');
+const { configureBlobCollection } = require('../files');
+
+const SNAPSHOT_BATCH = 10000;
+const REFORK_DELAY_MS = 1000;
+const BLOB_COLLECTION_DELAY_MS = 60 * 1000;
+
+// The cluster primary: forks the HTTP workers and holds the state they share.
+//
+// The primary keeps the authoritative copy of every collection and is the
+// only writer of the activity log. A worker starts from a snapshot of the
+// collections, then sends each local write here; the primary applies it and
+// broadcasts it to every worker, the writer included, so all copies see
+// writes in the primary's order. Activity records are written by the primary
+// and indexed by the workers straight from the segment files.
+//
+// SIGHUP replaces the workers one at a time, each only once its replacement
+// is listening; SIGTERM and SIGINT drain them all and exit.
+//
+// Every worker process gets an id partition of its own, held until its IPC
+// channel closes (so after its last write has arrived). There are twice as
+// many partitions as slots, so a replacement never shares one with the
+// worker it replaces while that one drains.
+class Primary {
+  constructor({ workers, log = console }) {
+    this.size = workers;
+    this.log = log;
+    this.slots = new Map();
+    this.ready = new Set();
+    this.partitions = new Set();
+    this.partitionCount = 2 * workers;
+    this.restarting = false;
+    this.stopping = false;
+  }
+
+  start() {
+    activities.open();
+    configureBlobCollection({ delayMs: BLOB_COLLECTION_DELAY_MS });
+    process.on('SIGHUP', () => this.restart());
+    process.on('SIGTERM', () => this.stop());
+    process.on('SIGINT', () => this.stop());
+    const forks = [];
+    for (let slot = 0; slot < this.size; slot += 1) {
+      forks.push(listening(this.fork(slot)));
+    }
+    return Promise.all(forks).then(() => {
+      this.log.log(`Cluster ready with ${this.size} workers`);
+    });
+  }
+
+  fork(slot) {
+    const partition = this.freePartition();
+    const worker = cluster.fork({ CLUSTER_PARTITION: String(partition), CLUSTER_PARTITIONS: String(this.partitionCount) });
+    this.partitions.add(partition);
+    this.slots.set(slot, worker);
+    worker.on('message', (message) => this.receive(worker, message));
+    worker.on('disconnect', () => {
+      this.ready.delete(worker);
+      this.partitions.delete(partition);
+    });
+    worker.on('exit', (code, signal) => {
+      this.ready.delete(worker);
+      if (this.stopping || this.slots.get(slot) !== worker) {
+        return;
+      }
+      this.log.warn(`Worker ${worker.process.pid} exited (${signal || code}), starting a new one`);
+      setTimeout(() => {
+        if (!this.stopping && this.slots.get(slot) === worker) {
+          this.fork(slot);
+        }
+      }, REFORK_DELAY_MS);
+    });
+    return worker;
+  }
+
+  freePartition() {
+    for (let partition = 0; partition < this.partitionCount; partition += 1) {
+      if (!this.partitions.has(partition)) {
+        return partition;
+      }
+    }
+    throw new Error('no free id partition');
+  }
+
+  receive(worker, message) {
+    switch (message.type) {
+      case 'state:snapshot':
+        this.sendSnapshot(worker);
+        break;
+      case 'state:change':
+        this.applyChange(message);
+        this.broadcast({ ...message, origin: worker.process.pid });
+        break;
+      case 'activity:append':
+        this.broadcast({ type: 'activity:ingest', record: message.record, ...activities.write(message.record) });
+        break;
+      case 'activity:cleanup':
+        worker.send({ type: 'activity:cleaned', requestId: message.requestId, result: this.cleanup(message.options) });
+        break;
+      case 'activity:clear':
+        activities.clear();
+        this.broadcast({ type: 'activity:forget-all' });
+        break;
+      case 'worker:drained':
+        this.log.log(`Worker ${worker.process.pid} drained`);
+        break;
+      default:
+        break;
+    }
+  }
+
+  // Every collection in batches, sent in one go so no write can land between
+  // the snapshot and the first broadcast the worker receives.
+  sendSnapshot(worker) {
+    worker.send({ type: 'state:reset' });
+    for (const [collection, store] of Object.entries(collections)) {
+      let docs = [];
+      for (const doc of store.items.values()) {
+        docs.push(doc);
+        if (docs.length === SNAPSHOT_BATCH) {
+          worker.send({ type: 'state:docs', collection, docs });
+          docs = [];
+        }
+      }
+      if (docs.length > 0) {
+        worker.send({ type: 'state:docs', collection, docs });
+      }
+    }
+    worker.send({ type: 'state:ready' });
+    this.ready.add(worker);
+  }
+
+  applyChange({ collection, id, doc }) {
+    const store = collections[collection];
+    if (doc) {
+      store.put(doc);
+    } else {
+      store.remove(id);
+    }
+  }
+
+  cleanup(options) {
+    const before = activities.open().segments.map((segment) => segment.start);
+    const result = activities.cleanup(options);
+    if (result.segments > 0) {
+      const kept = new Set(activities.segments.map((segment) => segment.start));
+      this.broadcast({ type: 'activity:forget', starts: before.filter((start) => !kept.has(start)) });
+    }
+    return result;
+  }
+
+  broadcast(message) {
+    for (const worker of this.ready) {
+      worker.send(message);
+    }
+  }
+
+  // Replace the workers one at a time; a replacement that fails to come up
+  // stops the restart and gives its slot back to the worker it was to
+  // replace, which keeps running with the remaining ones.
+  async restart() {
+    if (this.restarting || this.stopping) {
+      return;
+    }
+    this.restarting = true;
+    this.log.log('Rolling restart started');
+    try {
+      for (const [slot, previous] of Array.from(this.slots)) {
+        try {
+          await listening(this.fork(slot));
+        } catch (err) {
+          if (!previous.isDead()) {
+            this.slots.set(slot, previous);
+          }
+          throw err;
+        }
+        await retire(previous);
+      }
+      this.log.log('Rolling restart finished');
+    } catch (err) {
+      this.log.error(`Rolling restart stopped: ${err.message}`);
+    } finally {
+      this.restarting = false;
+    }
+  }
+
+  async stop() {
+    if (this.stopping) {
+      return;
+    }
+    this.stopping = true;
+    await Promise.all(Array.from(this.slots.values()).map(retire));
+    activities.close();
+    process.exit(0);
+  }
+}
+
+function listening(worker) {
+  return new Promise((resolve, reject) => {
+    const exited = (code) => reject(new Error(`worker ${worker.process.pid} exited with ${code} before listening`));
+    worker.once('exit', exited);
+    worker.once('listening', () => {
+      worker.removeListener('exit', exited);
+      resolve(worker);
+    });
+  });
+}
+
+// Ask a worker to drain and wait for it to exit.
+function retire(worker) {
+  return new Promise((resolve) => {
+    if (worker.isDead() || !worker.isConnected()) {
+      resolve();
+      return;
+    }
+    worker.once('exit', resolve);
+    worker.send({ type: 'shutdown' });
+  });
+}
+
+module.exports = Primary;
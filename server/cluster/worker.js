@@ -0,0 +1,169 @@
+const net = require('net');
+const { collections } = require('../store');
+const { activities } = require('../activity');
+const { configureBlobCollection } = require('../files');
+const { hub } = require('../notifications');
+
+// Join the primary's shared state (see Primary): ids are partitioned so
+// workers never hand out the same one, the collections are loaded
+// from the primary's snapshot, and from then on local writes go to the
+// primary and everyone's writes come back in the primary's order. Derived
+// views (search, dashboard, notifications, the response cache) follow the
+// replicated writes through the usual store events. Resolves once the
+// snapshot is loaded.
+//
+// A write is visible to the worker that made it at once and to the others a
+// round trip later. When two workers write the same document concurrently,
+// each ends up with whichever write reached the primary last.
+function joinCluster({ partition, partitions }) {
+  for (const store of Object.values(collections)) {
+    store.partitionIds(partitions, partition);
+  }
+  activities.partitionIds(partitions, partition);
+  configureBlobCollection({ enabled: false });
+
+  let requestId = 0;
+  const cleanups = new Map();
+  activities.follow({
+    append: (record) => process.send({ type: 'activity:append', record }),
+    cleanup: (options) => new Promise((resolve) => {
+      requestId += 1;
+      cleanups.set(requestId, resolve);
+      process.send({ type: 'activity:cleanup', requestId, options });
+    }),
+    clear: () => process.send({ type: 'activity:clear' })
+  });
+
+  // Local writes waiting for their echo, by op number
+  let op = 0;
+  const pending = new Map();
+  let applying = false;
+
+  const replicate = () => {
+    for (const [collection, store] of Object.entries(collections)) {
+      store.on('change', ({ doc, previous }) => {
+        if (applying) {
+          return;
+        }
+        op += 1;
+        pending.set(op, doc);
+        process.send({ type: 'state:change', collection, op, id: (doc || previous).id, doc });
+      });
+    }
+  };
+
+  // Our own write is already applied unless another write to the same
+  // document got in since; anything else is applied as the primary has it.
+  const apply = (message) => {
+    const store = collections[message.collection];
+    if (message.origin === process.pid) {
+      const produced = pending.get(message.op);
+      pending.delete(message.op);
+      if (store.get(message.id) === produced) {
+        return;
+      }
+    }
+    applying = true;
+    try {
+      if (message.doc) {
+        store.put(message.doc);
+      } else {
+        store.remove(message.id);
+      }
+    } finally {
+      applying = false;
+    }
+  };
+
+  return new Promise((resolve) => {
+    process.on('message', (message) => {
+      switch (message.type) {
+        case 'state:reset':
+          for (const store of Object.values(collections)) {
+            store.clear();
+          }
+          break;
+        case 'state:docs':
+          for (const doc of message.docs) {
+            collections[message.collection].put(doc);
+          }
+          break;
+        case 'state:ready':
+          // Opened only now: the files hold every record written before the
+          // snapshot, and later ones arrive as activity:ingest.
+          activities.open();
+          replicate();
+          resolve();
+          break;
+        case 'state:change':
+          apply(message);
+          break;
+        case 'activity:ingest':
+          activities.ingest(message);
+          break;
+        case 'activity:forget':
+          activities.forget(message.starts);
+          break;
+        case 'activity:forget-all':
+          activities.forgetAll();
+          break;
+        case 'activity:cleaned':
+          cleanups.get(message.requestId)(message.result);
+          cleanups.delete(message.requestId);
+          break;
+        default:
+          break;
+      }
+    });
+    process.send({ type: 'state:snapshot' });
+  });
+}
+
+// Drain `server` when the primary asks (or on SIGTERM): stop accepting
+// connections, answer further requests with Connection: close, end event
+// streams, and exit once every connection is gone or after `timeoutMs`.
+// Writes made while draining still reach the primary before the exit.
+function drainOnShutdown(server, { timeoutMs }) {
+  let draining = false;
+  server.prependListener('request', (req, res) => {
+    if (draining) {
+      res.setHeader('Connection', 'close');
+    }
+  });
+
+  let exiting = false;
+  const exit = () => {
+    if (!exiting) {
+      exiting = true;
+      process.send({ type: 'worker:drained' }, () => process.exit(0));
+    }
+  };
+  const shutdown = () => {
+    if (draining) {
+      return;
+    }
+    draining = true;
+    // Stop accepting without http.Server#close, which also drops idle
+    // keep-alive connections and so races a client sending its next request
+    // on one. Those get a Connection: close answer or run into the
+    // keep-alive timeout instead.
+    net.Server.prototype.close.call(server, exit);
+    hub.closeAll();
+    setTimeout(() => {
+      server.closeAllConnections();
+      exit();
+    }, timeoutMs).unref();
+  };
+
+  process.on('message', (message) => {
+    if (message.type === 'shutdown') {
+      shutdown();
+    }
+  });
+  process.on('SIGTERM', shutdown);
+  process.on('SIGINT', shutdown);
+  // Without the primary there is nothing to replicate to
+  process.on('disconnect', () => process.exit(0));
+}
+
+module.exports = { joinCluster, drainOnShutdown };
@@ -0,0 +1,86 @@
+const crypto = require('crypto');
+const fs = require('fs');
+const path = require('path');
+const { pipeline } = require('stream/promises');
+
+const HASH_ALGORITHM = 'sha256';
+const CHUNK_BYTES = 1024 * 1024;
+
+// Content-addressed file storage: every blob lives at <dir>/<ab>/<sha256>.
+//
+// Uploads stream through the hash into a temporary file and are renamed
+// into place once the digest is known, so memory stays flat whatever the
+// size and identical content is stored once. Blobs are immutable; callers
+// keep the metadata (names, owners) and decide when a hash is unreferenced.
+class BlobStore {
+  constructor({ dir }) {
+    this.dir = dir;
+    this.tmpDir = path.join(dir, 'tmp');
+    this.ready = false;
+    this.sequence = 0;
+  }
+
+  // Create the directories and drop partial uploads left by a crash.
+  open() {
+    if (!this.ready) {
+      fs.rmSync(this.tmpDir, { recursive: true, force: true });
+      fs.mkdirSync(this.tmpDir, { recursive: true });
+      this.ready = true;
+    }
+    return this;
+  }
+
+  path(hash) {
+    return path.join(this.dir, hash.slice(0, 2), hash);
+  }
+
+  has(hash) {
+    return fs.existsSync(this.path(hash));
+  }
+
+  // Store the bytes of a readable stream; resolves to { hash, size, created }
+  // where `created` is false when the content was already stored.
+  async write(source) {
+    this.open();
+    this.sequence += 1;
+    const tmp = path.join(this.tmpDir, `${process.pid}-${this.sequence}`);
+    const hash = crypto.createHash(HASH_ALGORITHM);
+    let size = 0;
+    try {
+      await pipeline(source, async function* (chunks) {
+        for await (const chunk of chunks) {
+          hash.update(chunk);
+          size += chunk.length;
+          yield chunk;
+        }
+      }, fs.createWriteStream(tmp, { highWaterMark: CHUNK_BYTES }));
+    } catch (err) {
+      fs.rmSync(tmp, { force: true });
+      throw err;
+    }
+
+    // Synchronous from here on, so the caller records its reference before
+    // any other request can see the blob unreferenced and remove it.
+    const digest = hash.digest('hex');
+    const target = this.path(digest);
+    const created = !fs.existsSync(target);
+    if (created) {
+      fs.mkdirSync(path.dirname(target), { recursive: true });
+      fs.renameSync(tmp, target);
+    } else {
+      fs.rmSync(tmp, { force: true });
+    }
+    return { hash: digest, size, created };
+  }
+
+  // Bytes start..end (inclusive, both optional) of a stored blob.
+  createReadStream(hash, { start, end } = {}) {
+    return fs.createReadStream(this.path(hash), { start, end, highWaterMark: CHUNK_BYTES });
+  }
+
+  remove(hash) {
+    fs.rmSync(this.path(hash), { force: true });
+  }
+}
+
+module.exports = BlobStore;
@@ -0,0 +1,39 @@
+const path = require('path');
+const BlobStore = require('./BlobStore');
+const { parseRange } = require('./range');
+const { files } = require('../store');
+const { DATA_DIR } = require('../activity');
+
+// Blobs behind the /api/files routes. File records reference a blob by
+// hash; the last record to let go of a hash removes the blob.
+const blobs = new BlobStore({ dir: path.join(DATA_DIR, 'files') });
+
+// In one process a blob can go as soon as its last record does. With
+// several processes an upload deduplicated against the blob elsewhere may
+// not have replicated yet, so cluster workers leave removal to the primary,
+// which waits `delayMs` and checks again.
+const collection = { enabled: true, delayMs: 0 };
+
+function configureBlobCollection(options) {
+  Object.assign(collection, options);
+}
+
+function collectBlob(hash) {
+  if (files.count({ hash }) === 0) {
+    blobs.remove(hash);
+  }
+}
+
+files.on('change', ({ doc, previous }) => {
+  const released = previous && previous.hash;
+  if (!released || (doc && doc.hash === released) || !collection.enabled) {
+    return;
+  }
+  if (collection.delayMs > 0) {
+    setTimeout(() => collectBlob(released), collection.delayMs).unref();
+  } else {
+    collectBlob(released);
+  }
+});
+
+module.exports = { BlobStore, blobs, parseRange, configureBlobCollection };
@@ -0,0 +1,31 @@
+// Parse a Range request header against a representation of `size` bytes.
+//
+// Returns null when the whole body should be sent (no header, another unit,
+// malformed or multiple ranges), { start, end } (inclusive) for one
+// satisfiable range, or false when the range cannot be satisfied.
+function parseRange(header, size) {
+  const match = /^bytes=(\d*)-(\d*)$/.exec((header || '').trim());
+  if (!match || (match[1] === '' && match[2] === '')) {
+    return null;
+  }
+  let start;
+  let end;
+  if (match[1] === '') {
+    // Suffix range: the last N bytes
+    const length = Number(match[2]);
+    if (length === 0) {
+      return false;
+    }
+    start = Math.max(0, size - length);
+    end = size - 1;
+  } else {
+    start = Number(match[1]);
+    end = match[2] === '' ? size - 1 : Math.min(Number(match[2]), size - 1);
+  }
+  if (start >= size || start > end) {
+    return false;
+  }
+  return { start, end };
+}
+
+module.exports = { parseRange };
@@ -0,0 +1,50 @@
+const cluster = require('cluster');
+const { workerCount } = require('./cluster');
+
+const PORT = process.env.PORT || 5000;
+const SHUTDOWN_TIMEOUT_MS = Number(process.env.SHUTDOWN_TIMEOUT_MS) || 30 * 1000;
+const WORKERS = workerCount(process.env.CLUSTER_WORKERS);
+
+// Cluster mode: the primary holds the shared state and forks the workers
+// (server/cluster/primary.js); it never loads the app itself.
+async function startPrimary() {
+  const store = require('./store');
+  const { Primary } = require('./cluster');
+
+  if (process.env.SEED_FILE) {
+    const loaded = await store.loadFile(process.env.SEED_FILE);
+    console.log(`Loaded ${loaded} records from ${process.env.SEED_FILE}`);
+  }
+  await new Primary({ workers: WORKERS }).start();
+}
+
+async function start() {
+  const app = require('./app');
+  const store = require('./store');
+  const { joinCluster, drainOnShutdown } = require('./cluster');
+
+  if (cluster.isWorker) {
+    // State comes from the primary, which loaded SEED_FILE
+    await joinCluster({ partition: Number(process.env.CLUSTER_PARTITION), partitions: Number(process.env.CLUSTER_PARTITIONS) });
+  } else if (process.env.SEED_FILE) {
+    // Optional NDJSON fixture, e.g. generated by benchmarks/datagen.py
+    const loaded = await store.loadFile(process.env.SEED_FILE);
+    console.log(`Loaded ${loaded} records from ${process.env.SEED_FILE}`);
+  }
+
+  // Route groups, and what only they use (search indexes, dashboard
+  // counters, ...), load on their first request (server/routes)
+  const server = app.listen(PORT, () => {
+    console.log(cluster.isWorker
+      ? `Worker ${process.pid} listening on port ${PORT} (id partition ${process.env.CLUSTER_PARTITION})`
+      : `Server running on port ${PORT}`);
+  });
+  if (cluster.isWorker) {
+    drainOnShutdown(server, { timeoutMs: SHUTDOWN_TIMEOUT_MS });
+  }
+}
+
+(WORKERS > 0 && cluster.isPrimary ? startPrimary() : start()).catch((err) => {
+  console.error(err.stack);
+  process.exit(1);
+});
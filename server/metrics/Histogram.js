@@ -0,0 +1,72 @@
+// Request latencies in seconds: 100µs (cache hits) up to 10s
+const DURATION_BUCKETS = [0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10];
+// Payload sizes in bytes: 64 B up to 16 MB in powers of four
+const SIZE_BUCKETS = [64, 256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216];
+
+// Counts of observed values per bucket of fixed upper bounds, with their
+// sum: the Prometheus histogram model. Counts are kept per bucket and only
+// made cumulative for export, so observing is a short scan of the bounds
+// and an increment. Quantiles are interpolated within the bucket they fall
+// in, so they are as precise as the bounds around them.
+class Histogram {
+  constructor(bounds) {
+    this.bounds = bounds;
+    this.counts = new Array(bounds.length + 1).fill(0);
+    this.count = 0;
+    this.sum = 0;
+  }
+
+  observe(value) {
+    const { bounds } = this;
+    let i = 0;
+    while (i < bounds.length && value > bounds[i]) {
+      i += 1;
+    }
+    this.counts[i] += 1;
+    this.count += 1;
+    this.sum += value;
+  }
+
+  // Adds `other`'s observations; both must have the same bounds.
+  merge(other) {
+    for (let i = 0; i < this.counts.length; i += 1) {
+      this.counts[i] += other.counts[i];
+    }
+    this.count += other.count;
+    this.sum += other.sum;
+    return this;
+  }
+
+  // Estimated value below which a `q` (0..1) share of observations fall.
+  // Values past the last bound are reported as the last bound.
+  quantile(q) {
+    if (this.count === 0) {
+      return 0;
+    }
+    const rank = q * this.count;
+    let seen = 0;
+    for (let i = 0; i < this.counts.length; i += 1) {
+      const count = this.counts[i];
+      if (count > 0 && seen + count >= rank) {
+        if (i === this.bounds.length) {
+          return this.bounds[i - 1];
+        }
+        const lower = i === 0 ? 0 : this.bounds[i - 1];
+        return lower + ((this.bounds[i] - lower) * (rank - seen)) / count;
+      }
+      seen += count;
+    }
+    return this.bounds[this.bounds.length - 1];
+  }
+
+  // [upper bound, observations <= bound] pairs ending with Infinity
+  cumulative() {
+    let total = 0;
+    return this.counts.map((count, i) => {
+      total += count;
+      return [i < this.bounds.length ? this.bounds[i] : Infinity, total];
+    });
+  }
+}
+
+module.exports = { Histogram, DURATION_BUCKETS, SIZE_BUCKETS };
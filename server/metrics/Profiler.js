@@ -0,0 +1,101 @@
+const inspector = require('inspector');
+
+// Functions listed in a profile summary
+const TOP_FUNCTIONS = 20;
+
+// V8's sampling CPU profiler behind a runtime switch. Off, it costs
+// nothing; on, V8 records the stack every `intervalUs`. A run stops after
+// `durationMs` at the latest so a forgotten profiler doesn't keep growing
+// the profile. The last run is kept both as a summary (self time per
+// function) and as the raw .cpuprofile for Chrome DevTools or speedscope.
+class Profiler {
+  constructor({ maxDurationMs = 5 * 60 * 1000 } = {}) {
+    this.maxDurationMs = maxDurationMs;
+    this.session = null;
+    this.current = null;
+    this.last = null;
+    this.timer = null;
+  }
+
+  get running() {
+    return this.current !== null;
+  }
+
+  post(method, params = {}) {
+    return new Promise((resolve, reject) => {
+      this.session.post(method, params, (err, result) => (err ? reject(err) : resolve(result)));
+    });
+  }
+
+  // Resolves false when a run is already in progress.
+  async start({ intervalUs = 1000, durationMs = this.maxDurationMs } = {}) {
+    if (this.session) {
+      return false;
+    }
+    this.session = new inspector.Session();
+    this.session.connect();
+    this.current = { startedAt: new Date().toISOString(), intervalUs, durationMs: Math.min(durationMs, this.maxDurationMs) };
+    try {
+      await this.post('Profiler.enable');
+      await this.post('Profiler.setSamplingInterval', { interval: intervalUs });
+      await this.post('Profiler.start');
+    } catch (err) {
+      this.session.disconnect();
+      this.session = null;
+      this.current = null;
+      throw err;
+    }
+    this.timer = setTimeout(() => this.stop().catch(() => {}), this.current.durationMs);
+    this.timer.unref();
+    return true;
+  }
+
+  // Resolves with the run's summary, or null when none was in progress.
+  async stop() {
+    if (!this.current) {
+      return null;
+    }
+    const run = this.current;
+    this.current = null;
+    clearTimeout(this.timer);
+    try {
+      const { profile } = await this.post('Profiler.stop');
+      this.last = { profile, summary: { ...run, stoppedAt: new Date().toISOString(), ...summarize(profile) } };
+      return this.last.summary;
+    } finally {
+      this.session.disconnect();
+      this.session = null;
+    }
+  }
+
+  status() {
+    return {
+      running: this.running,
+      current: this.current,
+      last: this.last ? this.last.summary : null
+    };
+  }
+}
+
+// Sample count and the functions with the most self time
+function summarize(profile) {
+  const nodes = new Map(profile.nodes.map((node) => [node.id, node]));
+  const selfUs = new Map();
+  let totalUs = 0;
+  profile.samples.forEach((id, i) => {
+    const { callFrame } = nodes.get(id);
+    const name = `${callFrame.functionName || '(anonymous)'} ${callFrame.url}:${callFrame.lineNumber + 1}`;
+    const delta = profile.timeDeltas[i] || 0;
+    selfUs.set(name, (selfUs.get(name) || 0) + delta);
+    totalUs += delta;
+  });
+  const top = Array.from(selfUs, ([name, us]) => ({
+    function: name,
+    selfMs: Math.round(us) / 1000,
+    selfPercent: totalUs > 0 ? Math.round((us / totalUs) * 1000) / 10 : 0
+  }));
+  top.sort((a, b) => b.selfMs - a.selfMs);
+  return { samples: profile.samples.length, top: top.slice(0, TOP_FUNCTIONS) };
+}
+
+module.exports = Profiler;
@@ -0,0 +1,93 @@
+const { Histogram, DURATION_BUCKETS, SIZE_BUCKETS } = require('./Histogram');
+
+// Per-route request metrics: counts by status, latency, request and response
+// size histograms and unhandled errors, keyed by method and route template
+// (`GET /api/tasks/:id`), never by concrete URL, so the number of series is
+// bounded by the routes the app defines.
+class RouteMetrics {
+  constructor() {
+    this.reset();
+  }
+
+  reset() {
+    this.series = new Map();
+    this.inFlight = 0;
+  }
+
+  seriesFor(method, route) {
+    const key = `${method} ${route}`;
+    let series = this.series.get(key);
+    if (!series) {
+      series = {
+        method,
+        route,
+        statuses: new Map(),
+        duration: new Histogram(DURATION_BUCKETS),
+        requestSize: new Histogram(SIZE_BUCKETS),
+        responseSize: new Histogram(SIZE_BUCKETS),
+        errors: 0
+      };
+      this.series.set(key, series);
+    }
+    return series;
+  }
+
+  record({ method, route, status, seconds, requestBytes, responseBytes }) {
+    const series = this.seriesFor(method, route);
+    series.statuses.set(status, (series.statuses.get(status) || 0) + 1);
+    series.duration.observe(seconds);
+    series.requestSize.observe(requestBytes);
+    series.responseSize.observe(responseBytes);
+  }
+
+  // An error that reached the app's error handler
+  error(method, route) {
+    this.seriesFor(method, route).errors += 1;
+  }
+
+  // Totals across routes and the `slowest` routes by p95 latency, in ms,
+  // for /api/dashboard/performance/metrics
+  summary({ slowest = 5 } = {}) {
+    const duration = new Histogram(DURATION_BUCKETS);
+    let total = 0;
+    let serverErrors = 0;
+    const routes = [];
+    for (const series of this.series.values()) {
+      let errors = 0;
+      for (const [status, count] of series.statuses) {
+        total += count;
+        if (status >= 500) {
+          errors += count;
+        }
+      }
+      serverErrors += errors;
+      duration.merge(series.duration);
+      routes.push({
+        route: `${series.method} ${series.route}`,
+        count: series.duration.count,
+        errors,
+        latencyMs: latencyMs(series.duration)
+      });
+    }
+    routes.sort((a, b) => b.latencyMs.p95 - a.latencyMs.p95 || b.count - a.count);
+    return {
+      total,
+      inFlight: this.inFlight,
+      errorRate: total > 0 ? Math.round((serverErrors / total) * 10000) / 10000 : 0,
+      latencyMs: latencyMs(duration),
+      slowestRoutes: routes.slice(0, slowest)
+    };
+  }
+}
+
+const ms = (seconds) => Math.round(seconds * 1e6) / 1e3;
+
+function latencyMs(histogram) {
+  return {
+    p50: ms(histogram.quantile(0.5)),
+    p95: ms(histogram.quantile(0.95)),
+    p99: ms(histogram.quantile(0.99))
+  };
+}
+
+module.exports = RouteMetrics;
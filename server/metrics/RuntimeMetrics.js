@@ -0,0 +1,44 @@
+const { monitorEventLoopDelay } = require('perf_hooks');
+
+// Process CPU, memory and event loop delay. The delay histogram is sampled
+// by libuv every `resolutionMs` and reset every `windowMs`, so its
+// quantiles describe the last window or so rather than the whole uptime.
+class RuntimeMetrics {
+  constructor({ resolutionMs = 20, windowMs = 60 * 1000 } = {}) {
+    this.loopDelay = monitorEventLoopDelay({ resolution: resolutionMs });
+    this.loopDelay.enable();
+    this.windowMs = windowMs;
+    this.resetAt = Date.now();
+  }
+
+  snapshot() {
+    const cpu = process.cpuUsage();
+    const memory = process.memoryUsage();
+    const delay = this.loopDelay;
+    const seconds = (ns) => (Number.isFinite(ns) && delay.count > 0 ? ns / 1e9 : 0);
+    const snapshot = {
+      cpuUserSeconds: cpu.user / 1e6,
+      cpuSystemSeconds: cpu.system / 1e6,
+      residentBytes: memory.rss,
+      heapUsedBytes: memory.heapUsed,
+      heapTotalBytes: memory.heapTotal,
+      startTimeSeconds: Math.round(Date.now() / 1000 - process.uptime()),
+      eventLoopDelaySeconds: {
+        0.5: seconds(delay.percentile(50)),
+        0.99: seconds(delay.percentile(99)),
+        1: seconds(delay.max)
+      }
+    };
+    if (Date.now() - this.resetAt >= this.windowMs) {
+      delay.reset();
+      this.resetAt = Date.now();
+    }
+    return snapshot;
+  }
+
+  stop() {
+    this.loopDelay.disable();
+  }
+}
+
+module.exports = RuntimeMetrics;
@@ -0,0 +1,31 @@
+const RouteMetrics = require('./RouteMetrics');
+const RuntimeMetrics = require('./RuntimeMetrics');
+const Profiler = require('./Profiler');
+const { Histogram, DURATION_BUCKETS, SIZE_BUCKETS } = require('./Histogram');
+const { instrument, routeOf } = require('./middleware');
+const { exposition, CONTENT_TYPE } = require('./prometheus');
+
+// Shared instrumentation behind /api/metrics and
+// /api/dashboard/performance/metrics. Each process counts its own requests:
+// in cluster mode a scrape sees the worker that answered it.
+const routeMetrics = new RouteMetrics();
+const runtime = new RuntimeMetrics();
+const profiler = new Profiler();
+
+const metricsText = () => exposition(routeMetrics, runtime.snapshot(), profiler);
+
+module.exports = {
+  routeMetrics,
+  runtime,
+  profiler,
+  metricsText,
+  instrument,
+  routeOf,
+  RouteMetrics,
+  RuntimeMetrics,
+  Profiler,
+  Histogram,
+  DURATION_BUCKETS,
+  SIZE_BUCKETS,
+  CONTENT_TYPE
+};
@@ -0,0 +1,73 @@
+// Routes learned per method and path, for requests that never reach a route
+// (response cache hits); forgotten wholesale past this many paths
+const MAX_LEARNED_PATHS = 10000;
+
+const byteLength = (chunk, encoding) => {
+  if (chunk === undefined || chunk === null || typeof chunk === 'function') {
+    return 0;
+  }
+  return typeof chunk === 'string' ? Buffer.byteLength(chunk, typeof encoding === 'string' ? encoding : 'utf8') : chunk.length;
+};
+
+// Template of the route that answered `req`, once routed
+const routeOf = (req) => (req.route ? `${req.baseUrl || ''}${req.route.path}` : null);
+
+// Records every request into `metrics` (RouteMetrics) once its response is
+// finished or its connection closes: status, time from arrival to the last
+// byte handed to the socket, Content-Length of the request, and bytes of
+// response body.
+//
+// Requests are labelled with the template of the route that answered them.
+// Requests answered before routing (response cache hits) take the route
+// last seen for the same method and path; anything else is 'unmatched'.
+// Mount it first so the latency covers the other middleware.
+function instrument(metrics, { maxLearnedPaths = MAX_LEARNED_PATHS } = {}) {
+  const learned = new Map();
+  return (req, res, next) => {
+    const started = process.hrtime.bigint();
+    const query = req.url.indexOf('?');
+    const key = `${req.method} ${query === -1 ? req.url : req.url.slice(0, query)}`;
+    let written = 0;
+    const { write, end } = res;
+    res.write = function countedWrite(chunk, encoding, callback) {
+      written += byteLength(chunk, encoding);
+      return write.call(this, chunk, encoding, callback);
+    };
+    res.end = function countedEnd(chunk, encoding, callback) {
+      written += byteLength(chunk, encoding);
+      return end.call(this, chunk, encoding, callback);
+    };
+    metrics.inFlight += 1;
+
+    let recorded = false;
+    const record = () => {
+      if (recorded) {
+        return;
+      }
+      recorded = true;
+      metrics.inFlight -= 1;
+      const routed = routeOf(req);
+      const route = routed || learned.get(key);
+      if (routed && routed !== learned.get(key)) {
+        if (learned.size >= maxLearnedPaths) {
+          learned.clear();
+        }
+        learned.set(key, route);
+      }
+      const length = res.getHeader('Content-Length');
+      metrics.record({
+        method: req.method,
+        route: route || 'unmatched',
+        status: res.statusCode,
+        seconds: Number(process.hrtime.bigint() - started) / 1e9,
+        requestBytes: Number(req.headers['content-length']) || 0,
+        responseBytes: length !== undefined && req.method !== 'HEAD' ? Number(length) : written
+      });
+    };
+    res.once('finish', record);
+    res.once('close', record);
+    next();
+  };
+}
+
+module.exports = { instrument, routeOf };
@@ -0,0 +1,85 @@
+// Prometheus text exposition format, version 0.0.4
+const CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8';
+
+const escapeLabel = (value) => String(value).replace(/\\/g, '\\\\').replace(/"/g, '\\"').replace(/\n/g, '\\n');
+
+const formatValue = (value) => {
+  if (value === Infinity) {
+    return '+Inf';
+  }
+  return Number.isFinite(value) ? String(value) : 'NaN';
+};
+
+function formatLabels(labels) {
+  const pairs = Object.entries(labels).map(([name, value]) => `${name}="${escapeLabel(value)}"`);
+  return pairs.length > 0 ? `{${pairs.join(',')}}` : '';
+}
+
+// Accumulates metric families; each family's samples are written under a
+// single HELP/TYPE header as the format requires.
+class Exposition {
+  constructor() {
+    this.lines = [];
+  }
+
+  family(name, type, help, samples) {
+    this.lines.push(`# HELP ${name} ${help}`, `# TYPE ${name} ${type}`);
+    for (const [suffix, labels, value] of samples) {
+      this.lines.push(`${name}${suffix}${formatLabels(labels)} ${formatValue(value)}`);
+    }
+    return this;
+  }
+
+  // `series` is [labels, Histogram] pairs
+  histogram(name, help, series) {
+    const samples = [];
+    for (const [labels, histogram] of series) {
+      for (const [bound, count] of histogram.cumulative()) {
+        samples.push(['_bucket', { ...labels, le: formatValue(bound) }, count]);
+      }
+      samples.push(['_sum', labels, histogram.sum], ['_count', labels, histogram.count]);
+    }
+    return this.family(name, 'histogram', help, samples);
+  }
+
+  toString() {
+    return `${this.lines.join('\n')}\n`;
+  }
+}
+
+// The exposition of `routes` (RouteMetrics), the process and event loop
+// figures in `runtime` (RuntimeMetrics#snapshot) and `profiler`'s state.
+function exposition(routes, runtime, profiler) {
+  const series = Array.from(routes.series.values());
+  const labelsOf = ({ method, route }) => ({ method, route });
+  const out = new Exposition();
+  const requests = [];
+  for (const entry of series) {
+    for (const [status, count] of entry.statuses) {
+      requests.push(['', { ...labelsOf(entry), status }, count]);
+    }
+  }
+  out.family('http_requests_total', 'counter', 'Requests answered, by route and status.', requests);
+  out.histogram('http_request_duration_seconds', 'Time from request arrival to the end of the response.',
+    series.map((entry) => [labelsOf(entry), entry.duration]));
+  out.histogram('http_request_size_bytes', 'Request body sizes from Content-Length.',
+    series.map((entry) => [labelsOf(entry), entry.requestSize]));
+  out.histogram('http_response_size_bytes', 'Response body sizes.',
+    series.map((entry) => [labelsOf(entry), entry.responseSize]));
+  out.family('http_request_errors_total', 'counter', 'Errors that reached the error handler.',
+    series.filter((entry) => entry.errors > 0).map((entry) => ['', labelsOf(entry), entry.errors]));
+  out.family('http_requests_in_flight', 'gauge', 'Requests being handled.', [['', {}, routes.inFlight]]);
+
+  out.family('process_cpu_user_seconds_total', 'counter', 'User CPU time.', [['', {}, runtime.cpuUserSeconds]]);
+  out.family('process_cpu_system_seconds_total', 'counter', 'System CPU time.', [['', {}, runtime.cpuSystemSeconds]]);
+  out.family('process_resident_memory_bytes', 'gauge', 'Resident set size.', [['', {}, runtime.residentBytes]]);
+  out.family('process_start_time_seconds', 'gauge', 'Start time since the epoch.', [['', {}, runtime.startTimeSeconds]]);
+  out.family('nodejs_heap_used_bytes', 'gauge', 'V8 heap in use.', [['', {}, runtime.heapUsedBytes]]);
+  out.family('nodejs_heap_total_bytes', 'gauge', 'V8 heap allocated.', [['', {}, runtime.heapTotalBytes]]);
+  out.family('nodejs_eventloop_delay_seconds', 'summary', 'Event loop delay since the last reset.',
+    Object.entries(runtime.eventLoopDelaySeconds).map(([quantile, value]) => ['', { quantile }, value]));
+  out.family('profiler_running', 'gauge', 'Whether the sampling profiler is on.', [['', {}, profiler.running ? 1 : 0]]);
+  return out.toString();
+}
+
+module.exports = { exposition, CONTENT_TYPE };
@@ -0,0 +1,174 @@
+const HEARTBEAT_MS = 25 * 1000;
+
+// Per-user unread sets and live subscribers for a notifications store.
+//
+// Unread ids are kept per user from the store's change events, so the
+// unread count is a Set size and marking everything read touches only the
+// unread notifications. Subscribers (stream connections) are grouped by
+// user: a new notification reaches just that user's connections, and count
+// changes are coalesced to one message per user per tick however many
+// notifications a request touched.
+class NotificationHub {
+  constructor({ heartbeatMs = HEARTBEAT_MS } = {}) {
+    this.heartbeatMs = heartbeatMs;
+    this.store = null;
+    this.unread = new Map();
+    this.subscribers = new Map();
+    this.connections = 0;
+    this.pendingCounts = new Set();
+    this.flushScheduled = false;
+    this.heartbeat = null;
+  }
+
+  attach(store) {
+    this.store = store;
+    this.load();
+    store.on('change', (change) => this.onChange(change));
+    store.on('clear', () => this.load());
+    return this;
+  }
+
+  load() {
+    this.unread.clear();
+    for (const notification of this.store.items.values()) {
+      if (!notification.isRead) {
+        this.unreadSet(notification.userId).add(notification.id);
+      }
+    }
+  }
+
+  unreadSet(userId) {
+    let set = this.unread.get(userId);
+    if (!set) {
+      set = new Set();
+      this.unread.set(userId, set);
+    }
+    return set;
+  }
+
+  onChange({ doc, previous }) {
+    if (previous && !previous.isRead) {
+      const set = this.unread.get(previous.userId);
+      set.delete(previous.id);
+      if (set.size === 0) {
+        this.unread.delete(previous.userId);
+      }
+    }
+    if (doc && !doc.isRead) {
+      this.unreadSet(doc.userId).add(doc.id);
+    }
+    if (doc && !previous) {
+      this.publish(doc.userId, { event: 'notification', id: doc.id, data: doc });
+    }
+    for (const userId of new Set([doc && doc.userId, previous && previous.userId])) {
+      if (userId !== undefined && userId !== null) {
+        this.countChanged(userId);
+      }
+    }
+  }
+
+  unreadCount(userId) {
+    const set = this.unread.get(userId);
+    return set ? set.size : 0;
+  }
+
+  // Snapshot of the user's unread ids, safe to iterate while updating.
+  unreadIds(userId) {
+    return Array.from(this.unread.get(userId) || []);
+  }
+
+  counts(userId) {
+    return { unreadCount: this.unreadCount(userId), totalNotifications: this.store.count({ userId }) };
+  }
+
+  // Call `send(message)` with every message for `userId` until the returned
+  // function is called. Messages are { event, id?, data }; `data` is shared
+  // between subscribers and must not be modified. `close()` is called if the
+  // hub shuts the subscription down (see closeAll).
+  subscribe(userId, send, close = () => {}) {
+    let set = this.subscribers.get(userId);
+    if (!set) {
+      set = new Set();
+      this.subscribers.set(userId, set);
+    }
+    const subscriber = { send, close };
+    set.add(subscriber);
+    this.connections += 1;
+    this.startHeartbeat();
+    return () => {
+      if (!set.delete(subscriber)) {
+        return;
+      }
+      if (set.size === 0) {
+        this.subscribers.delete(userId);
+      }
+      this.connections -= 1;
+      if (this.connections === 0) {
+        this.stopHeartbeat();
+      }
+    };
+  }
+
+  publish(userId, message) {
+    const set = this.subscribers.get(userId);
+    if (!set) {
+      return;
+    }
+    for (const subscriber of set) {
+      subscriber.send(message);
+    }
+  }
+
+  // End every subscription, e.g. before the process exits; clients
+  // reconnect elsewhere and catch up with Last-Event-ID.
+  closeAll() {
+    for (const set of Array.from(this.subscribers.values())) {
+      for (const subscriber of Array.from(set)) {
+        subscriber.close();
+      }
+    }
+  }
+
+  countChanged(userId) {
+    if (!this.subscribers.has(userId)) {
+      return;
+    }
+    this.pendingCounts.add(userId);
+    if (!this.flushScheduled) {
+      this.flushScheduled = true;
+      setImmediate(() => this.flushCounts());
+    }
+  }
+
+  flushCounts() {
+    this.flushScheduled = false;
+    const userIds = Array.from(this.pendingCounts);
+    this.pendingCounts.clear();
+    for (const userId of userIds) {
+      this.publish(userId, { event: 'count', data: this.counts(userId) });
+    }
+  }
+
+  // One shared timer keeps idle connections open through proxies.
+  startHeartbeat() {
+    if (this.heartbeat) {
+      return;
+    }
+    const message = { event: 'heartbeat', data: null };
+    this.heartbeat = setInterval(() => {
+      for (const set of this.subscribers.values()) {
+        for (const subscriber of set) {
+          subscriber.send(message);
+        }
+      }
+    }, this.heartbeatMs);
+    this.heartbeat.unref();
+  }
+
+  stopHeartbeat() {
+    clearInterval(this.heartbeat);
+    this.heartbeat = null;
+  }
+}
+
+module.exports = NotificationHub;
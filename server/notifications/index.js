@@ -0,0 +1,7 @@
+const NotificationHub = require('./NotificationHub');
+const { notifications } = require('../store');
+
+// Shared hub behind the /api/notifications routes and stream
+const hub = new NotificationHub().attach(notifications);
+
+module.exports = { NotificationHub, hub };
@@ -0,0 +1,235 @@
+const { Readable } = require('stream');
+const { pipeline } = require('stream/promises');
+const express = require('express');
+const { users } = require('../store');
+const { activities, resourceKey } = require('../activity');
+const { paging, decodeCursor, setNextCursor, displayName } = require('./common');
+
+const router = express.Router();
+
+// Activity log and audit trail endpoints
+const ACTIVITY_EXPORT_FORMATS = ['json', 'ndjson', 'csv'];
+const AGE_UNITS = { m: 60 * 1000, h: 60 * 60 * 1000, d: 24 * 60 * 60 * 1000, w: 7 * 24 * 60 * 60 * 1000 };
+
+// Epoch ms of a date query parameter: undefined when absent, NaN when invalid
+const parseTime = (value) => (value === undefined || value === '' ? undefined : Date.parse(value));
+
+// Cutoff for an age such as "90 days", "12h" or an absolute date
+const parseCutoff = (value, now = Date.now()) => {
+  const match = /^\s*(\d+)\s*(m|min|minutes?|h|hours?|d|days?|w|weeks?)\s*$/i.exec(value);
+  if (!match) {
+    return Date.parse(value);
+  }
+  return now - Number(match[1]) * AGE_UNITS[match[2][0].toLowerCase()];
+};
+
+const activityUser = (userId) => {
+  const user = users.get(userId);
+  return user ? { id: user.id, name: displayName(user), email: user.email } : { id: userId };
+};
+
+const presentActivity = (record) => ({
+  id: record.id,
+  action: record.action,
+  user: activityUser(record.userId),
+  resource: record.resource || null,
+  description: record.description,
+  timestamp: record.timestamp,
+  ipAddress: record.ipAddress,
+  userAgent: record.userAgent,
+  metadata: record.metadata || {}
+});
+
+const exportRow = (record) => {
+  const user = users.get(record.userId);
+  const { resource } = record;
+  return {
+    id: record.id,
+    action: record.action,
+    user: user ? displayName(user) : record.userId,
+    resource: resource ? resource.name || resourceKey(resource.type, resource.id) : null,
+    description: record.description,
+    timestamp: record.timestamp,
+    ipAddress: record.ipAddress
+  };
+};
+
+const csvField = (value) => {
+  const text = value === null || value === undefined ? '' : String(value);
+  return /[",\r\n]/.test(text) ? `"${text.replace(/"/g, '""')}"` : text;
+};
+
+// Serialize exported records one at a time; totalRecords goes last so the
+// JSON document can be written without knowing the count up front.
+async function* exportChunks(format, records) {
+  let total = 0;
+  if (format === 'csv') {
+    yield 'ID,Action,User,Resource,Description,Timestamp,IP Address\n';
+    for await (const record of records) {
+      const row = exportRow(record);
+      yield `${[row.id, row.action, row.user, row.resource, row.description, row.timestamp, row.ipAddress].map(csvField).join(',')}\n`;
+    }
+  } else if (format === 'ndjson') {
+    for await (const record of records) {
+      yield `${JSON.stringify(exportRow(record))}\n`;
+    }
+  } else {
+    yield `{"format":"json","exportedAt":${JSON.stringify(new Date().toISOString())},"exportData":[`;
+    for await (const record of records) {
+      yield `${total > 0 ? ',' : ''}${JSON.stringify(exportRow(record))}`;
+      total += 1;
+    }
+    yield `],"totalRecords":${total}}`;
+  }
+}
+
+// Activity pages: ?cursor ([segment, byte offset] of the last record) or
+// ?page; null for an invalid cursor
+const activityPaging = (req) => {
+  const position = decodeCursor(req.query.cursor, 2);
+  const { page, limit, offset } = paging(req.query);
+  if (position === undefined || (position && !position.every(Number.isInteger))) {
+    return null;
+  }
+  return position
+    ? { page: null, limit, offset: 0, before: { start: position[0], offset: position[1] } }
+    : { page, limit, offset, before: null };
+};
+
+const nextActivityPosition = (next) => next && [next.start, next.offset];
+
+router.get('/api/activities', (req, res) => {
+  const { action, userId, resourceType } = req.query;
+  const paged = activityPaging(req);
+  if (!paged) {
+    return res.status(400).json({ message: 'Invalid cursor' });
+  }
+  const { records, next } = activities.find({ action, userId, resourceType }, paged);
+  setNextCursor(req, res, nextActivityPosition(next));
+  res.json(records.map(presentActivity));
+});
+
+router.post('/api/activities', (req, res) => {
+  const { action, userId, resource, description, metadata } = req.body;
+
+  // Simple validation
+  if (!action || !userId) {
+    return res.status(400).json({ message: 'Action and userId are required' });
+  }
+  if (resource && (!resource.type || resource.id === undefined)) {
+    return res.status(400).json({ message: 'Resource type and id are required' });
+  }
+
+  const record = activities.append({
+    action,
+    userId: String(userId),
+    resource: resource ? { type: resource.type, id: String(resource.id), name: resource.name } : null,
+    description: description || `${action} performed`,
+    ipAddress: req.ip || '127.0.0.1',
+    userAgent: req.get('User-Agent') || 'Unknown',
+    metadata: metadata || {}
+  });
+  res.status(201).json({ activity: presentActivity(record) });
+});
+
+router.get('/api/activities/user/:userId', (req, res) => {
+  const { userId } = req.params;
+  const { action } = req.query;
+  const paged = activityPaging(req);
+  if (!paged) {
+    return res.status(400).json({ message: 'Invalid cursor' });
+  }
+  const { records, total, next } = activities.find({ userId, action }, paged);
+  res.json({
+    userId,
+    activities: records.map(presentActivity),
+    total,
+    page: paged.page,
+    limit: paged.limit,
+    nextCursor: setNextCursor(req, res, nextActivityPosition(next))
+  });
+});
+
+router.get('/api/activities/resource/:resourceType/:resourceId', (req, res) => {
+  const { resourceType, resourceId } = req.params;
+  const paged = activityPaging(req);
+  if (!paged) {
+    return res.status(400).json({ message: 'Invalid cursor' });
+  }
+  const { records, total, next } = activities.find({ resource: resourceKey(resourceType, resourceId) }, paged);
+  res.json({
+    resourceType,
+    resourceId,
+    activities: records.map(presentActivity),
+    total,
+    page: paged.page,
+    limit: paged.limit,
+    nextCursor: setNextCursor(req, res, nextActivityPosition(next))
+  });
+});
+
+router.get('/api/activities/export', async (req, res, next) => {
+  const { format = 'json', startDate, endDate, action } = req.query;
+  const since = parseTime(startDate);
+  const until = parseTime(endDate);
+
+  // Simple validation
+  if (!ACTIVITY_EXPORT_FORMATS.includes(format)) {
+    return res.status(400).json({ message: 'Export format must be json, ndjson or csv' });
+  }
+  if (Number.isNaN(since) || Number.isNaN(until)) {
+    return res.status(400).json({ message: 'Invalid startDate or endDate' });
+  }
+
+  if (format === 'csv') {
+    res.setHeader('Content-Type', 'text/csv');
+    res.setHeader('Content-Disposition', 'attachment; filename=activities.csv');
+  } else if (format === 'ndjson') {
+    res.setHeader('Content-Type', 'application/x-ndjson');
+    res.setHeader('Content-Disposition', 'attachment; filename=activities.ndjson');
+  } else {
+    res.setHeader('Content-Type', 'application/json; charset=utf-8');
+  }
+  try {
+    const records = activities.stream({ since, until, filters: { action } });
+    await pipeline(Readable.from(exportChunks(format, records)), res);
+  } catch (err) {
+    if (res.headersSent) {
+      res.destroy(err);
+    } else {
+      next(err);
+    }
+  }
+});
+
+router.delete('/api/activities/cleanup', async (req, res, next) => {
+  const { olderThan = '90 days', keepCount } = req.query;
+  const before = parseCutoff(olderThan);
+
+  // Simple validation
+  if (Number.isNaN(before)) {
+    return res.status(400).json({ message: 'olderThan must be an age such as "90 days" or a date' });
+  }
+
+  try {
+    const { deleted, remaining, segments } = await activities.cleanup({
+      before,
+      keepCount: keepCount ? parseInt(keepCount) || 0 : 0
+    });
+    res.json({
+      message: 'Activities cleanup completed',
+      criteria: {
+        olderThan,
+        keepCount: keepCount ? parseInt(keepCount) : null
+      },
+      deletedCount: deleted,
+      remainingCount: remaining,
+      segmentsDeleted: segments,
+      cleanupDate: new Date().toISOString()
+    });
+  } catch (err) {
+    next(err);
+  }
+});
+
+module.exports = router;
@@ -0,0 +1,155 @@
+const express = require('express');
+const { users, comments, CommentStore } = require('../store');
+const {
+  currentUserId,
+  paging,
+  encodeCursor,
+  decodeCursor,
+  setNextCursor,
+  LIST_ORDERS,
+  sendList,
+  displayName
+} = require('./common');
+
+const router = express.Router();
+
+// Comments and discussion endpoints: threads come a page at a time from the
+// comment store's per-thread index, replies included up to ?replies each
+const MAX_REPLY_PREVIEW = 20;
+
+const commentAuthor = (authorId) => {
+  const user = users.get(authorId);
+  return user ? { id: user.id, name: displayName(user) } : { id: authorId };
+};
+
+const presentComment = ({ thread, authorId, ...comment }) => ({
+  ...comment,
+  author: commentAuthor(authorId),
+  replyCount: comments.replyCount(comment.id)
+});
+
+// A comment with its first `count` replies and, when there are more, the
+// cursor that continues them at /api/comments?parentId=
+const presentThread = (comment, count) => {
+  const presented = presentComment(comment);
+  if (count === 0 || presented.replyCount === 0) {
+    return { ...presented, replies: [], repliesCursor: null };
+  }
+  const { docs, next } = comments.thread({ parentId: comment.id }, { limit: count });
+  return {
+    ...presented,
+    replies: docs.map(presentComment),
+    repliesCursor: next && encodeCursor(['id', 'asc', ...next])
+  };
+};
+
+router.get('/api/comments', (req, res, next) => {
+  const { resourceId, authorId, parentId } = req.query;
+  sendList(req, res, next, {
+    store: comments,
+    filters: { resourceId, authorId, thread: parentId ? CommentStore.threadOf({ commentId: parentId }) : undefined },
+    present: presentComment
+  });
+});
+
+router.post('/api/comments', (req, res) => {
+  const { content, parentId } = req.body;
+  let { resourceId, resourceType } = req.body;
+
+  // Simple validation
+  if (!content || typeof content !== 'string') {
+    return res.status(400).json({ message: 'Content is required' });
+  }
+  if (parentId) {
+    const parent = comments.get(parentId);
+    if (!parent) {
+      return res.status(404).json({ message: 'Parent comment not found' });
+    }
+    if (parent.deleted) {
+      return res.status(400).json({ message: 'Cannot reply to a deleted comment' });
+    }
+    if ((resourceId && String(resourceId) !== parent.resourceId) || (resourceType && resourceType !== parent.resourceType)) {
+      return res.status(400).json({ message: 'A reply belongs to its parent comment\'s resource' });
+    }
+    ({ resourceId, resourceType } = parent);
+  }
+  if (!resourceId || !resourceType) {
+    return res.status(400).json({ message: 'resourceId and resourceType are required' });
+  }
+
+  const comment = comments.insert({
+    content,
+    resourceId: String(resourceId),
+    resourceType,
+    parentId: parentId ? String(parentId) : null,
+    authorId: String(req.body.authorId || currentUserId(req))
+  });
+  res.status(201).json({ comment: presentComment(comment) });
+});
+
+router.get('/api/comments/:id', (req, res) => {
+  const comment = comments.get(req.params.id);
+  if (!comment) {
+    return res.status(404).json({ message: 'Comment not found' });
+  }
+  res.json({ comment: presentComment(comment) });
+});
+
+router.put('/api/comments/:id', (req, res) => {
+  const { content } = req.body;
+
+  // Simple validation
+  if (!content || typeof content !== 'string') {
+    return res.status(400).json({ message: 'Content is required' });
+  }
+  const previous = comments.get(req.params.id);
+  if (!previous) {
+    return res.status(404).json({ message: 'Comment not found' });
+  }
+  if (previous.deleted) {
+    return res.status(400).json({ message: 'Cannot edit a deleted comment' });
+  }
+
+  const comment = comments.update(previous.id, { content, editedAt: new Date().toISOString() });
+  res.json({ comment: presentComment(comment) });
+});
+
+router.delete('/api/comments/:id', (req, res) => {
+  const { id } = req.params;
+  if (!comments.discard(id)) {
+    return res.status(404).json({ message: 'Comment not found' });
+  }
+  res.json({ message: 'Comment deleted successfully', commentId: id });
+});
+
+router.get('/api/comments/resource/:resourceId', (req, res) => {
+  const { resourceId } = req.params;
+  const { order = 'asc' } = req.query;
+  const position = decodeCursor(req.query.cursor, 4);
+  const { limit } = paging(req.query);
+  const replies = req.query.replies === undefined ? 3 : Math.min(MAX_REPLY_PREVIEW, Math.max(0, parseInt(req.query.replies) || 0));
+
+  // Simple validation
+  if (!LIST_ORDERS.includes(order)) {
+    return res.status(400).json({ message: 'order must be asc or desc' });
+  }
+  if (position === undefined || (position && (position[0] !== 'id' || position[1] !== order))) {
+    return res.status(400).json({ message: 'Invalid cursor' });
+  }
+
+  const { docs, next } = comments.thread({ resourceId }, {
+    descending: order === 'desc',
+    after: position && position.slice(2),
+    limit
+  });
+  res.json({
+    resourceId,
+    comments: docs.map((comment) => presentThread(comment, replies)),
+    total: comments.topLevelCount(resourceId),
+    totalComments: comments.count({ resourceId }),
+    limit,
+    nextCursor: setNextCursor(req, res, next && ['id', order, ...next])
+  });
+});
+
+module.exports = router;
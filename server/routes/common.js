@@ -0,0 +1,154 @@
+const { Readable } = require('stream');
+const { pipeline } = require('stream/promises');
+
+// Request helpers shared by the route groups and server/app.js
+
+// Until auth issues real tokens every request acts as the seeded user
+const currentUserId = (req) => req.get('x-user-id') || '1';
+
+// Copy only the listed fields that are present in the request body
+const pick = (source, fields) => {
+  const picked = {};
+  for (const field of fields) {
+    if (source[field] !== undefined) {
+      picked[field] = source[field];
+    }
+  }
+  return picked;
+};
+
+// page/limit query parameters, clamped to a sane page size
+const MAX_PAGE_SIZE = 100;
+
+const paging = ({ page = 1, limit = 10 }) => {
+  const pageNumber = Math.max(1, parseInt(page) || 1);
+  const pageSize = Math.min(MAX_PAGE_SIZE, Math.max(1, parseInt(limit) || 10));
+  return { page: pageNumber, limit: pageSize, offset: (pageNumber - 1) * pageSize };
+};
+
+// Keyset pagination: a `cursor` query parameter is an opaque token for the
+// position after the last item of the previous page, so a deep page costs
+// what the first one does and concurrent inserts never shift a page. The
+// next page's cursor goes out in the X-Next-Cursor and Link headers (and as
+// `nextCursor` in object bodies); there is none after the last page.
+const encodeCursor = (position) => Buffer.from(JSON.stringify(position)).toString('base64url');
+
+// The position in a cursor: null when there is none, undefined when it is
+// not an array of `length` elements
+const decodeCursor = (cursor, length) => {
+  if (cursor === undefined || cursor === '') {
+    return null;
+  }
+  try {
+    const position = JSON.parse(Buffer.from(String(cursor), 'base64url').toString('utf8'));
+    return Array.isArray(position) && position.length === length ? position : undefined;
+  } catch (err) {
+    return undefined;
+  }
+};
+
+const setNextCursor = (req, res, position) => {
+  if (!position) {
+    return null;
+  }
+  const cursor = encodeCursor(position);
+  const url = new URL(req.originalUrl, 'http://localhost');
+  url.searchParams.set('cursor', cursor);
+  res.setHeader('X-Next-Cursor', cursor);
+  res.setHeader('Link', `<${url.pathname}${url.search}>; rel="next"`);
+  return cursor;
+};
+
+const LIST_ORDERS = ['asc', 'desc'];
+const LIST_FORMATS = ['json', 'ndjson'];
+const NDJSON_BATCH = 1000;
+
+// Every match from `after` on, one keyset page per chunk, so the stream
+// stays consistent however long the client takes to read it
+function* ndjsonPages(store, filters, { sort, descending, after }, present) {
+  let position = after;
+  do {
+    const { docs, next } = store.page(filters, { sort, descending, after: position, limit: NDJSON_BATCH });
+    if (docs.length > 0) {
+      yield docs.map((doc) => `${JSON.stringify(present(doc))}\n`).join('');
+    }
+    position = next;
+  } while (position);
+}
+
+// A list of `store` documents matching `filters`, ordered by ?sort (id or
+// one of the store's sorted fields) and ?order, then id. Sends a page of
+// up to ?limit documents as a JSON array, or with ?format=ndjson streams
+// every match from the cursor on. Without a cursor, ?page picks the page by
+// number as search and activities do, each page still naming the cursor of
+// the next.
+const sendList = async (req, res, next, {
+  store,
+  filters,
+  present = (doc) => doc,
+  order: defaultOrder = 'asc',
+  defaultLimit = MAX_PAGE_SIZE
+}) => {
+  const { sort = 'id', order = defaultOrder, format = 'json' } = req.query;
+  const position = decodeCursor(req.query.cursor, 4);
+
+  // Simple validation
+  if (!store.sortable.has(sort)) {
+    return res.status(400).json({ message: `sort must be one of ${Array.from(store.sortable).join(', ')}` });
+  }
+  if (!LIST_ORDERS.includes(order)) {
+    return res.status(400).json({ message: 'order must be asc or desc' });
+  }
+  if (!LIST_FORMATS.includes(format)) {
+    return res.status(400).json({ message: 'format must be json or ndjson' });
+  }
+  if (position === undefined || (position && (position[0] !== sort || position[1] !== order))) {
+    return res.status(400).json({ message: 'Invalid cursor' });
+  }
+
+  const options = { sort, descending: order === 'desc', after: position && position.slice(2) };
+  if (format === 'ndjson') {
+    res.setHeader('Content-Type', 'application/x-ndjson');
+    try {
+      await pipeline(Readable.from(ndjsonPages(store, filters, options, present)), res);
+    } catch (err) {
+      if (res.headersSent) {
+        res.destroy(err);
+      } else {
+        next(err);
+      }
+    }
+    return;
+  }
+
+  const { limit, offset } = paging({ page: req.query.page, limit: req.query.limit || defaultLimit });
+  const page = store.page(filters, { ...options, limit, offset: position ? 0 : offset });
+  setNextCursor(req, res, page.next && [sort, order, ...page.next]);
+  res.json(page.docs.map(present));
+};
+
+const USER_FIELDS = ['username', 'email', 'firstName', 'lastName', 'role', 'bio', 'skills'];
+const PROJECT_FIELDS = ['name', 'description', 'status', 'priority', 'owner', 'tags'];
+const TASK_FIELDS = ['title', 'description', 'projectId', 'status', 'priority', 'assignee', 'dueDate', 'tags'];
+
+const publicUser = ({ password, ...user }) => user;
+
+const displayName = (user) => `${user.firstName || ''} ${user.lastName || ''}`.trim() || user.username;
+
+module.exports = {
+  currentUserId,
+  pick,
+  MAX_PAGE_SIZE,
+  paging,
+  encodeCursor,
+  decodeCursor,
+  setNextCursor,
+  LIST_ORDERS,
+  LIST_FORMATS,
+  sendList,
+  USER_FIELDS,
+  PROJECT_FIELDS,
+  TASK_FIELDS,
+  publicUser,
+  displayName
+};
@@ -0,0 +1,84 @@
+const os = require('os');
+const express = require('express');
+const { users, TASK_STATUSES, PROJECT_STATUSES, PRIORITIES } = require('../store');
+const { activities } = require('../activity');
+const { dashboard } = require('../aggregates');
+const { routeMetrics, runtime } = require('../metrics');
+const { currentUserId, paging, displayName } = require('./common');
+
+const RECONCILE_MS = Number(process.env.DASHBOARD_RECONCILE_MS) || 5 * 60 * 1000;
+
+const router = express.Router();
+
+// The counters follow writes from the moment server/aggregates is loaded.
+// Replay recent activity into them, and check them against a full recount
+// now and then; requests wait for the replay.
+let replayed = false;
+const replay = dashboard.loadActivity(activities).then(() => {
+  replayed = true;
+});
+dashboard.startReconciliation(RECONCILE_MS, (drift) => {
+  console.warn(`Dashboard aggregates drifted and were rebuilt: ${JSON.stringify(drift)}`);
+});
+
+router.use((req, res, next) => {
+  if (replayed) {
+    return next();
+  }
+  replay.then(() => next(), next);
+});
+
+// Dashboard analytics endpoints: served from counters kept up to date on
+// every write (server/aggregates) rather than by scanning
+const userName = (userId) => {
+  const user = users.get(userId);
+  return user ? displayName(user) : null;
+};
+
+router.get('/api/dashboard/stats', (req, res) => {
+  res.json({ ...dashboard.stats(), myOpenTasks: dashboard.openTasksFor(currentUserId(req)) });
+});
+
+router.get('/api/dashboard/projects/summary', (req, res) => {
+  res.json(dashboard.projectsSummary(PROJECT_STATUSES));
+});
+
+router.get('/api/dashboard/tasks/status', (req, res) => {
+  res.json(dashboard.tasksStatus(TASK_STATUSES, PRIORITIES));
+});
+
+router.get('/api/dashboard/users/activity', (req, res) => {
+  res.json(dashboard.usersActivity(userName));
+});
+
+router.get('/api/dashboard/recent/activities', (req, res) => {
+  const { limit } = paging(req.query);
+  const { records } = activities.find({}, { limit });
+  res.json(records.map((record) => ({
+    id: record.id,
+    type: record.action,
+    user: userName(record.userId) || record.userId,
+    action: record.description,
+    timestamp: record.timestamp,
+    projectId: record.resource && record.resource.type === 'project' ? record.resource.id : null
+  })));
+});
+
+router.get('/api/dashboard/performance/metrics', (req, res) => {
+  const memory = process.memoryUsage();
+  const reconciliation = dashboard.lastReconciliation;
+  res.json({
+    systemHealth: reconciliation && reconciliation.drift.length > 0 ? 'degraded' : 'good',
+    uptime: `${Math.floor(process.uptime())}s`,
+    serverLoad: Math.round((os.loadavg()[0] / os.cpus().length) * 100),
+    memoryUsage: Math.round((memory.heapUsed / memory.heapTotal) * 100),
+    eventLoopDelayMs: Math.round(runtime.snapshot().eventLoopDelaySeconds[0.99] * 1e6) / 1e3,
+    requests: routeMetrics.summary(),
+    aggregates: {
+      lastReconciledAt: reconciliation ? reconciliation.checkedAt : null,
+      drift: reconciliation ? reconciliation.drift.length : 0
+    }
+  });
+});
+
+module.exports = router;
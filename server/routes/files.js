@@ -0,0 +1,164 @@
+const { Readable } = require('stream');
+const { pipeline } = require('stream/promises');
+const express = require('express');
+const { files } = require('../store');
+const { blobs, parseRange } = require('../files');
+const { currentUserId, sendList } = require('./common');
+
+const router = express.Router();
+
+// File management endpoints: content lives in the content-addressed blob
+// store (server/files), file records only reference it by hash
+const FILE_TEXT_ENCODINGS = ['utf8', 'base64'];
+
+const presentFile = ({ hash, createdAt, ...file }) => ({
+  ...file,
+  uploadedAt: createdAt,
+  downloadUrl: `/api/files/${file.id}/download`
+});
+
+// Inline JSON uploads carry their content in the body; anything else is the
+// raw file, streamed to disk with its name in the query or X-Filename header
+const uploadSource = (req) => {
+  if (req.is('application/json')) {
+    const { filename, filetype, content, encoding = 'utf8', description, projectId } = req.body;
+    return {
+      filename,
+      filetype,
+      description,
+      projectId,
+      error: !FILE_TEXT_ENCODINGS.includes(encoding) ? 'Encoding must be utf8 or base64'
+        : typeof content !== 'string' ? 'File content is required' : null,
+      stream: () => Readable.from([Buffer.from(content, encoding)])
+    };
+  }
+  const { filename = req.get('x-filename'), description, projectId } = req.query;
+  return {
+    filename,
+    filetype: (req.get('content-type') || 'application/octet-stream').split(';')[0],
+    description,
+    projectId,
+    error: null,
+    stream: () => req
+  };
+};
+
+router.post('/api/files/upload', async (req, res, next) => {
+  const { filename, filetype, description, projectId, error, stream } = uploadSource(req);
+
+  // Simple validation
+  if (!filename || !filetype) {
+    return res.status(400).json({ message: 'Filename and filetype are required' });
+  }
+  if (error) {
+    return res.status(400).json({ message: error });
+  }
+
+  try {
+    const { hash, size, created } = await blobs.write(stream());
+    const file = files.insert({
+      filename,
+      filetype,
+      filesize: size,
+      hash,
+      userId: currentUserId(req),
+      projectId: projectId || null,
+      description: description || ''
+    });
+    res.status(201).json({ file: presentFile(file), deduplicated: !created });
+  } catch (err) {
+    next(err);
+  }
+});
+
+router.get('/api/files', (req, res, next) => {
+  const { projectId, filetype } = req.query;
+  sendList(req, res, next, {
+    store: files,
+    filters: { userId: currentUserId(req), projectId, filetype },
+    present: presentFile
+  });
+});
+
+router.get('/api/files/:id', (req, res) => {
+  const file = files.get(req.params.id);
+  if (!file) {
+    return res.status(404).json({ message: 'File not found' });
+  }
+  res.json({ file: presentFile(file) });
+});
+
+// Blobs never change, so the content hash is a strong ETag and single byte
+// ranges can be served straight from the blob file
+router.get('/api/files/:id/download', async (req, res, next) => {
+  const file = files.get(req.params.id);
+  if (!file) {
+    return res.status(404).json({ message: 'File not found' });
+  }
+  if (!file.hash) {
+    return res.status(404).json({ message: 'File content not available' });
+  }
+
+  const etag = `"${file.hash}"`;
+  const size = file.filesize;
+  res.setHeader('ETag', etag);
+  res.setHeader('Accept-Ranges', 'bytes');
+  if (req.get('if-none-match') === etag) {
+    return res.status(304).end();
+  }
+
+  const ifRange = req.get('if-range');
+  const range = ifRange && ifRange !== etag ? null : parseRange(req.get('range'), size);
+  if (range === false) {
+    res.setHeader('Content-Range', `bytes */${size}`);
+    return res.status(416).json({ message: 'Requested range not satisfiable' });
+  }
+
+  res.setHeader('Content-Type', file.filetype);
+  res.setHeader('Content-Disposition', `attachment; filename*=UTF-8''${encodeURIComponent(file.filename)}`);
+  const { start, end } = range || { start: 0, end: size - 1 };
+  if (range) {
+    res.status(206);
+    res.setHeader('Content-Range', `bytes ${start}-${end}/${size}`);
+  }
+  res.setHeader('Content-Length', end - start + 1);
+  if (req.method === 'HEAD' || size === 0) {
+    return res.end();
+  }
+
+  try {
+    await pipeline(blobs.createReadStream(file.hash, { start, end }), res);
+  } catch (err) {
+    if (res.headersSent) {
+      res.destroy(err);
+    } else {
+      next(err);
+    }
+  }
+});
+
+router.delete('/api/files/:id', (req, res) => {
+  const { id } = req.params;
+  if (!files.remove(id)) {
+    return res.status(404).json({ message: 'File not found' });
+  }
+  res.json({ message: 'File deleted successfully', fileId: id });
+});
+
+// Renaming touches only the file record; the blob stays where it is
+router.put('/api/files/:id/rename', (req, res) => {
+  const { newFilename } = req.body;
+
+  // Simple validation
+  if (!newFilename) {
+    return res.status(400).json({ message: 'New filename is required' });
+  }
+
+  const file = files.update(req.params.id, { filename: newFilename });
+  if (!file) {
+    return res.status(404).json({ message: 'File not found' });
+  }
+  res.json({ file: { ...presentFile(file), renamedAt: file.updatedAt } });
+});
+
+module.exports = router;
@@ -0,0 +1,48 @@
+// Route groups by URL prefix. Each is an express.Router registering full
+// paths, required on the first request under its prefix together with the
+// modules only it uses (search indexes, tag counters, blob store, ...), so
+// starting the server or requiring the app doesn't build them.
+const ROUTE_GROUPS = {
+  '/api/users': () => require('./users'),
+  '/api/projects': () => require('./projects'),
+  '/api/tasks': () => require('./tasks'),
+  '/api/dashboard': () => require('./dashboard'),
+  '/api/search': () => require('./search'),
+  '/api/comments': () => require('./comments'),
+  '/api/tags': () => require('./tags'),
+  '/api/activities': () => require('./activities'),
+  '/api/notifications': () => require('./notifications'),
+  '/api/files': () => require('./files')
+};
+
+// The group prefix of a path: its first two segments, e.g. /api/tasks
+const PREFIX = /^\/[^/]+\/[^/]+/;
+
+// Middleware dispatching each request to the router of its prefix's group,
+// loading the group first if this is its first request. A group whose
+// module fails to load is retried on the next request.
+function lazyRoutes(groups = ROUTE_GROUPS) {
+  const routers = new Map();
+  const middleware = (req, res, next) => {
+    const match = PREFIX.exec(req.path);
+    const load = match && groups[match[0]];
+    if (!load) {
+      return next();
+    }
+    let router = routers.get(match[0]);
+    if (!router) {
+      try {
+        router = load();
+      } catch (err) {
+        return next(err);
+      }
+      routers.set(match[0], router);
+    }
+    return router(req, res, next);
+  };
+  // Prefixes of the groups loaded so far
+  middleware.loaded = () => Array.from(routers.keys());
+  return middleware;
+}
+
+module.exports = { lazyRoutes, ROUTE_GROUPS };
@@ -0,0 +1,130 @@
+const express = require('express');
+const { notifications, PRIORITIES } = require('../store');
+const { hub } = require('../notifications');
+const { currentUserId, sendList } = require('./common');
+
+const router = express.Router();
+
+// Notification system endpoints: unread counts come from the hub's per-user
+// unread sets (server/notifications), and open streams get pushed updates
+const SSE_RETRY_MS = 5000;
+const SSE_MAX_BUFFERED_BYTES = 1024 * 1024;
+
+// Each message is serialized once however many connections it goes to
+const sseFrames = new WeakMap();
+const sseFrame = (message) => {
+  let frame = sseFrames.get(message);
+  if (!frame) {
+    frame = `${message.id ? `id: ${message.id}\n` : ''}event: ${message.event}\ndata: ${JSON.stringify(message.data)}\n\n`;
+    sseFrames.set(message, frame);
+  }
+  return frame;
+};
+
+// Newest first by default
+router.get('/api/notifications', (req, res, next) => {
+  sendList(req, res, next, {
+    store: notifications,
+    filters: { userId: currentUserId(req), isRead: req.query.unread === 'true' ? false : undefined },
+    order: 'desc',
+    defaultLimit: 10
+  });
+});
+
+router.post('/api/notifications', (req, res) => {
+  const { type, title, message, priority, userId } = req.body;
+
+  // Simple validation
+  if (!title || !message) {
+    return res.status(400).json({ message: 'Title and message are required' });
+  }
+  if (priority && !PRIORITIES.includes(priority)) {
+    return res.status(400).json({ message: 'Invalid notification priority' });
+  }
+
+  const notification = notifications.insert({
+    type: type || 'system',
+    title,
+    message,
+    priority: priority || 'medium',
+    userId: userId ? String(userId) : currentUserId(req),
+    isRead: false,
+    readAt: null
+  });
+  res.status(201).json({ notification });
+});
+
+router.get('/api/notifications/unread/count', (req, res) => {
+  res.json(hub.counts(currentUserId(req)));
+});
+
+// Server-Sent Events: the current counts on connect, then every new
+// notification and count change. Reconnecting clients send Last-Event-ID
+// and get the notifications they missed.
+router.get('/api/notifications/stream', (req, res) => {
+  const userId = currentUserId(req);
+  res.writeHead(200, {
+    'Content-Type': 'text/event-stream',
+    'Cache-Control': 'no-cache',
+    Connection: 'keep-alive',
+    'X-Accel-Buffering': 'no'
+  });
+  res.write(`retry: ${SSE_RETRY_MS}\n\n`);
+
+  const lastEventId = Number(req.get('last-event-id'));
+  if (lastEventId) {
+    for (const id of notifications.findIds({ userId })) {
+      if (Number(id) > lastEventId) {
+        res.write(sseFrame({ event: 'notification', id, data: notifications.get(id) }));
+      }
+    }
+  }
+  res.write(sseFrame({ event: 'count', data: hub.counts(userId) }));
+
+  // Drop clients that stop reading rather than buffer for them forever
+  const unsubscribe = hub.subscribe(userId, (message) => {
+    if (res.writableLength > SSE_MAX_BUFFERED_BYTES) {
+      res.destroy();
+    } else {
+      res.write(sseFrame(message));
+    }
+  }, () => res.end());
+  res.on('close', unsubscribe);
+});
+
+router.put('/api/notifications/mark-all-read', (req, res) => {
+  const userId = currentUserId(req);
+  const readAt = new Date().toISOString();
+  const ids = hub.unreadIds(userId);
+  for (const id of ids) {
+    notifications.update(id, { isRead: true, readAt });
+  }
+  res.json({
+    message: 'All notifications marked as read',
+    markedCount: ids.length,
+    unreadCount: hub.unreadCount(userId),
+    timestamp: readAt
+  });
+});
+
+router.put('/api/notifications/:id/read', (req, res) => {
+  const existing = notifications.get(req.params.id);
+  if (!existing) {
+    return res.status(404).json({ message: 'Notification not found' });
+  }
+
+  const notification = existing.isRead
+    ? existing
+    : notifications.update(existing.id, { isRead: true, readAt: new Date().toISOString() });
+  res.json({ notification, unreadCount: hub.unreadCount(notification.userId) });
+});
+
+router.delete('/api/notifications/:id', (req, res) => {
+  const { id } = req.params;
+  if (!notifications.remove(id)) {
+    return res.status(404).json({ message: 'Notification not found' });
+  }
+  res.json({ message: 'Notification deleted successfully', notificationId: id });
+});
+
+module.exports = router;
@@ -0,0 +1,82 @@
+const express = require('express');
+const { projects, tasks } = require('../store');
+const { currentUserId, pick, sendList, PROJECT_FIELDS, TASK_FIELDS } = require('./common');
+
+const router = express.Router();
+
+// Project management endpoints
+router.post('/api/projects', (req, res) => {
+  const { name } = req.body;
+
+  // Simple validation
+  if (!name) {
+    return res.status(400).json({ message: 'Project name is required' });
+  }
+
+  const project = projects.insert({
+    description: '',
+    status: 'active',
+    priority: 'medium',
+    owner: currentUserId(req),
+    ...pick(req.body, PROJECT_FIELDS)
+  });
+  res.status(201).json({ project });
+});
+
+router.get('/api/projects', (req, res, next) => {
+  const { status, priority, owner } = req.query;
+  sendList(req, res, next, { store: projects, filters: { status, priority, owner } });
+});
+
+router.get('/api/projects/:id', (req, res) => {
+  const project = projects.get(req.params.id);
+  if (!project) {
+    return res.status(404).json({ message: 'Project not found' });
+  }
+  res.json({ project });
+});
+
+router.put('/api/projects/:id', (req, res) => {
+  const project = projects.update(req.params.id, pick(req.body, PROJECT_FIELDS));
+  if (!project) {
+    return res.status(404).json({ message: 'Project not found' });
+  }
+  res.json({ project });
+});
+
+router.delete('/api/projects/:id', (req, res) => {
+  const { id } = req.params;
+  if (!projects.remove(id)) {
+    return res.status(404).json({ message: 'Project not found' });
+  }
+
+  // Tasks belong to their project; the projectId index finds them directly
+  for (const taskId of tasks.findIds({ projectId: id })) {
+    tasks.remove(taskId);
+  }
+  res.json({ message: 'Project deleted successfully', projectId: id });
+});
+
+router.post('/api/projects/:id/tasks', (req, res) => {
+  const { id } = req.params;
+  const { title } = req.body;
+
+  // Simple validation
+  if (!title) {
+    return res.status(400).json({ message: 'Task title is required' });
+  }
+  if (!projects.has(id)) {
+    return res.status(404).json({ message: 'Project not found' });
+  }
+
+  const task = tasks.insert({
+    description: '',
+    status: 'todo',
+    priority: 'medium',
+    ...pick(req.body, TASK_FIELDS),
+    projectId: id
+  });
+  res.status(201).json({ task });
+});
+
+module.exports = router;
@@ -0,0 +1,117 @@
+const express = require('express');
+const search = require('../search');
+const { paging, decodeCursor, setNextCursor, publicUser, displayName } = require('./common');
+
+const router = express.Router();
+
+// Search and filtering endpoints
+
+// How each entity type is presented in global search results
+const SEARCH_SUMMARIES = {
+  project: (project) => ({ title: project.name, description: project.description }),
+  task: (task) => ({ title: task.title, description: task.description }),
+  user: (user) => ({ title: displayName(user), description: user.bio || user.role }),
+  file: (file) => ({ title: file.filename, description: file.description || file.filetype })
+};
+
+const searchFile = ({ userId, createdAt, hash, ...file }) => ({ ...file, uploadedBy: userId, uploadedAt: createdAt });
+
+// Relevance is the BM25 score relative to the best hit on the page
+const withRelevance = (hits, best) => hits.map((hit) => ({
+  ...hit,
+  relevance: best > 0 ? Math.round((hit.score / best) * 1000) / 1000 : 0
+}));
+
+// Search pages: ?cursor ([score, id] of the last hit) or ?page. Relevance
+// depends on the whole index, so a cursor's order holds while the indexed
+// documents do.
+const searchPaging = (req) => {
+  const position = decodeCursor(req.query.cursor, 2);
+  const { page, limit, offset } = paging(req.query);
+  if (position === undefined || (position && typeof position[0] !== 'number')) {
+    return null;
+  }
+  return position ? { page: null, limit, offset: 0, after: position } : { page, limit, offset, after: null };
+};
+
+// `filters` go to the store's indexes; `echo` is what the response reports
+const sendTypeSearch = (req, res, { type, filters, echo = filters, present = (doc) => doc }) => {
+  const { q } = req.query;
+  const paged = searchPaging(req);
+  if (!paged) {
+    return res.status(400).json({ message: 'Invalid cursor' });
+  }
+  const { page, limit, offset, after } = paged;
+  const { hits, total, next } = search.searchType(type, q, { filters, limit, offset, after });
+  res.json({
+    query: q || '',
+    filters: echo,
+    results: hits.map((hit) => present(hit.doc)),
+    total,
+    page,
+    limit,
+    nextCursor: setNextCursor(req, res, next)
+  });
+};
+
+router.get('/api/search/global', (req, res) => {
+  const { q, type } = req.query;
+  const paged = searchPaging(req);
+  if (!paged) {
+    return res.status(400).json({ message: 'Invalid cursor' });
+  }
+  const { page, limit, offset, after } = paged;
+  const types = type && search.TYPES[type] ? [type] : undefined;
+  const { hits, total, next } = search.searchAll(q, { types, limit, offset, after });
+  const best = hits.length > 0 ? hits[0].score : 0;
+  res.json({
+    query: q || '',
+    results: withRelevance(hits, best).map(({ type: hitType, id, doc, relevance }) => ({
+      type: hitType,
+      id,
+      ...SEARCH_SUMMARIES[hitType](doc),
+      relevance
+    })),
+    total,
+    page,
+    limit,
+    nextCursor: setNextCursor(req, res, next)
+  });
+});
+
+router.get('/api/search/projects', (req, res) => {
+  const { status } = req.query;
+  sendTypeSearch(req, res, { type: 'project', filters: { status } });
+});
+
+router.get('/api/search/tasks', (req, res) => {
+  const { status, assignee, priority } = req.query;
+  sendTypeSearch(req, res, { type: 'task', filters: { status, assignee, priority } });
+});
+
+router.get('/api/search/users', (req, res) => {
+  const { role, department } = req.query;
+  sendTypeSearch(req, res, { type: 'user', filters: { role, department }, present: publicUser });
+});
+
+router.get('/api/search/files', (req, res) => {
+  const { filetype, uploadedBy } = req.query;
+  sendTypeSearch(req, res, {
+    type: 'file',
+    filters: { filetype, userId: uploadedBy },
+    echo: { filetype, uploadedBy },
+    present: searchFile
+  });
+});
+
+router.get('/api/search/suggestions', (req, res) => {
+  const { q, type } = req.query;
+  const types = type && search.TYPES[type] ? [type] : undefined;
+  res.json({
+    query: q || '',
+    type: type || 'all',
+    suggestions: search.suggest(q, { types })
+  });
+});
+
+module.exports = router;
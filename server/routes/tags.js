@@ -0,0 +1,122 @@
+const express = require('express');
+const { projects, tasks, tags } = require('../store');
+const { tagUsage, TAG_WINDOWS } = require('../aggregates');
+const { pick, paging, sendList } = require('./common');
+
+const router = express.Router();
+
+// Tags and labels endpoints. Tasks and projects carry tags by name; usage
+// counts and popularity come from counters kept on every attach and detach
+// (server/aggregates) rather than from counting on each request.
+const DEFAULT_TAG_COLOR = '#6B7280';
+const TAG_RESOURCE_PREVIEW = 10;
+
+const presentTag = (tag) => ({ ...tag, usageCount: tagUsage.count(tag.name) });
+
+const tagNamed = (name) => tags.find({ name })[0] || null;
+
+// Replace tag `name` with `rename` (or drop it, for null) on every task and
+// project carrying it. Returns how many were changed.
+const retag = (name, rename) => {
+  let changed = 0;
+  for (const store of [tasks, projects]) {
+    const ids = store.findIds({ tags: name });
+    if (ids.length > 0) {
+      store.updateMany(ids, (doc) => ({
+        tags: Array.from(new Set(doc.tags.flatMap((tag) => (tag !== name ? [tag] : rename === null ? [] : [rename]))))
+      }));
+      changed += ids.length;
+    }
+  }
+  return changed;
+};
+
+router.get('/api/tags', (req, res, next) => {
+  const { name } = req.query;
+  sendList(req, res, next, { store: tags, filters: { name }, present: presentTag });
+});
+
+router.post('/api/tags', (req, res) => {
+  const { name, color, description } = req.body;
+
+  // Simple validation
+  if (!name || typeof name !== 'string' || !name.trim()) {
+    return res.status(400).json({ message: 'Tag name is required' });
+  }
+  if (tagNamed(name.trim())) {
+    return res.status(409).json({ message: 'Tag already exists' });
+  }
+
+  const tag = tags.insert({ name: name.trim(), color: color || DEFAULT_TAG_COLOR, description: description || '' });
+  res.status(201).json({ tag: presentTag(tag) });
+});
+
+// Registered ahead of /api/tags/:id
+router.get('/api/tags/popular', (req, res) => {
+  const { window } = req.query;
+  const { limit } = paging(req.query);
+
+  // Simple validation
+  if (window !== undefined && !TAG_WINDOWS.includes(window)) {
+    return res.status(400).json({ message: `window must be one of ${TAG_WINDOWS.join(', ')}` });
+  }
+
+  res.json(tagUsage.top(limit, window).map(({ tag: name, count }) => {
+    const tag = tagNamed(name);
+    return {
+      id: tag ? tag.id : null,
+      name,
+      color: tag ? tag.color : DEFAULT_TAG_COLOR,
+      usageCount: count,
+      trend: tagUsage.trend(name)
+    };
+  }));
+});
+
+router.get('/api/tags/:id', (req, res) => {
+  const tag = tags.get(req.params.id);
+  if (!tag) {
+    return res.status(404).json({ message: 'Tag not found' });
+  }
+  const preview = (store, type, label) => store.page({ tags: tag.name }, { limit: TAG_RESOURCE_PREVIEW }).docs
+    .map((doc) => ({ type, id: doc.id, name: doc[label] }));
+  res.json({
+    tag: {
+      ...presentTag(tag),
+      usage: Object.fromEntries(TAG_WINDOWS.map((window) => [window, tagUsage.count(tag.name, window)])),
+      resources: [...preview(projects, 'project', 'name'), ...preview(tasks, 'task', 'title')]
+    }
+  });
+});
+
+router.put('/api/tags/:id', (req, res) => {
+  const { name } = req.body;
+
+  // Simple validation
+  if (!name || typeof name !== 'string' || !name.trim()) {
+    return res.status(400).json({ message: 'Tag name is required' });
+  }
+  const previous = tags.get(req.params.id);
+  if (!previous) {
+    return res.status(404).json({ message: 'Tag not found' });
+  }
+  const existing = tagNamed(name.trim());
+  if (existing && existing.id !== previous.id) {
+    return res.status(409).json({ message: 'Tag already exists' });
+  }
+
+  const tag = tags.update(previous.id, { name: name.trim(), ...pick(req.body, ['color', 'description']) });
+  const retagged = tag.name !== previous.name ? retag(previous.name, tag.name) : 0;
+  res.json({ tag: presentTag(tag), retagged });
+});
+
+router.delete('/api/tags/:id', (req, res) => {
+  const { id } = req.params;
+  const tag = tags.remove(id);
+  if (!tag) {
+    return res.status(404).json({ message: 'Tag not found' });
+  }
+  res.json({ message: 'Tag deleted successfully', tagId: id, detachedFrom: retag(tag.name, null) });
+});
+
+module.exports = router;
@@ -0,0 +1,162 @@
+const express = require('express');
+const { tasks, TASK_STATUSES, PRIORITIES } = require('../store');
+const { pick, sendList, TASK_FIELDS } = require('./common');
+
+const router = express.Router();
+
+// Task management endpoints
+router.post('/api/tasks', (req, res) => {
+  const { title, status, priority } = req.body;
+
+  // Simple validation
+  if (!title) {
+    return res.status(400).json({ message: 'Task title is required' });
+  }
+  if (status && !TASK_STATUSES.includes(status)) {
+    return res.status(400).json({ message: 'Invalid task status' });
+  }
+  if (priority && !PRIORITIES.includes(priority)) {
+    return res.status(400).json({ message: 'Invalid task priority' });
+  }
+
+  const task = tasks.insert({
+    description: '',
+    projectId: null,
+    status: 'todo',
+    priority: 'medium',
+    ...pick(req.body, TASK_FIELDS)
+  });
+  res.status(201).json({ task });
+});
+
+router.get('/api/tasks', (req, res, next) => {
+  const { status, assignee, priority, projectId } = req.query;
+  sendList(req, res, next, { store: tasks, filters: { status, assignee, priority, projectId } });
+});
+
+router.get('/api/tasks/:id', (req, res) => {
+  const task = tasks.get(req.params.id);
+  if (!task) {
+    return res.status(404).json({ message: 'Task not found' });
+  }
+  res.json({ task });
+});
+
+router.put('/api/tasks/:id', (req, res) => {
+  const { status, priority } = req.body;
+  if (status && !TASK_STATUSES.includes(status)) {
+    return res.status(400).json({ message: 'Invalid task status' });
+  }
+  if (priority && !PRIORITIES.includes(priority)) {
+    return res.status(400).json({ message: 'Invalid task priority' });
+  }
+
+  const task = tasks.update(req.params.id, pick(req.body, TASK_FIELDS));
+  if (!task) {
+    return res.status(404).json({ message: 'Task not found' });
+  }
+  res.json({ task });
+});
+
+router.delete('/api/tasks/:id', (req, res) => {
+  const { id } = req.params;
+  if (!tasks.remove(id)) {
+    return res.status(404).json({ message: 'Task not found' });
+  }
+  res.json({ message: 'Task deleted successfully', taskId: id });
+});
+
+// Bulk task updates, registered ahead of /api/tasks/:id/status: every
+// listed task is updated under one timestamp, or none is if any is missing
+const MAX_BULK_IDS = 1000;
+
+// The distinct task ids of a bulk request, or null once an error is sent
+const bulkTaskIds = (req, res) => {
+  const { ids } = req.body;
+  if (!Array.isArray(ids) || ids.length === 0) {
+    res.status(400).json({ message: 'ids must be a non-empty array' });
+    return null;
+  }
+  if (ids.length > MAX_BULK_IDS) {
+    res.status(400).json({ message: `At most ${MAX_BULK_IDS} ids per request` });
+    return null;
+  }
+  const unique = Array.from(new Set(ids.map(String)));
+  const missing = unique.filter((id) => !tasks.has(id));
+  if (missing.length > 0) {
+    res.status(404).json({ message: 'Tasks not found', missing });
+    return null;
+  }
+  return unique;
+};
+
+router.patch('/api/tasks/bulk/status', (req, res) => {
+  const { status } = req.body;
+
+  // Simple validation
+  if (!TASK_STATUSES.includes(status)) {
+    return res.status(400).json({ message: 'Invalid task status' });
+  }
+  const ids = bulkTaskIds(req, res);
+  if (!ids) {
+    return;
+  }
+
+  const updated = tasks.updateMany(ids, { status });
+  res.json({ updated: updated.length, tasks: updated });
+});
+
+router.patch('/api/tasks/bulk/assignee', (req, res) => {
+  const { assignee } = req.body;
+
+  // Simple validation: null unassigns
+  if (assignee === undefined) {
+    return res.status(400).json({ message: 'Assignee is required' });
+  }
+  const ids = bulkTaskIds(req, res);
+  if (!ids) {
+    return;
+  }
+
+  const updated = tasks.updateMany(ids, { assignee: assignee === null ? null : String(assignee) });
+  res.json({ updated: updated.length, tasks: updated });
+});
+
+router.patch('/api/tasks/bulk/tags', (req, res) => {
+  const { add = [], remove = [] } = req.body;
+
+  // Simple validation
+  if (!Array.isArray(add) || !Array.isArray(remove) || add.length + remove.length === 0) {
+    return res.status(400).json({ message: 'Tags to add or remove are required' });
+  }
+  const ids = bulkTaskIds(req, res);
+  if (!ids) {
+    return;
+  }
+
+  const removed = new Set(remove.map(String));
+  const updated = tasks.updateMany(ids, (task) => ({
+    tags: Array.from(new Set([...(task.tags || []).filter((tag) => !removed.has(tag)), ...add.map(String)]))
+  }));
+  res.json({ updated: updated.length, tasks: updated });
+});
+
+router.patch('/api/tasks/:id/status', (req, res) => {
+  const { status } = req.body;
+
+  // Simple validation
+  if (!status) {
+    return res.status(400).json({ message: 'Task status is required' });
+  }
+  if (!TASK_STATUSES.includes(status)) {
+    return res.status(400).json({ message: 'Invalid task status' });
+  }
+
+  const task = tasks.update(req.params.id, { status });
+  if (!task) {
+    return res.status(404).json({ message: 'Task not found' });
+  }
+  res.json({ task });
+});
+
+module.exports = router;
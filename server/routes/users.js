@@ -0,0 +1,52 @@
+const express = require('express');
+const { users } = require('../store');
+const { currentUserId, pick, sendList, USER_FIELDS, publicUser } = require('./common');
+
+const router = express.Router();
+
+// User management endpoints
+router.get('/api/users/profile', (req, res) => {
+  const user = users.get(currentUserId(req));
+  if (!user) {
+    return res.status(404).json({ message: 'User not found' });
+  }
+  res.json({ user: publicUser(user) });
+});
+
+router.put('/api/users/profile', (req, res) => {
+  const user = users.update(currentUserId(req), pick(req.body, ['firstName', 'lastName', 'bio', 'skills']));
+  if (!user) {
+    return res.status(404).json({ message: 'User not found' });
+  }
+  res.json({ user: publicUser(user) });
+});
+
+router.get('/api/users', (req, res, next) => {
+  const { role } = req.query;
+  sendList(req, res, next, { store: users, filters: { role }, present: publicUser });
+});
+
+router.get('/api/users/:id', (req, res) => {
+  const user = users.get(req.params.id);
+  if (!user) {
+    return res.status(404).json({ message: 'User not found' });
+  }
+  res.json({ user: publicUser(user) });
+});
+
+router.put('/api/users/:id', (req, res) => {
+  const user = users.update(req.params.id, pick(req.body, USER_FIELDS));
+  if (!user) {
+    return res.status(404).json({ message: 'User not found' });
+  }
+  res.json({ user: publicUser(user) });
+});
+
+router.delete('/api/users/:id', (req, res) => {
+  if (!users.remove(req.params.id)) {
+    return res.status(404).json({ message: 'User not found' });
+  }
+  res.json({ message: 'User deleted successfully' });
+});
+
+module.exports = router;
@@ -0,0 +1,147 @@
+// Character trie over index terms for autocomplete.
+//
+// Each term carries a document count, and every node caches the `capacity`
+// most frequent term nodes below it (by reference, so a count change needs
+// no copying), so a suggestion lookup is a walk down the prefix plus a slice
+// of that cache. An increment can only promote a term, so the caches along
+// its path are patched in place. A decrement may let a
+// term outside a full cache overtake it; those caches are rebuilt bottom-up
+// from the node's own term and its children's caches, which is bounded by
+// the fan-out rather than the size of the subtree.
+class PrefixTrie {
+  constructor({ capacity = 10 } = {}) {
+    this.capacity = capacity;
+    this.root = createNode();
+    this.terms = 0;
+  }
+
+  add(term, delta = 1) {
+    const path = [this.root];
+    let node = this.root;
+    for (const ch of term) {
+      let child = node.children.get(ch);
+      if (!child) {
+        if (delta < 0) {
+          return;
+        }
+        child = createNode();
+        node.children.set(ch, child);
+      }
+      node = child;
+      path.push(node);
+    }
+
+    const before = node.count;
+    node.term = term;
+    node.count = Math.max(0, before + delta);
+    if (before === 0 && node.count > 0) {
+      this.terms += 1;
+    } else if (before > 0 && node.count === 0) {
+      this.terms -= 1;
+    }
+    if (delta > 0) {
+      for (const visited of path) {
+        this.promote(visited, node);
+      }
+      return;
+    }
+
+    const chars = Array.from(term);
+    for (let depth = path.length - 1; depth >= 0; depth -= 1) {
+      const visited = path[depth];
+      if (depth > 0 && visited.count === 0 && visited.children.size === 0) {
+        // Nothing left below: drop the branch instead of rebuilding it.
+        path[depth - 1].children.delete(chars[depth - 1]);
+        continue;
+      }
+      this.demote(visited, node);
+    }
+  }
+
+  remove(term, delta = 1) {
+    this.add(term, -delta);
+  }
+
+  count(term) {
+    const node = this.find(term);
+    return node ? node.count : 0;
+  }
+
+  // The most frequent terms starting with `prefix`, as [{ term, count }].
+  suggest(prefix, limit = this.capacity) {
+    const node = this.find(prefix);
+    if (!node) {
+      return [];
+    }
+    return node.top.slice(0, Math.min(limit, this.capacity)).map(({ term, count }) => ({ term, count }));
+  }
+
+  find(prefix) {
+    let node = this.root;
+    for (const ch of prefix) {
+      node = node.children.get(ch);
+      if (!node) {
+        return null;
+      }
+    }
+    return node;
+  }
+
+  promote(node, entry) {
+    const { top } = node;
+    let i = top.indexOf(entry);
+    if (i === -1) {
+      if (top.length === this.capacity && byCount(entry, top[top.length - 1]) > 0) {
+        return;
+      }
+      i = top.push(entry) - 1;
+    }
+    // Counts only grew, so bubbling the entry up restores the order.
+    while (i > 0 && byCount(top[i - 1], top[i]) > 0) {
+      [top[i - 1], top[i]] = [top[i], top[i - 1]];
+      i -= 1;
+    }
+    if (top.length > this.capacity) {
+      top.pop();
+    }
+  }
+
+  // Called deepest node first, so the children's caches are already current.
+  demote(node, entry) {
+    const { top } = node;
+    const existing = top.indexOf(entry);
+    if (existing === -1) {
+      return;
+    }
+    if (entry.count === 0) {
+      top.splice(existing, 1);
+      if (top.length < this.capacity - 1) {
+        // The cache was not full, so it already held every term below.
+        return;
+      }
+    } else if (top.length < this.capacity || (existing < top.length - 1 && byCount(entry, top[top.length - 1]) < 0)) {
+      // Either the cache holds every term below this node, or the entry
+      // still ranks ahead of the last cached term and so of every uncached
+      // one; sinking it restores the order.
+      for (let i = existing; i < top.length - 1 && byCount(top[i], top[i + 1]) > 0; i += 1) {
+        [top[i], top[i + 1]] = [top[i + 1], top[i]];
+      }
+      return;
+    }
+    const candidates = node.count > 0 ? [node] : [];
+    for (const child of node.children.values()) {
+      candidates.push(...child.top);
+    }
+    node.top = candidates.sort(byCount).slice(0, this.capacity);
+  }
+}
+
+function createNode() {
+  return { children: new Map(), term: null, count: 0, top: [] };
+}
+
+function byCount(a, b) {
+  return b.count - a.count || (a.term < b.term ? -1 : a.term > b.term ? 1 : 0);
+}
+
+module.exports = PrefixTrie;
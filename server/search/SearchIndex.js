@@ -0,0 +1,216 @@
+const PrefixTrie = require('./PrefixTrie');
+
+// BM25 parameters (the usual Lucene/Elasticsearch defaults)
+const K1 = 1.2;
+const B = 0.75;
+
+const STOP_WORDS = new Set(['a', 'an', 'and', 'the', 'of', 'to', 'in', 'for', 'on', 'with', 'is', 'at', 'by']);
+
+function tokenize(text) {
+  if (!text) {
+    return [];
+  }
+  return String(text)
+    .toLowerCase()
+    .split(/[^\p{L}\p{N}]+/u)
+    .filter((token) => token && !STOP_WORDS.has(token));
+}
+
+// Inverted index over one entity type with BM25 ranking.
+//
+// Documents are a set of weighted text fields; a term's frequency in a
+// document is the weight-scaled count across fields (so a title match counts
+// more than a description match). Each document remembers its own distinct
+// terms, so update and remove touch only that document's postings.
+// Document frequencies feed a PrefixTrie for autocomplete; changes are
+// collected per term and applied on the next suggestion lookup, so a bulk
+// load walks the trie once per distinct term rather than once per posting.
+class SearchIndex {
+  constructor({ fields }) {
+    this.fields = fields;
+    this.postings = new Map();
+    this.docs = new Map();
+    this.totalLength = 0;
+    this.trie = new PrefixTrie();
+    this.pending = new Map();
+  }
+
+  get size() {
+    return this.docs.size;
+  }
+
+  analyze(source) {
+    const terms = new Map();
+    let length = 0;
+    for (const [field, weight] of Object.entries(this.fields)) {
+      for (const token of tokenize(source[field])) {
+        terms.set(token, (terms.get(token) || 0) + weight);
+        length += weight;
+      }
+    }
+    return { terms, length };
+  }
+
+  add(id, source) {
+    if (this.docs.has(id)) {
+      this.remove(id);
+    }
+    const { terms, length } = this.analyze(source);
+    for (const [term, tf] of terms) {
+      let posting = this.postings.get(term);
+      if (!posting) {
+        posting = new Map();
+        this.postings.set(term, posting);
+      }
+      posting.set(id, tf);
+      this.pending.set(term, (this.pending.get(term) || 0) + 1);
+    }
+    this.docs.set(id, { terms: Array.from(terms.keys()), length });
+    this.totalLength += length;
+  }
+
+  // Re-index only when an indexed field changed.
+  update(id, source, previous) {
+    if (previous && this.docs.has(id) &&
+        Object.keys(this.fields).every((field) => source[field] === previous[field])) {
+      return;
+    }
+    this.add(id, source);
+  }
+
+  remove(id) {
+    const doc = this.docs.get(id);
+    if (!doc) {
+      return;
+    }
+    for (const term of doc.terms) {
+      const posting = this.postings.get(term);
+      posting.delete(id);
+      if (posting.size === 0) {
+        this.postings.delete(term);
+      }
+      this.pending.set(term, (this.pending.get(term) || 0) - 1);
+    }
+    this.docs.delete(id);
+    this.totalLength -= doc.length;
+  }
+
+  clear() {
+    this.postings.clear();
+    this.docs.clear();
+    this.totalLength = 0;
+    this.trie = new PrefixTrie();
+    this.pending.clear();
+  }
+
+  // Apply document-frequency changes collected since the last lookup.
+  flush() {
+    for (const [term, delta] of this.pending) {
+      if (delta !== 0) {
+        this.trie.add(term, delta);
+      }
+    }
+    this.pending.clear();
+  }
+
+  // Score every document containing a query term. `accept(id)` can exclude
+  // documents (e.g. by a status filter) and `after(score, id)` keeps only
+  // the hits ranked after a cursor. Returns [{ id, score }] for the best
+  // `limit` hits, highest first, the total number of matches and whether
+  // more hits follow the page.
+  search(query, { limit = 10, offset = 0, accept, after } = {}) {
+    const terms = Array.from(new Set(tokenize(query)));
+    const scores = new Map();
+    const n = this.docs.size;
+    const avgLength = n > 0 ? this.totalLength / n : 0;
+    for (const term of terms) {
+      const posting = this.postings.get(term);
+      if (!posting) {
+        continue;
+      }
+      const idf = Math.log(1 + (n - posting.size + 0.5) / (posting.size + 0.5));
+      for (const [id, tf] of posting) {
+        if (accept && !accept(id)) {
+          continue;
+        }
+        const { length } = this.docs.get(id);
+        const norm = tf + K1 * (1 - B + (B * length) / (avgLength || 1));
+        scores.set(id, (scores.get(id) || 0) + (idf * tf * (K1 + 1)) / norm);
+      }
+    }
+    let ranked = scores;
+    if (after) {
+      ranked = new Map();
+      for (const [id, score] of scores) {
+        if (after(score, id)) {
+          ranked.set(id, score);
+        }
+      }
+    }
+    const hits = topK(ranked, offset + limit).slice(offset);
+    return { hits, total: scores.size, more: ranked.size > offset + limit };
+  }
+
+  // Autocomplete the last word of `query` from this index's vocabulary.
+  suggest(query, limit = 10) {
+    const words = String(query || '').toLowerCase().trimStart().split(/\s+/);
+    const prefix = tokenize(words.pop()).join('');
+    if (!prefix) {
+      return [];
+    }
+    const lead = words.length > 0 ? `${words.join(' ')} ` : '';
+    this.flush();
+    return this.trie.suggest(prefix, limit).map(({ term, count }) => ({ text: lead + term, count }));
+  }
+}
+
+// The k highest-scoring entries of a Map(id -> score), via a bounded min-heap.
+function topK(scores, k) {
+  const heap = [];
+  const less = (a, b) => a.score < b.score || (a.score === b.score && a.id > b.id);
+  const swap = (i, j) => {
+    [heap[i], heap[j]] = [heap[j], heap[i]];
+  };
+  const siftUp = (i) => {
+    while (i > 0) {
+      const parent = (i - 1) >> 1;
+      if (!less(heap[i], heap[parent])) {
+        return;
+      }
+      swap(i, parent);
+      i = parent;
+    }
+  };
+  const siftDown = (i) => {
+    for (;;) {
+      const left = 2 * i + 1;
+      const right = left + 1;
+      let smallest = i;
+      if (left < heap.length && less(heap[left], heap[smallest])) {
+        smallest = left;
+      }
+      if (right < heap.length && less(heap[right], heap[smallest])) {
+        smallest = right;
+      }
+      if (smallest === i) {
+        return;
+      }
+      swap(i, smallest);
+      i = smallest;
+    }
+  };
+
+  for (const [id, score] of scores) {
+    const entry = { id, score };
+    if (heap.length < k) {
+      heap.push(entry);
+      siftUp(heap.length - 1);
+    } else if (k > 0 && less(heap[0], entry)) {
+      heap[0] = entry;
+      siftDown(0);
+    }
+  }
+  return heap.sort((a, b) => (less(a, b) ? 1 : less(b, a) ? -1 : 0));
+}
+
+module.exports = { SearchIndex, tokenize, topK };
@@ -0,0 +1,126 @@
+const { users, projects, tasks, files } = require('../store');
+const { SearchIndex, tokenize, topK } = require('./SearchIndex');
+const PrefixTrie = require('./PrefixTrie');
+
+// Searchable entity types: the backing store and the weighted text fields
+const TYPES = {
+  project: { store: projects, fields: { name: 2, description: 1 } },
+  task: { store: tasks, fields: { title: 2, description: 1 } },
+  user: { store: users, fields: { username: 2, firstName: 2, lastName: 2, bio: 1 } },
+  file: { store: files, fields: { filename: 2, description: 1 } }
+};
+
+// Build an index from the store's current contents, then keep it in step
+// with every insert, update and delete instead of rebuilding.
+function attach(store, fields) {
+  const index = new SearchIndex({ fields });
+  for (const doc of store.items.values()) {
+    index.add(doc.id, doc);
+  }
+  store.on('change', ({ type, doc, previous }) => {
+    if (type === 'remove') {
+      index.remove(previous.id);
+    } else {
+      index.update(doc.id, doc, previous);
+    }
+  });
+  store.on('clear', () => index.clear());
+  return index;
+}
+
+const indexes = {};
+for (const [type, { store, fields }] of Object.entries(TYPES)) {
+  indexes[type] = attach(store, fields);
+}
+
+// Whether a hit ranks after the position [score, key]: a lower score, or
+// the same score and a larger key (topK's order for ties).
+const rankedAfter = ([score, key]) => (hitScore, hitKey) => hitScore < score || (hitScore === score && hitKey > key);
+
+// Search one type. `filters` narrow the hits through the store's own
+// indexes; without a query the filtered entities are listed in id order.
+// Pages are either `offset` hits in, or the hits ranked after the position
+// `after` ([score, id] of the last hit already seen); `next` is the
+// position after this page, or null after the last one.
+function searchType(type, query, { filters = {}, limit = 10, offset = 0, after = null } = {}) {
+  const { store } = TYPES[type];
+  const filtered = Object.values(filters).some((value) => value !== undefined);
+  if (tokenize(query).length === 0) {
+    const total = store.count(filters);
+    if (offset > 0) {
+      const ids = store.findIds(filters).slice(offset, offset + limit);
+      return { hits: ids.map((id) => ({ id, score: 0, doc: store.get(id) })), total, next: null };
+    }
+    const { docs, next } = store.page(filters, { after: after && [null, after[1]], limit });
+    return {
+      hits: docs.map((doc) => ({ id: doc.id, score: 0, doc })),
+      total,
+      next: next && [0, next[1]]
+    };
+  }
+  const allowed = filtered ? new Set(store.findIds(filters)) : null;
+  const { hits, total, more } = indexes[type].search(query, {
+    limit,
+    offset,
+    accept: allowed ? (id) => allowed.has(id) : undefined,
+    after: after ? rankedAfter(after) : undefined
+  });
+  const last = hits[hits.length - 1];
+  return {
+    hits: hits.map((hit) => ({ ...hit, doc: store.get(hit.id) })),
+    total,
+    next: more ? [last.score, last.id] : null
+  };
+}
+
+// Search every type (or just `types`) and merge the hits by score. Cursor
+// positions use `type:id` keys.
+function searchAll(query, { types = Object.keys(TYPES), limit = 10, offset = 0, after = null } = {}) {
+  const scored = new Map();
+  let total = 0;
+  let more = false;
+  const ranked = after ? rankedAfter(after) : null;
+  for (const type of types) {
+    const result = indexes[type].search(query, {
+      limit: offset + limit,
+      after: ranked ? (score, id) => ranked(score, `${type}:${id}`) : undefined
+    });
+    total += result.total;
+    more = more || result.more;
+    for (const { id, score } of result.hits) {
+      scored.set(`${type}:${id}`, score);
+    }
+  }
+  const hits = topK(scored, offset + limit).slice(offset).map(({ id: key, score }) => {
+    const separator = key.indexOf(':');
+    const type = key.slice(0, separator);
+    const id = key.slice(separator + 1);
+    return { type, id, score, doc: TYPES[type].store.get(id) };
+  });
+  const last = hits[hits.length - 1];
+  more = more || scored.size > offset + limit;
+  return { hits, total, next: more ? [last.score, `${last.type}:${last.id}`] : null };
+}
+
+// Completions for the last word of `query`, most frequent first.
+function suggest(query, { types = Object.keys(TYPES), limit = 10 } = {}) {
+  const suggestions = [];
+  for (const type of types) {
+    for (const { text, count } of indexes[type].suggest(query, limit)) {
+      suggestions.push({ text, type, count });
+    }
+  }
+  suggestions.sort((a, b) => b.count - a.count || (a.text < b.text ? -1 : a.text > b.text ? 1 : 0));
+  return suggestions.slice(0, limit);
+}
+
+module.exports = {
+  TYPES,
+  indexes,
+  searchType,
+  searchAll,
+  suggest,
+  SearchIndex,
+  PrefixTrie,
+  tokenize
+};
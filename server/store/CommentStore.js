@@ -0,0 +1,65 @@
+const EntityStore = require('./EntityStore');
+
+// Comments on any resource (task, project, ...), threaded by `parentId`.
+//
+// Every comment is indexed under its thread: the comment it replies to, or
+// its resource for a top-level one. A page of a thread is then a page of
+// one index set and a comment's reply count is that set's size, both kept
+// current by every write with no scan of the thread.
+class CommentStore extends EntityStore {
+  constructor(name = 'comments') {
+    super(name, { indexes: ['thread', 'resourceId', 'authorId'], sorted: ['createdAt'] });
+  }
+
+  // The thread key of a comment, or of the replies to `commentId`
+  static threadOf({ resourceId, parentId, commentId }) {
+    if (commentId !== undefined) {
+      return `comment:${commentId}`;
+    }
+    return parentId ? `comment:${parentId}` : `resource:${resourceId}`;
+  }
+
+  insert(data) {
+    return super.insert({ ...data, thread: CommentStore.threadOf(data) });
+  }
+
+  replyCount(id) {
+    return this.count({ thread: CommentStore.threadOf({ commentId: id }) });
+  }
+
+  topLevelCount(resourceId) {
+    return this.count({ thread: CommentStore.threadOf({ resourceId }) });
+  }
+
+  // A page of the top-level comments on `resourceId`, or of the replies to
+  // `parentId`, in page() order
+  thread({ resourceId, parentId }, options) {
+    const thread = parentId ? CommentStore.threadOf({ commentId: parentId }) : CommentStore.threadOf({ resourceId });
+    return this.page({ thread }, options);
+  }
+
+  // Delete a comment. One with replies stays as a tombstone so its thread
+  // still hangs together; a tombstone whose last reply goes is removed in
+  // turn. Returns the comment as it was, or null.
+  discard(id) {
+    const comment = this.get(id);
+    if (!comment) {
+      return null;
+    }
+    if (this.replyCount(comment.id) > 0) {
+      if (!comment.deleted) {
+        this.update(comment.id, { content: '', deleted: true });
+      }
+      return comment;
+    }
+    this.remove(comment.id);
+    let parent = comment.parentId && this.get(comment.parentId);
+    while (parent && parent.deleted && this.replyCount(parent.id) === 0) {
+      this.remove(parent.id);
+      parent = parent.parentId && this.get(parent.parentId);
+    }
+    return comment;
+  }
+}
+
+module.exports = CommentStore;
@@ -0,0 +1,373 @@
+const { EventEmitter } = require('events');
+const { SortedIndex, compare } = require('./SortedIndex');
+
+// In-memory collection: primary Map by id plus secondary hash indexes.
+//
+// Every indexed field keeps value -> Set(id), so an equality filter is a
+// single Map lookup and a combined filter intersects the matching sets,
+// walking the smallest one. Array-valued fields (e.g. tags) index each
+// element. page() seeks into id order or (field, id) order for a `sorted`
+// field for keyset pagination; each order is built on first use and kept up
+// to date from then on, so bulk loads don't pay for it. Writes emit a
+// 'change' event that derived views subscribe to.
+class EntityStore extends EventEmitter {
+  constructor(name, { indexes = [], sorted = [] } = {}) {
+    super();
+    this.setMaxListeners(0);
+    this.name = name;
+    this.items = new Map();
+    this.indexes = new Map(indexes.map((field) => [field, new Map()]));
+    this.sortable = new Set(['id', ...sorted]);
+    this.orders = new Map();
+    this.lastId = 0;
+    this.idStride = 1;
+    this.idOffset = 0;
+  }
+
+  get size() {
+    return this.items.size;
+  }
+
+  // Hand out only every `stride`-th id, starting at `offset` + 1, so
+  // processes inserting into copies of the same collection never collide.
+  partitionIds(stride, offset) {
+    this.idStride = stride;
+    this.idOffset = offset;
+  }
+
+  nextId() {
+    let id = this.lastId + 1;
+    const skew = (((id - 1 - this.idOffset) % this.idStride) + this.idStride) % this.idStride;
+    if (skew > 0) {
+      id += this.idStride - skew;
+    }
+    this.lastId = id;
+    return String(id);
+  }
+
+  seenId(id) {
+    const numericId = Number(id);
+    if (Number.isInteger(numericId) && numericId > this.lastId) {
+      this.lastId = numericId;
+    }
+  }
+
+  get(id) {
+    return this.items.get(String(id)) || null;
+  }
+
+  has(id) {
+    return this.items.has(String(id));
+  }
+
+  all() {
+    return Array.from(this.items.values());
+  }
+
+  insert(data) {
+    const now = new Date().toISOString();
+    const id = data.id !== undefined && data.id !== null ? String(data.id) : this.nextId();
+    const doc = { id, ...data, createdAt: data.createdAt || now, updatedAt: data.updatedAt || now };
+    doc.id = id;
+    if (this.items.has(id)) {
+      throw new Error(`${this.name} ${id} already exists`);
+    }
+    this.seenId(id);
+    this.items.set(doc.id, doc);
+    for (const field of this.indexes.keys()) {
+      this.addToIndex(field, doc[field], doc.id);
+    }
+    for (const [field, order] of this.orders) {
+      order.add(sortKey(doc, field), doc.id);
+    }
+    this.emit('change', { type: 'insert', doc, previous: null });
+    return doc;
+  }
+
+  update(id, patch) {
+    const previous = this.get(id);
+    if (!previous) {
+      return null;
+    }
+    const doc = { ...previous, ...patch, id: previous.id, createdAt: previous.createdAt };
+    doc.updatedAt = patch.updatedAt || new Date().toISOString();
+    for (const field of this.indexes.keys()) {
+      if (doc[field] !== previous[field]) {
+        this.removeFromIndex(field, previous[field], doc.id);
+        this.addToIndex(field, doc[field], doc.id);
+      }
+    }
+    this.replace(doc, previous);
+    this.emit('change', { type: 'update', doc, previous });
+    return doc;
+  }
+
+  // Apply `patch` (an object, or a function from the document to one) to
+  // each of `ids` under one timestamp. Nothing is written unless every id
+  // exists; returns the updated documents, or null. Each document still
+  // gets its own 'change' event, which is what derived views and cluster
+  // replication consume.
+  updateMany(ids, patch) {
+    const docs = ids.map((id) => this.get(id));
+    if (docs.some((doc) => !doc)) {
+      return null;
+    }
+    const updatedAt = new Date().toISOString();
+    return docs.map((doc) => this.update(doc.id, {
+      ...(typeof patch === 'function' ? patch(doc) : patch),
+      updatedAt
+    }));
+  }
+
+  // Store `doc` exactly as given, e.g. a write replicated from another
+  // process: an insert or a whole-document replacement, with the same
+  // change event a local write would emit.
+  put(doc) {
+    const previous = this.get(doc.id);
+    for (const field of this.indexes.keys()) {
+      if (!previous || doc[field] !== previous[field]) {
+        if (previous) {
+          this.removeFromIndex(field, previous[field], doc.id);
+        }
+        this.addToIndex(field, doc[field], doc.id);
+      }
+    }
+    this.seenId(doc.id);
+    this.replace(doc, previous);
+    this.emit('change', { type: previous ? 'update' : 'insert', doc, previous });
+    return doc;
+  }
+
+  // Swap in the new version of a document, moving it in the sort orders
+  // whose key changed.
+  replace(doc, previous) {
+    for (const [field, order] of this.orders) {
+      if (!previous || sortKey(doc, field) !== sortKey(previous, field)) {
+        if (previous) {
+          order.delete(sortKey(previous, field), doc.id);
+        }
+        order.add(sortKey(doc, field), doc.id);
+      }
+    }
+    this.items.set(doc.id, doc);
+  }
+
+  remove(id) {
+    const doc = this.get(id);
+    if (!doc) {
+      return null;
+    }
+    for (const [field, order] of this.orders) {
+      order.delete(sortKey(doc, field), doc.id);
+    }
+    this.items.delete(doc.id);
+    for (const field of this.indexes.keys()) {
+      this.removeFromIndex(field, doc[field], doc.id);
+    }
+    this.emit('change', { type: 'remove', doc: null, previous: doc });
+    return doc;
+  }
+
+  clear() {
+    this.items.clear();
+    for (const index of this.indexes.values()) {
+      index.clear();
+    }
+    this.orders.clear();
+    this.lastId = 0;
+    this.emit('clear');
+  }
+
+  // Ids matching every filter. Indexed fields are resolved through their
+  // sets; other fields are checked against the candidate documents. A filter
+  // value may be an array, meaning "any of these values".
+  findIds(filters = {}) {
+    const { sets, predicates, empty } = this.plan(filters);
+    if (empty) {
+      return [];
+    }
+    const ids = [];
+    if (sets.length === 0) {
+      for (const doc of this.items.values()) {
+        if (predicates.every((test) => test(doc))) {
+          ids.push(doc.id);
+        }
+      }
+      return ids;
+    }
+    const [smallest, ...rest] = sets;
+    for (const id of smallest) {
+      if (rest.every((set) => set.has(id)) &&
+          (predicates.length === 0 || predicates.every((test) => test(this.items.get(id))))) {
+        ids.push(id);
+      }
+    }
+    return ids;
+  }
+
+  // The index sets (smallest first) and document predicates for `filters`;
+  // `empty` when an indexed value has no documents at all.
+  plan(filters) {
+    const sets = [];
+    const predicates = [];
+    for (const [field, value] of Object.entries(filters)) {
+      if (value === undefined) {
+        continue;
+      }
+      const index = this.indexes.get(field);
+      if (!index) {
+        const wanted = new Set(Array.isArray(value) ? value.map(String) : [String(value)]);
+        predicates.push((doc) => matchesValue(doc[field], wanted));
+        continue;
+      }
+      const set = Array.isArray(value) ? unionOf(index, value) : index.get(String(value));
+      if (!set || set.size === 0) {
+        return { sets, predicates, empty: true };
+      }
+      sets.push(set);
+    }
+    sets.sort((a, b) => a.size - b.size);
+    return { sets, predicates, empty: false };
+  }
+
+  // Up to `limit` documents matching `filters` in (sort, id) order, starting
+  // after the position `after` ([key, id] of the last document already
+  // seen, which need not exist any more). `next` is the position to pass
+  // for the following page, or null after the last one. Pages never skip or
+  // repeat a document whose sort key stays put, whatever is inserted or
+  // removed in between. `offset` skips that many matches first, for
+  // clients still paging by number.
+  page(filters = {}, { sort = 'id', descending = false, after = null, offset = 0, limit = 10 } = {}) {
+    const order = this.order(sort);
+    const { sets, predicates, empty } = this.plan(filters);
+    if (empty) {
+      return { docs: [], next: null };
+    }
+    const matches = (id) => sets.every((set) => set.has(id)) &&
+      (predicates.length === 0 || predicates.every((test) => test(this.items.get(id))));
+
+    // Walking the sort order and testing filters visits about
+    // limit * size / candidates documents; sorting the narrowest filter's
+    // candidates costs about candidates. Take the cheaper.
+    const count = offset + limit + 1;
+    let ids;
+    const candidates = sets.length > 0 ? sets[0].size : this.items.size;
+    if (sets.length > 0 && candidates * candidates < count * this.items.size) {
+      ids = this.firstAfter(sets[0], matches, sort, { descending, after, count });
+    } else {
+      ids = [];
+      for (const id of order.walk(after, descending)) {
+        if (matches(id)) {
+          ids.push(id);
+          if (ids.length === count) {
+            break;
+          }
+        }
+      }
+    }
+
+    const docs = ids.slice(offset, offset + limit).map((id) => this.items.get(id));
+    const last = docs[docs.length - 1];
+    return {
+      docs,
+      next: ids.length === count ? [sortKey(last, sort), last.id] : null
+    };
+  }
+
+  // The SortedIndex for `sort`, built now if this is its first use
+  order(sort) {
+    if (!this.sortable.has(sort)) {
+      throw new Error(`${this.name} cannot be sorted by ${sort}`);
+    }
+    let order = this.orders.get(sort);
+    if (!order) {
+      order = SortedIndex.from(Array.from(this.items.values(), (doc) => [sortKey(doc, sort), doc.id]));
+      this.orders.set(sort, order);
+    }
+    return order;
+  }
+
+  // The first `count` of `candidates` past `after` in (sort, id) order, by
+  // sorting just the candidates.
+  firstAfter(candidates, matches, sort, { descending, after, count }) {
+    const sign = descending ? -1 : 1;
+    const entries = [];
+    for (const id of candidates) {
+      const key = sortKey(this.items.get(id), sort);
+      if ((!after || sign * compare(after[0], after[1], key, id) < 0) && matches(id)) {
+        entries.push([key, id]);
+      }
+    }
+    entries.sort((a, b) => sign * compare(a[0], a[1], b[0], b[1]));
+    return entries.slice(0, count).map(([, id]) => id);
+  }
+
+  find(filters = {}) {
+    return this.findIds(filters).map((id) => this.items.get(id));
+  }
+
+  count(filters = {}) {
+    const entries = Object.entries(filters).filter(([, value]) => value !== undefined);
+    if (entries.length === 1 && this.indexes.has(entries[0][0]) && !Array.isArray(entries[0][1])) {
+      const set = this.indexes.get(entries[0][0]).get(String(entries[0][1]));
+      return set ? set.size : 0;
+    }
+    return this.findIds(filters).length;
+  }
+
+  addToIndex(field, value, id) {
+    const index = this.indexes.get(field);
+    for (const key of indexKeys(value)) {
+      let set = index.get(key);
+      if (!set) {
+        set = new Set();
+        index.set(key, set);
+      }
+      set.add(id);
+    }
+  }
+
+  removeFromIndex(field, value, id) {
+    const index = this.indexes.get(field);
+    for (const key of indexKeys(value)) {
+      const set = index.get(key);
+      if (set) {
+        set.delete(id);
+        if (set.size === 0) {
+          index.delete(key);
+        }
+      }
+    }
+  }
+}
+
+// The 'id' order is by id alone.
+function sortKey(doc, field) {
+  return field === 'id' ? null : doc[field];
+}
+
+function indexKeys(value) {
+  if (value === undefined || value === null) {
+    return [];
+  }
+  return Array.isArray(value) ? value.map(String) : [String(value)];
+}
+
+function matchesValue(value, wanted) {
+  return indexKeys(value).some((key) => wanted.has(key));
+}
+
+function unionOf(index, values) {
+  const union = new Set();
+  for (const value of values) {
+    const set = index.get(String(value));
+    if (set) {
+      for (const id of set) {
+        union.add(id);
+      }
+    }
+  }
+  return union;
+}
+
+module.exports = EntityStore;
@@ -0,0 +1,172 @@
+// (key, id) pairs kept in order for keyset pagination.
+//
+// Pairs live in a list of sorted chunks of at most 2 * CHUNK entries (keys
+// and ids in parallel arrays), so a seek is a binary search over the
+// chunks' last entries and then within one chunk, and an insert or delete
+// shifts a single chunk instead of the whole list. Appending past the last
+// entry, the usual case for ids and creation times, skips the search.
+const CHUNK = 256;
+
+class SortedIndex {
+  constructor() {
+    this.chunks = [];
+    this.size = 0;
+  }
+
+  // Index of [key, id] entries in any order, sorted in one go
+  static from(entries) {
+    const index = new SortedIndex();
+    entries.sort((a, b) => compare(a[0], a[1], b[0], b[1]));
+    for (let i = 0; i < entries.length; i += CHUNK) {
+      const slice = entries.slice(i, i + CHUNK);
+      index.chunks.push({ keys: slice.map(([key]) => key), ids: slice.map(([, id]) => id) });
+    }
+    index.size = entries.length;
+    return index;
+  }
+
+  // Chunk index and position of the first entry not before (key, id)
+  seek(key, id) {
+    let lo = 0;
+    let hi = this.chunks.length;
+    while (lo < hi) {
+      const mid = (lo + hi) >> 1;
+      const chunk = this.chunks[mid];
+      const last = chunk.ids.length - 1;
+      if (compare(key, id, chunk.keys[last], chunk.ids[last]) > 0) {
+        lo = mid + 1;
+      } else {
+        hi = mid;
+      }
+    }
+    if (lo === this.chunks.length) {
+      return [lo, 0];
+    }
+    const { keys, ids } = this.chunks[lo];
+    let start = 0;
+    let end = ids.length;
+    while (start < end) {
+      const mid = (start + end) >> 1;
+      if (compare(key, id, keys[mid], ids[mid]) > 0) {
+        start = mid + 1;
+      } else {
+        end = mid;
+      }
+    }
+    return [lo, start];
+  }
+
+  add(key, id) {
+    this.size += 1;
+    const tail = this.chunks[this.chunks.length - 1];
+    if (!tail) {
+      this.chunks.push({ keys: [key], ids: [id] });
+      return;
+    }
+    let c = this.chunks.length - 1;
+    let i = tail.ids.length;
+    if (compare(key, id, tail.keys[i - 1], tail.ids[i - 1]) < 0) {
+      [c, i] = this.seek(key, id);
+    }
+    const chunk = this.chunks[c];
+    insertAt(chunk.keys, i, key);
+    insertAt(chunk.ids, i, id);
+    if (chunk.ids.length > 2 * CHUNK) {
+      this.chunks.splice(c + 1, 0, { keys: chunk.keys.splice(CHUNK), ids: chunk.ids.splice(CHUNK) });
+    }
+  }
+
+  delete(key, id) {
+    const [c, i] = this.seek(key, id);
+    const chunk = this.chunks[c];
+    if (!chunk || chunk.ids[i] !== id) {
+      return false;
+    }
+    chunk.keys.splice(i, 1);
+    chunk.ids.splice(i, 1);
+    if (chunk.ids.length === 0) {
+      this.chunks.splice(c, 1);
+    }
+    this.size -= 1;
+    return true;
+  }
+
+  // Ids strictly after the position `after` ([key, id], or null for the
+  // start) in ascending order, or strictly before it descending. The index
+  // must not change while the walk is in progress.
+  * walk(after, descending = false) {
+    let [c, i] = after ? this.seek(after[0], after[1]) : [descending ? this.chunks.length : 0, 0];
+    if (descending) {
+      for (i -= 1; c >= 0; c -= 1, i = c >= 0 ? this.chunks[c].ids.length - 1 : 0) {
+        for (; i >= 0 && c < this.chunks.length; i -= 1) {
+          yield this.chunks[c].ids[i];
+        }
+      }
+      return;
+    }
+    if (after && c < this.chunks.length &&
+        compare(after[0], after[1], this.chunks[c].keys[i], this.chunks[c].ids[i]) === 0) {
+      i += 1;
+    }
+    for (; c < this.chunks.length; c += 1, i = 0) {
+      for (const { ids } = this.chunks[c]; i < ids.length; i += 1) {
+        yield ids[i];
+      }
+    }
+  }
+}
+
+// Array#splice allocates an array for the removed items even when there
+// are none, which adds up over a bulk load.
+function insertAt(array, i, value) {
+  for (let j = array.length; j > i; j -= 1) {
+    array[j] = array[j - 1];
+  }
+  array[i] = value;
+}
+
+// Order of (key, id) pairs: by key with missing keys last and different
+// types by type name, then numeric ids numerically before any other ids.
+function compare(keyA, idA, keyB, idB) {
+  if (keyA !== keyB) {
+    const aMissing = keyA === undefined || keyA === null;
+    const bMissing = keyB === undefined || keyB === null;
+    if (aMissing || bMissing) {
+      if (aMissing !== bMissing) {
+        return aMissing ? 1 : -1;
+      }
+    } else if (typeof keyA !== typeof keyB) {
+      return typeof keyA < typeof keyB ? -1 : 1;
+    } else {
+      return keyA < keyB ? -1 : 1;
+    }
+  }
+  return compareIds(idA, idB);
+}
+
+function compareIds(a, b) {
+  if (a === b) {
+    return 0;
+  }
+  const aNumeric = isNumeric(a);
+  const bNumeric = isNumeric(b);
+  if (aNumeric && bNumeric && a.length !== b.length) {
+    return a.length - b.length;
+  }
+  if (aNumeric !== bNumeric) {
+    return aNumeric ? -1 : 1;
+  }
+  return a < b ? -1 : 1;
+}
+
+function isNumeric(id) {
+  for (let i = 0; i < id.length; i += 1) {
+    const code = id.charCodeAt(i);
+    if (code < 48 || code > 57) {
+      return false;
+    }
+  }
+  return id.length > 0;
+}
+
+module.exports = { SortedIndex, compare };
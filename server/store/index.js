@@ -0,0 +1,144 @@
+const fs = require('fs');
+const readline = require('readline');
+const EntityStore = require('./EntityStore');
+const CommentStore = require('./CommentStore');
+
+// Shared collections behind the users, projects, tasks, files,
+// notifications, comments and tags routes. `sorted` fields are the list routes'
+// sort options besides id.
+const users = new EntityStore('users', { indexes: ['role', 'email'], sorted: ['createdAt', 'username'] });
+const projects = new EntityStore('projects', {
+  indexes: ['status', 'priority', 'owner', 'tags'],
+  sorted: ['createdAt', 'updatedAt', 'name']
+});
+const tasks = new EntityStore('tasks', {
+  indexes: ['status', 'assignee', 'priority', 'projectId', 'tags'],
+  sorted: ['createdAt', 'updatedAt', 'dueDate']
+});
+const files = new EntityStore('files', {
+  indexes: ['userId', 'filetype', 'projectId', 'hash'],
+  sorted: ['createdAt', 'filename', 'filesize']
+});
+const notifications = new EntityStore('notifications', { indexes: ['userId'] });
+const comments = new CommentStore();
+const tags = new EntityStore('tags', { indexes: ['name'], sorted: ['name', 'createdAt'] });
+
+const collections = { users, projects, tasks, files, notifications, comments, tags };
+
+const TASK_STATUSES = ['todo', 'in_progress', 'review', 'completed', 'cancelled'];
+const PROJECT_STATUSES = ['planning', 'active', 'in_progress', 'on_hold', 'completed', 'cancelled'];
+const PRIORITIES = ['low', 'medium', 'high', 'urgent'];
+
+function seedDefaults() {
+  users.insert({
+    id: '1',
+    username: 'testuser',
+    email: 'test@example.com',
+    firstName: 'Test',
+    lastName: 'User',
+    role: 'admin'
+  });
+  projects.insert({
+    id: '1',
+    name: 'Sample Project',
+    description: 'A sample project for testing',
+    status: 'active',
+    priority: 'medium',
+    owner: '1'
+  });
+  tasks.insert({
+    id: '1',
+    title: 'Sample Task',
+    description: 'A sample task for testing',
+    projectId: '1',
+    status: 'todo',
+    priority: 'medium',
+    assignee: '1'
+  });
+  files.insert({
+    id: '1',
+    filename: 'document.pdf',
+    filetype: 'application/pdf',
+    filesize: 2048576,
+    userId: '1',
+    description: 'Important project document'
+  });
+  files.insert({
+    id: '2',
+    filename: 'image.jpg',
+    filetype: 'image/jpeg',
+    filesize: 1024576,
+    userId: '1'
+  });
+  notifications.insert({
+    id: '1',
+    type: 'task_assigned',
+    title: 'New Task Assigned',
+    message: 'You have been assigned to "Sample Task"',
+    priority: 'medium',
+    userId: '1',
+    isRead: false,
+    readAt: null
+  });
+  notifications.insert({
+    id: '2',
+    type: 'project_update',
+    title: 'Project Update',
+    message: 'Project "Sample Project" status changed to active',
+    priority: 'low',
+    userId: '1',
+    isRead: true,
+    readAt: new Date().toISOString()
+  });
+}
+
+function reset() {
+  for (const store of Object.values(collections)) {
+    store.clear();
+  }
+  seedDefaults();
+}
+
+// Bulk-load NDJSON records of the form {"collection": "tasks", ...fields}
+// (as written by benchmarks/datagen.py). Returns the number of records loaded.
+async function loadFile(file) {
+  const lines = readline.createInterface({ input: fs.createReadStream(file), crlfDelay: Infinity });
+  let loaded = 0;
+  for await (const line of lines) {
+    if (!line.trim()) {
+      continue;
+    }
+    const { collection, ...doc } = JSON.parse(line);
+    const store = collections[collection];
+    if (!store) {
+      throw new Error(`Unknown collection in seed file: ${collection}`);
+    }
+    if (doc.id !== undefined && store.has(doc.id)) {
+      store.update(doc.id, doc);
+    } else {
+      store.insert(doc);
+    }
+    loaded += 1;
+  }
+  return loaded;
+}
+
+seedDefaults();
+
+module.exports = {
+  EntityStore,
+  CommentStore,
+  users,
+  projects,
+  tasks,
+  files,
+  notifications,
+  comments,
+  tags,
+  collections,
+  reset,
+  loadFile,
+  TASK_STATUSES,
+  PROJECT_STATUSES,
+  PRIORITIES
+};
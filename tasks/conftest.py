@@ -0,0 +1,9 @@
+import pytest
+
+from harness.routes import load_route_table
+
+
+@pytest.fixture(scope='session')
+def route_table():
+    """Routes registered in server/app.js, parsed once per session."""
+    return load_route_table()
@@ -1,49 +1,28 @@
 import pytest
-import os
-import subprocess
-import sys
 
 class TestNotificationAPI:
     """Simple tests for notification system API endpoints - check if endpoints exist in server code"""
     
-    def test_get_notifications_endpoint_exists(self):
+    def test_get_notifications_endpoint_exists(self, route_table):
         """Test GET /api/notifications endpoint exists in server code"""
-        app_file = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'server', 'app.js'))
-        with open(app_file, 'r') as f:
-            content = f.read()
-        assert "app.get('/api/notifications'," in content, "GET /api/notifications endpoint not found"
+        assert route_table.has('GET', '/api/notifications'), "GET /api/notifications endpoint not found"
 
-    def test_create_notification_endpoint_exists(self):
+    def test_create_notification_endpoint_exists(self, route_table):
         """Test POST /api/notifications endpoint exists in server code"""
-        app_file = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'server', 'app.js'))
-        with open(app_file, 'r') as f:
-            content = f.read()
-        assert "app.post('/api/notifications'," in content, "POST /api/notifications endpoint not found"
+        assert route_table.has('POST', '/api/notifications'), "POST /api/notifications endpoint not found"
 
-    def test_mark_notification_read_endpoint_exists(self):
+    def test_mark_notification_read_endpoint_exists(self, route_table):
         """Test PUT /api/notifications/:id/read endpoint exists in server code"""
-        app_file = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'server', 'app.js'))
-        with open(app_file, 'r') as f:
-            content = f.read()
-        assert "app.put('/api/notifications/:id/read'," in content, "PUT /api/notifications/:id/read endpoint not found"
+        assert route_table.has('PUT', '/api/notifications/:id/read'), "PUT /api/notifications/:id/read endpoint not found"
 
-    def test_delete_notification_endpoint_exists(self):
+    def test_delete_notification_endpoint_exists(self, route_table):
         """Test DELETE /api/notifications/:id endpoint exists in server code"""
-        app_file = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'server', 'app.js'))
-        with open(app_file, 'r') as f:
-            content = f.read()
-        assert "app.delete('/api/notifications/:id'," in content, "DELETE /api/notifications/:id endpoint not found"
+        assert route_table.has('DELETE', '/api/notifications/:id'), "DELETE /api/notifications/:id endpoint not found"
 
-    def test_unread_count_endpoint_exists(self):
+    def test_unread_count_endpoint_exists(self, route_table):
         """Test GET /api/notifications/unread/count endpoint exists in server code"""
-        app_file = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'server', 'app.js'))
-        with open(app_file, 'r') as f:
-            content = f.read()
-        assert "app.get('/api/notifications/unread/count'," in content, "GET /api/notifications/unread/count endpoint not found"
+        assert route_table.has('GET', '/api/notifications/unread/count'), "GET /api/notifications/unread/count endpoint not found"
 
-    def test_mark_all_read_endpoint_exists(self):
+    def test_mark_all_read_endpoint_exists(self, route_table):
         """Test PUT /api/notifications/mark-all-read endpoint exists in server code"""
-        app_file = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'server', 'app.js'))
-        with open(app_file, 'r') as f:
-            content = f.read()
-        assert "app.put('/api/notifications/mark-all-read'," in content, "PUT /api/notifications/mark-all-read endpoint not found"
+        assert route_table.has('PUT', '/api/notifications/mark-all-read'), "PUT /api/notifications/mark-all-read endpoint not found"
@@ -1,49 +1,28 @@
 import pytest
-import os
-import subprocess
-import sys
 
 class TestFileManagementAPI:
     """Simple tests for file management API endpoints - check if endpoints exist in server code"""
     
-    def test_upload_file_endpoint_exists(self):
+    def test_upload_file_endpoint_exists(self, route_table):
         """Test POST /api/files/upload endpoint exists in server code"""
-        app_file = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'server', 'app.js'))
-        with open(app_file, 'r') as f:
-            content = f.read()
-        assert "app.post('/api/files/upload'," in content, "POST /api/files/upload endpoint not found"
+        assert route_table.has('POST', '/api/files/upload'), "POST /api/files/upload endpoint not found"
 
-    def test_get_files_endpoint_exists(self):
+    def test_get_files_endpoint_exists(self, route_table):
         """Test GET /api/files endpoint exists in server code"""
-        app_file = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'server', 'app.js'))
-        with open(app_file, 'r') as f:
-            content = f.read()
-        assert "app.get('/api/files'," in content, "GET /api/files endpoint not found"
+        assert route_table.has('GET', '/api/files'), "GET /api/files endpoint not found"
 
-    def test_get_file_metadata_endpoint_exists(self):
+    def test_get_file_metadata_endpoint_exists(self, route_table):
         """Test GET /api/files/:id endpoint exists in server code"""
-        app_file = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'server', 'app.js'))
-        with open(app_file, 'r') as f:
-            content = f.read()
-        assert "app.get('/api/files/:id'," in content, "GET /api/files/:id endpoint not found"
+        assert route_table.has('GET', '/api/files/:id'), "GET /api/files/:id endpoint not found"
 
-    def test_download_file_endpoint_exists(self):
+    def test_download_file_endpoint_exists(self, route_table):
         """Test GET /api/files/:id/download endpoint exists in server code"""
-        app_file = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'server', 'app.js'))
-        with open(app_file, 'r') as f:
-            content = f.read()
-        assert "app.get('/api/files/:id/download'," in content, "GET /api/files/:id/download endpoint not found"
+        assert route_table.has('GET', '/api/files/:id/download'), "GET /api/files/:id/download endpoint not found"
 
-    def test_delete_file_endpoint_exists(self):
+    def test_delete_file_endpoint_exists(self, route_table):
         """Test DELETE /api/files/:id endpoint exists in server code"""
-        app_file = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'server', 'app.js'))
-        with open(app_file, 'r') as f:
-            content = f.read()
-        assert "app.delete('/api/files/:id'," in content, "DELETE /api/files/:id endpoint not found"
+        assert route_table.has('DELETE', '/api/files/:id'), "DELETE /api/files/:id endpoint not found"
 
-    def test_rename_file_endpoint_exists(self):
+    def test_rename_file_endpoint_exists(self, route_table):
         """Test PUT /api/files/:id/rename endpoint exists in server code"""
-        app_file = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'server', 'app.js'))
-        with open(app_file, 'r') as f:
-            content = f.read()
-        assert "app.put('/api/files/:id/rename'," in content, "PUT /api/files/:id/rename endpoint not found"
+        assert route_table.has('PUT', '/api/files/:id/rename'), "PUT /api/files/:id/rename endpoint not found"
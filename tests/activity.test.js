@@ -0,0 +1,140 @@
+const fs = require('fs');
+const os = require('os');
+const path = require('path');
+const request = require('supertest');
+const app = require('../server/app');
+const { ActivityLog, activities } = require('../server/activity');
+
+const HOUR = 60 * 60 * 1000;
+
+describe('ActivityLog', () => {
+  let dir;
+  let clock;
+  let log;
+
+  const openLog = () => new ActivityLog({ dir, bucketMs: HOUR, now: () => clock });
+
+  beforeEach(() => {
+    dir = fs.mkdtempSync(path.join(os.tmpdir(), 'activity-log-'));
+    clock = Date.parse('2026-01-01T00:00:00Z');
+    log = openLog();
+    // A record every 18s for three hours: four hourly segments, the last
+    // holding a single record. Every third record is user 7's.
+    for (let i = 0; i < 600; i += 1) {
+      clock += (3 * HOUR) / 600;
+      log.append({
+        action: i % 2 ? 'task_updated' : 'project_created',
+        userId: i % 3 ? '1' : '7',
+        resource: { type: 'task', id: String(i % 10) }
+      });
+    }
+  });
+
+  afterEach(() => {
+    log.close();
+    fs.rmSync(dir, { recursive: true, force: true });
+  });
+
+  test('writes one segment file per time bucket', () => {
+    const files = fs.readdirSync(dir).filter((name) => name.endsWith('.ndjson'));
+    expect(files).toHaveLength(4);
+    expect(log.count).toBe(600);
+  });
+
+  test('pages newest first across segments', () => {
+    const { records, total } = log.find({}, { offset: 195, limit: 10 });
+    expect(total).toBe(600);
+    expect(records.map((r) => r.id)).toEqual(['405', '404', '403', '402', '401', '400', '399', '398', '397', '396']);
+  });
+
+  test('serves user and resource filters from the segment indexes', () => {
+    const byUser = log.find({ userId: '7' }, { limit: 3 });
+    expect(byUser.total).toBe(200);
+    expect(byUser.records.map((r) => r.id)).toEqual(['598', '595', '592']);
+
+    const combined = log.find({ userId: '7', resource: 'task:0', action: 'project_created' }, { limit: 100 });
+    expect(combined.total).toBe(20);
+    expect(combined.records.every((r) => r.userId === '7' && r.resource.id === '0')).toBe(true);
+  });
+
+  test('reloads sealed segments from their index and rescans the open one', () => {
+    log.close();
+    const reopened = openLog();
+    expect(reopened.find({ userId: '7' }).total).toBe(200);
+    const record = reopened.append({ action: 'user_login', userId: '7' });
+    expect(record.id).toBe('601');
+    expect(reopened.find({ userId: '7' }, { limit: 1 }).records[0].id).toBe('601');
+    reopened.close();
+  });
+
+  test('streams a time range oldest first', async () => {
+    const ids = [];
+    for await (const record of log.stream({
+      since: Date.parse('2026-01-01T01:00:00Z'),
+      until: Date.parse('2026-01-01T01:30:00Z'),
+      filters: { action: 'task_updated' }
+    })) {
+      ids.push(Number(record.id));
+    }
+    expect(ids).toHaveLength(51);
+    expect(ids[0]).toBe(200);
+    expect(ids[50]).toBe(300);
+    expect(ids).toEqual([...ids].sort((a, b) => a - b));
+  });
+
+  test('cleanup drops whole expired segments only', () => {
+    const result = log.cleanup({ before: Date.parse('2026-01-01T02:30:00Z') });
+    expect(result).toEqual({ deleted: 399, remaining: 201, segments: 2 });
+    expect(log.find({}, { offset: 200, limit: 10 }).records.map((r) => r.id)).toEqual(['400']);
+
+    expect(log.cleanup({ before: clock + HOUR, keepCount: 1 }).deleted).toBe(200);
+    expect(log.count).toBe(1);
+  });
+});
+
+describe('Activity API', () => {
+  beforeEach(() => activities.clear());
+
+  const logActivity = (body) => request(app).post('/api/activities').send(body).expect(201);
+
+  test('POST /api/activities is returned by the user and resource routes', async () => {
+    await logActivity({ action: 'project_created', userId: '1', resource: { type: 'project', id: '1', name: 'Sample Project' } });
+    await logActivity({ action: 'user_login', userId: '2' });
+
+    const byUser = await request(app).get('/api/activities/user/1').expect(200);
+    expect(byUser.body.total).toBe(1);
+    expect(byUser.body.activities[0].user.name).toBe('Test User');
+
+    const byResource = await request(app).get('/api/activities/resource/project/1').expect(200);
+    expect(byResource.body.activities.map((a) => a.action)).toEqual(['project_created']);
+
+    const all = await request(app).get('/api/activities').expect(200);
+    expect(all.body.map((a) => a.action)).toEqual(['user_login', 'project_created']);
+  });
+
+  test('GET /api/activities/export streams CSV, NDJSON and JSON', async () => {
+    await logActivity({ action: 'task_updated', userId: '1', description: 'Renamed "a, b"' });
+    await logActivity({ action: 'user_login', userId: '1' });
+
+    const csv = await request(app).get('/api/activities/export?format=csv').expect(200);
+    expect(csv.headers['content-type']).toMatch(/text\/csv/);
+    expect(csv.text.split('\n')[1]).toContain('"Renamed ""a, b"""');
+
+    const ndjson = await request(app).get('/api/activities/export?format=ndjson&action=user_login').expect(200);
+    expect(ndjson.text.trim().split('\n').map((line) => JSON.parse(line).action)).toEqual(['user_login']);
+
+    const json = await request(app).get('/api/activities/export').expect(200);
+    expect(json.body.totalRecords).toBe(2);
+    expect(json.body.exportData[0].user).toBe('Test User');
+  });
+
+  test('DELETE /api/activities/cleanup keeps current segments', async () => {
+    await logActivity({ action: 'user_login', userId: '1' });
+
+    const response = await request(app).delete('/api/activities/cleanup?olderThan=30d').expect(200);
+    expect(response.body.deletedCount).toBe(0);
+    expect(response.body.remainingCount).toBe(1);
+
+    await request(app).delete('/api/activities/cleanup?olderThan=soon').expect(400);
+  });
+});
@@ -0,0 +1,98 @@
+const express = require('express');
+const request = require('supertest');
+const app = require('../server/app');
+const { dispatch } = require('../server/batch');
+const { reset, tasks, users } = require('../server/store');
+
+describe('Bulk task updates', () => {
+  beforeEach(() => {
+    reset();
+    for (let i = 0; i < 5; i += 1) {
+      tasks.insert({ title: `Task ${i}`, status: 'todo', tags: ['a'] });
+    }
+  });
+
+  test('update every listed task under one timestamp', async () => {
+    const status = await request(app).patch('/api/tasks/bulk/status')
+      .send({ ids: ['1', '2', '2', '3'], status: 'completed' }).expect(200);
+    expect(status.body.updated).toBe(3);
+    expect(new Set(status.body.tasks.map((task) => task.updatedAt)).size).toBe(1);
+    expect(tasks.count({ status: 'completed' })).toBe(3);
+
+    await request(app).patch('/api/tasks/bulk/assignee').send({ ids: ['1', '4'], assignee: 7 }).expect(200);
+    expect(tasks.find({ assignee: '7' }).map((task) => task.id)).toEqual(['1', '4']);
+
+    const tags = await request(app).patch('/api/tasks/bulk/tags')
+      .send({ ids: ['1', '5'], add: ['b'], remove: ['a'] }).expect(200);
+    expect(tags.body.tasks.map((task) => task.tags)).toEqual([['b'], ['b']]);
+    expect(tasks.get('2').tags).toEqual(['a']);
+  });
+
+  test('write nothing when a task is missing or the input is bad', async () => {
+    const missing = await request(app).patch('/api/tasks/bulk/status')
+      .send({ ids: ['1', '99'], status: 'completed' }).expect(404);
+    expect(missing.body.missing).toEqual(['99']);
+    expect(tasks.get('1').status).toBe('todo');
+
+    await request(app).patch('/api/tasks/bulk/status').send({ ids: ['1'], status: 'nope' }).expect(400);
+    await request(app).patch('/api/tasks/bulk/status').send({ ids: [], status: 'completed' }).expect(400);
+    await request(app).patch('/api/tasks/bulk/tags').send({ ids: ['1'] }).expect(400);
+  });
+});
+
+describe('POST /api/batch', () => {
+  beforeEach(() => {
+    reset();
+    users.insert({ username: 'second' });
+    tasks.insert({ title: 'Existing', status: 'todo' });
+  });
+
+  test('runs sub-requests in order with a status each', async () => {
+    const response = await request(app).post('/api/batch').set('X-User-Id', '2').send({
+      requests: [
+        { id: 'create', method: 'POST', path: '/api/tasks', body: { title: 'New' } },
+        { method: 'patch', path: '/api/tasks/2/status', body: { status: 'completed' } },
+        { method: 'PATCH', path: '/api/tasks/99/status', body: { status: 'completed' } },
+        { method: 'GET', path: '/api/tasks?status=completed&limit=1' },
+        { method: 'GET', path: '/api/users/profile' },
+        { method: 'GET', path: '/api/notifications/stream' },
+        { method: 'GET', path: '/api/nowhere' }
+      ]
+    }).expect(200);
+
+    const { responses } = response.body;
+    expect(responses.map((item) => item.status)).toEqual([201, 200, 404, 200, 200, 400, 404]);
+    expect(responses[0].id).toBe('create');
+    expect(responses[0].body.task.title).toBe('New');
+    expect(responses[3].body.map((task) => task.id)).toEqual(['2']);
+    expect(responses[4].body.user.id).toBe('2');
+    expect(tasks.get('2').status).toBe('completed');
+  });
+
+  test('answers items asking for a compressed or partial response in full', async () => {
+    const response = await request(app).post('/api/batch').send({
+      requests: [
+        { method: 'GET', path: '/api/tasks/2', headers: { 'Accept-Encoding': 'gzip, br' } },
+        { method: 'GET', path: '/api/tasks/2', headers: { 'If-None-Match': '*', Range: 'bytes=0-1' } }
+      ]
+    }).expect(200);
+    expect(response.body.responses.map((item) => item.status)).toEqual([200, 200]);
+    expect(response.body.responses[0].body.task.title).toBe('Existing');
+    expect(response.body.responses[1].body).toEqual(response.body.responses[0].body);
+  });
+
+  test('turns a malformed JSON sub-response into a 500 item', async () => {
+    const broken = express();
+    broken.get('/api/broken', (req, res) => res.type('json').send('{"partial": '));
+    broken.get('/api/run', async (req, res) => res.json(await dispatch(broken, req, { method: 'GET', path: '/api/broken' })));
+    const response = await request(broken).get('/api/run').expect(200);
+    expect(response.body.status).toBe(500);
+  });
+
+  test('rejects malformed batches', async () => {
+    await request(app).post('/api/batch').send({}).expect(400);
+    await request(app).post('/api/batch').send({ requests: new Array(1001).fill({ method: 'GET', path: '/api/health' }) }).expect(400);
+    const response = await request(app).post('/api/batch').send({ requests: [null, { method: 'TRACE', path: '/api/health' }] }).expect(200);
+    expect(response.body.responses.map((item) => item.status)).toEqual([400, 400]);
+  });
+});
@@ -0,0 +1,99 @@
+const request = require('supertest');
+const app = require('../server/app');
+const { reset, tasks } = require('../server/store');
+const { ResponseCache, responses, negotiateEncoding, etagMatches } = require('../server/cache');
+
+const entry = (text, types) => ({ body: Buffer.from(text), hash: text, contentType: 'application/json', types, generation: 0 });
+
+describe('ResponseCache', () => {
+  test('evicts least recently used entries past the byte cap', () => {
+    const cache = new ResponseCache({ maxBytes: 10 });
+    cache.set('a', entry('aaaa', ['tasks']));
+    cache.set('b', entry('bbbb', ['tasks']));
+    cache.get('a');
+    cache.set('c', entry('cccc', ['users']));
+    expect(Array.from(cache.entries.keys())).toEqual(['a', 'c']);
+    expect(cache.bytes).toBe(8);
+  });
+
+  test('invalidates by resource type and refuses stale writes', () => {
+    const cache = new ResponseCache();
+    cache.set('tasks', entry('[1]', ['tasks']));
+    cache.set('dashboard', entry('{}', ['tasks', 'users']));
+    cache.set('users', entry('[2]', ['users']));
+    const generation = cache.generation(['tasks']);
+
+    cache.invalidate('tasks');
+    expect(Array.from(cache.entries.keys())).toEqual(['users']);
+    expect(cache.set('tasks', { ...entry('[1]', ['tasks']), generation })).toBe(null);
+  });
+});
+
+describe('Content negotiation', () => {
+  test('prefers brotli, honours q-values and compares ETags weakly', () => {
+    expect(negotiateEncoding('gzip, deflate, br')).toBe('br');
+    expect(negotiateEncoding('gzip;q=1.0, br;q=0.5')).toBe('gzip');
+    expect(negotiateEncoding('br;q=0, *')).toBe('gzip');
+    expect(negotiateEncoding('identity')).toBe(null);
+    expect(etagMatches('"x", W/"abc"', '"abc"')).toBe(true);
+    expect(etagMatches('"x"', '"abc"')).toBe(false);
+  });
+});
+
+describe('Response cache middleware', () => {
+  beforeEach(() => {
+    reset();
+    responses.clear();
+  });
+
+  test('answers If-None-Match with 304 and serves repeats from the cache', async () => {
+    const first = await request(app).get('/api/tasks').expect(200);
+    expect(first.headers.etag).toMatch(/^"[\w-]+"$/);
+
+    const hits = responses.hits;
+    await request(app).get('/api/tasks').set('If-None-Match', first.headers.etag).expect(304);
+    expect(responses.hits).toBe(hits + 1);
+  });
+
+  test('writes to a resource type invalidate its cached responses', async () => {
+    const before = await request(app).get('/api/tasks').expect(200);
+    await request(app).post('/api/tasks').send({ title: 'New' }).expect(201);
+
+    const after = await request(app).get('/api/tasks').set('If-None-Match', before.headers.etag).expect(200);
+    expect(after.body).toHaveLength(2);
+    expect(after.headers.etag).not.toBe(before.headers.etag);
+
+    tasks.remove('1');
+    const removed = await request(app).get('/api/tasks').expect(200);
+    expect(removed.body.map((task) => task.title)).toEqual(['New']);
+  });
+
+  test('negotiates compressed variants with their own ETags', async () => {
+    for (let i = 0; i < 50; i += 1) {
+      tasks.insert({ title: `Task ${i}`, description: 'Repetitive description text', status: 'todo' });
+    }
+    const plain = await request(app).get('/api/tasks').set('Accept-Encoding', 'identity').expect(200);
+    const gzip = await request(app).get('/api/tasks').set('Accept-Encoding', 'gzip').expect(200);
+
+    expect(plain.headers['content-encoding']).toBe(undefined);
+    expect(gzip.headers['content-encoding']).toBe('gzip');
+    expect(gzip.headers.vary).toMatch(/Accept-Encoding/);
+    expect(Number(gzip.headers['content-length'])).toBeLessThan(Number(plain.headers['content-length']) / 4);
+    expect(gzip.headers.etag).not.toBe(plain.headers.etag);
+  });
+
+  test('concurrent misses share one compression of a variant', async () => {
+    for (let i = 0; i < 50; i += 1) {
+      tasks.insert({ title: `Task ${i}`, description: 'Repetitive description text', status: 'todo' });
+    }
+    await request(app).get('/api/tasks').set('Accept-Encoding', 'identity').expect(200);
+    const bytes = responses.bytes;
+    const [first, second] = await Promise.all([1, 2].map(() =>
+      request(app).get('/api/tasks').set('Accept-Encoding', 'gzip').expect(200)));
+
+    expect(first.headers['content-encoding']).toBe('gzip');
+    expect(second.headers.etag).toBe(first.headers.etag);
+    expect(responses.bytes).toBe(bytes + Number(first.headers['content-length']));
+    await request(app).head('/api/tasks').set('Accept-Encoding', 'gzip').set('If-None-Match', first.headers.etag).expect(304);
+  });
+});
@@ -0,0 +1,280 @@
+const fs = require('fs');
+const http = require('http');
+const net = require('net');
+const os = require('os');
+const path = require('path');
+const cluster = require('cluster');
+const { EventEmitter } = require('events');
+const { spawn } = require('child_process');
+const { EntityStore } = require('../server/store');
+const { ActivityLog } = require('../server/activity');
+const { workerCount } = require('../server/cluster');
+const Primary = require('../server/cluster/primary');
+
+const HOUR = 60 * 60 * 1000;
+
+const freePort = () => new Promise((resolve) => {
+  const server = net.createServer().listen(0, () => {
+    const { port } = server.address();
+    server.close(() => resolve(port));
+  });
+});
+
+// One request on a fresh connection, so the primary hands each to the next
+// worker in turn
+const send = (port, method, pathname, body) => new Promise((resolve, reject) => {
+  const payload = body === undefined ? '' : JSON.stringify(body);
+  const req = http.request({
+    port, method, path: pathname, agent: false,
+    headers: { 'Content-Type': 'application/json', 'Content-Length': Buffer.byteLength(payload) }
+  }, (res) => {
+    let text = '';
+    res.on('data', (chunk) => { text += chunk; });
+    res.on('end', () => resolve({ status: res.statusCode, body: text ? JSON.parse(text) : null }));
+  });
+  req.on('error', reject);
+  req.end(payload);
+});
+
+describe('Replicated stores', () => {
+  test('partitioned ids never collide and skip past replicated ones', () => {
+    const first = new EntityStore('tasks');
+    const second = new EntityStore('tasks');
+    first.partitionIds(2, 0);
+    second.partitionIds(2, 1);
+
+    const a = first.insert({ title: 'a' });
+    const b = second.insert({ title: 'b' });
+    expect([a.id, b.id]).toEqual(['1', '2']);
+
+    first.put(b);
+    expect(first.insert({ title: 'c' }).id).toBe('3');
+    second.put(first.get('3'));
+    expect(second.insert({ title: 'd' }).id).toBe('4');
+  });
+
+  test('put replaces the whole document and reindexes it', () => {
+    const store = new EntityStore('tasks', { indexes: ['status'] });
+    const events = [];
+    store.on('change', ({ type }) => events.push(type));
+    store.put({ id: '7', status: 'todo', title: 'x' });
+    store.put({ id: '7', status: 'review' });
+
+    expect(store.get('7')).toEqual({ id: '7', status: 'review' });
+    expect(store.count({ status: 'todo' })).toBe(0);
+    expect(store.count({ status: 'review' })).toBe(1);
+    expect(events).toEqual(['insert', 'update']);
+  });
+});
+
+describe('Followed activity log', () => {
+  let dir;
+  let clock;
+  let leader;
+  let follower;
+
+  beforeEach(() => {
+    dir = fs.mkdtempSync(path.join(os.tmpdir(), 'activity-follow-'));
+    clock = Date.parse('2026-01-01T00:00:00Z');
+    leader = new ActivityLog({ dir, bucketMs: HOUR, now: () => clock });
+    leader.append({ action: 'user_login', userId: '1' });
+
+    // The follower reads the same files and indexes whatever the leader
+    // reports writing, like a cluster worker and the primary.
+    follower = new ActivityLog({ dir, bucketMs: HOUR, now: () => clock });
+    follower.partitionIds(2, 1);
+    follower.follow({
+      append: (record) => follower.ingest({ record, ...leader.write(record) }),
+      cleanup: async (options) => leader.cleanup(options),
+      clear: () => leader.clear()
+    });
+  });
+
+  afterEach(() => {
+    leader.close();
+    follower.close();
+    fs.rmSync(dir, { recursive: true, force: true });
+  });
+
+  test('indexes the leader writes without rereading the files', () => {
+    clock += HOUR / 2;
+    const record = follower.append({ action: 'task_updated', userId: '7' });
+    clock += HOUR;
+    follower.append({ action: 'task_updated', userId: '7' });
+
+    expect(record.id).toBe('2');
+    expect(follower.find({ userId: '7' }).total).toBe(2);
+    expect(follower.find({}, { limit: 3 }).records.map((r) => r.id)).toEqual(['4', '2', '1']);
+    expect(leader.find({ userId: '7' }).total).toBe(2);
+  });
+
+  test('forwards retention to the leader', async () => {
+    clock += 2 * HOUR;
+    follower.append({ action: 'task_updated', userId: '7' });
+    const result = await follower.cleanup({ before: clock });
+    expect(result.deleted).toBe(1);
+
+    follower.forget([Date.parse('2026-01-01T00:00:00Z')]);
+    expect(follower.count).toBe(1);
+  });
+});
+
+describe('Cluster', () => {
+  let dir;
+  let port;
+  let primary;
+  let output;
+
+  // Resolves once the primary has printed a line matching `pattern`
+  const printed = (pattern) => new Promise((resolve, reject) => {
+    const check = () => {
+      if (pattern.test(output)) {
+        primary.stdout.removeListener('data', check);
+        primary.removeListener('exit', exited);
+        resolve();
+      }
+    };
+    const exited = (code) => reject(new Error(`primary exited with ${code}:\n${output}`));
+    primary.stdout.on('data', check);
+    primary.once('exit', exited);
+    check();
+  });
+
+  beforeEach(async () => {
+    dir = fs.mkdtempSync(path.join(os.tmpdir(), 'cluster-'));
+    port = await freePort();
+    output = '';
+    primary = spawn(process.execPath, [path.join(__dirname, '..', 'server', 'index.js')], {
+      env: { ...process.env, PORT: String(port), CLUSTER_WORKERS: '2', DATA_DIR: dir, SHUTDOWN_TIMEOUT_MS: '2000' }
+    });
+    primary.stdout.setEncoding('utf8');
+    primary.stdout.on('data', (chunk) => { output += chunk; });
+    primary.stderr.on('data', (chunk) => { output += chunk; });
+    await printed(/Cluster ready with 2 workers/);
+  });
+
+  afterEach(async () => {
+    if (primary.exitCode === null) {
+      const exited = new Promise((resolve) => primary.once('exit', resolve));
+      primary.kill('SIGTERM');
+      await exited;
+    }
+    fs.rmSync(dir, { recursive: true, force: true });
+  });
+
+  const partitions = () => Array.from(output.matchAll(/listening on port \d+ \(id partition (\d+)\)/g), (m) => m[1]);
+
+  // Poll until every worker answers every id, i.e. the writes replicated
+  const everywhere = async (ids) => {
+    for (let attempt = 0; attempt < 50; attempt += 1) {
+      const responses = [];
+      for (const id of ids) {
+        responses.push(await send(port, 'GET', `/api/tasks/${id}`), await send(port, 'GET', `/api/tasks/${id}`));
+      }
+      if (responses.every((response) => response.status === 200)) {
+        return;
+      }
+      await new Promise((resolve) => setTimeout(resolve, 20));
+    }
+    throw new Error('writes did not reach every worker');
+  };
+
+  test('workers hand out distinct ids and replicate their writes', async () => {
+    expect(new Set(partitions()).size).toBe(2);
+    const ids = [];
+    for (let i = 0; i < 6; i += 1) {
+      const response = await send(port, 'POST', '/api/tasks', { title: `Task ${i}` });
+      expect(response.status).toBe(201);
+      ids.push(response.body.task.id);
+    }
+    expect(new Set(ids).size).toBe(6);
+    await everywhere(ids);
+
+    const updated = await send(port, 'PATCH', `/api/tasks/${ids[0]}/status`, { status: 'completed' });
+    expect(updated.status).toBe(200);
+    for (let attempt = 0; attempt < 50; attempt += 1) {
+      const [a, b] = [await send(port, 'GET', `/api/tasks/${ids[0]}`), await send(port, 'GET', `/api/tasks/${ids[0]}`)];
+      if (a.body.task.status === 'completed' && b.body.task.status === 'completed') {
+        return;
+      }
+      await new Promise((resolve) => setTimeout(resolve, 20));
+    }
+    throw new Error('the update did not reach every worker');
+  }, 30000);
+
+  test('a rolling restart gives replacements their own id partitions and keeps the data', async () => {
+    const before = [];
+    for (let i = 0; i < 4; i += 1) {
+      before.push((await send(port, 'POST', '/api/tasks', { title: `Before ${i}` })).body.task.id);
+    }
+
+    const finished = printed(/Rolling restart finished/);
+    primary.kill('SIGHUP');
+    const during = [];
+    let done = false;
+    finished.then(() => { done = true; });
+    while (!done) {
+      const response = await send(port, 'POST', '/api/tasks', { title: 'During' });
+      expect(response.status).toBe(201);
+      during.push(response.body.task.id);
+    }
+    await finished;
+
+    // Initial workers, then the first replacement while the worker it
+    // replaces still runs: three distinct partitions
+    const seen = partitions();
+    expect(seen).toHaveLength(4);
+    expect(new Set(seen.slice(0, 3)).size).toBe(3);
+    expect(new Set([...before, ...during]).size).toBe(before.length + during.length);
+    await everywhere([...before, ...during.slice(-4)]);
+    await printed(/Worker \d+ drained[\s\S]*Worker \d+ drained/);
+  }, 30000);
+});
+
+describe('Primary', () => {
+  const fork = cluster.fork;
+  afterEach(() => {
+    cluster.fork = fork;
+  });
+
+  const fakeWorker = (pid) => {
+    const worker = new EventEmitter();
+    worker.process = { pid };
+    worker.dead = false;
+    worker.isDead = () => worker.dead;
+    worker.isConnected = () => !worker.dead;
+    worker.sent = [];
+    worker.send = (message) => worker.sent.push(message);
+    return worker;
+  };
+
+  test('a replacement that exits before listening gives the slot back', async () => {
+    const log = { log: () => {}, warn: () => {}, error: () => {} };
+    const primary = new Primary({ workers: 1, log });
+    const previous = fakeWorker(1);
+    cluster.fork = () => previous;
+    primary.fork(0);
+
+    const replacement = fakeWorker(2);
+    cluster.fork = () => {
+      setImmediate(() => {
+        replacement.dead = true;
+        replacement.emit('exit', 1, null);
+      });
+      return replacement;
+    };
+    await primary.restart();
+
+    expect(primary.slots.get(0)).toBe(previous);
+    expect(previous.sent).toEqual([]);
+  });
+});
+
+describe('workerCount', () => {
+  test('reads CLUSTER_WORKERS', () => {
+    expect(workerCount(undefined)).toBe(0);
+    expect(workerCount('3')).toBe(3);
+    expect(workerCount('auto')).toBeGreaterThan(0);
+    expect(() => workerCount('many')).toThrow();
+  });
+});
@@ -0,0 +1,94 @@
+const request = require('supertest');
+const app = require('../server/app');
+const { CommentStore, reset, comments } = require('../server/store');
+
+describe('CommentStore', () => {
+  let store;
+
+  beforeEach(() => {
+    store = new CommentStore();
+  });
+
+  test('counts replies per thread as comments come and go', () => {
+    const root = store.insert({ content: 'root', resourceId: '7', resourceType: 'task', parentId: null });
+    const reply = store.insert({ content: 'reply', resourceId: '7', resourceType: 'task', parentId: root.id });
+    store.insert({ content: 'other', resourceId: '8', resourceType: 'task', parentId: null });
+
+    expect(store.topLevelCount('7')).toBe(1);
+    expect(store.replyCount(root.id)).toBe(1);
+    expect(store.thread({ parentId: root.id }, { limit: 5 }).docs.map((doc) => doc.id)).toEqual([reply.id]);
+
+    store.discard(reply.id);
+    expect(store.replyCount(root.id)).toBe(0);
+  });
+
+  test('keeps deleted comments with replies as tombstones until the last reply goes', () => {
+    const root = store.insert({ content: 'root', resourceId: '7', resourceType: 'task' });
+    const middle = store.insert({ content: 'middle', resourceId: '7', resourceType: 'task', parentId: root.id });
+    const leaf = store.insert({ content: 'leaf', resourceId: '7', resourceType: 'task', parentId: middle.id });
+
+    store.discard(root.id);
+    store.discard(middle.id);
+    expect(store.get(root.id)).toMatchObject({ deleted: true, content: '' });
+    expect(store.size).toBe(3);
+
+    store.discard(leaf.id);
+    expect(store.size).toBe(0);
+  });
+});
+
+describe('Comments API', () => {
+  beforeEach(() => {
+    reset();
+  });
+
+  const post = (body) => request(app).post('/api/comments').send(body).expect(201).then((response) => response.body.comment);
+
+  test('pages a resource thread with reply previews', async () => {
+    const roots = [];
+    for (let i = 0; i < 12; i += 1) {
+      roots.push(await post({ content: `Root ${i}`, resourceId: '5', resourceType: 'task' }));
+    }
+    for (let i = 0; i < 4; i += 1) {
+      await post({ content: `Reply ${i}`, parentId: roots[0].id });
+    }
+    await post({ content: 'Elsewhere', resourceId: '6', resourceType: 'task' });
+
+    const first = await request(app).get('/api/comments/resource/5?limit=10&replies=2').expect(200);
+    expect(first.body.total).toBe(12);
+    expect(first.body.totalComments).toBe(16);
+    expect(first.body.comments).toHaveLength(10);
+    expect(first.body.comments[0].author.id).toBe('1');
+    expect(first.body.comments[0].replyCount).toBe(4);
+    expect(first.body.comments[0].replies.map((reply) => reply.content)).toEqual(['Reply 0', 'Reply 1']);
+
+    const rest = await request(app).get(`/api/comments?parentId=${roots[0].id}&cursor=${first.body.comments[0].repliesCursor}`).expect(200);
+    expect(rest.body.map((reply) => reply.content)).toEqual(['Reply 2', 'Reply 3']);
+
+    const second = await request(app).get(`/api/comments/resource/5?limit=10&cursor=${first.body.nextCursor}`).expect(200);
+    expect(second.body.comments.map((comment) => comment.content)).toEqual(['Root 10', 'Root 11']);
+    expect(second.body.nextCursor).toBe(null);
+  });
+
+  test('edits, deletes and validates comments', async () => {
+    const root = await post({ content: 'Root', resourceId: '5', resourceType: 'task' });
+    const reply = await post({ content: 'Reply', parentId: root.id });
+    expect(reply.resourceId).toBe('5');
+
+    const edited = await request(app).put(`/api/comments/${reply.id}`).send({ content: 'Edited' }).expect(200);
+    expect(edited.body.comment.content).toBe('Edited');
+    expect(edited.body.comment.editedAt).toBeTruthy();
+
+    await request(app).delete(`/api/comments/${root.id}`).expect(200);
+    expect((await request(app).get(`/api/comments/${root.id}`).expect(200)).body.comment.deleted).toBe(true);
+    await request(app).post('/api/comments').send({ content: 'Late', parentId: root.id }).expect(400);
+    await request(app).delete(`/api/comments/${reply.id}`).expect(200);
+    await request(app).get(`/api/comments/${root.id}`).expect(404);
+    expect(comments.size).toBe(0);
+
+    await request(app).post('/api/comments').send({ resourceId: '5', resourceType: 'task' }).expect(400);
+    await request(app).post('/api/comments').send({ content: 'x' }).expect(400);
+    await request(app).post('/api/comments').send({ content: 'x', parentId: '99' }).expect(404);
+    await request(app).get('/api/comments/resource/5?cursor=nonsense').expect(400);
+  });
+});
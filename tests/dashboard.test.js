@@ -0,0 +1,126 @@
+const fs = require('fs');
+const os = require('os');
+const path = require('path');
+const request = require('supertest');
+const app = require('../server/app');
+const { reset, tasks, projects } = require('../server/store');
+const { activities, ActivityLog } = require('../server/activity');
+const { dashboard, DashboardAggregates, RankedCounter, RollingCounter } = require('../server/aggregates');
+
+const HOUR = 60 * 60 * 1000;
+
+describe('RankedCounter', () => {
+  test('keeps keys ordered by count through increments and decrements', () => {
+    const counter = new RankedCounter();
+    for (const key of ['a', 'b', 'b', 'c', 'c', 'c']) {
+      counter.add(key);
+    }
+    expect(counter.top(2)).toEqual([{ key: 'c', count: 3 }, { key: 'b', count: 2 }]);
+
+    counter.add('c', -2);
+    counter.add('a', 4);
+    expect(counter.top(3).map((entry) => entry.key)).toEqual(['a', 'b', 'c']);
+    expect(counter.total).toBe(8);
+
+    counter.add('b', -2);
+    expect(counter.get('b')).toBe(0);
+    expect(counter.size).toBe(2);
+  });
+});
+
+describe('RollingCounter', () => {
+  test('slides windows as time passes', () => {
+    let clock = Date.parse('2026-01-01T00:00:00Z');
+    const counter = new RollingCounter({ bucketMs: HOUR, windows: { hour: 1, day: 24 }, now: () => clock });
+    counter.add(clock, 2);
+    clock += 3 * HOUR;
+    counter.add(clock);
+    expect(counter.snapshot()).toEqual({ hour: 1, day: 3 });
+
+    clock += 22 * HOUR;
+    expect(counter.snapshot()).toEqual({ hour: 0, day: 1 });
+    counter.add(clock - 30 * HOUR);
+    expect(counter.sum('day')).toBe(1);
+  });
+});
+
+describe('Dashboard aggregates', () => {
+  beforeEach(() => {
+    reset();
+    activities.clear();
+  });
+
+  test('task counters follow creates, status changes and deletes', async () => {
+    await request(app).post('/api/tasks').send({ title: 'Ship it', status: 'review', priority: 'high', assignee: '2' }).expect(201);
+    const { body } = await request(app).post('/api/tasks').send({ title: 'Late', assignee: '2', dueDate: '2020-01-01' }).expect(201);
+    await request(app).patch('/api/tasks/1/status').send({ status: 'completed' }).expect(200);
+
+    let response = await request(app).get('/api/dashboard/tasks/status').expect(200);
+    expect(response.body.totalTasks).toBe(3);
+    expect(response.body.tasksByStatus).toEqual({ todo: 1, inProgress: 0, review: 1, completed: 1, cancelled: 0 });
+    expect(response.body.tasksByPriority.high).toBe(1);
+    expect(response.body.overdueTasks).toBe(1);
+    expect(response.body.completedThisWeek).toBe(1);
+
+    await request(app).delete(`/api/tasks/${body.task.id}`).expect(200);
+    response = await request(app).get('/api/dashboard/stats').set('x-user-id', '2').expect(200);
+    expect(response.body.totalTasks).toBe(2);
+    expect(response.body.pendingTasks).toBe(1);
+    expect(response.body.myOpenTasks).toBe(1);
+  });
+
+  test('project summary and user activity', async () => {
+    projects.update('1', { status: 'completed' });
+    await request(app).post('/api/activities').send({ action: 'user_login', userId: '1' }).expect(201);
+    await request(app).post('/api/activities').send({ action: 'user_login', userId: '1' }).expect(201);
+
+    const summary = await request(app).get('/api/dashboard/projects/summary').expect(200);
+    expect(summary.body.completedProjects).toBe(1);
+    expect(summary.body.projectsByStatus.onHold).toBe(0);
+    expect(summary.body.averageCompletionTime).toBe('0 days');
+
+    const activity = await request(app).get('/api/dashboard/users/activity').expect(200);
+    expect(activity.body.userEngagement).toEqual({ dailyActive: 1, weeklyActive: 1, monthlyActive: 1 });
+    expect(activity.body.activityVolume.day).toBe(2);
+
+    const recent = await request(app).get('/api/dashboard/recent/activities').expect(200);
+    expect(recent.body).toHaveLength(2);
+    expect(recent.body[0].user).toBe('Test User');
+  });
+
+  test('activity appended during the replay is counted once', async () => {
+    const dir = fs.mkdtempSync(path.join(os.tmpdir(), 'dashboard-replay-'));
+    let clock = Date.now() - 3 * HOUR;
+    const log = new ActivityLog({ dir, bucketMs: HOUR, now: () => clock });
+    try {
+      // Two segments: the appends land in the second while the first replays
+      log.append({ action: 'user_login', userId: '1' });
+      clock += HOUR;
+      log.append({ action: 'user_login', userId: '2' });
+      const aggregates = new DashboardAggregates();
+      log.on('append', (record) => aggregates.onActivity(record));
+
+      const replay = aggregates.loadActivity(log);
+      log.append({ action: 'user_login', userId: '3' });
+      log.append({ action: 'user_login', userId: '1' });
+      await replay;
+
+      expect(aggregates.activity.volume.sum('day')).toBe(4);
+      expect(aggregates.activity.activeUsers.sum('day')).toBe(3);
+    } finally {
+      log.close();
+      fs.rmSync(dir, { recursive: true, force: true });
+    }
+  });
+
+  test('reconcile detects and repairs drift', () => {
+    expect(dashboard.reconcile().drift).toEqual([]);
+
+    // Simulate a write that bypassed the change events
+    tasks.items.get('1').status = 'cancelled';
+    const { drift } = dashboard.reconcile();
+    expect(drift.map((entry) => entry.metric)).toContain('tasks.byStatus');
+    expect(dashboard.tasksStatus(['todo', 'cancelled'], []).tasksByStatus).toEqual({ todo: 0, cancelled: 1 });
+    expect(dashboard.reconcile().drift).toEqual([]);
+  });
+});
@@ -0,0 +1,115 @@
+const fs = require('fs');
+const os = require('os');
+const path = require('path');
+const { Readable } = require('stream');
+const request = require('supertest');
+const app = require('../server/app');
+const { reset, files } = require('../server/store');
+const { BlobStore, blobs, parseRange } = require('../server/files');
+
+const CONTENT = 'The quick brown fox jumps over the lazy dog\n'.repeat(100);
+
+describe('BlobStore', () => {
+  let dir;
+
+  beforeEach(() => {
+    dir = fs.mkdtempSync(path.join(os.tmpdir(), 'blob-store-'));
+  });
+
+  afterEach(() => fs.rmSync(dir, { recursive: true, force: true }));
+
+  test('stores streamed content once per hash', async () => {
+    const store = new BlobStore({ dir });
+    const chunks = () => Readable.from([Buffer.from('hello '), Buffer.from('world')]);
+    const first = await store.write(chunks());
+    const second = await store.write(chunks());
+
+    expect(first).toEqual({
+      hash: 'b94d27b9934d3e08a52e52d7da7dabfac484efe37a5380ee9088f7ace2efcde9',
+      size: 11,
+      created: true
+    });
+    expect(second.created).toBe(false);
+    expect(fs.readFileSync(store.path(first.hash), 'utf8')).toBe('hello world');
+    expect(fs.readdirSync(store.tmpDir)).toEqual([]);
+  });
+});
+
+describe('parseRange', () => {
+  test('handles open, suffix, clamped and unsatisfiable ranges', () => {
+    expect(parseRange(undefined, 100)).toBe(null);
+    expect(parseRange('bytes=10-19', 100)).toEqual({ start: 10, end: 19 });
+    expect(parseRange('bytes=90-', 100)).toEqual({ start: 90, end: 99 });
+    expect(parseRange('bytes=-5', 100)).toEqual({ start: 95, end: 99 });
+    expect(parseRange('bytes=50-500', 100)).toEqual({ start: 50, end: 99 });
+    expect(parseRange('bytes=0-1,5-6', 100)).toBe(null);
+    expect(parseRange('bytes=100-', 100)).toBe(false);
+  });
+});
+
+describe('File API', () => {
+  beforeEach(() => reset());
+
+  const upload = (filename, body = CONTENT) => request(app)
+    .post(`/api/files/upload?filename=${filename}`)
+    .set('Content-Type', 'text/plain')
+    .send(body)
+    .expect(201);
+
+  test('raw uploads are hashed and deduplicated', async () => {
+    const first = await upload('notes.txt');
+    const second = await upload('copy.txt');
+
+    expect(first.body.file.filesize).toBe(CONTENT.length);
+    expect(first.body.file.filetype).toBe('text/plain');
+    expect(first.body.deduplicated).toBe(false);
+    expect(second.body.deduplicated).toBe(true);
+    const [a, b] = [first.body.file.id, second.body.file.id].map((id) => files.get(id));
+    expect(a.hash).toBe(b.hash);
+  });
+
+  test('JSON uploads accept utf8 and base64 content', async () => {
+    const response = await request(app)
+      .post('/api/files/upload')
+      .send({ filename: 'hi.txt', filetype: 'text/plain', content: Buffer.from('hi').toString('base64'), encoding: 'base64' })
+      .expect(201);
+    expect(response.body.file.filesize).toBe(2);
+
+    await request(app).post('/api/files/upload').send({ filename: 'hi.txt', filetype: 'text/plain' }).expect(400);
+  });
+
+  test('downloads support ranges and conditional requests', async () => {
+    const { body } = await upload('notes.txt');
+    const url = `/api/files/${body.file.id}/download`;
+
+    const full = await request(app).get(url).expect(200);
+    expect(full.text).toBe(CONTENT);
+    expect(full.headers['accept-ranges']).toBe('bytes');
+
+    const partial = await request(app).get(url).set('Range', 'bytes=4-8').expect(206);
+    expect(partial.text).toBe('quick');
+    expect(partial.headers['content-range']).toBe(`bytes 4-8/${CONTENT.length}`);
+
+    await request(app).get(url).set('Range', `bytes=${CONTENT.length}-`).expect(416);
+    await request(app).get(url).set('If-None-Match', full.headers.etag).expect(304);
+    await request(app).get(url).set('Range', 'bytes=4-8').set('If-Range', '"stale"').expect(200);
+  });
+
+  test('rename is metadata-only and delete frees the blob with its last reference', async () => {
+    const first = await upload('notes.txt');
+    const second = await upload('copy.txt');
+    const { hash } = files.get(first.body.file.id);
+
+    const renamed = await request(app)
+      .put(`/api/files/${first.body.file.id}/rename`)
+      .send({ newFilename: 'renamed.txt' })
+      .expect(200);
+    expect(renamed.body.file.filename).toBe('renamed.txt');
+    expect(files.get(first.body.file.id).hash).toBe(hash);
+
+    await request(app).delete(`/api/files/${first.body.file.id}`).expect(200);
+    expect(blobs.has(hash)).toBe(true);
+    await request(app).delete(`/api/files/${second.body.file.id}`).expect(200);
+    expect(blobs.has(hash)).toBe(false);
+  });
+});
@@ -0,0 +1,91 @@
+const request = require('supertest');
+const app = require('../server/app');
+const { reset, tasks } = require('../server/store');
+const { routeMetrics, Histogram } = require('../server/metrics');
+
+describe('Histogram', () => {
+  test('buckets observations and interpolates quantiles', () => {
+    const histogram = new Histogram([1, 2, 4]);
+    for (const value of [0.5, 1, 1.5, 1.5, 3, 10]) {
+      histogram.observe(value);
+    }
+    expect(histogram.cumulative()).toEqual([[1, 2], [2, 4], [4, 5], [Infinity, 6]]);
+    expect(histogram.sum).toBe(17.5);
+    expect(histogram.quantile(0.5)).toBe(1.5);
+    expect(histogram.quantile(0.75)).toBe(3);
+    expect(histogram.quantile(1)).toBe(4);
+    expect(new Histogram([1]).quantile(0.5)).toBe(0);
+  });
+});
+
+describe('Request metrics', () => {
+  beforeEach(() => {
+    reset();
+    routeMetrics.reset();
+  });
+
+  test('labels requests by route template, including cache hits', async () => {
+    const task = tasks.insert({ title: 'Measured', status: 'todo' });
+    await request(app).get(`/api/tasks/${task.id}`).expect(200);
+    await request(app).get(`/api/tasks/${task.id}?x=1`).expect(200);
+    await request(app).get(`/api/tasks/${task.id}?x=1`).expect(200);
+    await request(app).post('/api/tasks').send({ title: '' }).expect(400);
+    await request(app).get('/api/nowhere').expect(404);
+
+    const byRoute = Object.fromEntries(Array.from(routeMetrics.series.values(), (series) => [
+      `${series.method} ${series.route}`,
+      Object.fromEntries(series.statuses)
+    ]));
+    expect(byRoute).toEqual({
+      'GET /api/tasks/:id': { 200: 3 },
+      'POST /api/tasks': { 400: 1 },
+      'GET unmatched': { 404: 1 }
+    });
+    const posted = routeMetrics.seriesFor('POST', '/api/tasks');
+    expect(posted.requestSize.sum).toBe(JSON.stringify({ title: '' }).length);
+    expect(posted.responseSize.sum).toBeGreaterThan(0);
+    expect(routeMetrics.inFlight).toBe(0);
+  });
+
+  test('exposes Prometheus text and backs the performance dashboard', async () => {
+    await request(app).get('/api/health').expect(200);
+    await request(app).get('/api/health').expect(200);
+
+    const scrape = await request(app).get('/api/metrics').expect(200);
+    expect(scrape.headers['content-type']).toMatch(/^text\/plain; version=0\.0\.4/);
+    const lines = scrape.text.split('\n');
+    expect(lines).toContain('# TYPE http_request_duration_seconds histogram');
+    expect(lines).toContain('http_requests_total{method="GET",route="/api/health",status="200"} 2');
+    expect(lines).toContain('http_request_duration_seconds_bucket{method="GET",route="/api/health",le="+Inf"} 2');
+    expect(lines).toContain('profiler_running 0');
+
+    const performance = await request(app).get('/api/dashboard/performance/metrics').expect(200);
+    const { requests } = performance.body;
+    expect(requests.total).toBe(3);
+    expect(requests.errorRate).toBe(0);
+    expect(requests.latencyMs.p99).toBeGreaterThan(0);
+    expect(requests.slowestRoutes.map(({ route }) => route).sort()).toEqual(['GET /api/health', 'GET /api/metrics']);
+  });
+
+  test('toggles the sampling profiler at runtime', async () => {
+    await request(app).get('/api/metrics/profiler/profile').expect(404);
+    await request(app).put('/api/metrics/profiler').send({ enabled: 'yes' }).expect(400);
+    await request(app).put('/api/metrics/profiler').send({ enabled: false }).expect(409);
+
+    const started = await request(app).put('/api/metrics/profiler').send({ enabled: true, intervalUs: 200 }).expect(201);
+    expect(started.body.running).toBe(true);
+    await request(app).put('/api/metrics/profiler').send({ enabled: true }).expect(409);
+    const until = Date.now() + 50;
+    while (Date.now() < until) {
+      JSON.stringify(Array.from({ length: 1000 }, (_, i) => ({ i })));
+    }
+
+    const stopped = await request(app).put('/api/metrics/profiler').send({ enabled: false }).expect(200);
+    expect(stopped.body.running).toBe(false);
+    expect(stopped.body.last.samples).toBeGreaterThan(0);
+    expect(stopped.body.last.top.length).toBeGreaterThan(0);
+    const profile = await request(app).get('/api/metrics/profiler/profile').expect(200);
+    expect(profile.headers['content-disposition']).toMatch(/\.cpuprofile$/);
+    expect(profile.body.nodes.length).toBeGreaterThan(0);
+  });
+});
@@ -0,0 +1,110 @@
+const http = require('http');
+const request = require('supertest');
+const app = require('../server/app');
+const { EntityStore, reset, notifications } = require('../server/store');
+const { NotificationHub, hub } = require('../server/notifications');
+
+const nextTick = () => new Promise((resolve) => setImmediate(resolve));
+
+describe('NotificationHub', () => {
+  test('tracks unread ids and coalesces count messages per user', async () => {
+    const store = new EntityStore('notifications', { indexes: ['userId'] });
+    const local = new NotificationHub().attach(store);
+    const messages = [];
+    const unsubscribe = local.subscribe('7', (message) => messages.push(message));
+
+    const first = store.insert({ title: 'a', userId: '7', isRead: false });
+    store.insert({ title: 'b', userId: '7', isRead: false });
+    store.insert({ title: 'c', userId: '8', isRead: false });
+    store.update(first.id, { isRead: true });
+    expect(local.unreadCount('7')).toBe(1);
+    expect(local.unreadCount('8')).toBe(1);
+
+    await nextTick();
+    expect(messages.map((m) => m.event)).toEqual(['notification', 'notification', 'count']);
+    expect(messages[2].data).toEqual({ unreadCount: 1, totalNotifications: 2 });
+
+    unsubscribe();
+    expect(local.connections).toBe(0);
+    expect(local.heartbeat).toBe(null);
+  });
+});
+
+describe('Notification API', () => {
+  beforeEach(() => reset());
+
+  test('creating, reading and deleting keep the unread count in step', async () => {
+    await request(app).post('/api/notifications').send({ title: 'Hi', message: 'One' }).expect(201);
+    const { body } = await request(app).post('/api/notifications').send({ title: 'Hi', message: 'Two' }).expect(201);
+    await request(app).post('/api/notifications').send({ title: 'Hi', message: 'Other user', userId: '2' }).expect(201);
+
+    let count = await request(app).get('/api/notifications/unread/count').expect(200);
+    expect(count.body).toEqual({ unreadCount: 3, totalNotifications: 4 });
+
+    const read = await request(app).put(`/api/notifications/${body.notification.id}/read`).expect(200);
+    expect(read.body.notification.isRead).toBe(true);
+    expect(read.body.unreadCount).toBe(2);
+
+    const unread = await request(app).get('/api/notifications?unread=true').expect(200);
+    expect(unread.body.map((n) => n.message)).toEqual(['One', 'You have been assigned to "Sample Task"']);
+
+    await request(app).delete('/api/notifications/1').expect(200);
+    count = await request(app).get('/api/notifications/unread/count').expect(200);
+    expect(count.body).toEqual({ unreadCount: 1, totalNotifications: 3 });
+
+    const all = await request(app).put('/api/notifications/mark-all-read').expect(200);
+    expect(all.body.markedCount).toBe(1);
+    expect(hub.unreadCount('1')).toBe(0);
+    expect(hub.unreadCount('2')).toBe(1);
+
+    await request(app).post('/api/notifications').send({ title: 'Hi' }).expect(400);
+    await request(app).put('/api/notifications/99/read').expect(404);
+  });
+
+  test('GET /api/notifications/stream pushes notifications and counts', async () => {
+    const server = app.listen(0);
+    await new Promise((resolve) => server.once('listening', resolve));
+    let response;
+    const events = [];
+    const waitFor = (count) => new Promise((resolve) => {
+      const check = () => (events.length >= count ? resolve() : setTimeout(check, 5));
+      check();
+    });
+    try {
+      await new Promise((resolve) => {
+        http.get({ port: server.address().port, path: '/api/notifications/stream', headers: { 'Last-Event-ID': '1' } }, (res) => {
+          response = res;
+          let buffered = '';
+          res.setEncoding('utf8');
+          res.on('data', (chunk) => {
+            buffered += chunk;
+            const frames = buffered.split('\n\n');
+            buffered = frames.pop();
+            for (const frame of frames) {
+              const event = /^event: (.*)$/m.exec(frame);
+              if (event) {
+                events.push({ event: event[1], data: JSON.parse(/^data: (.*)$/m.exec(frame)[1]) });
+              }
+            }
+          });
+          resolve();
+        });
+      });
+      await waitFor(2);
+      expect(response.headers['content-type']).toBe('text/event-stream');
+      expect(events[0].event).toBe('notification');
+      expect(events[0].data.id).toBe('2');
+      expect(events[1]).toEqual({ event: 'count', data: { unreadCount: 1, totalNotifications: 2 } });
+
+      notifications.insert({ title: 'Pushed', message: 'Hello', userId: '1', isRead: false });
+      notifications.insert({ title: 'Elsewhere', message: 'Hello', userId: '2', isRead: false });
+      await waitFor(4);
+      expect(events.slice(2).map((e) => e.event)).toEqual(['notification', 'count']);
+      expect(events[2].data.title).toBe('Pushed');
+      expect(events[3].data.unreadCount).toBe(2);
+    } finally {
+      response.destroy();
+      server.close();
+    }
+  });
+});
@@ -0,0 +1,128 @@
+const request = require('supertest');
+const app = require('../server/app');
+const { EntityStore, reset, tasks } = require('../server/store');
+const { activities } = require('../server/activity');
+
+describe('EntityStore.page', () => {
+  let store;
+
+  beforeEach(() => {
+    store = new EntityStore('tasks', { indexes: ['status'], sorted: ['dueDate'] });
+    for (let i = 1; i <= 30; i += 1) {
+      store.insert({ status: i % 3 ? 'todo' : 'done', dueDate: i % 4 ? `2026-01-${String(31 - i).padStart(2, '0')}` : undefined });
+    }
+  });
+
+  const walk = (filters, options) => {
+    const ids = [];
+    let after = null;
+    do {
+      const { docs, next } = store.page(filters, { ...options, after, limit: 4 });
+      ids.push(...docs.map((doc) => doc.id));
+      after = next;
+    } while (after);
+    return ids;
+  };
+
+  test('walks (sort key, id) order with missing keys last', () => {
+    const ids = walk({}, { sort: 'dueDate' });
+    expect(ids).toHaveLength(30);
+    expect(ids.slice(0, 3)).toEqual(['30', '29', '27']);
+    expect(ids.slice(-7)).toEqual(['4', '8', '12', '16', '20', '24', '28']);
+    expect(walk({ status: 'done' }, { descending: true })).toEqual(['30', '27', '24', '21', '18', '15', '12', '9', '6', '3']);
+  });
+
+  test('never skips or repeats documents as others are inserted and removed', () => {
+    const first = store.page({ status: 'todo' }, { limit: 5 });
+    store.remove('1');
+    store.remove(first.docs[4].id);
+    store.insert({ status: 'todo' });
+    const second = store.page({ status: 'todo' }, { after: first.next, limit: 5 });
+    expect(first.docs.map((doc) => doc.id)).toEqual(['1', '2', '4', '5', '7']);
+    expect(second.docs.map((doc) => doc.id)).toEqual(['8', '10', '11', '13', '14']);
+  });
+
+  test('moves documents whose sort key changes', () => {
+    expect(walk({}, { sort: 'dueDate' })[0]).toBe('30');
+    store.update('30', { dueDate: '2027-01-01' });
+    const ids = walk({}, { sort: 'dueDate' });
+    expect(ids.indexOf('30')).toBe(22);
+    expect(store.orders.get('dueDate').size).toBe(30);
+  });
+});
+
+describe('Paginated list API', () => {
+  beforeEach(() => {
+    reset();
+    for (let i = 0; i < 25; i += 1) {
+      tasks.insert({ title: `Task ${i}`, status: 'todo', projectId: '1' });
+    }
+  });
+
+  test('follows cursors to the end and rejects foreign ones', async () => {
+    const ids = [];
+    let url = '/api/tasks?projectId=1&limit=10';
+    while (url) {
+      const response = await request(app).get(url).expect(200);
+      ids.push(...response.body.map((task) => task.id));
+      const link = /<([^>]+)>; rel="next"/.exec(response.headers.link || '');
+      url = link ? link[1] : null;
+      if (url) {
+        tasks.insert({ title: 'Late', projectId: '1' });
+      }
+    }
+    expect(ids.slice(0, 26)).toEqual(Array.from({ length: 26 }, (_, i) => String(i + 1)));
+    expect(new Set(ids).size).toBe(ids.length);
+
+    const sorted = await request(app).get('/api/tasks?sort=createdAt&limit=1').expect(200);
+    await request(app).get(`/api/tasks?cursor=${sorted.headers['x-next-cursor']}`).expect(400);
+    await request(app).get('/api/tasks?cursor=nonsense').expect(400);
+    await request(app).get('/api/tasks?sort=title').expect(400);
+  });
+
+  test('serves ?page by number with the cursor of the following page', async () => {
+    const ids = (response) => response.body.map((task) => task.id);
+    const second = await request(app).get('/api/tasks?projectId=1&limit=10&page=2').expect(200);
+    expect(ids(second)).toEqual(Array.from({ length: 10 }, (_, i) => String(i + 11)));
+
+    const third = await request(app).get(`/api/tasks?projectId=1&limit=10&page=2&cursor=${second.headers['x-next-cursor']}`).expect(200);
+    expect(ids(third)).toEqual(['21', '22', '23', '24', '25', '26']);
+    expect(third.headers['x-next-cursor']).toBe(undefined);
+
+    const past = await request(app).get('/api/tasks?projectId=1&limit=10&page=4').expect(200);
+    expect(past.body).toEqual([]);
+    expect(past.headers['x-next-cursor']).toBe(undefined);
+    expect((await request(app).get('/api/users?page=2&limit=10').expect(200)).body).toEqual([]);
+  });
+
+  test('caps the page size and streams NDJSON for bulk reads', async () => {
+    for (let i = 0; i < 150; i += 1) {
+      tasks.insert({ title: `Bulk ${i}` });
+    }
+    const page = await request(app).get('/api/tasks?limit=500').expect(200);
+    expect(page.body).toHaveLength(100);
+
+    const cached = await request(app).get('/api/tasks?limit=500').expect(200);
+    expect(cached.headers['x-next-cursor']).toBe(page.headers['x-next-cursor']);
+
+    const stream = await request(app).get(`/api/tasks?format=ndjson&cursor=${page.headers['x-next-cursor']}`).expect(200);
+    expect(stream.headers['content-type']).toMatch(/application\/x-ndjson/);
+    const lines = stream.text.trim().split('\n').map((line) => JSON.parse(line));
+    expect(lines).toHaveLength(tasks.size - 100);
+    expect(lines[0].id).toBe(String(Number(page.body[99].id) + 1));
+  });
+
+  test('pages activities newest first by cursor', async () => {
+    activities.clear();
+    for (let i = 0; i < 7; i += 1) {
+      activities.append({ action: 'user_login', userId: '1', description: String(i) });
+    }
+    const first = await request(app).get('/api/activities/user/1?limit=5').expect(200);
+    activities.append({ action: 'user_login', userId: '1', description: 'later' });
+    const second = await request(app).get(`/api/activities/user/1?limit=5&cursor=${first.body.nextCursor}`).expect(200);
+
+    expect(first.body.activities.map((a) => a.description)).toEqual(['6', '5', '4', '3', '2']);
+    expect(second.body.activities.map((a) => a.description)).toEqual(['1', '0']);
+    expect(second.body.nextCursor).toBe(null);
+  });
+});
@@ -0,0 +1,59 @@
+const path = require('path');
+const { execFileSync } = require('child_process');
+const express = require('express');
+const request = require('supertest');
+const { lazyRoutes } = require('../server/routes');
+
+describe('lazyRoutes', () => {
+  test('loads a group on the first request under its prefix', async () => {
+    const loads = [];
+    const group = (name) => () => {
+      loads.push(name);
+      const router = express.Router();
+      router.get(`/api/${name}/:id`, (req, res) => res.json({ name, id: req.params.id }));
+      return router;
+    };
+    const routes = lazyRoutes({ '/api/things': group('things'), '/api/others': group('others') });
+    const app = express();
+    app.use(routes);
+    app.use((req, res) => res.status(404).json({ message: 'nope' }));
+
+    expect(loads).toEqual([]);
+    expect((await request(app).get('/api/things/1').expect(200)).body).toEqual({ name: 'things', id: '1' });
+    await request(app).get('/api/things/2').expect(200);
+    await request(app).get('/api/things').expect(404);
+    await request(app).get('/api/elsewhere/1').expect(404);
+    expect(loads).toEqual(['things']);
+    expect(routes.loaded()).toEqual(['/api/things']);
+  });
+
+  test('retries a group whose module failed to load', async () => {
+    let attempts = 0;
+    const app = express();
+    app.use(lazyRoutes({
+      '/api/flaky': () => {
+        attempts += 1;
+        if (attempts === 1) {
+          throw new Error('not yet');
+        }
+        const router = express.Router();
+        router.get('/api/flaky', (req, res) => res.json({ attempts }));
+        return router;
+      }
+    }));
+    app.use((err, req, res, next) => res.status(500).json({ message: err.message }));
+
+    await request(app).get('/api/flaky').expect(500);
+    expect((await request(app).get('/api/flaky').expect(200)).body).toEqual({ attempts: 2 });
+  });
+
+  test('requiring the app loads no route group', () => {
+    const script = `
+      require('./server/app');
+      const loaded = Object.keys(require.cache).map((file) => require('path').relative(process.cwd(), file));
+      console.log(JSON.stringify(loaded.filter((file) => /^server\\/(routes\\/(?!index|common)|search|aggregates)/.test(file))));
+    `;
+    const output = execFileSync(process.execPath, ['-e', script], { cwd: path.join(__dirname, '..'), encoding: 'utf8' });
+    expect(JSON.parse(output)).toEqual([]);
+  });
+});
@@ -0,0 +1,101 @@
+const request = require('supertest');
+const app = require('../server/app');
+const { reset, tasks } = require('../server/store');
+const { SearchIndex, PrefixTrie } = require('../server/search');
+
+describe('SearchIndex', () => {
+  let index;
+
+  beforeEach(() => {
+    index = new SearchIndex({ fields: { title: 2, description: 1 } });
+    index.add('1', { title: 'Fix login bug', description: 'Users cannot log in on mobile' });
+    index.add('2', { title: 'Mobile release', description: 'Ship the mobile app' });
+    index.add('3', { title: 'Update docs', description: 'Mention the login flow' });
+  });
+
+  test('ranks title matches and repeated terms higher', () => {
+    const { hits, total } = index.search('mobile');
+    expect(total).toBe(2);
+    expect(hits.map((hit) => hit.id)).toEqual(['2', '1']);
+    expect(index.search('login').hits[0].id).toBe('1');
+  });
+
+  test('updates and removals only touch the changed document', () => {
+    index.update('3', { title: 'Update docs', description: 'Mention the mobile flow' },
+      { title: 'Update docs', description: 'Mention the login flow' });
+    expect(index.search('login').total).toBe(1);
+    expect(index.search('mobile').total).toBe(3);
+
+    index.remove('2');
+    expect(index.search('release').total).toBe(0);
+    expect(index.postings.has('release')).toBe(false);
+  });
+
+  test('suggests completions for the last word', () => {
+    expect(index.suggest('mo').map((s) => s.text)).toEqual(['mobile']);
+    expect(index.suggest('fix lo')[0]).toEqual({ text: 'fix login', count: 2 });
+  });
+});
+
+describe('PrefixTrie', () => {
+  test('keeps the most frequent terms per prefix as counts change', () => {
+    const trie = new PrefixTrie({ capacity: 2 });
+    trie.add('deploy', 3);
+    trie.add('design', 2);
+    trie.add('debug', 1);
+    expect(trie.suggest('de').map((s) => s.term)).toEqual(['deploy', 'design']);
+
+    trie.add('debug', 5);
+    expect(trie.suggest('de').map((s) => s.term)).toEqual(['debug', 'deploy']);
+
+    trie.remove('debug', 6);
+    expect(trie.suggest('de').map((s) => s.term)).toEqual(['deploy', 'design']);
+    expect(trie.find('debug')).toBeNull();
+  });
+});
+
+describe('Search API', () => {
+  beforeEach(() => reset());
+
+  test('indexes entities as they are created, updated and deleted', async () => {
+    const created = await request(app)
+      .post('/api/tasks')
+      .send({ title: 'Refactor billing pipeline', status: 'review' })
+      .expect(201);
+    const { id } = created.body.task;
+
+    let response = await request(app).get('/api/search/tasks?q=billing').expect(200);
+    expect(response.body.results.map((task) => task.id)).toEqual([id]);
+
+    await request(app).put(`/api/tasks/${id}`).send({ title: 'Refactor invoice pipeline' }).expect(200);
+    response = await request(app).get('/api/search/tasks?q=billing').expect(200);
+    expect(response.body.total).toBe(0);
+
+    await request(app).delete(`/api/tasks/${id}`).expect(200);
+    response = await request(app).get('/api/search/tasks?q=invoice').expect(200);
+    expect(response.body.total).toBe(0);
+  });
+
+  test('applies filters to the matching documents', async () => {
+    tasks.insert({ title: 'Sample checklist', status: 'completed' });
+
+    const response = await request(app).get('/api/search/tasks?q=sample&status=completed').expect(200);
+    expect(response.body.filters.status).toBe('completed');
+    expect(response.body.results.map((task) => task.title)).toEqual(['Sample checklist']);
+  });
+
+  test('GET /api/search/global ranks across entity types', async () => {
+    const response = await request(app).get('/api/search/global?q=sample').expect(200);
+    expect(response.body.results.map((hit) => hit.type).sort()).toEqual(['project', 'task']);
+    expect(response.body.results[0].relevance).toBe(1);
+  });
+
+  test('GET /api/search/suggestions completes from the indexed vocabulary', async () => {
+    const response = await request(app).get('/api/search/suggestions?q=sam').expect(200);
+    expect(response.body.type).toBe('all');
+    expect(response.body.suggestions).toEqual([
+      { text: 'sample', type: 'project', count: 1 },
+      { text: 'sample', type: 'task', count: 1 }
+    ]);
+  });
+});
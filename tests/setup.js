@@ -1,3 +1,8 @@
 // Simple test setup
+const fs = require('fs');
+const os = require('os');
+const path = require('path');
+
 process.env.NODE_ENV = 'test';
 process.env.JWT_SECRET = 'test_secret';
+process.env.DATA_DIR = fs.mkdtempSync(path.join(os.tmpdir(), 'nodenest-test-'));
@@ -0,0 +1,75 @@
+const request = require('supertest');
+const app = require('../server/app');
+const { EntityStore, reset } = require('../server/store');
+
+describe('EntityStore', () => {
+  let store;
+
+  beforeEach(() => {
+    store = new EntityStore('tasks', { indexes: ['status', 'assignee', 'tags'] });
+    store.insert({ title: 'a', status: 'todo', assignee: '1', tags: ['ui'] });
+    store.insert({ title: 'b', status: 'todo', assignee: '2', tags: ['ui', 'api'] });
+    store.insert({ title: 'c', status: 'review', assignee: '1', priority: 'high' });
+  });
+
+  test('intersects indexed filters', () => {
+    expect(store.find({ status: 'todo', assignee: '1' }).map((t) => t.title)).toEqual(['a']);
+    expect(store.find({ tags: 'ui' }).map((t) => t.title)).toEqual(['a', 'b']);
+    expect(store.find({ status: ['todo', 'review'], assignee: '1' })).toHaveLength(2);
+    expect(store.find({ status: 'done' })).toEqual([]);
+  });
+
+  test('applies unindexed filters to the candidates', () => {
+    expect(store.find({ assignee: '1', priority: 'high' }).map((t) => t.title)).toEqual(['c']);
+  });
+
+  test('keeps indexes in sync on update and remove', () => {
+    store.update('1', { status: 'review' });
+    expect(store.count({ status: 'todo' })).toBe(1);
+    expect(store.count({ status: 'review' })).toBe(2);
+
+    store.remove('3');
+    expect(store.find({ status: 'review' }).map((t) => t.id)).toEqual(['1']);
+
+    store.remove('1');
+    expect(store.indexes.get('status').has('review')).toBe(false);
+  });
+});
+
+describe('Task API filters', () => {
+  beforeEach(() => reset());
+
+  test('GET /api/tasks filters by status and assignee', async () => {
+    await request(app).post('/api/tasks').send({ title: 'Write docs', status: 'review', assignee: '7' }).expect(201);
+    await request(app).post('/api/tasks').send({ title: 'Fix bug', status: 'todo', assignee: '7' }).expect(201);
+
+    const response = await request(app)
+      .get('/api/tasks?status=review&assignee=7')
+      .expect(200);
+
+    expect(response.body).toHaveLength(1);
+    expect(response.body[0].title).toBe('Write docs');
+  });
+
+  test('PATCH /api/tasks/:id/status moves the task between status indexes', async () => {
+    await request(app).patch('/api/tasks/1/status').send({ status: 'completed' }).expect(200);
+
+    const todo = await request(app).get('/api/tasks?status=todo').expect(200);
+    const completed = await request(app).get('/api/tasks?status=completed').expect(200);
+
+    expect(todo.body).toHaveLength(0);
+    expect(completed.body.map((t) => t.id)).toEqual(['1']);
+  });
+
+  test('POST and PUT /api/tasks reject an unknown priority', async () => {
+    await request(app).post('/api/tasks').send({ title: 'Triage', priority: 'whenever' }).expect(400);
+    await request(app).put('/api/tasks/1').send({ priority: 'asap' }).expect(400);
+    const response = await request(app).put('/api/tasks/1').send({ priority: 'urgent' }).expect(200);
+    expect(response.body.task.priority).toBe('urgent');
+  });
+
+  test('DELETE /api/projects/:id removes the project tasks', async () => {
+    await request(app).delete('/api/projects/1').expect(200);
+    await request(app).get('/api/tasks/1').expect(404);
+  });
+});
@@ -0,0 +1,91 @@
+const request = require('supertest');
+const app = require('../server/app');
+const { EntityStore, reset, tasks, projects } = require('../server/store');
+const { TagUsage, RollingRanking } = require('../server/aggregates');
+
+const DAY = 24 * 60 * 60 * 1000;
+
+describe('RollingRanking', () => {
+  test('ranks keys per window and expires old buckets', () => {
+    let clock = Date.parse('2026-01-01T00:00:00Z');
+    const ranking = new RollingRanking({ bucketMs: DAY, windows: { week: 7, month: 30 }, now: () => clock });
+    ranking.add('old', clock - 10 * DAY, 5);
+    ranking.add('new', clock, 2);
+    ranking.add('new', clock - DAY);
+    expect(ranking.top('week', 2)).toEqual([{ key: 'new', count: 3 }]);
+    expect(ranking.top('month', 2)).toEqual([{ key: 'old', count: 5 }, { key: 'new', count: 3 }]);
+
+    clock += 6 * DAY;
+    expect(ranking.get('week', 'new')).toBe(2);
+    clock += 15 * DAY;
+    expect(ranking.top('month', 2)).toEqual([{ key: 'new', count: 3 }]);
+    clock += 100 * DAY;
+    expect(ranking.top('month', 2)).toEqual([]);
+  });
+});
+
+describe('TagUsage', () => {
+  test('counts attaches and detaches from store changes', () => {
+    const clock = Date.parse('2026-01-01T00:00:00Z');
+    const store = new EntityStore('tasks');
+    const usage = new TagUsage({ now: () => clock }).attach({ tasks: store });
+    const old = new Date(clock - 20 * DAY).toISOString();
+    store.insert({ tags: ['a', 'b'], createdAt: old });
+    const task = store.insert({ tags: ['a'] });
+    store.update(task.id, { tags: ['a', 'c'] });
+    store.update(task.id, { status: 'done' });
+    store.update('1', { tags: ['b'] });
+
+    expect(['a', 'b', 'c'].map((tag) => usage.count(tag))).toEqual([1, 1, 1]);
+    expect(['a', 'b', 'c'].map((tag) => usage.count(tag, 'week'))).toEqual([1, 0, 1]);
+    expect(usage.top(1, 'month')).toEqual([{ tag: 'a', count: 2 }]);
+    expect(usage.trend('c')).toBe('up');
+    expect(usage.trend('b')).toBe('down');
+
+    store.clear();
+    expect(usage.top(3)).toEqual([]);
+  });
+});
+
+describe('Tags API', () => {
+  beforeEach(() => {
+    reset();
+  });
+
+  test('answers popular tags from maintained counts', async () => {
+    const frontend = (await request(app).post('/api/tags').send({ name: 'frontend', color: '#3B82F6' }).expect(201)).body.tag;
+    await request(app).post('/api/tags').send({ name: 'frontend' }).expect(409);
+    tasks.insert({ title: 'a', tags: ['frontend', 'bug'] });
+    tasks.insert({ title: 'b', tags: ['frontend'] });
+    projects.insert({ name: 'c', tags: ['bug', 'frontend'] });
+
+    const popular = await request(app).get('/api/tags/popular?limit=2').expect(200);
+    expect(popular.body.map(({ id, name, usageCount }) => ({ id, name, usageCount }))).toEqual([
+      { id: frontend.id, name: 'frontend', usageCount: 3 },
+      { id: null, name: 'bug', usageCount: 2 }
+    ]);
+    expect(popular.body[0].trend).toBe('up');
+    await request(app).get('/api/tags/popular?window=year').expect(400);
+
+    const detail = await request(app).get(`/api/tags/${frontend.id}`).expect(200);
+    expect(detail.body.tag.usageCount).toBe(3);
+    expect(detail.body.tag.usage).toEqual({ week: 3, month: 3 });
+    expect(detail.body.tag.resources.map((resource) => resource.type)).toEqual(['project', 'task', 'task']);
+  });
+
+  test('renames and deletes tags on every resource carrying them', async () => {
+    const tag = (await request(app).post('/api/tags').send({ name: 'ui' }).expect(201)).body.tag;
+    tasks.insert({ title: 'a', tags: ['ui', 'ux'] });
+    tasks.insert({ title: 'b', tags: ['ux'] });
+
+    const renamed = await request(app).put(`/api/tags/${tag.id}`).send({ name: 'ux' }).expect(200);
+    expect(renamed.body.retagged).toBe(1);
+    expect(tasks.find({ tags: 'ux' }).map((task) => task.tags)).toEqual([['ux'], ['ux']]);
+    expect(renamed.body.tag.usageCount).toBe(2);
+
+    const deleted = await request(app).delete(`/api/tags/${tag.id}`).expect(200);
+    expect(deleted.body.detachedFrom).toBe(2);
+    expect((await request(app).get('/api/tags/popular').expect(200)).body).toEqual([]);
+    await request(app).get(`/api/tags/${tag.id}`).expect(404);
+  });
+});
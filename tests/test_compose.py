@@ -0,0 +1,28 @@
+import subprocess
+
+import pytest
+
+from harness.compose import ComposeError, compose, load_task_diffs
+from harness.routes import REPO_ROOT
+from harness.runner import discover_tasks
+
+
+def test_composes_every_task_against_its_pre_image():
+    composition = compose(load_task_diffs(discover_tasks()), cache_dir=None)
+
+    assert len(composition.routes['server/app.js']) == 63
+    assert any('task-002 names pre-image 13eb8be' in warning for warning in composition.warnings)
+
+
+def test_missing_pre_image_is_an_error():
+    with pytest.raises(ComposeError, match='13eb8be .task-002. are not in this repository'):
+        compose(load_task_diffs(['task-002']), cache_dir=None)
+
+
+def test_explicit_revision_base():
+    root = subprocess.run(['git', 'rev-list', '--max-parents=0', 'HEAD'], cwd=REPO_ROOT, check=True,
+                          stdout=subprocess.PIPE, text=True).stdout.split()[0]
+    composition = compose(load_task_diffs(['task-001', 'task-002']), base=root, cache_dir=None)
+
+    assert composition.warnings == []
+    assert composition.routes['server/app.js']
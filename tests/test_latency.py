@@ -0,0 +1,26 @@
+from benchmarks.endpoints import critical_endpoints, fill
+from benchmarks.latency import compare
+
+
+def stats(statuses, p50=1.0):
+    return {'p50_ms': p50, 'p95_ms': p50, 'p99_ms': p50, 'throughput': 100.0, 'requests': sum(statuses.values()),
+            'statuses': statuses, 'errors': {}}
+
+
+def test_compare_fails_when_the_error_rate_changes():
+    baseline = {'routes': {'DELETE /api/tasks/:id': stats({'200': 100})}}
+    faster_404s = {'routes': {'DELETE /api/tasks/:id': stats({'200': 1, '404': 99}, p50=0.5)}}
+    same = {'routes': {'DELETE /api/tasks/:id': stats({'200': 100})}}
+
+    assert compare(baseline, same) == []
+    [regression] = compare(baseline, faster_404s)
+    assert 'error rate 0.0% -> 99.0%' in regression
+
+
+def test_mutations_of_one_document_get_fresh_ids():
+    fresh = {(e.method, e.route): e.fresh for e in critical_endpoints()}
+    assert fresh[('DELETE', '/api/tasks/:id')] == 'tasks'
+    assert fresh[('PUT', '/api/users/:id')] == 'users'
+    assert fresh[('GET', '/api/tasks/:id')] is None
+    assert fresh[('POST', '/api/projects/:id/tasks')] is None
+    assert fill({'name': 'load-test-{n}', 'tags': ['{n}'], 'size': 3}, 7) == {'name': 'load-test-7', 'tags': ['7'], 'size': 3}
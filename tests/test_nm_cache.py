@@ -0,0 +1,47 @@
+import json
+import os
+
+from harness.nm_cache import NodeModulesCache
+
+
+def make_tree(path):
+    os.makedirs(os.path.join(path, 'pkg'))
+    with open(os.path.join(path, 'pkg', 'index.js'), 'w') as f:
+        f.write('module.exports = 1;\n')
+    os.makedirs(os.path.join(path, '.bin'))
+    os.symlink('../pkg/index.js', os.path.join(path, '.bin', 'pkg'))
+
+
+def test_restored_tree_does_not_share_files_with_the_cache(tmp_path):
+    cache = NodeModulesCache(root=str(tmp_path / 'cache'))
+    make_tree(str(tmp_path / 'installed'))
+    cache.store('k', str(tmp_path / 'installed'))
+
+    dest = tmp_path / 'project' / 'node_modules'
+    assert cache.restore('k', str(dest))
+    assert os.readlink(str(dest / '.bin' / 'pkg')) == '../pkg/index.js'
+    with open(str(dest / 'pkg' / 'index.js'), 'w') as f:
+        f.write('module.exports = 2;\n')
+
+    cached = os.path.join(cache.entry_dir('k'), 'node_modules', 'pkg', 'index.js')
+    with open(cached) as f:
+        assert f.read() == 'module.exports = 1;\n'
+
+
+def test_evict_keeps_lock_files_and_entries_in_use(tmp_path):
+    cache = NodeModulesCache(root=str(tmp_path / 'cache'), max_bytes=0)
+    for key in ('old', 'busy', 'new'):
+        os.makedirs(os.path.join(cache.entry_dir(key), 'node_modules'))
+        with open(os.path.join(cache.entry_dir(key), 'meta.json'), 'w') as f:
+            json.dump({'key': key, 'size': 10, 'created': 0}, f)
+        with cache.lock(key):
+            pass
+
+    with cache.lock('busy'):
+        removed = cache.evict(keep='new')
+
+    assert removed == ['old']
+    assert cache.lookup('old') is None
+    assert cache.lookup('busy') is not None
+    assert sorted(name for name in os.listdir(cache.root) if name.endswith('.lock')) == [
+        'busy.lock', 'new.lock', 'old.lock']
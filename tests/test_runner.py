@@ -0,0 +1,28 @@
+import os
+
+from harness.routes import RouteTable
+from harness.runner import TASKS_DIR, diff_routes, discover_tasks, run
+
+
+def test_diff_routes_lists_added_registrations():
+    routes = diff_routes(os.path.join(TASKS_DIR, 'task-001', 'task_diff.txt'))
+    assert routes
+    assert all(method in ('GET', 'POST', 'PUT', 'PATCH', 'DELETE') for method, _ in routes)
+
+
+def test_tasks_are_merged_at_head():
+    table = RouteTable.from_file()
+    for task_id in discover_tasks():
+        routes = diff_routes(os.path.join(TASKS_DIR, task_id, 'task_diff.txt'))
+        assert all(table.has(method, path) for method, path in routes), task_id
+
+
+def test_runner_passes_every_task_at_head(tmp_path):
+    summary = run(discover_tasks(), ref='HEAD', workers=4, report_dir=str(tmp_path / 'reports'), run_jest=False)
+
+    assert summary['passed'] == summary['total'] == len(discover_tasks())
+    for result in summary['tasks']:
+        apply_step = result['steps'][0]
+        assert apply_step['name'] == 'apply'
+        assert apply_step['output'].startswith('skipped:')
+    assert (tmp_path / 'reports' / 'junit.xml').exists()